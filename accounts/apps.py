@@ -10,4 +10,4 @@ class AccountsConfig(AppConfig):
         from .models_badges import add_badges_method
 
         add_badges_method()
-        import accounts.signals  # noqa: F401 — подключение сигналов LoginHistory
+        import accounts.signals  # noqa: F401 — сигналы LoginHistory и статистики
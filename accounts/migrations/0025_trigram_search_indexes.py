@@ -0,0 +1,45 @@
+"""
+GIN-индексы pg_trgm для поиска пользователей в админ-панели.
+
+admin_panel/search.py ищет через `icontains`, что на PostgreSQL даёт
+`UPPER(col::text) LIKE UPPER('%term%')` — индексы строятся ровно по
+этому выражению. CONCURRENTLY — без блокировки записи в таблицу,
+поэтому миграция не атомарная. На SQLite — no-op.
+"""
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TABLE = "accounts_customuser"
+FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {TABLE}_{field}_trgm_idx "
+            f"ON {TABLE} USING gin (UPPER({field}::text) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in FIELDS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {TABLE}_{field}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0024_alter_documentverification_document_file"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,5 +1,8 @@
 """
 Сигналы безопасности: запись LoginHistory при входе/неудаче.
+Плюс сброс кэшированной статистики пользователя (accounts/stats.py)
+при изменении его объявлений и сделок и штампа продавцов REST API
+(api/caching.py) при смене рейтинга.
 
 Подключаются через AccountsConfig.ready().
 """
@@ -7,8 +10,15 @@
 import logging
 
 from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from api import caching as api_cache
+from listings.models import Listing
+from transactions.models import PurchaseRequest
+
+from . import stats
+from .models import Profile
 from .models_security import LoginHistory
 
 logger = logging.getLogger("django.security")
@@ -64,3 +74,20 @@ def on_user_login_failed(sender, credentials, request, **kwargs):
         )
     except Exception as exc:
         logger.warning("LoginHistory.log_login (failed) error: %s", exc)
+
+
+@receiver([post_save, post_delete], sender=Listing)
+def invalidate_seller_stats(sender, instance, **kwargs):
+    stats.invalidate([instance.seller_id])
+
+
+@receiver([post_save, post_delete], sender=PurchaseRequest)
+def invalidate_deal_stats(sender, instance, **kwargs):
+    stats.invalidate([instance.buyer_id, instance.seller_id])
+
+
+@receiver(post_save, sender=Profile)
+def bump_api_sellers(sender, instance, update_fields=None, **kwargs):
+    # seller_rating в ListingSerializer; last_seen и прочие поля не влияют
+    if update_fields is None or "rating" in update_fields:
+        api_cache.bump("sellers")
@@ -0,0 +1,99 @@
+"""
+Сводная статистика пользователя для профиля и админ-панели.
+
+Раньше admin_panel.user_detail делал три отдельных COUNT (объявления,
+покупки, продажи через JOIN listing__seller), а публичный профиль —
+get_or_create профиля на каждый просмотр.
+
+Теперь все счётчики считаются одним SELECT: по скалярному подзапросу на
+таблицу, внутри — COUNT(...) FILTER (WHERE ...) (на SQLite Django
+разворачивает filter= в CASE WHEN). Результат лежит в кэше под ключом
+`user_stats:{user_id}` с TTL USER_STATS_TTL. Сохранение или удаление
+объявления и сделки сбрасывает ключ продавца и покупателя после коммита
+(accounts/signals.py). Массовые .update() сигналов не шлют — их
+расхождение ограничено TTL.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+KEY_PREFIX = "user_stats"
+FIELDS = ("listings", "active_listings", "purchases", "sales")
+
+
+def _key(user_id) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _ttl() -> int:
+    return getattr(settings, "USER_STATS_TTL", 300)
+
+
+def _scalar(queryset, owner: str, **aggregates):
+    """Скалярные подзапросы с агрегатами queryset по владельцу OuterRef("pk")."""
+    grouped = queryset.filter(**{owner: OuterRef("pk")}).order_by().values(owner)
+    return {
+        name: Coalesce(
+            Subquery(grouped.annotate(value=aggregate).values("value")[:1]),
+            0,
+            output_field=IntegerField(),
+        )
+        for name, aggregate in aggregates.items()
+    }
+
+
+def _load(user_id) -> Dict[str, int]:
+    from accounts.models import CustomUser
+    from listings.models import Listing
+    from transactions.models import PurchaseRequest
+
+    completed = Q(status="completed")
+    row = (
+        CustomUser.objects.filter(pk=user_id)
+        .values("pk")
+        .annotate(
+            **_scalar(
+                Listing.objects.all(),
+                "seller",
+                listings=Count("pk"),
+                active_listings=Count("pk", filter=Q(status="active")),
+            ),
+            **_scalar(
+                PurchaseRequest.objects.all(),
+                "buyer",
+                purchases=Count("pk", filter=completed),
+            ),
+            **_scalar(
+                PurchaseRequest.objects.all(),
+                "seller",
+                sales=Count("pk", filter=completed),
+            ),
+        )
+        .first()
+    )
+    if row is None:
+        return dict.fromkeys(FIELDS, 0)
+    return {field: row[field] for field in FIELDS}
+
+
+def get_user_stats(user_id) -> Dict[str, int]:
+    """Счётчики пользователя: из кэша, иначе одним запросом с дозаписью в кэш."""
+    stats = cache.get(_key(user_id))
+    if stats is None:
+        stats = _load(user_id)
+        cache.set(_key(user_id), stats, _ttl())
+    return stats
+
+
+def invalidate(user_ids: Iterable) -> None:
+    """Сбросить статистику пользователей после коммита текущей транзакции."""
+    keys = [_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
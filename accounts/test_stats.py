@@ -0,0 +1,91 @@
+"""Тесты сводной статистики пользователя (accounts/stats.py)."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from accounts import stats
+from accounts.models import Profile
+
+
+@pytest.mark.django_db
+def test_stats_counted_in_one_query(
+    seller, buyer, listing_factory, purchase_request_factory, django_assert_num_queries
+):
+    sold = listing_factory(seller)
+    listing_factory(seller, status="cancelled")
+    deal = purchase_request_factory(sold, buyer)
+    deal.status = "completed"
+    deal.save()
+    purchase_request_factory(listing_factory(seller), buyer)
+
+    with django_assert_num_queries(1):
+        seller_stats = stats.get_user_stats(seller.pk)
+    with django_assert_num_queries(0):
+        assert stats.get_user_stats(seller.pk) == seller_stats
+
+    assert seller_stats == {
+        "listings": 3,
+        "active_listings": 2,
+        "purchases": 0,
+        "sales": 1,
+    }
+    assert stats.get_user_stats(buyer.pk) == {
+        "listings": 0,
+        "active_listings": 0,
+        "purchases": 1,
+        "sales": 0,
+    }
+
+
+@pytest.mark.django_db
+def test_stats_reset_on_listing_and_deal_changes(
+    seller, buyer, listing_factory, purchase_request_factory, django_capture_on_commit_callbacks
+):
+    assert stats.get_user_stats(seller.pk)["listings"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        listing = listing_factory(seller)
+    assert stats.get_user_stats(seller.pk)["listings"] == 1
+    assert stats.get_user_stats(buyer.pk)["purchases"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        deal = purchase_request_factory(listing, buyer)
+        deal.status = "completed"
+        deal.save()
+    assert stats.get_user_stats(buyer.pk)["purchases"] == 1
+    assert stats.get_user_stats(seller.pk)["sales"] == 1
+
+
+@pytest.mark.django_db
+def test_profile_page_reads_without_writes(client, seller, listing_factory):
+    listing_factory(seller)
+    Profile.objects.filter(user=seller).delete()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("accounts:profile", kwargs={"username": seller.username}))
+
+    assert response.status_code == 200
+    assert "активных объявлений" in response.content.decode()
+    writes = [
+        q["sql"] for q in queries if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE"))
+    ]
+    assert writes == []
+    assert not Profile.objects.filter(user=seller).exists()
+
+
+@pytest.mark.django_db
+def test_admin_user_detail_uses_stats(client, user_factory, seller, listing_factory):
+    admin = user_factory()
+    admin.is_staff = True
+    admin.save()
+    client.force_login(admin)
+    listing_factory(seller)
+
+    response = client.get(reverse("admin_panel:user_detail", args=[seller.pk]))
+
+    assert response.status_code == 200
+    assert response.context["user_listings"] == 1
+    assert response.context["user_sales"] == 0
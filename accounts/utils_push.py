@@ -117,15 +117,7 @@ def send_push_notification(user, title, body, url=None, icon=None):
         )
         return {'queued': 0, 'failed': 0, 'sent': 0}
 
-    payload = {
-        'title': title,
-        'body': body,
-        'icon': icon or '/static/img/logo.png',
-    }
-    if url:
-        payload['url'] = url
-
-    payload_json = json.dumps(payload)
+    payload_json = build_push_payload(title, body, url, icon)
 
     queued = 0
     for sub_id in subscription_ids:
@@ -145,6 +137,9 @@ def send_push_to_multiple_users(users, title, body, url=None, icon=None):
     """
     Постановка push-уведомлений в очередь для нескольких пользователей.
 
+    Подписки всех пользователей выбираются одним запросом и уходят
+    пачками в send_push_batch (вместо запроса и задачи на подписку).
+
     Args:
         users: QuerySet или список пользователей.
         title: Заголовок.
@@ -155,12 +150,119 @@ def send_push_to_multiple_users(users, title, body, url=None, icon=None):
     Returns:
         dict: {'queued': N, 'failed': 0}
     """
-    total_queued = 0
-    total_failed = 0
+    if not getattr(settings, 'VAPID_PRIVATE_KEY', ''):
+        logger.error('VAPID keys not configured')
+        return {'queued': 0, 'failed': 0, 'sent': 0}
+
+    subscription_ids = PushSubscription.objects.filter(
+        user__in=users, is_active=True
+    ).values_list('id', flat=True)
+    payload_json = build_push_payload(title, body, url, icon)
+    queued = enqueue_push_batches(
+        [[sub_id, payload_json] for sub_id in subscription_ids]
+    )
+    return {'queued': queued, 'failed': 0, 'sent': queued}
+
+
+def build_push_payload(title, body, url=None, icon=None):
+    """JSON payload push-уведомления (title/body/icon/url)."""
+    payload = {
+        'title': title,
+        'body': body,
+        'icon': icon or '/static/img/logo.png',
+    }
+    if url:
+        payload['url'] = url
+    return json.dumps(payload)
+
+
+def enqueue_push_batches(deliveries):
+    """
+    Поставить доставки [subscription_id, payload_json] в send_push_batch
+    пачками по NOTIFICATION_BATCH_SIZE после коммита транзакции.
 
-    for user in users:
-        result = send_push_notification(user, title, body, url, icon)
-        total_queued += result.get('queued', 0)
-        total_failed += result.get('failed', 0)
+    Returns:
+        int: Сколько доставок поставлено в очередь.
+    """
+    deliveries = list(deliveries)
+    batch_size = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 100)
+    for start in range(0, len(deliveries), batch_size):
+        batch = deliveries[start:start + batch_size]
+        transaction.on_commit(lambda b=batch: send_push_batch.delay(b))
+    return len(deliveries)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def send_push_batch(self, deliveries):  # noqa: C901
+    """
+    Отправка пачки push-уведомлений одной HTTP-сессией.
+
+    Args:
+        deliveries: Список пар [subscription_id, payload_json].
+
+    Особенности:
+        - Подписки читаются одним запросом, протухшие (404/410)
+          деактивируются одним UPDATE.
+        - Прочие ошибки => retry задачи только с неотправленными.
 
-    return {'queued': total_queued, 'failed': total_failed, 'sent': total_queued}
+    Returns:
+        int: Сколько уведомлений отправлено.
+    """
+    if not getattr(settings, 'VAPID_PRIVATE_KEY', ''):
+        logger.warning('VAPID_PRIVATE_KEY not configured — push skipped')
+        return 0
+
+    from core.integrations.http import pooled_session
+
+    subscriptions = dict(
+        PushSubscription.objects.filter(
+            id__in=[sub_id for sub_id, _ in deliveries], is_active=True
+        ).values_list('id', 'subscription_info')
+    )
+    session = pooled_session('webpush')
+    vapid_claims = {'sub': f'mailto:{settings.DEFAULT_FROM_EMAIL}'}
+    sent = 0
+    gone = []
+    failed = []
+    for sub_id, payload_json in deliveries:
+        info = subscriptions.get(sub_id)
+        if info is None:
+            continue
+        try:
+            webpush(
+                subscription_info=info,
+                data=payload_json,
+                vapid_private_key=settings.VAPID_PRIVATE_KEY,
+                vapid_claims=dict(vapid_claims),
+                timeout=10,
+                requests_session=session,
+            )
+            sent += 1
+        except WebPushException as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in (404, 410):
+                gone.append(sub_id)
+            else:
+                logger.warning(
+                    f'WebPushException for subscription #{sub_id}: {e}'
+                )
+                failed.append([sub_id, payload_json])
+        except Exception as e:
+            logger.exception(
+                f'Unexpected error sending push to subscription #{sub_id}: {e}'
+            )
+            failed.append([sub_id, payload_json])
+
+    if gone:
+        PushSubscription.objects.filter(id__in=gone).update(is_active=False)
+    logger.info(
+        f'Push batch: sent={sent} gone={len(gone)} failed={len(failed)}'
+    )
+    if failed:
+        try:
+            raise self.retry(args=[failed])
+        except self.MaxRetriesExceededError:
+            logger.error(
+                f'Max retries exceeded for push batch ({len(failed)} items)'
+            )
+    return sent
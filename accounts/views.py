@@ -22,6 +22,7 @@ from .forms import (
 )
 from .models import CustomUser, PasswordResetCode, Profile
 from .models_security import LoginHistory
+from .stats import get_user_stats
 
 
 def _get_client_ip(request):
@@ -220,21 +221,16 @@ def profile(request, username):
     from django.core.paginator import Paginator
 
     # Case-insensitive поиск (argear = Argear)
-    user = get_object_or_404(CustomUser, username__iexact=username)
+    user = get_object_or_404(
+        CustomUser.objects.select_related("profile"), username__iexact=username
+    )
 
-    # Исправление: проверка на существование profile (уже реализовано)
-    # Используем get_or_create для атомарности
+    # Публичная страница ничего не пишет: профиль создаёт post_save сигнал,
+    # а для старых пользователей без него показываем пустой несохранённый.
     try:
-        profile, created = Profile.objects.get_or_create(user=user)
-        if created:
-            messages.info(request, "Профиль был создан автоматически.")
-    except Exception as e:
-        import logging
-
-        logger = logging.getLogger(__name__)
-        logger.error(f"Ошибка при создании профиля для {username}: {e}")
-        messages.error(request, "Произошла ошибка при загрузке профиля.")
-        return redirect("listings:home")
+        profile = user.profile
+    except Profile.DoesNotExist:
+        profile = Profile(user=user)
 
     # Получаем отзывы о пользователе с оптимизацией
     reviews = (
@@ -256,6 +252,7 @@ def profile(request, username):
     context = {
         "profile_user": user,
         "profile": profile,
+        "stats": get_user_stats(user.pk),
         "reviews": reviews_page,
         "is_own_profile": is_own_profile,
     }
@@ -46,7 +46,7 @@ def _audit(action_type, *, actor, target=None, description, risk_level, request,
         md["target_user_id"] = target.id
         md["target_username"] = target.username
     md.update(metadata)
-    SecurityAuditLog.objects.create(
+    SecurityAuditLog.log(
         user=actor,
         action_type=action_type,
         risk_level=risk_level,
@@ -585,6 +585,105 @@ def resolve_dispute(request, dispute_id):
     return json_response(True, "Спор разрешен")
 
 
+# ═══════════════════════════════════════════════════════════════
+# ВЫВОДЫ СРЕДСТВ
+# ═══════════════════════════════════════════════════════════════
+
+
+@user_passes_test(is_staff_or_moderator)
+def withdrawals_queue(request):
+    """Сводка очереди pending-выводов (один агрегатный запрос)."""
+    from payments.selectors import withdrawal_queue_summary
+
+    summary = withdrawal_queue_summary()
+    return json_response(
+        success=True,
+        data={
+            "count": summary["count"],
+            "total_amount": str(summary["total_amount"]),
+            "stale_count": summary["stale_count"],
+            "stale_amount": str(summary["stale_amount"]),
+            "buckets": {
+                key: {"count": b["count"], "amount": str(b["amount"])}
+                for key, b in summary["buckets"].items()
+            },
+            "by_method": {
+                method: {"count": m["count"], "amount": str(m["amount"])}
+                for method, m in summary["by_method"].items()
+            },
+        },
+    )
+
+
+@require_POST
+@staff_member_required
+def process_withdrawals(request):
+    """Пакетно завершить/отклонить заявки на вывод одной транзакцией.
+
+    Параметры POST:
+        action: 'complete' | 'reject'
+        ids: pk заявок (повторяющийся параметр или через запятую)
+        comment: комментарий администратора
+
+    Финансовая операция — требуем 2FA.
+    """
+    from payments.services import process_withdrawals_batch
+
+    if not _has_2fa(request.user):
+        logger.warning("admin process_withdrawals denied (no 2FA): actor=%s", request.user.pk)
+        return json_response(False, "Включите 2FA для критических админ-операций")
+
+    action = request.POST.get("action")
+    if action not in ("complete", "reject"):
+        return json_response(False, "Неверное действие")
+
+    raw_ids = []
+    for value in request.POST.getlist("ids"):
+        raw_ids.extend(part for part in value.split(",") if part.strip())
+    try:
+        ids = [int(part) for part in raw_ids]
+    except ValueError:
+        return json_response(False, "Некорректный список заявок")
+    if not ids:
+        return json_response(False, "Не выбраны заявки")
+
+    comment = request.POST.get("comment") or (
+        f"{'Одобрено' if action == 'complete' else 'Отклонено'} " f"админом {request.user.username}"
+    )
+    result = process_withdrawals_batch(withdrawal_ids=ids, action=action, admin_comment=comment)
+
+    logger.warning(
+        "admin process_withdrawals: actor=%s action=%s processed=%s failed=%s",
+        request.user.pk,
+        action,
+        result["processed"],
+        list(result["failed"]),
+    )
+    _audit(
+        action_type="withdrawal_complete" if action == "complete" else "balance_change",
+        actor=request.user,
+        description=(
+            f"Пакетная обработка выводов ({action}): "
+            f"{len(result['processed'])} обработано, {len(result['failed'])} ошибок"
+        ),
+        risk_level="high",
+        request=request,
+        action=action,
+        processed=result["processed"],
+        skipped=result["skipped"],
+    )
+
+    return json_response(
+        success=True,
+        message=f"Обработано заявок: {len(result['processed'])}",
+        data={
+            "processed": result["processed"],
+            "skipped": result["skipped"],
+            "failed": {str(pk): reason for pk, reason in result["failed"].items()},
+        },
+    )
+
+
 # ═══════════════════════════════════════════════════════════════
 # РЕПОРТЫ
 # ═══════════════════════════════════════════════════════════════
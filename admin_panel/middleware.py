@@ -4,6 +4,8 @@ import logging
 
 from django.core.cache import cache
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 from listings.models import Report
 from payments.models_disputes import Dispute
 
@@ -15,34 +17,49 @@ SIDEBAR_CACHE_TTL = 60  # секунд
 class AdminPanelContextMiddleware:
     """Подкладывает счётчики в request только на маршрутах кастомной админки."""
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        if request.path.startswith("/custom-admin/") and self._is_staff(request.user):
-            counters = cache.get("admin_panel:sidebar_counters")
-            if counters is None:
-                pending_reports = Report.objects.filter(status="pending").count()
-                active_disputes = Dispute.objects.filter(
-                    status__in=["open", "under_review"]
-                ).count()
-                counters = {
-                    "pending_reports": pending_reports,
-                    "active_disputes": active_disputes,
-                }
-                cache.set("admin_panel:sidebar_counters", counters, SIDEBAR_CACHE_TTL)
-                logger.debug(
-                    "admin sidebar counters MISS: reports=%s disputes=%s",
-                    pending_reports,
-                    active_disputes,
-                )
-
-            request.pending_moderation = counters["pending_reports"]
-            request.pending_reports = counters["pending_reports"]
-            request.active_disputes = counters["active_disputes"]
-
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path.startswith("/custom-admin/"):
+            self._attach_counters(request)
         return self.get_response(request)
 
+    async def __acall__(self, request):
+        # Вне админки — без перехода в поток
+        if request.path.startswith("/custom-admin/"):
+            await sync_to_async(self._attach_counters)(request)
+        return await self.get_response(request)
+
+    def _attach_counters(self, request):
+        if not self._is_staff(request.user):
+            return
+        counters = cache.get("admin_panel:sidebar_counters")
+        if counters is None:
+            pending_reports = Report.objects.filter(status="pending").count()
+            active_disputes = Dispute.objects.filter(status__in=["open", "under_review"]).count()
+            counters = {
+                "pending_reports": pending_reports,
+                "active_disputes": active_disputes,
+            }
+            cache.set("admin_panel:sidebar_counters", counters, SIDEBAR_CACHE_TTL)
+            logger.debug(
+                "admin sidebar counters MISS: reports=%s disputes=%s",
+                pending_reports,
+                active_disputes,
+            )
+
+        request.pending_moderation = counters["pending_reports"]
+        request.pending_reports = counters["pending_reports"]
+        request.active_disputes = counters["active_disputes"]
+
     @staticmethod
     def _is_staff(user):
         if not user.is_authenticated:
@@ -0,0 +1,170 @@
+"""
+Поиск и пагинация для списков админ-панели.
+
+Поиск по подстроке — `icontains`, на PostgreSQL это
+`UPPER(col::text) LIKE UPPER('%term%')`; под ровно это выражение
+миграции accounts/0025 и listings/0022 строят GIN-индексы pg_trgm
+(`gin_trgm_ops`), так что поиск идёт по индексу, а не Seq Scan.
+
+Условия по связанным таблицам (продавец объявления, покупатель сделки)
+собираются подзапросами `pk__in` вместо OR через JOIN: иначе OR по
+разным таблицам не раскладывается в BitmapOr и индексы не используются.
+Терм короче MIN_TRIGRAM_LENGTH (трёхграмм из него не получится) ищется
+точным совпадением.
+
+Пагинация — keyset по (поле даты, pk) с курсором в GET-параметре
+вместо OFFSET; счётчик — COUNT по подзапросу с LIMIT COUNT_CAP + 1
+(«10 000+» вместо полного COUNT по миллионам строк).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import CustomUser
+from listings.models import Listing
+
+MIN_TRIGRAM_LENGTH = 3
+COUNT_CAP = 10000
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+LISTING_FIELDS = ("title", "description")
+
+CURSOR_PARAM = "after"
+REVERSE_CURSOR_PARAM = "before"
+
+
+def text_q(fields, term: str) -> Q:
+    """OR по полям: icontains (trigram-индекс) или iexact для коротких термов."""
+    lookup = "icontains" if len(term) >= MIN_TRIGRAM_LENGTH else "iexact"
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__{lookup}": term})
+    return condition
+
+
+def matching_users(term: str) -> QuerySet:
+    """pk пользователей, подходящих под терм (подзапрос)."""
+    return CustomUser.objects.filter(text_q(USER_FIELDS, term)).values("pk")
+
+
+def search_users(queryset: QuerySet, term: str) -> QuerySet:
+    return queryset.filter(text_q(USER_FIELDS, term))
+
+
+def search_listings(queryset: QuerySet, term: str) -> QuerySet:
+    return queryset.filter(text_q(LISTING_FIELDS, term) | Q(seller_id__in=matching_users(term)))
+
+
+def search_transactions(queryset: QuerySet, term: str) -> QuerySet:
+    users = matching_users(term)
+    listings = Listing.objects.filter(text_q(("title",), term) | Q(seller_id__in=users))
+    return queryset.filter(Q(buyer_id__in=users) | Q(listing_id__in=listings.values("pk")))
+
+
+def capped_count(queryset: QuerySet, cap: int = COUNT_CAP) -> str:
+    """Число строк для шапки списка: точное до cap, дальше «cap+»."""
+    count = queryset.order_by()[: cap + 1].count()
+    if count > cap:
+        return f"{cap:,}+".replace(",", " ")
+    return str(count)
+
+
+def _encode(value: datetime, pk: int) -> str:
+    return f"{value.isoformat()}|{pk}"
+
+
+def _decode(cursor: str) -> Optional[tuple]:
+    value, _, pk = (cursor or "").partition("|")
+    try:
+        moment = parse_datetime(value)
+        return (moment, int(pk)) if moment else None
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    """
+    Страница keyset-пагинации (от новых к старым).
+
+    Итерируется как список объектов; next_query / previous_query —
+    querystring соседних страниц с сохранением фильтров.
+    """
+
+    def __init__(self, object_list, *, has_next, has_previous, field, params):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self._field = field
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _query(self, param=None, obj=None) -> str:
+        params = self._params.copy()
+        params.pop(CURSOR_PARAM, None)
+        params.pop(REVERSE_CURSOR_PARAM, None)
+        params.pop("page", None)
+        if param:
+            params[param] = _encode(getattr(obj, self._field), obj.pk)
+        return params.urlencode()
+
+    @property
+    def first_query(self) -> str:
+        return self._query()
+
+    @property
+    def next_query(self) -> str:
+        if not (self.has_next and self.object_list):
+            return ""
+        return self._query(CURSOR_PARAM, self.object_list[-1])
+
+    @property
+    def previous_query(self) -> str:
+        if not (self.has_previous and self.object_list):
+            return ""
+        return self._query(REVERSE_CURSOR_PARAM, self.object_list[0])
+
+
+def paginate_keyset(queryset: QuerySet, request, *, field: str = "created_at", per_page: int = 50):
+    """
+    Страница queryset по убыванию (field, pk) без OFFSET.
+
+    ?after=<курсор> — следующая страница, ?before=<курсор> — предыдущая.
+    Битый курсор — первая страница.
+    """
+    after = _decode(request.GET.get(CURSOR_PARAM))
+    before = None if after else _decode(request.GET.get(REVERSE_CURSOR_PARAM))
+
+    if before:
+        value, pk = before
+        rows = list(
+            queryset.filter(
+                Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+            ).order_by(field, "pk")[: per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(
+            rows, has_next=True, has_previous=has_previous, field=field, params=request.GET
+        )
+
+    if after:
+        value, pk = after
+        queryset = queryset.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}))
+    rows = list(queryset.order_by(f"-{field}", "-pk")[: per_page + 1])
+    return KeysetPage(
+        rows[:per_page],
+        has_next=len(rows) > per_page,
+        has_previous=after is not None,
+        field=field,
+        params=request.GET,
+    )
@@ -0,0 +1,122 @@
+"""Тесты поиска и keyset-пагинации админ-панели (admin_panel/search.py)."""
+
+from datetime import timedelta
+
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from accounts.models import CustomUser
+from admin_panel import search
+from listings.models import Listing
+from transactions.models import PurchaseRequest
+
+
+def _get(**params):
+    return RequestFactory().get("/", params)
+
+
+@pytest.mark.django_db
+def test_listing_search_matches_text_and_seller(seller, buyer, listing_factory):
+    by_title = listing_factory(buyer, title="Редкий скин дракона")
+    by_seller = listing_factory(seller, title="Аккаунт")
+    listing_factory(buyer, title="Другое")
+
+    found = search.search_listings(Listing.objects.all(), "дракон")
+    assert list(found) == [by_title]
+
+    found = search.search_listings(Listing.objects.all(), seller.username)
+    assert list(found) == [by_seller]
+
+
+@pytest.mark.django_db
+def test_short_terms_use_exact_match(user_factory):
+    user = user_factory(username="ab")
+    user_factory(username="abc_long")
+
+    assert list(search.search_users(CustomUser.objects.all(), "AB")) == [user]
+
+
+@pytest.mark.django_db
+def test_transaction_search_by_buyer_and_listing(
+    seller, buyer, listing_factory, purchase_request_factory
+):
+    deal = purchase_request_factory(listing_factory(seller, title="Золото 1000"), buyer)
+    other = purchase_request_factory(listing_factory(seller, title="Броня"), buyer)
+
+    # LIKE в SQLite регистронезависим только для ASCII — кириллица в том же регистре
+    assert set(search.search_transactions(PurchaseRequest.objects.all(), "Золото")) == {deal}
+    assert set(search.search_transactions(PurchaseRequest.objects.all(), buyer.username)) == {
+        deal,
+        other,
+    }
+
+
+@pytest.mark.django_db
+def test_keyset_pages_walk_forward_and_back(user_factory):
+    now = timezone.now()
+    users = []
+    for i in range(5):
+        user = user_factory()
+        # Две пары с одинаковой датой — порядок внутри решает pk
+        CustomUser.objects.filter(pk=user.pk).update(date_joined=now - timedelta(days=i // 2))
+        users.append(user)
+    expected = list(CustomUser.objects.order_by("-date_joined", "-pk"))
+    queryset = CustomUser.objects.all()
+
+    first = search.paginate_keyset(queryset, _get(role="x"), field="date_joined", per_page=2)
+    assert list(first) == expected[:2]
+    assert first.has_next and not first.has_previous
+
+    request = RequestFactory().get(f"/?{first.next_query}")
+    second = search.paginate_keyset(queryset, request, field="date_joined", per_page=2)
+    assert list(second) == expected[2:4]
+    assert second.has_previous
+    assert "role=x" in second.next_query
+
+    request = RequestFactory().get(f"/?{second.next_query}")
+    third = search.paginate_keyset(queryset, request, field="date_joined", per_page=2)
+    assert list(third) == expected[4:]
+    assert not third.has_next
+
+    request = RequestFactory().get(f"/?{third.previous_query}")
+    back = search.paginate_keyset(queryset, request, field="date_joined", per_page=2)
+    assert list(back) == expected[2:4]
+    assert back.has_previous and back.has_next
+
+
+@pytest.mark.django_db
+def test_broken_cursor_falls_back_to_first_page(user_factory):
+    user_factory()
+    page = search.paginate_keyset(
+        CustomUser.objects.all(), _get(after="garbage"), field="date_joined"
+    )
+    assert len(page) == 1
+    assert not page.has_previous
+
+
+@pytest.mark.django_db
+def test_capped_count(user_factory):
+    for _ in range(3):
+        user_factory()
+
+    assert search.capped_count(CustomUser.objects.all(), cap=5) == "3"
+    assert search.capped_count(CustomUser.objects.all(), cap=2) == "2+"
+
+
+@pytest.mark.django_db
+def test_admin_lists_render_with_cursor(client, user_factory, seller, listing_factory):
+    admin = user_factory()
+    CustomUser.objects.filter(pk=admin.pk).update(is_staff=True)
+    client.force_login(admin)
+    listing_factory(seller, title="Меч")
+
+    for name in ("users_list", "listings_moderation", "transactions_list"):
+        url = reverse(f"admin_panel:{name}")
+        assert client.get(url, {"search": "меч"}).status_code == 200
+        assert client.get(url, {"after": f"{timezone.now().isoformat()}|1"}).status_code == 200
+
+    response = client.get(reverse("admin_panel:users_list"), {"search": seller.username})
+    assert seller.username in response.content.decode()
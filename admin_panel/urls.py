@@ -57,6 +57,10 @@ urlpatterns = [
     # Споры
     path('api/disputes/<int:dispute_id>/resolve/', api_views.resolve_dispute, name='api_resolve_dispute'),
     
+    # Выводы средств
+    path('api/withdrawals/queue/', api_views.withdrawals_queue, name='api_withdrawals_queue'),
+    path('api/withdrawals/process/', api_views.process_withdrawals, name='api_process_withdrawals'),
+    
     # Репорты
     path('api/reports/<int:report_id>/process/', api_views.process_report, name='api_process_report'),
     
@@ -10,6 +10,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from accounts.models import CustomUser, Profile
+from accounts.stats import get_user_stats
 from core.models_audit import DataChangeLog, SecurityAuditLog
 from core.utils import paginate_queryset
 from listings.models import Category, Game, Listing, Report
@@ -17,6 +18,8 @@ from payments.models import Wallet
 from payments.models_disputes import Dispute
 from transactions.models import PurchaseRequest, Review
 
+from . import search as admin_search
+
 logger = logging.getLogger(__name__)
 
 
@@ -148,16 +151,10 @@ def users_list(request):
         users = users.filter(profile__is_verified=False)
 
     if search:
-        users = users.filter(
-            Q(username__icontains=search)
-            | Q(email__icontains=search)
-            | Q(first_name__icontains=search)
-            | Q(last_name__icontains=search)
-        )
-
-    users = users.order_by("-date_joined")
-    page_obj = paginate_queryset(users, request, per_page=50)
-    total_count = page_obj.paginator.count
+        users = admin_search.search_users(users, search)
+
+    page_obj = admin_search.paginate_keyset(users, request, field="date_joined", per_page=50)
+    total_count = admin_search.capped_count(users)
 
     context = {
         "users": page_obj,
@@ -183,10 +180,8 @@ def user_detail(request, user_id):
         user.pk,
     )
 
-    # Статистика пользователя
-    user_listings = Listing.objects.filter(seller=user).count()
-    user_purchases = PurchaseRequest.objects.filter(buyer=user, status="completed").count()
-    user_sales = PurchaseRequest.objects.filter(listing__seller=user, status="completed").count()
+    # Статистика пользователя — один запрос (или кэш), см. accounts/stats.py
+    stats = get_user_stats(user.pk)
 
     # Последняя активность
     recent_listings = Listing.objects.filter(seller=user).order_by("-created_at")[:5]
@@ -197,9 +192,9 @@ def user_detail(request, user_id):
 
     context = {
         "user": user,
-        "user_listings": user_listings,
-        "user_purchases": user_purchases,
-        "user_sales": user_sales,
+        "user_listings": stats["listings"],
+        "user_purchases": stats["purchases"],
+        "user_sales": stats["sales"],
         "recent_listings": recent_listings,
         "recent_purchases": recent_purchases,
         "security_logs": security_logs,
@@ -211,11 +206,7 @@ def user_detail(request, user_id):
 @user_passes_test(is_staff_or_moderator)
 def listings_moderation(request):
     """Модерация объявлений"""
-    listings = (
-        Listing.objects.select_related("game", "category", "seller__profile")
-        .annotate(views_count=Count("views"))
-        .all()
-    )
+    listings = Listing.objects.select_related("game", "category", "seller__profile")
 
     # Фильтры
     status = request.GET.get("status")
@@ -232,15 +223,12 @@ def listings_moderation(request):
         listings = listings.filter(game_id=game)
 
     if search:
-        listings = listings.filter(
-            Q(title__icontains=search)
-            | Q(description__icontains=search)
-            | Q(seller__username__icontains=search)
-        )
-
-    listings = listings.order_by("-created_at")
-    page_obj = paginate_queryset(listings, request, per_page=50)
-    total_count = page_obj.paginator.count
+        listings = admin_search.search_listings(listings, search)
+
+    total_count = admin_search.capped_count(listings)
+    page_obj = admin_search.paginate_keyset(
+        listings.annotate(views_count=Count("views")), request, per_page=50
+    )
 
     # Для фильтра игр
     games = Game.objects.all().order_by("name")
@@ -293,15 +281,10 @@ def transactions_list(request):
         transactions = transactions.filter(status=status)
 
     if search:
-        transactions = transactions.filter(
-            Q(buyer__username__icontains=search)
-            | Q(listing__seller__username__icontains=search)
-            | Q(listing__title__icontains=search)
-        )
-
-    transactions = transactions.order_by("-created_at")
-    page_obj = paginate_queryset(transactions, request, per_page=50)
-    total_count = page_obj.paginator.count
+        transactions = admin_search.search_transactions(transactions, search)
+
+    page_obj = admin_search.paginate_keyset(transactions, request, per_page=50)
+    total_count = admin_search.capped_count(transactions)
 
     context = {
         "transactions": page_obj,
@@ -0,0 +1,121 @@
+"""
+HTTP-кэширование публичного REST API: ETag, условный GET, Cache-Control.
+
+Каждая коллекция (games, categories, listings, sellers) имеет штамп
+версии в кэше `api:version:<имя>` — время последнего изменения. Штампы
+обновляют существующие сигналы: listings/signals.py (игры, категории,
+объявления) и accounts/signals.py (рейтинг продавца).
+
+CachedReadMixin для list/retrieve:
+    - ETag = sha1(штампы коллекций вьюсета + схема и хост + путь +
+      нормализованный querystring + формат ответа), Last-Modified = самый
+      свежий штамп. Хост — в ключе: URL картинок (image, icon) абсолютные,
+      ответ для внутреннего имени или другого домена отдавать нельзя;
+    - If-None-Match / If-Modified-Since совпали → 304 сразу после
+      get_many штампов, без queryset и сериализатора;
+    - иначе сериализованные данные страницы берутся из кэша по тому же
+      ETag (`api:page:<etag>`) с TTL API_CACHE_TTL — новая версия
+      коллекции даёт новый ключ, старые записи истекают сами.
+
+Last-Modified секундный, поэтому правка в ту же секунду, что и ответ,
+по If-Modified-Since не видна — точным остаётся ETag (клиенты шлют
+If-None-Match, и тогда If-Modified-Since игнорируется).
+
+Ответ не зависит от пользователя (только публичные данные), поэтому
+ключ общий; Cache-Control для анонимов — public, для авторизованных —
+private (browsable API выводит имя пользователя).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.middleware_pagecache import normalized_query
+
+COLLECTIONS = ("games", "categories", "listings", "sellers")
+
+VERSION_PREFIX = "api:version"
+PAGE_PREFIX = "api:page"
+
+
+def _version_key(collection: str) -> str:
+    return f"{VERSION_PREFIX}:{collection}"
+
+
+def bump(*collections: str) -> None:
+    """Новый штамп версии коллекций: все их ETag и кэш страниц устаревают."""
+    now = time.time()
+    cache.set_many({_version_key(name): now for name in collections or COLLECTIONS}, timeout=None)
+
+
+def get_versions(collections: Iterable[str]) -> Dict[str, float]:
+    """Штампы коллекций одним get_many; отсутствующие (сброс кэша) — текущее время."""
+    keys = {_version_key(name): name for name in collections}
+    stored = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in stored}
+    if missing:
+        # add(): параллельный запрос мог уже записать штамп — берём его
+        for key, value in missing.items():
+            cache.add(key, value, timeout=None)
+        stored.update(cache.get_many(missing))
+    return {keys[key]: value for key, value in stored.items()}
+
+
+class CachedReadMixin:
+    """
+    ETag / Last-Modified / Cache-Control и кэш данных для list и retrieve.
+
+    cache_collections — коллекции, от которых зависит ответ вьюсета.
+    """
+
+    cache_collections: tuple = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_read(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_read(super().retrieve, request, *args, **kwargs)
+
+    def _cached_read(self, handler, request, *args, **kwargs):
+        if not getattr(settings, "API_CACHE_ENABLED", True):
+            return handler(request, *args, **kwargs)
+
+        versions = get_versions(self.cache_collections)
+        stamp = "|".join(f"{name}:{versions[name]!r}" for name in sorted(versions))
+        digest = hashlib.sha1(
+            f"{stamp}|{request.scheme}://{request.get_host()}{request.path}"
+            f"|{normalized_query(request.query_params)}"
+            f"|{request.accepted_renderer.format}".encode("utf-8")
+        ).hexdigest()
+        etag = f'"{digest}"'
+        last_modified = int(max(versions.values()))
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            key = f"{PAGE_PREFIX}:{digest}"
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, getattr(settings, "API_CACHE_TTL", 30))
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        visibility = "private" if request.user.is_authenticated else "public"
+        response["Cache-Control"] = (
+            f"{visibility}, max-age={getattr(settings, 'API_CACHE_MAX_AGE', 0)}, must-revalidate"
+        )
+        return response
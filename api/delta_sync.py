@@ -0,0 +1,133 @@
+"""
+Delta-sync каталога объявлений: изменения с курсора клиента.
+
+Зеркала каталога (клиенты, партнёрские интеграции) вместо повторной
+выгрузки /api/listings/ страницами OFFSET читают
+
+    GET /api/listings/changes/?cursor=<N>&limit=<M>
+
+и получают только листинги, изменившиеся после курсора:
+
+    created / updated — компактные строки listing_serializer (как в списке);
+    deleted           — id, которые нужно убрать из зеркала: удалённые и
+                        ушедшие из публичной выдачи (проданы, сняты);
+    cursor            — курсор следующего запроса, has_more — есть ли ещё.
+
+Источник — журнал ListingChange (listings/models_changes.py): курсор — id
+строки журнала. id выделяется не в транзакции самого изменения, а при
+переносе из PendingListingChange после её коммита, поэтому долгая
+транзакция (приём заявки с эскроу, порция перепроверки) не получит id
+меньше уже отданных. Перед чтением журнала перенос выполняется и здесь —
+для строк, чей on_commit не выполнился (падение процесса).
+
+Остаётся короткое окно между выделением id при переносе и его коммитом:
+строки моложе LISTING_CHANGES_SETTLE_SECONDS не отдаются. Окно должно
+быть больше длительности транзакции переноса; statement_timeout в ней
+ограничен четвертью окна (PostgreSQL).
+
+Первый запрос без cursor возвращает только текущий курсор: его нужно
+запомнить до полной выгрузки, затем читать изменения с него. Курсор старше
+срока хранения журнала (LISTING_CHANGES_RETENTION_DAYS) — 410, нужна
+полная выгрузка заново.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from listings.models import ListingChange
+
+from .fast_serializers import listing_serializer
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Курсор устарел: журнал изменений уже очищен, нужна полная синхронизация."
+    default_code = "cursor_expired"
+
+
+def parse_cursor(raw):
+    """None без курсора, иначе неотрицательное целое."""
+    if raw in (None, ""):
+        return None
+    try:
+        cursor = int(raw)
+    except (TypeError, ValueError):
+        cursor = -1
+    if cursor < 0:
+        raise ValidationError({"cursor": ["Ожидается неотрицательное целое."]})
+    return cursor
+
+
+def parse_limit(raw) -> int:
+    maximum = settings.LISTING_CHANGES_PAGE_SIZE
+    try:
+        limit = int(raw) if raw not in (None, "") else maximum
+    except (TypeError, ValueError):
+        raise ValidationError({"limit": ["Ожидается целое число."]})
+    return max(1, min(limit, maximum))
+
+
+def _settled():
+    """Журнал без строк моложе окна LISTING_CHANGES_SETTLE_SECONDS."""
+    horizon = timezone.now() - timedelta(seconds=settings.LISTING_CHANGES_SETTLE_SECONDS)
+    return ListingChange.objects.filter(created_at__lte=horizon)
+
+
+def head_cursor() -> int:
+    return _settled().order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def changes_page(queryset, cursor, limit: int, context: dict) -> dict:
+    """
+    Страница изменений после cursor.
+
+    queryset — публичная выдача объявлений: листинг из журнала, которого в
+    ней нет, попадает в deleted. Три запроса на страницу (проверка
+    неперенесённых изменений, журнал, строки листингов), ещё один — только
+    при разрыве в id для проверки курсора.
+    """
+    ListingChange.publish_pending()
+    if cursor is None:
+        return {"cursor": str(head_cursor()), "has_more": False}
+
+    rows = list(
+        _settled()
+        .filter(id__gt=cursor)
+        .order_by("id")
+        .values_list("id", "listing_id", "action")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows and rows[0][0] > cursor + 1:
+        # Разрыв — откаты транзакций или очистка журнала после курсора
+        # (очистка всегда оставляет последнюю строку, так что пустой
+        # журнал после курсора означает «изменений не было»)
+        oldest = ListingChange.objects.order_by("id").values_list("id", flat=True).first()
+        if oldest > cursor + 1:
+            raise CursorExpired()
+
+    # Несколько изменений одного листинга на странице схлопываются в одно
+    created, touched = set(), {}
+    for _, listing_id, action in rows:
+        touched[listing_id] = None
+        if action == "created":
+            created.add(listing_id)
+
+    visible = {
+        row["id"]: listing_serializer.one(row, context)
+        for row in queryset.filter(pk__in=list(touched)).values(*listing_serializer.lookups)
+    }
+    return {
+        "cursor": str(rows[-1][0] if rows else cursor),
+        "has_more": has_more,
+        "created": [visible[pk] for pk in touched if pk in visible and pk in created],
+        "updated": [visible[pk] for pk in touched if pk in visible and pk not in created],
+        "deleted": [pk for pk in touched if pk not in visible],
+    }
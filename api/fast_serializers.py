@@ -0,0 +1,215 @@
+"""
+Быстрые read-only сериализаторы для списков API.
+
+ModelSerializer на списке из 20–100 объектов тратит больше времени на
+обвязку полей (get_attribute по цепочке source, to_representation,
+ReturnDict), чем на сами данные. Для GET-списков объявлений, бесед и
+сообщений используется отдельный путь:
+
+    queryset.values(*serializer.lookups) → serializer.many(rows, context)
+
+ValuesSerializer собирается один раз на импорт модуля из списка полей
+(ключ ответа, lookup для .values(), конвертер). На строку — один dict
+comprehension; конвертеры повторяют to_representation соответствующих
+полей DRF (Decimal → строка с фиксированной точностью, datetime →
+ISO 8601 в текущей таймзоне с «Z» для UTC, файл → абсолютный URL), так что
+ответ совпадает с ListingSerializer / ConversationSerializer /
+MessageSerializer байт в байт по содержимому.
+
+FastListMixin подключает этот путь к action list вьюсета; create/update и
+retrieve остаются на обычных сериализаторах. Выключатель —
+API_FAST_SERIALIZERS. Замер — `manage.py bench_serializers`.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Callable, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from rest_framework.response import Response
+
+from chat.models import Message
+from listings.models import Listing
+
+Converter = Optional[Callable]
+
+
+def decimal_string(places: int) -> Callable:
+    """DecimalField(decimal_places=places) при COERCE_DECIMAL_TO_STRING."""
+    quantum = Decimal(1).scaleb(-places)
+
+    def convert(value, context):
+        if value is None:
+            return None
+        return f"{Decimal(value).quantize(quantum):f}"
+
+    return convert
+
+
+def iso_datetime(value, context):
+    """Как DateTimeField.to_representation при USE_TZ."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def file_url(field) -> Callable:
+    """FileField/ImageField с UPLOADED_FILES_USE_URL: абсолютный URL или None."""
+    storage = field.storage
+
+    def convert(value, context):
+        if not value:
+            return None
+        url = storage.url(value)
+        request = context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+class ValuesSerializer:
+    """
+    Сериализатор строк .values() по заранее собранной схеме.
+
+    fields — последовательность (ключ ответа, lookup, конвертер или None).
+    optional — ключи, которые выпадают из ответа при None: так DRF
+    пропускает read-only поле с source через пустую связь
+    (category.name при category=None).
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, str, Converter]], optional: Sequence[str] = ()):
+        self.fields = tuple(fields)
+        self.optional = tuple(optional)
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _ in self.fields))
+
+    def one(self, row: dict, context: dict) -> dict:
+        data = {
+            key: convert(row[lookup], context) if convert else row[lookup]
+            for key, lookup, convert in self.fields
+        }
+        for key in self.optional:
+            if data[key] is None:
+                del data[key]
+        return data
+
+    def many(self, rows, context: dict) -> list:
+        if self.optional:
+            return [self.one(row, context) for row in rows]
+        fields = self.fields
+        return [
+            {
+                key: convert(row[lookup], context) if convert else row[lookup]
+                for key, lookup, convert in fields
+            }
+            for row in rows
+        ]
+
+
+listing_serializer = ValuesSerializer(
+    [
+        ("id", "id", None),
+        ("title", "title", None),
+        ("description", "description", None),
+        ("price", "price", decimal_string(Listing._meta.get_field("price").decimal_places)),
+        ("image", "image", file_url(Listing._meta.get_field("image"))),
+        ("status", "status", None),
+        ("game", "game", None),
+        ("game_name", "game__name", None),
+        ("category", "category", None),
+        ("category_name", "category__name", None),
+        ("seller", "seller", None),
+        ("seller_username", "seller__username", None),
+        ("seller_rating", "seller__profile__rating", decimal_string(2)),
+        ("created_at", "created_at", iso_datetime),
+        ("updated_at", "updated_at", iso_datetime),
+    ],
+    optional=("game_name", "category_name", "seller_rating"),
+)
+
+message_serializer = ValuesSerializer(
+    [
+        ("id", "id", None),
+        ("conversation", "conversation", None),
+        ("sender", "sender", None),
+        ("sender_username", "sender__username", None),
+        ("content", "content", None),
+        ("is_read", "is_read", None),
+        ("created_at", "created_at", iso_datetime),
+    ]
+)
+
+conversation_serializer = ValuesSerializer(
+    [
+        ("id", "id", None),
+        ("participant1", "participant1", None),
+        ("participant2", "participant2", None),
+        ("listing", "listing", None),
+        ("created_at", "created_at", iso_datetime),
+        ("updated_at", "updated_at", iso_datetime),
+        ("last_message", "last_message_id", None),
+        ("unread_count", "unread_count", None),
+    ]
+)
+
+
+def annotate_conversations(queryset, user):
+    """unread_count для user и id последнего сообщения — в том же запросе."""
+    latest = (
+        Message.objects.filter(conversation=OuterRef("pk"))
+        .order_by()
+        .values("conversation")
+        .annotate(last=Max("pk"))
+        .values("last")
+    )
+    # С GROUP BY Meta.ordering не применяется — порядок задаём явно
+    return queryset.order_by("-updated_at", "-pk").annotate(
+        unread_count=Count(
+            "messages", filter=Q(messages__is_read=False) & ~Q(messages__sender=user)
+        ),
+        last_message_id=Subquery(latest[:1]),
+    )
+
+
+def attach_last_messages(conversations: list, context: dict) -> list:
+    """Подставить последние сообщения страницы бесед одним запросом."""
+    ids = [item["last_message"] for item in conversations if item["last_message"]]
+    rows = Message.objects.filter(pk__in=ids).values(*message_serializer.lookups)
+    messages = {row["id"]: message_serializer.one(row, context) for row in rows}
+    for item in conversations:
+        item["last_message"] = messages.get(item["last_message"])
+    return conversations
+
+
+class FastListMixin:
+    """
+    action list через .values() и ValuesSerializer вместо ModelSerializer.
+
+    fast_serializer — схема; finalize_fast_page(data) — дозагрузка
+    вложенных данных для страницы (по умолчанию без изменений).
+    """
+
+    fast_serializer: Optional[ValuesSerializer] = None
+
+    def finalize_fast_page(self, data: list) -> list:
+        return data
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer is None or not getattr(settings, "API_FAST_SERIALIZERS", True):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.fast_serializer.lookups)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        data = self.finalize_fast_page(
+            self.fast_serializer.many(rows, self.get_serializer_context())
+        )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,122 @@
+"""
+Бенчмарк сериализации списков API: ModelSerializer + json против
+api.fast_serializers + orjson.
+
+На каждый объект замеряется отдельно:
+    serialize — ListingSerializer(many=True).data против
+                listing_serializer.many() по строкам .values();
+    render    — то же плюс кодирование в JSON (JSONRenderer / ORJSONRenderer).
+
+По умолчанию объекты синтетические и в памяти (без БД): экземпляры
+моделей со связанными объектами для DRF и эквивалентные строки .values()
+для быстрого пути. С --from-db берутся активные объявления из БД; время
+запросов в замер не входит.
+
+Примеры:
+    python manage.py bench_serializers
+    python manage.py bench_serializers --items 100 --rounds 2000
+    python manage.py bench_serializers --from-db --items 50
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser, Profile
+from api.fast_serializers import listing_serializer
+from api.renderers import ORJSONRenderer
+from api.serializers import ListingSerializer
+from listings.models import Category, Game, Listing
+
+
+def synthetic_listings(count):
+    """Пары (экземпляры для DRF, строки .values() для быстрого пути)."""
+    now = timezone.now()
+    game = Game(pk=1, name="Dota 2", slug="dota-2")
+    category = Category(pk=1, game=game, name="Аккаунты", slug="accounts")
+    objects, rows = [], []
+    for i in range(count):
+        seller = CustomUser(pk=i % 10 + 1, username=f"seller_{i % 10}")
+        seller.profile = Profile(rating=Decimal("4.75"))
+        listing = Listing(
+            pk=i + 1,
+            title=f"Аккаунт с редкими скинами #{i}",
+            description="Прокачанный аккаунт, быстрая передача данных. " * 5,
+            price=Decimal("1499.00") + i,
+            status="active",
+            game=game,
+            category=category,
+            seller=seller,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        objects.append(listing)
+        rows.append(
+            {
+                "id": listing.pk,
+                "title": listing.title,
+                "description": listing.description,
+                "price": listing.price,
+                "image": "",
+                "status": listing.status,
+                "game": game.pk,
+                "game__name": game.name,
+                "category": category.pk,
+                "category__name": category.name,
+                "seller": seller.pk,
+                "seller__username": seller.username,
+                "seller__profile__rating": seller.profile.rating,
+                "created_at": listing.created_at,
+                "updated_at": listing.updated_at,
+            }
+        )
+    return objects, rows
+
+
+class Command(BaseCommand):
+    help = "Сравнение стоимости сериализации списка объявлений: DRF против fast + orjson"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=50, help="Объектов на странице")
+        parser.add_argument("--rounds", type=int, default=500, help="Повторов страницы")
+        parser.add_argument("--from-db", action="store_true", help="Активные объявления из БД")
+
+    def handle(self, *args, **options):
+        objects, rows = self._dataset(options["items"], options["from_db"])
+        if not rows:
+            self.stdout.write("Нет объявлений")
+            return
+        rounds = options["rounds"]
+        items = len(rows) * rounds
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{len(rows)} объектов × {rounds} повторов"))
+
+        json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        runs = {
+            "drf": lambda: ListingSerializer(objects, many=True).data,
+            "fast": lambda: listing_serializer.many(rows, {}),
+            "drf+json": lambda: json_renderer.render(ListingSerializer(objects, many=True).data),
+            "fast+orjson": lambda: orjson_renderer.render(listing_serializer.many(rows, {})),
+        }
+        self.stdout.write(f"{'схема':<12} {'сек':>8} {'мкс/объект':>11} {'объектов/с':>12}")
+        for name, run in runs.items():
+            started = time.perf_counter()
+            for _ in range(rounds):
+                run()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name:<12} {elapsed:>8.3f} {elapsed / items * 1e6:>11.1f} {items / elapsed:>12.0f}"
+            )
+
+    @staticmethod
+    def _dataset(count, from_db):
+        if not from_db:
+            return synthetic_listings(count)
+        queryset = Listing.objects.filter(status="active").order_by("-created_at")[:count]
+        objects = list(queryset.select_related("seller", "seller__profile", "game", "category"))
+        rows = list(queryset.values(*listing_serializer.lookups))
+        return objects, rows
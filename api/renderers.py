@@ -0,0 +1,36 @@
+"""
+JSON-рендерер REST API на orjson.
+
+orjson кодирует dict/list/str/int в несколько раз быстрее stdlib json,
+которым пользуется rest_framework.renderers.JSONRenderer. Типы, которых
+orjson не знает (Decimal, ленивые строки перевода, QuerySet), и datetime
+(OPT_PASSTHROUGH_DATETIME — чтобы формат совпадал с DRF) уходят в
+rest_framework.utils.encoders.JSONEncoder.default.
+
+Без установленного orjson рендерер ведёт себя как штатный JSONRenderer.
+"""
+
+from __future__ import annotations
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson в requirements/base.txt
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer с кодированием через orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=JSONEncoder().default, option=option)
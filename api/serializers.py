@@ -4,6 +4,7 @@ Serializers для REST API.
 from rest_framework import serializers
 from accounts.models import CustomUser, Profile
 from listings.models import Listing, Game, Category
+from listings.services import SELLER_STATUSES
 from transactions.models import PurchaseRequest, Review
 from chat.models import Conversation, Message
 
@@ -72,6 +73,29 @@ class ListingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'seller', 'created_at', 'updated_at']
 
 
+class ListingBulkCreateItemSerializer(serializers.Serializer):
+    """Элемент массового создания: поля без запросов к БД (связи проверяет сервис)"""
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(max_length=5000)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    game = serializers.IntegerField()
+    category = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ListingBulkUpdateItemSerializer(serializers.Serializer):
+    """Элемент массового изменения: цена и/или статус"""
+    id = serializers.IntegerField()
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    status = serializers.ChoiceField(choices=SELLER_STATUSES, required=False)
+
+    def validate(self, attrs):
+        if 'price' not in attrs and 'status' not in attrs:
+            raise serializers.ValidationError('Укажите price и/или status.')
+        return attrs
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор отзыва"""
     reviewer_username = serializers.CharField(source='reviewer.username', read_only=True)
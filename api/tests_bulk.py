@@ -0,0 +1,142 @@
+"""Тесты массовых операций с объявлениями (/api/listings/bulk/, bulk-delete/)."""
+
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from listings.models import Listing
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_per_item_errors(
+    api_client, seller, game, settings, django_capture_on_commit_callbacks
+):
+    settings.MAX_ACTIVE_LISTINGS = 2
+    api_client.force_authenticate(seller)
+    items = [
+        {"title": "Аккаунт 1", "description": "Описание", "price": "100", "game": game.pk},
+        {"title": "Аккаунт 2", "description": "Описание", "price": "-1", "game": game.pk},
+        {"title": "Аккаунт 3", "description": "Описание", "price": "300", "game": 999999},
+        {"title": "Аккаунт 4", "description": "Описание", "price": "400", "game": game.pk},
+        {"title": "Аккаунт 5", "description": "Описание", "price": "500", "game": game.pk},
+    ]
+
+    with mock.patch("listings.signals.bump_generation") as bump:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post("/api/listings/bulk/", {"items": items}, format="json")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (2, 3)
+    statuses = [result["status"] for result in data["results"]]
+    assert statuses == ["created", "error", "error", "created", "error"]
+    assert [result["index"] for result in data["results"]] == [0, 1, 2, 3, 4]
+    assert "price" in data["results"][1]["errors"]
+    assert "game" in data["results"][2]["errors"]
+    assert "non_field_errors" in data["results"][4]["errors"]
+    assert Listing.objects.filter(seller=seller, status="active").count() == 2
+    assert bump.call_count == 1
+
+
+@pytest.mark.django_db
+def test_bulk_update_changes_only_own_listings(api_client, seller, buyer, listing_factory):
+    own = listing_factory(seller, price=Decimal("100"))
+    cancelled = listing_factory(seller, status="cancelled")
+    foreign = listing_factory(buyer)
+    api_client.force_authenticate(seller)
+    items = [
+        {"id": own.pk, "price": "150.50"},
+        {"id": cancelled.pk, "status": "active"},
+        {"id": foreign.pk, "status": "cancelled"},
+        {"id": own.pk, "status": "cancelled"},
+        {"id": own.pk},
+    ]
+
+    response = api_client.patch("/api/listings/bulk/", {"items": items}, format="json")
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [
+        "updated",
+        "updated",
+        "error",
+        "error",
+        "error",
+    ]
+    own.refresh_from_db()
+    cancelled.refresh_from_db()
+    foreign.refresh_from_db()
+    assert own.price == Decimal("150.50") and own.status == "active"
+    assert cancelled.status == "active"
+    assert foreign.status == "active"
+
+
+@pytest.mark.django_db
+def test_bulk_update_keeps_reserved_listing(api_client, seller, listing_factory):
+    reserved = listing_factory(seller, status="reserved")
+    api_client.force_authenticate(seller)
+
+    response = api_client.patch(
+        "/api/listings/bulk/", {"items": [{"id": reserved.pk, "price": "1"}]}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert response.json()["failed"] == 1
+    reserved.refresh_from_db()
+    assert reserved.status == "reserved"
+
+
+@pytest.mark.django_db
+def test_bulk_delete_skips_listings_with_deals(
+    api_client, seller, buyer, listing_factory, purchase_request_factory
+):
+    free = listing_factory(seller)
+    with_deal = listing_factory(seller)
+    purchase_request_factory(with_deal, buyer)
+    foreign = listing_factory(buyer)
+    api_client.force_authenticate(seller)
+
+    response = api_client.post(
+        "/api/listings/bulk-delete/", {"ids": [free.pk, with_deal.pk, foreign.pk]}, format="json"
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [
+        "deleted",
+        "error",
+        "error",
+    ]
+    assert not Listing.objects.filter(pk=free.pk).exists()
+    assert Listing.objects.filter(pk__in=[with_deal.pk, foreign.pk]).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_payload_size_is_limited(api_client, seller, settings):
+    settings.API_BULK_MAX_ITEMS = 2
+    api_client.force_authenticate(seller)
+
+    response = api_client.post("/api/listings/bulk-delete/", {"ids": [1, 2, 3]}, format="json")
+    assert response.status_code == 400
+    assert "ids" in response.json()
+
+    response = api_client.patch("/api/listings/bulk/", {"items": []}, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_requires_authentication(api_client, game):
+    response = api_client.post(
+        "/api/listings/bulk/",
+        {"items": [{"title": "x", "description": "y", "price": "1", "game": game.pk}]},
+        format="json",
+    )
+
+    assert response.status_code in (401, 403)
+    assert not Listing.objects.exists()
@@ -0,0 +1,119 @@
+"""Тесты HTTP-кэширования публичного API (api/caching.py)."""
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+from listings.models import Category
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_conditional_get_returns_304_without_queries(
+    api_client, seller, listing_factory, django_assert_num_queries
+):
+    listing_factory(seller)
+
+    response = api_client.get("/api/listings/")
+    assert response.status_code == 200
+    assert response["Cache-Control"].startswith("public")
+    assert response["Last-Modified"]
+    etag = response["ETag"]
+
+    with django_assert_num_queries(0):
+        not_modified = api_client.get("/api/listings/", HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_serialized_page_cached_by_querystring(
+    api_client, seller, listing_factory, django_assert_num_queries
+):
+    listing_factory(seller, price=100)
+    first = api_client.get("/api/listings/", {"ordering": "price", "page": 1})
+
+    with django_assert_num_queries(0):
+        again = api_client.get("/api/listings/", {"page": 1, "ordering": "price"})
+    assert again.json() == first.json()
+    assert again["ETag"] == first["ETag"]
+
+    other = api_client.get("/api/listings/", {"ordering": "-price"})
+    assert other["ETag"] != first["ETag"]
+
+
+@pytest.mark.django_db
+def test_listing_change_bumps_etags(api_client, seller, listing_factory, game):
+    listing = listing_factory(seller, title="Старое")
+    listings_etag = api_client.get("/api/listings/")["ETag"]
+    games = api_client.get("/api/games/")
+    detail_etag = api_client.get(f"/api/listings/{listing.pk}/")["ETag"]
+
+    listing.title = "Новое"
+    listing.save()
+
+    response = api_client.get("/api/listings/", HTTP_IF_NONE_MATCH=listings_etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["title"] == "Новое"
+    assert (
+        api_client.get(f"/api/listings/{listing.pk}/", HTTP_IF_NONE_MATCH=detail_etag).status_code
+        == 200
+    )
+    assert api_client.get("/api/games/", HTTP_IF_NONE_MATCH=games["ETag"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_taxonomy_etag_ignores_listing_changes(api_client, seller, listing_factory, game):
+    # Список /api/categories/ перекрыт JSON-вью listings:api_categories — берём detail
+    category = Category.objects.create(game=game, name="Скины", slug="skins")
+    url = f"/api/categories/{category.pk}/"
+    etag = api_client.get(url)["ETag"]
+
+    listing_factory(seller)
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    category.name = "Предметы"
+    category.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_seller_rating_change_bumps_listing_etag(api_client, seller, listing_factory):
+    listing_factory(seller)
+    etag = api_client.get("/api/listings/")["ETag"]
+
+    profile = Profile.objects.get(user=seller)
+    profile.last_seen = None
+    profile.save(update_fields=["last_seen"])
+    assert api_client.get("/api/listings/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    profile.rating = 4.5
+    profile.save(update_fields=["rating"])
+    assert api_client.get("/api/listings/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_authenticated_responses_are_private(api_client, buyer):
+    api_client.force_authenticate(buyer)
+
+    response = api_client.get("/api/games/")
+
+    assert response.status_code == 200
+    assert response["Cache-Control"].startswith("private")
+
+
+@pytest.mark.django_db
+def test_cache_key_includes_host(api_client, settings, seller, listing_factory):
+    settings.ALLOWED_HOSTS = ["lootlink.ru", "internal.lootlink"]
+    listing_factory(seller, image="listings/sword.png")
+
+    public = api_client.get("/api/listings/", HTTP_HOST="lootlink.ru")
+    internal = api_client.get("/api/listings/", HTTP_HOST="internal.lootlink")
+
+    assert public["ETag"] != internal["ETag"]
+    assert public.json()["results"][0]["image"].startswith("http://lootlink.ru/")
+    assert internal.json()["results"][0]["image"].startswith("http://internal.lootlink/")
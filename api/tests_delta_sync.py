@@ -0,0 +1,163 @@
+"""Тесты delta-sync объявлений (/api/listings/changes/, api/delta_sync.py)."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+from rest_framework.test import APIClient
+
+from listings.models import ListingChange, PendingListingChange
+from listings.tasks import prune_listing_changes
+
+URL = "/api/listings/changes/"
+
+
+@pytest.fixture
+def api_client(settings):
+    settings.LISTING_CHANGES_SETTLE_SECONDS = 0
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_changes_since_cursor(api_client, seller, listing_factory):
+    kept = listing_factory(seller, title="Старое")
+    sold = listing_factory(seller)
+    removed = listing_factory(seller)
+    cursor = api_client.get(URL).json()["cursor"]
+
+    fresh = listing_factory(seller, title="Новое")
+    kept.title = "Обновлённое"
+    kept.save()
+    sold.status = "sold"
+    sold.save(update_fields=["status"])
+    removed_pk = removed.pk
+    removed.delete()
+
+    data = api_client.get(URL, {"cursor": cursor}).json()
+
+    assert [item["id"] for item in data["created"]] == [fresh.pk]
+    assert [item["title"] for item in data["updated"]] == ["Обновлённое"]
+    assert sorted(data["deleted"]) == sorted([sold.pk, removed_pk])
+    assert data["has_more"] is False
+
+    again = api_client.get(URL, {"cursor": data["cursor"]}).json()
+    assert (again["created"], again["updated"], again["deleted"]) == ([], [], [])
+    assert again["cursor"] == data["cursor"]
+
+
+@pytest.mark.django_db
+def test_changes_paging_and_query_count(
+    api_client, seller, listing_factory, django_assert_num_queries
+):
+    for _ in range(5):
+        listing_factory(seller)
+    ListingChange.publish_pending()
+
+    with django_assert_num_queries(3):
+        first = api_client.get(URL, {"cursor": 0, "limit": 3}).json()
+    assert first["has_more"] is True
+    assert len(first["created"]) == 3
+
+    second = api_client.get(URL, {"cursor": first["cursor"], "limit": 3}).json()
+    assert second["has_more"] is False
+    assert len(second["created"]) == 2
+
+
+@pytest.mark.django_db
+def test_bulk_operations_are_journaled(api_client, seller, game, listing_factory):
+    listing = listing_factory(seller)
+    cursor = api_client.get(URL).json()["cursor"]
+    api_client.force_authenticate(seller)
+
+    api_client.post(
+        "/api/listings/bulk/",
+        {"items": [{"title": "Пачка", "description": "д", "price": "5", "game": game.pk}]},
+        format="json",
+    )
+    api_client.patch(
+        "/api/listings/bulk/", {"items": [{"id": listing.pk, "price": "7"}]}, format="json"
+    )
+
+    data = api_client.get(URL, {"cursor": cursor}).json()
+    assert [item["title"] for item in data["created"]] == ["Пачка"]
+    assert [item["price"] for item in data["updated"]] == ["7.00"]
+
+
+@pytest.mark.django_db
+def test_unsettled_changes_are_held_back(api_client, seller, listing_factory, settings):
+    cursor = api_client.get(URL).json()["cursor"]
+    settings.LISTING_CHANGES_SETTLE_SECONDS = 60
+    listing_factory(seller)
+
+    data = api_client.get(URL, {"cursor": cursor}).json()
+
+    assert data["created"] == [] and data["cursor"] == cursor
+
+
+@pytest.mark.django_db
+def test_pruned_cursor_is_gone(api_client, seller, listing_factory, settings):
+    settings.LISTING_CHANGES_RETENTION_DAYS = 1
+    listing_factory(seller)
+    cursor = api_client.get(URL).json()["cursor"]
+    listing_factory(seller)
+    listing_factory(seller)
+    ListingChange.publish_pending()
+    ListingChange.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+    prune_listing_changes()
+
+    assert ListingChange.objects.count() == 1
+    response = api_client.get(URL, {"cursor": cursor})
+    assert response.status_code == 410
+    assert response.json()["detail"]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(api_client):
+    assert api_client.get(URL, {"cursor": "abc"}).status_code == 400
+    assert api_client.get(URL, {"cursor": -1}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_journal_ids_follow_commit_order(
+    api_client, seller, listing_factory, django_capture_on_commit_callbacks
+):
+    slow = listing_factory(seller)
+    fast = listing_factory(seller)
+    cursor = api_client.get(URL).json()["cursor"]
+
+    # Долгая транзакция пишет первой, а коммитится последней. Пока она не
+    # закоммичена, её PendingListingChange другим соединениям не виден —
+    # здесь он временно убран из таблицы
+    slow.title = "Долгая"
+    slow.save()
+    uncommitted = list(PendingListingChange.objects.values("listing_id", "action"))
+    PendingListingChange.objects.all().delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        fast.title = "Быстрая"
+        fast.save()
+    first = api_client.get(URL, {"cursor": cursor}).json()
+
+    PendingListingChange.objects.bulk_create(PendingListingChange(**row) for row in uncommitted)
+    second = api_client.get(URL, {"cursor": first["cursor"]}).json()
+
+    assert [item["title"] for item in first["updated"]] == ["Быстрая"]
+    assert [item["title"] for item in second["updated"]] == ["Долгая"]
+
+
+@pytest.mark.django_db
+def test_automoderation_journals_only_blocked_listings(seller, listing_factory):
+    from core.automoderation import AutoModerator
+
+    active = listing_factory(seller)
+    sold = listing_factory(seller, status="sold")
+    PendingListingChange.objects.all().delete()
+    moderator = AutoModerator()
+    scam = moderator.check_text("предоплата обязательна")
+
+    moderator.apply_listing_results(
+        [(active.pk, seller.pk, scam), (sold.pk, seller.pk, scam)], block_statuses=("active",)
+    )
+
+    assert list(PendingListingChange.objects.values_list("listing_id", flat=True)) == [active.pk]
@@ -0,0 +1,113 @@
+"""Тесты быстрых сериализаторов списков API (api/fast_serializers.py)."""
+
+import json
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+from api.renderers import ORJSONRenderer
+from api.serializers import ListingSerializer, MessageSerializer
+from chat.models import Message
+from listings.models import Category, Listing
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_listing_list_matches_model_serializer(api_client, seller, game, listing_factory, settings):
+    Profile.objects.filter(user=seller).update(rating=Decimal("4.5"))
+    category = Category.objects.create(game=game, name="Скины", slug="skins")
+    listing_factory(seller, price=Decimal("1999.90"), category=category)
+    listing_factory(seller, price=Decimal("5"))
+
+    fast = api_client.get("/api/listings/").json()
+    request = api_client.get("/api/listings/").wsgi_request
+    expected = ListingSerializer(
+        Listing.objects.filter(status="active").order_by("-created_at"),
+        many=True,
+        context={"request": request},
+    ).data
+
+    assert fast["results"] == json.loads(json.dumps(expected))
+    assert fast["results"][0]["seller_rating"] == "4.50"
+    assert "category_name" not in fast["results"][0]
+
+    settings.API_FAST_SERIALIZERS = False
+    settings.API_CACHE_ENABLED = False
+    assert api_client.get("/api/listings/").json() == fast
+
+
+@pytest.mark.django_db
+def test_listing_list_query_count_is_flat(
+    api_client, seller, listing_factory, django_assert_max_num_queries
+):
+    for _ in range(30):
+        listing_factory(seller)
+
+    # COUNT для пагинации + одна выборка .values() с JOIN
+    with django_assert_max_num_queries(2):
+        response = api_client.get("/api/listings/")
+    assert len(response.json()["results"]) == 20
+
+
+@pytest.mark.django_db
+def test_conversation_list_has_last_message_and_unread(
+    api_client, buyer, seller, user_factory, conversation_factory, message_factory
+):
+    conversation = conversation_factory(buyer, seller)
+    message_factory(conversation, seller, "Привет")
+    last = message_factory(conversation, seller, "Ещё вопрос")
+    message_factory(conversation_factory(buyer, user_factory()), buyer, "Моё")
+    api_client.force_authenticate(buyer)
+
+    results = {item["id"]: item for item in api_client.get("/api/conversations/").json()["results"]}
+
+    item = results[conversation.pk]
+    assert item["unread_count"] == 2
+    expected = MessageSerializer(last).data
+    assert item["last_message"] == json.loads(json.dumps(expected))
+
+
+@pytest.mark.django_db
+def test_messages_action_matches_model_serializer(
+    api_client, buyer, seller, conversation_factory, message_factory
+):
+    conversation = conversation_factory(buyer, seller)
+    for text in ("раз", "два", "три"):
+        message_factory(conversation, buyer, text)
+    api_client.force_authenticate(seller)
+
+    data = api_client.get(f"/api/conversations/{conversation.pk}/messages/").json()
+
+    expected = MessageSerializer(Message.objects.order_by("created_at"), many=True).data
+    assert data == json.loads(json.dumps(expected))
+
+
+def test_orjson_renderer_matches_drf_types():
+    from datetime import datetime, timezone
+
+    from rest_framework.renderers import JSONRenderer
+
+    data = {
+        "price": Decimal("10.50"),
+        "at": datetime(2024, 1, 2, 3, 4, 5, 123456, timezone.utc),
+        "title": "Меч",
+    }
+
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+def test_bench_serializers_command_runs():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    out = StringIO()
+    call_command("bench_serializers", items=3, rounds=1, stdout=out)
+
+    assert "fast+orjson" in out.getvalue()
@@ -1,10 +1,17 @@
 """
 Кастомные Throttle классы для API rate limiting.
+
+Все классы считают лимиты через core.ratelimit (GCRA, один атомарный шаг
+в Redis) вместо штатного хранилища DRF — списка timestamp'ов в кэше,
+который читается, фильтруется и перезаписывается целиком на каждый запрос.
+Rates по-прежнему берутся из REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"].
 """
 
 import logging
 
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from rest_framework import throttling
+
+from core import ratelimit
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,39 @@ def _log_throttled(scope, request, view):
     )
 
 
+class GCRAThrottleMixin:
+    """allow_request/wait поверх core.ratelimit для SimpleRateThrottle-наследников."""
+
+    retry_after = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        decision = ratelimit.hit(
+            f"drf:{self.scope}", self.key, ratelimit.Rate(self.num_requests, self.duration)
+        )
+        self.retry_after = decision.retry_after
+        if not decision.allowed:
+            _log_throttled(self.scope, request, view)
+        return decision.allowed
+
+    def wait(self):
+        return self.retry_after or None
+
+
+class AnonRateThrottle(GCRAThrottleMixin, throttling.AnonRateThrottle):
+    """Лимит для анонимных пользователей (по IP)."""
+
+
+class UserRateThrottle(GCRAThrottleMixin, throttling.UserRateThrottle):
+    """Лимит для аутентифицированных (по id), анонимы — по IP."""
+
+
 class BurstRateThrottle(UserRateThrottle):
     """
     Burst лимит - быстрые запросы в короткий период.
@@ -31,12 +71,6 @@ class BurstRateThrottle(UserRateThrottle):
 
     scope = "burst"
 
-    def allow_request(self, request, view):
-        allowed = super().allow_request(request, view)
-        if not allowed:
-            _log_throttled(self.scope, request, view)
-        return allowed
-
 
 class CreateRateThrottle(UserRateThrottle):
     """
@@ -50,10 +84,7 @@ class CreateRateThrottle(UserRateThrottle):
         # Применяем только к POST запросам
         if request.method != "POST":
             return True
-        allowed = super().allow_request(request, view)
-        if not allowed:
-            _log_throttled(self.scope, request, view)
-        return allowed
+        return super().allow_request(request, view)
 
 
 class ModifyRateThrottle(UserRateThrottle):
@@ -67,10 +98,7 @@ class ModifyRateThrottle(UserRateThrottle):
         # Применяем к PUT, PATCH, DELETE
         if request.method not in ["PUT", "PATCH", "DELETE"]:
             return True
-        allowed = super().allow_request(request, view)
-        if not allowed:
-            _log_throttled(self.scope, request, view)
-        return allowed
+        return super().allow_request(request, view)
 
 
 class StrictAnonRateThrottle(AnonRateThrottle):
@@ -88,9 +116,3 @@ class StrictAnonRateThrottle(AnonRateThrottle):
         ident = self.get_ident(request)
         user_agent = request.META.get("HTTP_USER_AGENT", "")[:50]
         return self.cache_format % {"scope": self.scope, "ident": f"{ident}_{hash(user_agent)}"}
-
-    def allow_request(self, request, view):
-        allowed = super().allow_request(request, view)
-        if not allowed:
-            _log_throttled(self.scope, request, view)
-        return allowed
@@ -11,14 +11,25 @@ from django.http import JsonResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 
 from accounts.models import CustomUser, Profile
 from chat.models import Conversation, Message
 from listings.models import Category, Game, Listing
+from listings.services import listing_bulk_create, listing_bulk_delete, listing_bulk_update
 from transactions.models import Review
 
+from . import delta_sync
+from .caching import CachedReadMixin
+from .fast_serializers import (
+    FastListMixin,
+    annotate_conversations,
+    attach_last_messages,
+    conversation_serializer,
+    listing_serializer,
+    message_serializer,
+)
 from .permissions import (
     CanCreateReview,
     IsConversationParticipant,
@@ -29,6 +40,8 @@ from .serializers import (
     CategorySerializer,
     ConversationSerializer,
     GameSerializer,
+    ListingBulkCreateItemSerializer,
+    ListingBulkUpdateItemSerializer,
     ListingSerializer,
     MessageSerializer,
     ProfileSerializer,
@@ -45,9 +58,11 @@ def vapid_public_key(request):
     return JsonResponse({"public_key": getattr(settings, "VAPID_PUBLIC_KEY", "")})
 
 
-class GameViewSet(viewsets.ReadOnlyModelViewSet):
+class GameViewSet(CachedReadMixin, viewsets.ReadOnlyModelViewSet):
     """API для игр."""
 
+    # listing_count зависит от объявлений
+    cache_collections = ("games", "listings")
     queryset = Game.objects.filter(is_active=True).annotate(
         listing_count=Count("listings", filter=Q(listings__status="active"))
     )
@@ -58,9 +73,10 @@ class GameViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ["order", "name"]
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedReadMixin, viewsets.ReadOnlyModelViewSet):
     """API для категорий."""
 
+    cache_collections = ("games", "categories")
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -68,9 +84,11 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ["game", "order", "name"]
 
 
-class ListingViewSet(viewsets.ModelViewSet):
+class ListingViewSet(CachedReadMixin, FastListMixin, viewsets.ModelViewSet):
     """API для объявлений."""
 
+    cache_collections = ("listings", "games", "categories", "sellers")
+    fast_serializer = listing_serializer
     queryset = Listing.objects.filter(status="active").select_related(
         "seller", "seller__profile", "game", "category"
     )
@@ -130,6 +148,93 @@ class ListingViewSet(viewsets.ModelViewSet):
         )
         return Response({"favorited": True})
 
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Delta-sync: созданные, изменённые и удалённые объявления после cursor.
+
+        Без cursor — только текущий курсор (см. api/delta_sync.py).
+        """
+        data = delta_sync.changes_page(
+            self.get_queryset(),
+            delta_sync.parse_cursor(request.query_params.get("cursor")),
+            delta_sync.parse_limit(request.query_params.get("limit")),
+            self.get_serializer_context(),
+        )
+        return Response(data)
+
+    @action(
+        detail=False,
+        methods=["post", "patch"],
+        url_path="bulk",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk(self, request):
+        """
+        Массовое создание (POST) или изменение цены/статуса (PATCH).
+
+        Тело: {"items": [...]}; ответ — результат по каждому элементу.
+        """
+        if request.method == "POST":
+            item_serializer, service = ListingBulkCreateItemSerializer, listing_bulk_create
+        else:
+            item_serializer, service = ListingBulkUpdateItemSerializer, listing_bulk_update
+
+        items = _bulk_payload(request, "items")
+        results, valid = [], []
+        for index, item in enumerate(items):
+            serializer = item_serializer(data=item)
+            if serializer.is_valid():
+                valid.append({**serializer.validated_data, "index": index})
+            else:
+                results.append(
+                    {
+                        "index": index,
+                        "status": "error",
+                        "id": item.get("id") if isinstance(item, dict) else None,
+                        "errors": serializer.errors,
+                    }
+                )
+        if valid:
+            results.extend(service(seller=request.user, items=valid))
+        return _bulk_response(sorted(results, key=lambda result: result["index"]))
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-delete",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk_delete(self, request):
+        """Массовое удаление: {"ids": [...]}; ответ — результат по каждому id."""
+        ids = _bulk_payload(request, "ids")
+        if not all(isinstance(pk, int) for pk in ids):
+            return Response(
+                {"ids": ["Ожидается список целых id."]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return _bulk_response(listing_bulk_delete(seller=request.user, ids=ids))
+
+
+def _bulk_payload(request, key: str) -> list:
+    """Список элементов из тела запроса с проверкой размера пачки."""
+    payload = request.data.get(key) if isinstance(request.data, dict) else None
+    if not isinstance(payload, list) or not payload:
+        raise ValidationError({key: ["Ожидается непустой список."]})
+    limit = getattr(settings, "API_BULK_MAX_ITEMS", 100)
+    if len(payload) > limit:
+        raise ValidationError({key: [f"Не больше {limit} элементов за запрос."]})
+    return payload
+
+
+def _bulk_response(results: list) -> Response:
+    failed = sum(1 for result in results if result["status"] == "error")
+    succeeded = len(results) - failed
+    logger.info("API listing bulk: succeeded=%s failed=%s", succeeded, failed)
+    return Response(
+        {"succeeded": succeeded, "failed": failed, "results": results},
+        status=status.HTTP_200_OK if succeeded else status.HTTP_400_BAD_REQUEST,
+    )
+
 
 class ReviewViewSet(viewsets.ModelViewSet):
     """API для отзывов."""
@@ -187,18 +292,25 @@ class ReviewViewSet(viewsets.ModelViewSet):
         )
 
 
-class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
+class ConversationViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """API для бесед."""
 
     serializer_class = ConversationSerializer
+    fast_serializer = conversation_serializer
     permission_classes = [permissions.IsAuthenticated, IsConversationParticipant]
     throttle_classes = [BurstRateThrottle]
 
     def get_queryset(self):
         """Вернуть только беседы текущего пользователя (защита от IDOR)."""
-        return Conversation.objects.filter(
+        queryset = Conversation.objects.filter(
             Q(participant1=self.request.user) | Q(participant2=self.request.user)
-        ).select_related("participant1", "participant2", "listing")
+        )
+        if self.action == "list":
+            return annotate_conversations(queryset, self.request.user)
+        return queryset.select_related("participant1", "participant2", "listing")
+
+    def finalize_fast_page(self, data):
+        return attach_last_messages(data, self.get_serializer_context())
 
     @action(
         detail=True,
@@ -220,15 +332,15 @@ class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
             )
             raise PermissionDenied("Вы не являетесь участником этой беседы.")
 
-        messages = conversation.messages.select_related("sender").order_by("created_at")
-        serializer = MessageSerializer(messages, many=True)
+        rows = conversation.messages.order_by("created_at").values(*message_serializer.lookups)
+        data = message_serializer.many(rows, self.get_serializer_context())
         logger.info(
             "API messages fetched: user=%s conv=%s count=%s",
             request.user.pk,
             conversation.pk,
-            len(serializer.data),
+            len(data),
         )
-        return Response(serializer.data)
+        return Response(data)
 
     @action(
         detail=True,
@@ -9,6 +9,7 @@ from collections import deque
 
 from django.utils import timezone
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
@@ -56,9 +57,6 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
-        # Per-user rate limit ключ
-        self._rate_key = f"ws_rate:{self.user.id}"
-
         # Отправляем статус "онлайн"
         await self.channel_layer.group_send(
             self.room_group_name,
@@ -93,20 +91,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 f"User {self.user.username} disconnected from conversation {self.conversation_id}"
             )
 
-    @database_sync_to_async
+    @sync_to_async
     def _check_rate_limit_atomic(self):
-        """Per-user rate-limit через cache.incr (атомарно, общий для вкладок).
+        """Per-user rate-limit через core.ratelimit (общий для вкладок).
 
         P1-19: до фикса rate-limit был per-connection — 10 вкладок дают 10×лимит.
         """
-        from django.core.cache import cache
+        from core import ratelimit
 
-        try:
-            current = cache.incr(self._rate_key)
-        except ValueError:
-            cache.set(self._rate_key, 1, WS_RATE_WINDOW)
-            current = 1
-        return current <= WS_RATE_LIMIT
+        return ratelimit.hit("ws_chat", str(self.user.id), (WS_RATE_LIMIT, WS_RATE_WINDOW)).allowed
 
     async def receive(self, text_data):
         """Получение сообщения от клиента"""
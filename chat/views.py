@@ -4,7 +4,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
 from accounts.models import CustomUser
@@ -224,18 +224,24 @@ def conversation_start(request, listing_pk):
 
 @login_required
 @require_http_methods(["GET"])
-def get_new_messages(request, conversation_pk):
-    """API endpoint для получения новых сообщений (AJAX)."""
-    from django.core.cache import cache
+async def get_new_messages(request, conversation_pk):
+    """API endpoint для получения новых сообщений (AJAX).
+
+    Async: polling каждые 3 секунды из каждого открытого чата — под ASGI
+    ожидание Redis (core/async_cache.py) и БД (async ORM) не держит поток.
+    """
+    from core import async_cache
+
+    user = await request.auser()
 
     # Rate limiting: 200 запросов в минуту на пользователя (для polling каждые 3 секунды)
-    cache_key = f"chat_poll_rate_{request.user.id}_{conversation_pk}"
-    requests_count = cache.get(cache_key, 0)
+    cache_key = f"chat_poll_rate_{user.id}_{conversation_pk}"
+    requests_count = await async_cache.aget(cache_key, 0)
 
     if requests_count >= 200:
         logger.warning(
             "chat poll rate-limited: user=%s conv=%s count=%s",
-            request.user.pk,
+            user.pk,
             conversation_pk,
             requests_count,
         )
@@ -243,15 +249,15 @@ def get_new_messages(request, conversation_pk):
             {"error": "Слишком много запросов. Подождите минуту.", "messages": []}, status=429
         )
 
-    cache.set(cache_key, requests_count + 1, 60)
+    await async_cache.aset(cache_key, requests_count + 1, 60)
 
-    conversation = get_object_or_404(Conversation, pk=conversation_pk)
+    conversation = await aget_object_or_404(Conversation, pk=conversation_pk)
 
-    # Проверяем доступ
-    if request.user not in [conversation.participant1, conversation.participant2]:
+    # Проверяем доступ (по id — без загрузки участников)
+    if user.pk not in (conversation.participant1_id, conversation.participant2_id):
         logger.warning(
             "chat IDOR attempt on get_new_messages: user=%s conv=%s",
-            request.user.pk,
+            user.pk,
             conversation.pk,
         )
         return JsonResponse({"error": "Доступ запрещён"}, status=403)
@@ -269,7 +275,7 @@ def get_new_messages(request, conversation_pk):
     )
 
     messages_data = []
-    for message in new_messages:
+    async for message in new_messages:
         messages_data.append(
             {
                 "id": message.id,
@@ -89,6 +89,11 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
+    # orjson вместо stdlib json (api/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
@@ -98,8 +103,8 @@ REST_FRAMEWORK = {
     ],
     # Rate Limiting (Throttling) для защиты от DDoS и злоупотреблений
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "api.throttling.AnonRateThrottle",
+        "api.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",  # Анонимные пользователи: 100 запросов в час
@@ -118,6 +123,9 @@ MIDDLEWARE = [
     # Request ID первым — чтобы все последующие логи подхватили идентификатор
     "core.middleware_logging.RequestIDMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Полностраничный кэш для анонимов — до сессий/auth, чтобы попадание
+    # не трогало session store и БД (core/middleware_pagecache.py).
+    "core.middleware_pagecache.AnonymousPageCacheMiddleware",
     # GZipMiddleware убран: Caddy уже сжимает (encode zstd gzip),
     # а GZip + HTTPS = уязвимость BREACH
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -486,19 +494,203 @@ CELERY_BEAT_SCHEDULE = {
         "task": "payments.check_pending_withdrawals",
         "schedule": 86400.0,  # Раз в день
     },
+    # Финансовый отчёт за прошлый месяц: комиссии/выплаты + сверка леджера.
+    # Ежедневный запуск перезаписывает отчёт прошлого месяца — поздние
+    # корректировки попадают в него без ручного перезапуска.
+    "build-finance-report-daily": {
+        "task": "payments.build_finance_report",
+        "schedule": 86400.0,  # Раз в день
+    },
+    # Истечение неотвеченных запросов на покупку и предложений цены
+    "expire-stale-requests-hourly": {
+        "task": "transactions.expire_stale_requests",
+        "schedule": 3600.0,  # Раз в час
+    },
+    # Партиции audit log / transactions на несколько месяцев вперёд
+    "maintain-partitions-daily": {
+        "task": "core.tasks.maintain_partitions",
+        "schedule": 86400.0,  # Раз в день
+    },
     # Прогрев кэша каталога (TTL контекста = 10 мин, перепрогрев каждые 4 мин)
     "warm-catalog-cache": {
         "task": "listings.tasks.warm_catalog_cache",
         "schedule": 240.0,
     },
+    # Индекс рыночных цен для антифрода: изменившиеся группы каждые 10 мин,
+    # полный пересчёт раз в сутки (листинги, выпавшие из окна выборки).
+    "refresh-market-price-index": {
+        "task": "listings.tasks.refresh_market_price_index",
+        "schedule": 600.0,
+    },
+    "rebuild-market-price-index-daily": {
+        "task": "listings.tasks.refresh_market_price_index",
+        "schedule": 86400.0,
+        "kwargs": {"full": True},
+    },
+    # Перепроверка контента после смены правил AutoModerator: ограниченное
+    # число порций за запуск, следующий запуск продолжает с того же места.
+    "remoderate-listings": {
+        "task": "core.tasks.remoderate_content",
+        "schedule": 600.0,
+        "kwargs": {"content_type": "listing"},
+    },
+    "remoderate-messages": {
+        "task": "core.tasks.remoderate_content",
+        "schedule": 600.0,
+        "kwargs": {"content_type": "message"},
+    },
+    # Статические sitemap-файлы: изменившиеся части каждые 30 мин,
+    # полная перегенерация раз в сутки (переименования пользователей).
+    "generate-sitemaps": {
+        "task": "core.tasks.generate_sitemaps",
+        "schedule": 1800.0,
+    },
+    "regenerate-sitemaps-daily": {
+        "task": "core.tasks.generate_sitemaps",
+        "schedule": 86400.0,
+        "kwargs": {"full": True},
+    },
+    # Сводки уведомлений (NotificationSettings.digest_frequency)
+    "notification-digest-hourly": {
+        "task": "core.tasks.send_notification_digests",
+        "schedule": 3600.0,
+        "kwargs": {"frequency": "hourly"},
+    },
+    "notification-digest-daily": {
+        "task": "core.tasks.send_notification_digests",
+        "schedule": 86400.0,
+        "kwargs": {"frequency": "daily"},
+    },
+    # Очистка журнала delta-sync старше LISTING_CHANGES_RETENTION_DAYS
+    "prune-listing-changes-daily": {
+        "task": "listings.tasks.prune_listing_changes",
+        "schedule": 86400.0,
+    },
+    # Перестройка индекса автодополнения: пересчёт популярности объявлений
+    # (точечные правки листингов индекс подхватывает сам, по сигналу).
+    "rebuild-autocomplete-index-daily": {
+        "task": "listings.tasks.rebuild_autocomplete_index",
+        "schedule": 86400.0,
+    },
 }
 
+# Асинхронная пакетная запись SecurityAuditLog (core/audit_writer.py).
+# Финансовые события пишутся синхронно независимо от флага.
+AUDIT_ASYNC = config("AUDIT_ASYNC", default=True, cast=bool)
+AUDIT_BUFFER_SIZE = config("AUDIT_BUFFER_SIZE", default=10000, cast=int)
+AUDIT_FLUSH_BATCH_SIZE = config("AUDIT_FLUSH_BATCH_SIZE", default=200, cast=int)
+AUDIT_FLUSH_INTERVAL = config("AUDIT_FLUSH_INTERVAL", default=1.0, cast=float)
+
+# Состояние шапки (баланс + непрочитанные) в Redis hash на пользователя,
+# сбрасывается записями в кошелёк/уведомления (core/header_state.py).
+HEADER_STATE_TTL = config("HEADER_STATE_TTL", default=300, cast=int)
+
+# Кэш счётчиков пользователя для профиля и админки (accounts/stats.py),
+# сбрасывается сигналами объявлений и сделок.
+USER_STATS_TTL = config("USER_STATS_TTL", default=300, cast=int)
+
+# Полностраничный кэш публичных страниц для анонимов без cookie сессии.
+# Инвалидируется сигналами листингов (listings/signals.py).
+ANON_PAGE_CACHE_ENABLED = config("ANON_PAGE_CACHE_ENABLED", default=not DEBUG, cast=bool)
+ANON_PAGE_CACHE_TTL = config("ANON_PAGE_CACHE_TTL", default=60, cast=int)
+ANON_PAGE_CACHE_ROUTES = (
+    "listings:home",
+    "listings:catalog",
+    "listings:game_listings",
+    "listings:listing_detail",
+)
+
+# HTTP-кэш публичного REST API (api/caching.py): ETag по штампам версий
+# коллекций, кэш сериализованных страниц на API_CACHE_TTL секунд,
+# Cache-Control max-age (0 — клиент каждый раз перепроверяет по ETag).
+API_CACHE_ENABLED = config("API_CACHE_ENABLED", default=True, cast=bool)
+API_CACHE_TTL = config("API_CACHE_TTL", default=30, cast=int)
+API_CACHE_MAX_AGE = config("API_CACHE_MAX_AGE", default=0, cast=int)
+# GET-списки объявлений и бесед через .values() + api/fast_serializers.py
+API_FAST_SERIALIZERS = config("API_FAST_SERIALIZERS", default=True, cast=bool)
+# Максимум элементов в одном запросе /api/listings/bulk/ и bulk-delete/
+API_BULK_MAX_ITEMS = config("API_BULK_MAX_ITEMS", default=100, cast=int)
+# Delta-sync /api/listings/changes/ (api/delta_sync.py): размер страницы,
+# окно на коммит переноса в журнал (listings/models_changes.py; больше
+# длительности транзакции переноса), срок хранения журнала ListingChange.
+LISTING_CHANGES_PAGE_SIZE = config("LISTING_CHANGES_PAGE_SIZE", default=500, cast=int)
+LISTING_CHANGES_SETTLE_SECONDS = config("LISTING_CHANGES_SETTLE_SECONDS", default=5, cast=int)
+LISTING_CHANGES_RETENTION_DAYS = config("LISTING_CHANGES_RETENTION_DAYS", default=14, cast=int)
+# Автодополнение (listings/autocomplete.py): как часто процесс сверяет токен
+# индекса игр в кэше (правки игр видны не позже чем через столько секунд).
+AUTOCOMPLETE_GAMES_CHECK_SECONDS = config("AUTOCOMPLETE_GAMES_CHECK_SECONDS", default=1, cast=int)
+# Кэш результатов /search/ (listings/search_cache.py): id выдачи, число и
+# диапазон цен по нормализованному запросу; сколько id хранить в записи.
+SEARCH_CACHE_ENABLED = config("SEARCH_CACHE_ENABLED", default=True, cast=bool)
+SEARCH_CACHE_TTL = config("SEARCH_CACHE_TTL", default=60, cast=int)
+SEARCH_CACHE_MAX_IDS = config("SEARCH_CACHE_MAX_IDS", default=1000, cast=int)
+
+# Индекс рыночных цен (listings/market_index.py): окно выборки, минимальная
+# выборка категории (иначе антифрод берёт статистику игры целиком), TTL кэша.
+MARKET_INDEX_WINDOW_DAYS = config("MARKET_INDEX_WINDOW_DAYS", default=90, cast=int)
+MARKET_INDEX_MIN_SAMPLE = config("MARKET_INDEX_MIN_SAMPLE", default=5, cast=int)
+MARKET_INDEX_CACHE_TTL = config("MARKET_INDEX_CACHE_TTL", default=3600, cast=int)
+
+# Движок правил антифрода (core/fraud_rules.py): события листингов, запросов
+# на покупку и выводов оцениваются правилами AntiFraudRule в Celery.
+# Признаки пользователя/IP кэшируются на FRAUD_FEATURE_TTL секунд.
+FRAUD_RULES_ENABLED = config("FRAUD_RULES_ENABLED", default=True, cast=bool)
+FRAUD_FEATURE_TTL = config("FRAUD_FEATURE_TTL", default=300, cast=int)
+FRAUD_IP_WINDOW_DAYS = config("FRAUD_IP_WINDOW_DAYS", default=30, cast=int)
+
+# Рассылка уведомлений (core/notification_dispatch.py): каналы по умолчанию
+# и размер пачки доставок на одну Celery-задачу (одно SMTP-соединение /
+# одна HTTP-сессия на пачку).
+NOTIFICATION_CHANNELS = ("email", "telegram", "push")
+NOTIFICATION_BATCH_SIZE = config("NOTIFICATION_BATCH_SIZE", default=100, cast=int)
+
+# Фоновая перепроверка объявлений/сообщений при смене правил AutoModerator
+# (core/remoderation.py). WORKERS=0 — по числу CPU; в prefork-воркере Celery
+# проверка идёт в текущем процессе.
+REMODERATION_BATCH_SIZE = config("REMODERATION_BATCH_SIZE", default=1000, cast=int)
+REMODERATION_WORKERS = config("REMODERATION_WORKERS", default=0, cast=int)
+REMODERATION_MAX_BATCHES_PER_RUN = config("REMODERATION_MAX_BATCHES_PER_RUN", default=50, cast=int)
+
+# Счётчики неудачных входов для BruteForceProtectionMiddleware
+# (скользящее окно в кэше, core/login_throttle.py). Окно — в секундах,
+# лимиты — на IP, подсеть (/24, /64) и имя пользователя.
+LOGIN_THROTTLE = {
+    "window": config("LOGIN_THROTTLE_WINDOW", default=1800, cast=int),
+    "limits": {
+        "ip": config("LOGIN_THROTTLE_IP_LIMIT", default=10, cast=int),
+        "subnet": config("LOGIN_THROTTLE_SUBNET_LIMIT", default=50, cast=int),
+        "username": config("LOGIN_THROTTLE_USERNAME_LIMIT", default=20, cast=int),
+    },
+}
+
+# Помесячное партиционирование append-heavy таблиц (только PostgreSQL).
+# Таблица → колонка партиционирования. См. core/partitioning.py.
+PARTITIONED_TABLES = {
+    "core_securityauditlog": "created_at",
+    "payments_transaction": "created_at",
+}
+# Сколько будущих месяцев держать созданными заранее (beat maintain_partitions)
+PARTITION_PREMAKE_MONTHS = config("PARTITION_PREMAKE_MONTHS", default=3, cast=int)
+
+# Через сколько часов без ответа продавца pending-запрос на покупку
+# отменяется автоматически (beat expire_stale_requests).
+PURCHASE_REQUEST_PENDING_TTL_HOURS = config(
+    "PURCHASE_REQUEST_PENDING_TTL_HOURS", default=72, cast=int
+)
+# Размер порции UPDATE при пакетных переходах статусов
+TRADE_EXPIRY_BATCH_SIZE = config("TRADE_EXPIRY_BATCH_SIZE", default=500, cast=int)
+
 # ЮKassa settings
 YOOKASSA_SHOP_ID = config("YOOKASSA_SHOP_ID", default="")
 YOOKASSA_SECRET_KEY = config("YOOKASSA_SECRET_KEY", default="")
 YOOKASSA_WEBHOOK_ALLOWED_IPS = config("YOOKASSA_WEBHOOK_ALLOWED_IPS", default="")
 SITE_URL = config("SITE_URL", default="https://lootlink.ru")
 
+# Статические sitemap-файлы в default storage (core/sitemap_files.py):
+# каталог и ширина диапазона pk одной части (не больше 50 000 URL).
+SITEMAP_DIR = "sitemaps"
+SITEMAP_PART_SIZE = config("SITEMAP_PART_SIZE", default=50000, cast=int)
+
 # Комиссия платформы (P0-11): процент от суммы сделки, удерживается с продавца
 # при release_to_seller. Например, 5 = 5%.
 PLATFORM_COMMISSION_PERCENT = config("PLATFORM_COMMISSION_PERCENT", default="0", cast=str)
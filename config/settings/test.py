@@ -31,6 +31,13 @@ CACHES = {
     }
 }
 
+# Полностраничный кэш выключен — тесты меняют данные без сигналов и
+# сразу перечитывают страницы. Тесты кэша включают его сами.
+ANON_PAGE_CACHE_ENABLED = False
+
+# Аудит пишется синхронно — тесты проверяют записи сразу после действия
+AUDIT_ASYNC = False
+
 # Celery: синхронное выполнение, без брокера
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
@@ -91,3 +98,7 @@ YOOKASSA_WEBHOOK_SECRET = ""
 
 # Никаких proxy в тестах
 TRUSTED_PROXIES = ["127.0.0.1", "::1"]
+
+# Индекс игр автодополнения сверяет токен на каждом запросе — иначе правка
+# Game в одном тесте не видна в следующем.
+AUTOCOMPLETE_GAMES_CHECK_SECONDS = 0
@@ -5,12 +5,10 @@ URL configuration for LootLink project.
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
 from django.views.generic.base import RedirectView
 
 from core import views as core_views
-from core.sitemaps import sitemaps
 
 urlpatterns = [
     # Стандартная Django-админка по пути из ADMIN_URL (см. settings.py).
@@ -49,9 +47,8 @@ urlpatterns = [
         "yandex_a6899228ac192041.html", core_views.yandex_verification, name="yandex_verification"
     ),
     # SEO
-    path(
-        "sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="django.contrib.sitemaps.views.sitemap"
-    ),
+    path("sitemap.xml", core_views.sitemap_file, name="django.contrib.sitemaps.views.sitemap"),
+    path("sitemaps/<str:name>", core_views.sitemap_file, name="sitemap_file"),
 ]
 
 # Custom error handlers
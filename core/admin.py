@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import AntiFraudRule, Notification
 
 
 @admin.register(Notification)
@@ -24,3 +24,12 @@ class NotificationAdmin(admin.ModelAdmin):
         """Запрещаем создавать уведомления вручную."""
         return False
 
+
+@admin.register(AntiFraudRule)
+class AntiFraudRuleAdmin(admin.ModelAdmin):
+    """Правила антифрода. Изменения подхватываются движком без рестарта."""
+
+    list_display = ['rule_type', 'pattern', 'risk_score', 'action', 'is_active', 'created_at']
+    list_filter = ['rule_type', 'action', 'is_active']
+    list_editable = ['is_active']
+    search_fields = ['pattern', 'description']
@@ -4,12 +4,17 @@ import logging
 from datetime import timedelta
 from decimal import Decimal
 
-from django.core.cache import cache
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from core import fraud_rules
+
 logger = logging.getLogger(__name__)
 
+# Цена ниже 30% медианы рынка считается подозрительной.
+LOW_PRICE_RATIO = Decimal("0.3")
+
 
 class AntiFraudSystem:
     """
@@ -19,84 +24,137 @@ class AntiFraudSystem:
     def __init__(self):
         self.risk_thresholds = {"low": 30, "medium": 60, "high": 80, "critical": 95}
 
-    def check_user(self, user):  # noqa: C901 — линейный набор fraud-проверок
+    def check_user(self, user):
         """Проверить пользователя на мошенничество.
 
         Returns:
             dict: {'risk_score': int, 'flags': list, 'action': str}
         """
-        flags = []
-        risk_score = 0
-
-        # Проверка 1: Новый аккаунт
-        if (timezone.now() - user.date_joined).days < 1:
-            flags.append("Аккаунт младше 1 дня")
-            risk_score += 15
+        return self.score_users([user])[user.pk]
 
-        # Проверка 2: Нет верификации
-        if not user.profile.is_verified:
-            flags.append("Email/телефон не верифицированы")
-            risk_score += 20
+    def score_users(self, users):  # noqa: C901 — линейный набор fraud-проверок
+        """Проверить пачку пользователей фиксированным числом запросов.
 
-        # Проверка 3: Низкий рейтинг или много плохих отзывов
-        if user.profile.rating < 2.0 and user.profile.total_sales > 5:
-            flags.append("Низкий рейтинг при большом количестве продаж")
-            risk_score += 40
+        Профили, число листингов за час и активные листинги грузятся
+        тремя запросами на всю пачку; рыночные цены берутся из индекса
+        (listings/market_index.py), а не Avg("price") на каждый вызов.
+        Правила AntiFraudRule оцениваются движком core/fraud_rules.py.
 
-        # Проверка 4: Множественные активные объявления за короткий срок
-        recent_listings = user.listings.filter(
-            created_at__gte=timezone.now() - timedelta(hours=1)
-        ).count()
-
-        if recent_listings > 10:
-            flags.append(f"Создано {recent_listings} объявлений за час")
-            risk_score += 30
-
-        # Проверка 5: Подозрительные цены
+        Returns:
+            dict: {user_id: результат check_user}
+        """
+        from accounts.models import Profile
         from listings.models import Listing
 
-        avg_price_market = (
-            Listing.objects.filter(
-                game=user.listings.first().game if user.listings.exists() else None
-            ).aggregate(avg=models.Avg("price"))["avg"]
-            or 0
-        )
-
-        if avg_price_market > 0:
-            # Decimal arithmetic: Avg возвращает Decimal, поэтому 0.3 нужно как Decimal
-            # (раньше падало TypeError: Decimal * float — пойман через тесты).
-            threshold = avg_price_market * Decimal("0.3")
-            user_listings = user.listings.filter(status="active")
-            for listing in user_listings:
-                if listing.price < threshold:  # Цена на 70% ниже рынка
-                    flags.append(f"Подозрительно низкая цена: {listing.title}")
-                    risk_score += 25
-
-        # Определяем действие
-        if risk_score >= self.risk_thresholds["critical"]:
-            action = "block"
-        elif risk_score >= self.risk_thresholds["high"]:
-            action = "review"
-        elif risk_score >= self.risk_thresholds["medium"]:
-            action = "flag"
-        else:
-            action = "allow"
+        users = {user.pk: user for user in users}
+        now = timezone.now()
 
-        return {
-            "risk_score": min(risk_score, 100),
-            "flags": flags,
-            "action": action,
-            "level": self.get_risk_level(risk_score),
+        profiles = {
+            row["user_id"]: row
+            for row in Profile.objects.filter(user_id__in=users).values(
+                "user_id", "is_verified", "rating", "total_sales"
+            )
         }
+        recent_counts = dict(
+            Listing.objects.filter(seller_id__in=users, created_at__gte=now - timedelta(hours=1))
+            .order_by()
+            .values("seller_id")
+            .annotate(count=models.Count("id"))
+            .values_list("seller_id", "count")
+        )
+        active_listings = list(
+            Listing.objects.filter(seller_id__in=users, status="active")
+            .order_by("seller_id", "id")
+            .values("seller_id", "title", "price", "game_id", "category_id")
+        )
+        thresholds = self._low_price_thresholds(active_listings)
+
+        results = {user_id: {"risk_score": 0, "flags": []} for user_id in users}
+
+        for user_id, user in users.items():
+            result = results[user_id]
+            profile = profiles.get(user_id, {})
+
+            # Проверка 1: Новый аккаунт
+            if (now - user.date_joined).days < 1:
+                result["flags"].append("Аккаунт младше 1 дня")
+                result["risk_score"] += 15
+
+            # Проверка 2: Нет верификации
+            if not profile.get("is_verified"):
+                result["flags"].append("Email/телефон не верифицированы")
+                result["risk_score"] += 20
+
+            # Проверка 3: Низкий рейтинг или много плохих отзывов
+            if profile and profile["rating"] < 2 and profile["total_sales"] > 5:
+                result["flags"].append("Низкий рейтинг при большом количестве продаж")
+                result["risk_score"] += 40
+
+            # Проверка 4: Множественные активные объявления за короткий срок
+            recent_listings = recent_counts.get(user_id, 0)
+            if recent_listings > 10:
+                result["flags"].append(f"Создано {recent_listings} объявлений за час")
+                result["risk_score"] += 30
+
+        # Проверка 5: Подозрительные цены (на 70% ниже медианы рынка)
+        for listing in active_listings:
+            threshold = thresholds.get((listing["game_id"], listing["category_id"]))
+            if threshold is not None and listing["price"] < threshold:
+                result = results[listing["seller_id"]]
+                result["flags"].append(f"Подозрительно низкая цена: {listing['title']}")
+                result["risk_score"] += 25
+
+        # Проверка 6: Правила AntiFraudRule из админки (core/fraud_rules.py)
+        verdicts = fraud_rules.evaluate(
+            fraud_rules.FraudEvent("user_check", user_id) for user_id in users
+        )
+        for verdict in verdicts:
+            result = results[verdict.event.user_id]
+            for rule in verdict.hits:
+                result["flags"].append(f"Правило антифрода: {rule}")
+                result["risk_score"] += rule.risk_score
+
+        for result in results.values():
+            risk_score = result["risk_score"]
+            result["risk_score"] = min(risk_score, 100)
+            result["action"] = self.get_action_for_score(risk_score)
+            result["level"] = self.get_risk_level(risk_score)
+        return results
+
+    @staticmethod
+    def _low_price_thresholds(listings):
+        """Порог «подозрительно низкой» цены на (игру, категорию) листингов.
+
+        Медиана категории, если выборка не меньше MARKET_INDEX_MIN_SAMPLE,
+        иначе медиана игры целиком; без статистики — порога нет.
+        """
+        from listings import market_index
+
+        pairs = {(listing["game_id"], listing["category_id"]) for listing in listings}
+        if not pairs:
+            return {}
+        game_groups = {(game_id, None) for game_id, _ in pairs}
+        stats = market_index.get_stats(pairs | game_groups)
+        min_sample = getattr(settings, "MARKET_INDEX_MIN_SAMPLE", 5)
+
+        thresholds = {}
+        for game_id, category_id in pairs:
+            stat = stats.get((game_id, category_id)) if category_id else None
+            if not stat or stat["sample_size"] < min_sample:
+                stat = stats.get((game_id, None))
+            if stat and stat["p50"] > 0:
+                thresholds[(game_id, category_id)] = stat["p50"] * LOW_PRICE_RATIO
+        return thresholds
 
     def check_transaction(self, purchase_request):
         """Проверить транзакцию"""
         flags = []
         risk_score = 0
 
-        # Проверка покупателя и продавца
-        buyer_risk = self.check_user(purchase_request.buyer)
-        seller_risk = self.check_user(purchase_request.seller)
+        # Проверка покупателя и продавца — одной пачкой
+        scores = self.score_users([purchase_request.buyer, purchase_request.seller])
+        buyer_risk = scores[purchase_request.buyer_id]
+        seller_risk = scores[purchase_request.seller_id]
 
         risk_score += buyer_risk["risk_score"] * 0.5
         risk_score += seller_risk["risk_score"] * 0.5
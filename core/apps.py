@@ -6,3 +6,6 @@ class CoreConfig(AppConfig):
     name = 'core'
     verbose_name = 'Ядро системы'
 
+    def ready(self) -> None:
+        # Инвалидация кэша состояния шапки (баланс, непрочитанные).
+        from . import signals  # noqa: F401
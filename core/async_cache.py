@@ -0,0 +1,108 @@
+"""
+Асинхронный доступ к кэшу для async-вью под ASGI.
+
+У django-redis нет нативного async: cache.aget() — это
+sync_to_async(cache.get), то есть переход в поток из пула на каждый
+вызов. Здесь — клиент redis.asyncio на том же LOCATION и сериализация
+django-redis (client.encode/decode, ключи через client.make_key), так что
+значения общие с синхронным кодом: положенное cache.set читает aget, и
+наоборот.
+
+Клиент redis.asyncio привязан к event loop, поэтому пул соединений
+заводится на каждый loop. Ошибки Redis, как IGNORE_EXCEPTIONS у
+django-redis, не пробрасываются: чтение возвращает default, запись
+пропускается с предупреждением в лог.
+
+Без Redis (USE_REDIS=False — dev, тесты) — штатные cache.aget/aset/adelete.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """redis.asyncio.Redis для текущего event loop или None без Redis."""
+    if not getattr(settings, "USE_REDIS", False):
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        from redis import asyncio as aioredis
+
+        params = settings.CACHES["default"]
+        options = params.get("OPTIONS", {})
+        client = aioredis.Redis.from_url(
+            params["LOCATION"],
+            socket_timeout=options.get("SOCKET_TIMEOUT"),
+            socket_connect_timeout=options.get("SOCKET_CONNECT_TIMEOUT"),
+            **options.get("CONNECTION_POOL_KWARGS", {}),
+        )
+        _clients[loop] = client
+    return client
+
+
+def make_key(key: str) -> str:
+    """Полный ключ Redis так, как его строит django-redis."""
+    return str(cache.client.make_key(key))
+
+
+def _timeout(timeout):
+    return cache.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+
+async def aget(key: str, default=None):
+    client = get_client()
+    if client is None:
+        return await cache.aget(key, default)
+    try:
+        value = await client.get(make_key(key))
+    except Exception as exc:
+        logger.warning("async cache get failed: key=%s error=%s", key, exc)
+        return default
+    return default if value is None else cache.client.decode(value)
+
+
+async def aset(key: str, value, timeout=DEFAULT_TIMEOUT) -> None:
+    client = get_client()
+    if client is None:
+        await cache.aset(key, value, timeout)
+        return
+    timeout = _timeout(timeout)
+    try:
+        if timeout is not None and timeout <= 0:
+            await client.delete(make_key(key))
+        else:
+            await client.set(make_key(key), cache.client.encode(value), ex=timeout)
+    except Exception as exc:
+        logger.warning("async cache set failed: key=%s error=%s", key, exc)
+
+
+async def adelete(key: str) -> None:
+    client = get_client()
+    if client is None:
+        await cache.adelete(key)
+        return
+    try:
+        await client.delete(make_key(key))
+    except Exception as exc:
+        logger.warning("async cache delete failed: key=%s error=%s", key, exc)
+
+
+async def aping() -> bool:
+    """Запись и чтение пробного ключа — для readiness-проверки."""
+    client = get_client()
+    if client is None:
+        await cache.aset("health:ready:probe", "1", 5)
+        return await cache.aget("health:ready:probe") == "1"
+    return bool(await client.ping())
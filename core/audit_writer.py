@@ -0,0 +1,205 @@
+"""
+Асинхронная пакетная запись SecurityAuditLog.
+
+SecurityAuditLog.log() вызывается из горячих путей (SecurityAuditMiddleware
+на каждый 403/exception, log_failed_login, BruteForceProtectionMiddleware,
+админ-действия). Синхронный INSERT на каждый вызов превращает волну
+credential stuffing в поток одиночных INSERT'ов на primary.
+
+Здесь log() кладёт несохранённый объект в in-process кольцевой буфер,
+а фоновый поток-флашер пишет его пачками через bulk_create:
+    - раз в AUDIT_FLUSH_INTERVAL секунд или сразу при накоплении
+      AUDIT_FLUSH_BATCH_SIZE записей;
+    - при переполнении буфера (AUDIT_BUFFER_SIZE) самые старые записи
+      вытесняются и учитываются в метрике dropped;
+    - при завершении процесса буфер дописывается (atexit).
+
+Финансовые события (SYNC_ACTION_TYPES) и вызовы с sync=True пишутся
+синхронно — в транзакции вызывающего кода, как раньше.
+
+Буфер — на процесс: после fork (gunicorn/celery prefork) дочерний процесс
+заводит свой буфер и свой поток.
+
+Метрики Prometheus:
+    lootlink_audit_queue_depth          — записей в буфере;
+    lootlink_audit_flush_seconds        — длительность bulk_create пачки;
+    lootlink_audit_written_total        — записано асинхронным путём;
+    lootlink_audit_dropped_total        — вытеснено из переполненного буфера;
+    lootlink_audit_flush_errors_total   — упавшие flush'и.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# События, которые обязаны закоммититься вместе с бизнес-транзакцией.
+SYNC_ACTION_TYPES = frozenset(
+    {
+        "balance_change",
+        "withdrawal_request",
+        "withdrawal_complete",
+        "deposit",
+        "escrow_create",
+        "escrow_release",
+        "escrow_refund",
+        "purchase_complete",
+    }
+)
+
+QUEUE_DEPTH = Gauge("lootlink_audit_queue_depth", "SecurityAuditLog records waiting for flush")
+FLUSH_SECONDS = Histogram(
+    "lootlink_audit_flush_seconds",
+    "SecurityAuditLog bulk_create batch duration",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+WRITTEN = Counter("lootlink_audit_written_total", "SecurityAuditLog records written asynchronously")
+DROPPED = Counter("lootlink_audit_dropped_total", "SecurityAuditLog records evicted from buffer")
+FLUSH_ERRORS = Counter("lootlink_audit_flush_errors_total", "Failed SecurityAuditLog flushes")
+
+
+def is_async_enabled() -> bool:
+    return getattr(settings, "AUDIT_ASYNC", False)
+
+
+def should_write_sync(action_type: str) -> bool:
+    """Писать ли событие синхронно (финансовое или async выключен)."""
+    return not is_async_enabled() or action_type in SYNC_ACTION_TYPES
+
+
+class AuditBuffer:
+    """Кольцевой буфер несохранённых SecurityAuditLog + поток-флашер."""
+
+    def __init__(self, *, maxlen: int, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._items: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def enqueue(self, record) -> None:
+        with self._lock:
+            if len(self._items) == self._items.maxlen:
+                DROPPED.inc()
+            self._items.append(record)
+            depth = len(self._items)
+        QUEUE_DEPTH.set(depth)
+        if depth >= self.batch_size:
+            self._wakeup.set()
+        self._ensure_thread()
+
+    def drain(self, limit: int | None = None) -> list:
+        with self._lock:
+            count = len(self._items) if limit is None else min(limit, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            depth = len(self._items)
+        QUEUE_DEPTH.set(depth)
+        return batch
+
+    def flush(self) -> int:
+        """Записать всё накопленное пачками. Возвращает число записанных строк."""
+        from core.models_audit import SecurityAuditLog
+
+        written = 0
+        while True:
+            batch = self.drain(self.batch_size)
+            if not batch:
+                return written
+            started = time.perf_counter()
+            try:
+                SecurityAuditLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            except Exception:
+                FLUSH_ERRORS.inc()
+                logger.exception("audit flush failed: lost %s records", len(batch))
+                return written
+            finally:
+                FLUSH_SECONDS.observe(time.perf_counter() - started)
+            WRITTEN.inc(len(batch))
+            written += len(batch)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-log-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._items:
+                self.flush()
+                # Соединение потока живёт между flush'ами; закрываем, если
+                # оно устарело (CONN_MAX_AGE) или сломано.
+                close_old_connections()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+
+_buffer: AuditBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> AuditBuffer:
+    """Буфер текущего процесса (пересоздаётся после fork)."""
+    global _buffer
+    pid = os.getpid()
+    if _buffer is None or _buffer._pid != pid:
+        with _buffer_lock:
+            if _buffer is None or _buffer._pid != pid:
+                _buffer = AuditBuffer(
+                    maxlen=getattr(settings, "AUDIT_BUFFER_SIZE", 10000),
+                    batch_size=getattr(settings, "AUDIT_FLUSH_BATCH_SIZE", 200),
+                    interval=getattr(settings, "AUDIT_FLUSH_INTERVAL", 1.0),
+                )
+    return _buffer
+
+
+def enqueue(record) -> None:
+    """Поставить несохранённый SecurityAuditLog в очередь на bulk_create.
+
+    created_at (auto_now_add) проставляется при flush'е — расхождение
+    с моментом события не больше AUDIT_FLUSH_INTERVAL.
+    """
+    get_buffer().enqueue(record)
+
+
+def flush() -> int:
+    """Синхронно дописать буфер текущего процесса (тесты, shutdown)."""
+    return get_buffer().flush() if _buffer is not None else 0
+
+
+def queue_depth() -> int:
+    return len(_buffer) if _buffer is not None and _buffer._pid == os.getpid() else 0
+
+
+@atexit.register
+def _flush_on_exit() -> None:  # pragma: no cover — вызывается интерпретатором
+    if _buffer is not None and _buffer._pid == os.getpid() and len(_buffer):
+        try:
+            _buffer.stop()
+            _buffer.flush()
+        except Exception:
+            logger.exception("audit flush on exit failed")
@@ -1,47 +1,188 @@
 """
 Автоматическая модерация контента.
+
+Все правила (мат, спам, мошенничество) компилируются в один regex-trie:
+буквальные начала правил (корни, ключевые слова) сведены в префиксное
+дерево, после каждого — хвост правила и пустая именованная группа-метка.
+Текст проходится одним finditer, категория берётся из match.lastgroup.
+Каждая ветка начинается с буквы, поэтому движок re быстро пропускает
+позиции, с которых не начинается ни одно правило (в отличие от трёх
+IGNORECASE-alternation regex, которые шли по тексту последовательно).
+
+Перед проверкой текст нормализуется (normalize_text): нижний регистр,
+ё → е, латинские двойники кириллицы и leetspeak внутри слов (xyй, пи3дец,
+sh1t), растянутые буквы (бляяяя) и слова по буквам (х у й, х.у.й). Дорогие
+шаги запускаются, только если дешёвый regex-детектор что-то нашёл.
+Корни мата ловятся с типичными приставками (нахуй, отпиздить) и любыми
+окончаниями.
+
+Пакетный API — check_texts / moderate_listings / moderate_messages: логи
+AutoModeration и очередь модерации пишутся bulk-запросами на пачку.
 """
-import re
-from django.conf import settings
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 
+PROFANITY_ROOTS = (
+    'хуй', 'хуе', 'хуя', 'пизд', 'ебл', 'еба', 'ебу', 'бля', 'сук', 'муда', 'пидор', 'гандон',
+)
+# Приставки, с которыми встречаются корни мата (на-, от-, вы- ...).
+PROFANITY_PREFIXES = (
+    'на', 'по', 'от', 'вы', 'за', 'при', 'до', 'пере', 'про', 'раз', 'рас', 'под', 'об', 'о',
+    'с', 'у',
+)
+# Однобуквенные приставки к корням «еб*» не добавляются: с+еба, с+ебу
+# совпадают с началом обычных слов (Себастьян, себу).
+PROFANITY_WORDS = PROFANITY_ROOTS + tuple(
+    prefix + root
+    for prefix in PROFANITY_PREFIXES
+    for root in PROFANITY_ROOTS
+    if len(prefix) > 1 or not root.startswith('еб')
+)
+
+# Правила: (категория, буквальные начала, хвост regex, только с начала слова).
+# Применяются к normalize_text(text).
+RULES = (
+    ('scam', ('гарант',), r'\w*\s+(?:100%|обязательно)', False),
+    ('scam', ('обман', 'мошенни', 'кидал'), r'\w*\s+(?:не|нет)', False),
+    ('scam', ('предоплата',), r'\s+обязательна', False),
+    ('scam', ('яндекс', 'киви', 'карта'), r'\s+\d{10,}', False),  # Реквизиты для оплаты
+    ('spam', ('купи', 'продам', 'заработок', 'доход'), r'\s+(?:здесь|тут|сейчас)', False),
+    ('spam', ('telegram', 'whatsapp', 'viber'), r'\s*[@:]\s*@?\w+', False),
+    ('spam', ('http://', 'https://'), r'(?:bit\.ly|goo\.gl|tinyurl|vk\.cc)', False),  # Короткие ссылки
+    ('spam', tuple('0123456789'), r'\d{9,}', False),  # Длинные номера телефонов
+    (
+        'profanity',
+        PROFANITY_WORDS,
+        r'\w*',
+        True,
+    ),
+    ('profanity', ('fuck', 'shit', 'bitch', 'ass'), r'\w*', True),
+)
+
+SEVERITY_ORDER = ('scam', 'spam', 'profanity')
+
+# Латинские двойники кириллицы и leetspeak: для слов на кириллице ...
+TO_CYRILLIC = str.maketrans({
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м', 'o': 'о',
+    'p': 'р', 't': 'т', 'x': 'х', 'y': 'у', 'u': 'и',
+    '0': 'о', '3': 'з', '4': 'ч', '6': 'б', '9': 'я', '@': 'а', '$': 'с',
+})
+# ... и для слов на латинице.
+TO_LATIN = str.maketrans({
+    'а': 'a', 'в': 'b', 'с': 'c', 'е': 'e', 'н': 'h', 'к': 'k', 'м': 'm', 'о': 'o',
+    'р': 'p', 'т': 't', 'х': 'x', 'у': 'y', 'и': 'u',
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's',
+})
+
+# Слово с возможными @/$ внутри (п@дла, a$$).
+WORD_RE = re.compile(r'[^\W_]+(?:[@$]+[^\W_]+)*')
+CYRILLIC_RE = re.compile(r'[а-я]')
+LATIN_RE = re.compile(r'[a-z]')
+DIGIT_RE = re.compile(r'\d')
+# 3+ одинаковых буквы подряд → одна (бляяяя → бля).
+REPEAT_RE = re.compile(r'([^\W\d_])\1{2,}')
+# Слово по буквам через пробел/точку/дефис/звёздочку (х у й, х.у.й).
+SPELLED_RE = re.compile(r'(?<![^\W_])(?:[^\W\d_][ .\-_*]){2,}[^\W\d_](?![^\W_])')
+# Дешёвый детектор: есть ли в тексте, что нормализовать.
+NEEDS_WORDS = re.compile(r'[а-я][a-z\d@$]|[a-z\d@$][а-я]|[a-z][\d@$][a-z]')
+NEEDS_SPELLED = re.compile(r'(?<![^\W_])[^\W\d_][ .\-_*][^\W\d_][ .\-_*]')
+NEEDS_REPEAT = re.compile(r'(\w)\1\1')
+
+
+def _normalize_word(match):
+    word = match.group(0)
+    cyrillic = len(CYRILLIC_RE.findall(word))
+    latin = len(LATIN_RE.findall(word))
+    digits = len(DIGIT_RE.findall(word))
+    mixed = cyrillic and latin
+    leet = (digits or '@' in word or '$' in word) and cyrillic + latin > digits
+    if not (mixed or leet):
+        # Номера телефонов, артикулы и обычные слова — без изменений.
+        return word
+    # Выбираем алфавит, в котором после замены остаётся меньше «чужих» букв.
+    as_cyrillic = word.translate(TO_CYRILLIC)
+    as_latin = word.translate(TO_LATIN)
+    foreign_in_cyrillic = len(LATIN_RE.findall(as_cyrillic))
+    foreign_in_latin = len(CYRILLIC_RE.findall(as_latin))
+    if foreign_in_cyrillic < foreign_in_latin or (
+        foreign_in_cyrillic == foreign_in_latin and cyrillic >= latin
+    ):
+        return as_cyrillic
+    return as_latin
+
+
+def normalize_text(text):
+    """Привести текст к виду, на котором проверяются правила."""
+    text = (text or '').lower().replace('ё', 'е')
+    if NEEDS_SPELLED.search(text):
+        text = SPELLED_RE.sub(lambda m: re.sub(r'[ .\-_*]', '', m.group(0)), text)
+    if NEEDS_WORDS.search(text):
+        text = WORD_RE.sub(_normalize_word, text)
+    if NEEDS_REPEAT.search(text):
+        text = REPEAT_RE.sub(r'\1', text)
+    return text
+
+
+def compile_rules(rules):
+    """
+    Собрать правила в один regex-trie.
+
+    Returns:
+        (re.Pattern, {имя группы-метки: категория})
+    """
+    trie = {}
+    group_types = {}
+    for index, (category, words, tail, word_start) in enumerate(rules):
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            name = f'{category}_{index}_{len(group_types)}'
+            group_types[name] = category
+            # Граница слова проверяется lookbehind'ом на длину буквального начала.
+            boundary = f'(?<![^\\W_].{{{len(word)}}})' if word_start else ''
+            node.setdefault('', []).append(f'{boundary}{tail}(?P<{name}>)')
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in node.items() if char]
+        branches += node.get('', [])
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return re.compile(emit(trie)), group_types
+
+
 class AutoModerator:
     """
     Автоматический модератор для фильтрации нежелательного контента.
     """
-    
-    # Паттерны для обнаружения
-    PROFANITY_PATTERNS = [
-        r'\b(хуй|пизд|ебл|бля|сук|муда|пидор|гандон)\w*',
-        r'\b(fuck|shit|bitch|ass)\w*',
-    ]
-    
-    SPAM_PATTERNS = [
-        r'(купи|продам|заработок|доход)\s+(здесь|тут|сейчас)',
-        r'(telegram|whatsapp|viber)\s*[@:]\s*[\w\d]+',
-        r'https?://(bit\.ly|goo\.gl|tinyurl|vk\.cc)',  # Короткие ссылки
-        r'(\d{10,})',  # Длинные номера телефонов
-    ]
-    
-    SCAM_PATTERNS = [
-        r'(гарант|гарантия)\s+(100%|обязательно)',
-        r'(обман|мошенник|кидала)\s+(не|нет)',
-        r'предоплата\s+обязательна',
-        r'(яндекс|киви|карта)\s+\d{10,}',  # Реквизиты для оплаты
-    ]
-    
+
+    RULES = RULES
+
+    MESSAGES = {
+        'profanity': 'Обнаружена нецензурная лексика',
+        'spam': 'Обнаружены признаки спама',
+        'scam': 'Обнаружены признаки мошенничества',
+    }
+
     def __init__(self):
-        self.profanity_regex = re.compile('|'.join(self.PROFANITY_PATTERNS), re.IGNORECASE)
-        self.spam_regex = re.compile('|'.join(self.SPAM_PATTERNS), re.IGNORECASE)
-        self.scam_regex = re.compile('|'.join(self.SCAM_PATTERNS), re.IGNORECASE)
-    
+        self.matcher, self.group_types = compile_rules(self.RULES)
+
+    def find_matches(self, text):
+        """Совпадения по категориям за один проход: {type: [строки]}."""
+        matches = {}
+        for match in self.matcher.finditer(normalize_text(text)):
+            matches.setdefault(self.group_types[match.lastgroup], []).append(match.group(0))
+        return matches
+
     def check_text(self, text):
         """
         Проверить текст на нежелательный контент.
-        
+
         Returns:
             dict: {
                 'is_clean': bool,
@@ -49,116 +190,217 @@ class AutoModerator:
                 'severity': 'low'|'medium'|'high'
             }
         """
+        matches = self.find_matches(text)
         violations = []
         severity = 'low'
-        
+
         # Проверка на мат
-        if self.profanity_regex.search(text):
+        if 'profanity' in matches:
             violations.append({
                 'type': 'profanity',
-                'message': 'Обнаружена нецензурная лексика'
+                'message': self.MESSAGES['profanity']
             })
             severity = 'medium'
-        
+
         # Проверка на спам
-        spam_matches = self.spam_regex.findall(text)
-        if spam_matches:
+        if 'spam' in matches:
             violations.append({
                 'type': 'spam',
-                'message': 'Обнаружены признаки спама',
-                'matches': spam_matches[:3]  # Первые 3 совпадения
+                'message': self.MESSAGES['spam'],
+                'matches': matches['spam'][:3]  # Первые 3 совпадения
             })
             severity = 'medium' if severity == 'low' else 'high'
-        
+
         # Проверка на мошенничество
-        scam_matches = self.scam_regex.findall(text)
-        if scam_matches:
+        if 'scam' in matches:
             violations.append({
                 'type': 'scam',
-                'message': 'Обнаружены признаки мошенничества'
+                'message': self.MESSAGES['scam']
             })
             severity = 'high'
-        
+
         return {
             'is_clean': len(violations) == 0,
             'violations': violations,
             'severity': severity
         }
-    
+
+    def check_texts(self, texts):
+        """Проверить пачку текстов; результаты в том же порядке."""
+        return [self.check_text(text) for text in texts]
+
     def moderate_listing(self, listing):
         """Проверить объявление"""
-        text = f"{listing.title} {listing.description}"
-        result = self.check_text(text)
-        
-        if not result['is_clean']:
-            self._log_violation(
-                content_type='listing',
-                content_id=listing.id,
-                user=listing.seller,
-                violations=result['violations'],
-                severity=result['severity']
-            )
-            
+        return self.moderate_listings([listing])[listing.id]
+
+    def moderate_listings(self, listings):
+        """
+        Проверить пачку объявлений.
+
+        Returns:
+            dict: {listing.id: 'approved'|'flagged'|'blocked'}
+        """
+        listings = list(listings)
+        results = self.check_texts(f'{listing.title} {listing.description}' for listing in listings)
+        outcomes = self.apply_listing_results(
+            (listing.id, listing.seller_id, result) for listing, result in zip(listings, results)
+        )
+        for listing in listings:
+            if outcomes[listing.id] == 'blocked':
+                listing.status = 'cancelled'
+        return outcomes
+
+    def apply_listing_results(self, entries, block_statuses=None):
+        """
+        Применить результаты проверки объявлений bulk-операциями.
+
+        high → status=cancelled одним UPDATE (без save(): ни пересчёта
+        search_vector, ни сброса кэша каталога на каждое объявление — кэш
+        сбрасывается один раз на пачку); medium → ModerationQueue.
+
+        Args:
+            entries: [(listing_id, seller_id, результат check_text)]
+            block_statuses: блокировать только объявления в этих статусах
+                (фоновая перепроверка не трогает проданные между делом).
+
+        Returns:
+            dict: {listing_id: 'approved'|'flagged'|'blocked'}
+        """
+        from django.utils import timezone
+
+        from listings.models import Listing, ListingChange
+        from listings.signals import invalidate_catalog_cache
+
+        from .moderation_models import ModerationQueue
+
+        outcomes = {}
+        violations = []
+        blocked = []
+        flagged = []
+        for listing_id, seller_id, result in entries:
+            outcomes[listing_id] = 'approved'
+            if result['is_clean']:
+                continue
+            violations.append(('listing', listing_id, seller_id, result))
+
             if result['severity'] == 'high':
                 # Автоматически скрываем
-                listing.status = 'cancelled'
-                listing.save()
-                return 'blocked'
+                blocked.append(listing_id)
+                outcomes[listing_id] = 'blocked'
             elif result['severity'] == 'medium':
-                # Добавляем в очередь модерации
-                from .moderation_models import ModerationQueue
-                ModerationQueue.objects.get_or_create(
+                flagged.append((listing_id, seller_id))
+                outcomes[listing_id] = 'flagged'
+
+        self._log_violations(violations)
+
+        if blocked:
+            to_block = Listing.objects.filter(pk__in=blocked)
+            if block_statuses is not None:
+                to_block = to_block.filter(status__in=block_statuses)
+                # В журнал — только листинги, которые UPDATE действительно меняет
+                blocked = list(to_block.values_list('pk', flat=True))
+                to_block = to_block.filter(pk__in=blocked)
+            if blocked and to_block.update(status='cancelled', updated_at=timezone.now()):
+                # QuerySet.update() минует post_save — журнал delta-sync вручную
+                ListingChange.record(blocked, 'updated')
+                invalidate_catalog_cache()
+
+        if flagged:
+            # Добавляем в очередь модерации (без дублей уже стоящих в ней)
+            queued = set(ModerationQueue.objects.filter(
+                content_type='listing',
+                content_id__in=[listing_id for listing_id, _ in flagged],
+            ).values_list('content_id', 'user_id'))
+            ModerationQueue.objects.bulk_create([
+                ModerationQueue(
                     content_type='listing',
-                    content_id=listing.id,
-                    user=listing.seller,
-                    defaults={'priority': 5}
+                    content_id=listing_id,
+                    user_id=seller_id,
+                    priority=5,
                 )
-                return 'flagged'
-        
-        return 'approved'
-    
+                for listing_id, seller_id in flagged
+                if (listing_id, seller_id) not in queued
+            ])
+
+        return outcomes
+
     def moderate_message(self, message):
         """Проверить сообщение"""
-        result = self.check_text(message.content)
-        
-        if not result['is_clean']:
-            self._log_violation(
-                content_type='message',
-                content_id=message.id,
-                user=message.sender,
-                violations=result['violations'],
-                severity=result['severity']
-            )
-            
-            if result['severity'] == 'high':
-                return 'blocked'
-            else:
-                return 'warned'
-        
-        return 'approved'
-    
+        return self.moderate_messages([message])[message.id]
+
+    def moderate_messages(self, messages):
+        """
+        Проверить пачку сообщений.
+
+        Returns:
+            dict: {message.id: 'approved'|'warned'|'blocked'}
+        """
+        messages = list(messages)
+        results = self.check_texts(message.content for message in messages)
+        return self.apply_message_results(
+            (message.id, message.sender_id, result) for message, result in zip(messages, results)
+        )
+
+    def apply_message_results(self, entries):
+        """
+        Записать нарушения в сообщениях одним bulk_create.
+
+        Args:
+            entries: [(message_id, sender_id, результат check_text)]
+
+        Returns:
+            dict: {message_id: 'approved'|'warned'|'blocked'}
+        """
+        outcomes = {}
+        violations = []
+        for message_id, sender_id, result in entries:
+            if result['is_clean']:
+                outcomes[message_id] = 'approved'
+                continue
+            violations.append(('message', message_id, sender_id, result))
+            outcomes[message_id] = 'blocked' if result['severity'] == 'high' else 'warned'
+
+        self._log_violations(violations)
+        return outcomes
+
     def _log_violation(self, content_type, content_id, user, violations, severity):
         """Логирование нарушения"""
+        self._log_violations([
+            (content_type, content_id, user.pk, {'violations': violations, 'severity': severity})
+        ])
+
+    def _log_violations(self, entries):
+        """Логирование нарушений одним bulk_create"""
         from .moderation_models import AutoModeration
-        
-        action = {
-            'low': 'flag',
-            'medium': 'warn',
-            'high': 'block'
-        }.get(severity, 'flag')
-        
-        AutoModeration.objects.create(
-            content_type=content_type,
-            content_id=content_id,
-            user=user,
-            action=action,
-            reason=f"Обнаружено нарушений: {len(violations)}",
-            matched_patterns=[v['type'] for v in violations]
-        )
-        
-        logger.warning(f'AutoMod {action}: {content_type} #{content_id} by {user.username}')
+
+        if not entries:
+            return
+
+        records = []
+        for content_type, content_id, user_id, result in entries:
+            action = {
+                'low': 'flag',
+                'medium': 'warn',
+                'high': 'block'
+            }.get(result['severity'], 'flag')
+
+            records.append(AutoModeration(
+                content_type=content_type,
+                content_id=content_id,
+                user_id=user_id,
+                action=action,
+                reason=f"Обнаружено нарушений: {len(result['violations'])}",
+                matched_patterns=[v['type'] for v in result['violations']]
+            ))
+            logger.warning(f'AutoMod {action}: {content_type} #{content_id} by user #{user_id}')
+
+        AutoModeration.objects.bulk_create(records)
+
+
+def check_texts(texts):
+    """Проверить тексты модулем-синглтоном (точка входа для пула процессов)."""
+    return auto_moderator.check_texts(texts)
 
 
 # Singleton
 auto_moderator = AutoModerator()
-
@@ -0,0 +1,100 @@
+"""
+Пакетные state-переходы: set-based UPDATE порциями по keyset (pk).
+
+Используется фоновыми задачами, которые переводят много строк из одного
+статуса в другой (истечение запросов на покупку, предложений цены и т.п.):
+вместо цикла ``obj.status = ...; obj.save()`` — один UPDATE на порцию.
+
+Каждая порция обрабатывается в своей транзакции:
+    1. SELECT ... FOR UPDATE SKIP LOCKED — берём до batch_size кандидатов
+       с pk > последнего обработанного. Строки, которые прямо сейчас
+       меняет пользователь (accept/reject), пропускаются и будут
+       подобраны следующим запуском;
+    2. на СУБД без FOR UPDATE (SQLite) строки не заблокированы: из
+       порции оставляем только те, что всё ещё проходят исходное условие;
+    3. UPDATE ... WHERE pk IN (...) AND <исходное условие> — повторная
+       проверка условия защищает от двойного перехода;
+    4. on_batch(rows) — побочные эффекты для переведённых строк порции
+       (bulk-уведомления) в той же транзакции.
+
+Короткие транзакции не держат блокировки дольше одной порции.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, Iterable, List, Optional
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def bulk_transition(
+    queryset: QuerySet,
+    *,
+    updates: dict,
+    fields: Iterable[str] = (),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Optional[Callable[[List[dict]], None]] = None,
+) -> int:
+    """Применить ``updates`` ко всем строкам queryset порциями.
+
+    Args:
+        queryset: кандидаты на переход; фильтр должен включать исходный
+            статус (он же — guard при UPDATE).
+        updates: значения для ``QuerySet.update()``.
+        fields: дополнительные колонки (в т.ч. через ``__``), которые
+            нужны on_batch; ``pk`` добавляется всегда.
+        batch_size: размер порции.
+        on_batch: вызывается с list[dict] переведённых строк порции.
+
+    Returns:
+        Общее число переведённых строк.
+    """
+    columns = ["pk", *fields]
+    can_lock = connections[queryset.db].features.has_select_for_update
+    last_pk = None
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            candidates = queryset
+            if last_pk is not None:
+                candidates = candidates.filter(pk__gt=last_pk)
+            rows = list(
+                candidates.order_by("pk")
+                .select_for_update(skip_locked=True, of=("self",))
+                .values(*columns)[:batch_size]
+            )
+            if not rows:
+                break
+
+            last_pk = rows[-1]["pk"]
+            selected = len(rows)
+            ids = [row["pk"] for row in rows]
+            if not can_lock:
+                # Строку могли изменить после SELECT (accept/reject):
+                # переводим и уведомляем только прошедшие условие сейчас
+                current = set(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+                rows = [row for row in rows if row["pk"] in current]
+                ids = [row["pk"] for row in rows]
+            updated = queryset.filter(pk__in=ids).update(**updates) if ids else 0
+            total += updated
+            if on_batch is not None and updated:
+                on_batch(rows)
+
+        if selected < batch_size:
+            break
+
+    if total:
+        logger.info(
+            "bulk transition: model=%s updates=%s rows=%s",
+            queryset.model._meta.label,
+            sorted(updates),
+            total,
+        )
+    return total
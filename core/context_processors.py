@@ -5,42 +5,52 @@ Context processors для глобального доступа к данным.
 from django.conf import settings
 
 
+def _header_state(request):
+    """Один ленивый загрузчик шапки на запрос — общий для процессоров ниже."""
+    from core.header_state import LazyHeaderState
+
+    state = getattr(request, "_header_state", None)
+    if state is None:
+        state = request._header_state = LazyHeaderState(request.user.pk)
+    return state
+
+
 def notifications_processor(request):
     """
     Добавляет количество непрочитанных уведомлений в контекст шаблона.
-    Использует кэширование для снижения нагрузки на БД.
-    """
-    unread_count = 0
-
-    if request.user.is_authenticated:
-        from django.core.cache import cache
 
-        from core.models import Notification
+    Значение ленивое и берётся из кэша состояния шапки
+    (core/header_state.py) — запрос выполняется, только если шаблон его
+    выводит и в кэше его нет.
+    """
+    if not request.user.is_authenticated:
+        return {"unread_notifications_count": 0}
 
-        # Кэшируем количество уведомлений на 1 минуту
-        cache_key = f"unread_notif_count_{request.user.id}"
-        unread_count = cache.get(cache_key)
+    from django.utils.functional import SimpleLazyObject
 
-        if unread_count is None:
-            unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-            cache.set(cache_key, unread_count, 60)  # 1 минута
+    from core.header_state import UNREAD_NOTIFICATIONS
 
-    return {"unread_notifications_count": unread_count}
+    state = _header_state(request)
+    return {"unread_notifications_count": SimpleLazyObject(lambda: state[UNREAD_NOTIFICATIONS])}
 
 
 def wallet_balance_processor(request):
     """
     Добавляет баланс кошелька пользователя в контекст шаблона.
     Использует Wallet (единый источник истины), а не Profile.balance.
+
+    Кошелёк не создаётся: нет кошелька — баланс 0. Значение ленивое и
+    берётся из кэша состояния шапки вместе со счётчиком уведомлений.
     """
-    if request.user.is_authenticated:
-        from payments.models import Wallet
-
-        wallet, _ = Wallet.objects.get_or_create(
-            user=request.user, defaults={"balance": 0, "frozen_balance": 0}
-        )
-        return {"wallet_balance": wallet.balance}
-    return {"wallet_balance": 0}
+    if not request.user.is_authenticated:
+        return {"wallet_balance": 0}
+
+    from django.utils.functional import SimpleLazyObject
+
+    from core.header_state import WALLET_BALANCE
+
+    state = _header_state(request)
+    return {"wallet_balance": SimpleLazyObject(lambda: state[WALLET_BALANCE])}
 
 
 def site_context(request):
@@ -0,0 +1,564 @@
+"""
+Движок правил антифрода на основе AntiFraudRule.
+
+Правила из админки компилируются в предикаты по типу:
+    blacklist_email        — точные адреса (set) + маски `*@domain` одним regex;
+    blacklist_phone        — то же по цифрам номера (`+7999*` — префикс);
+    suspicious_price       — pattern = доля медианы рынка (`0.3`): цена события
+                             ниже доли × P50 из индекса MarketPriceStat;
+    multiple_accounts_ip   — pattern = N: с IP пользователя входили ≥ N аккаунтов;
+    rapid_account_creation — pattern = `N/часы` (`3/24`): ≥ N аккаунтов с этого
+                             IP зарегистрированы за последние часы;
+    chargeback_history     — pattern = N: ≥ N проигранных споров.
+Пороговые правила отсортированы, сработавшие находятся bisect'ом.
+
+Скомпилированный набор живёт в памяти процесса и сверяется с версией в
+кэше (один get на пачку событий). Сохранение/удаление правила меняет
+версию (core/signals.py) — все процессы перекомпилируют набор.
+
+События (FraudEvent: создание листинга, запрос на покупку, вывод)
+публикуются сервисами после коммита в Celery-задачу
+core.tasks.evaluate_fraud_events. Признаки пользователя и IP берутся из
+кэша (FRAUD_FEATURE_TTL), промахи догружаются пачкой. Срабатывания пишутся
+в SecurityAuditLog как suspicious_activity. IP и входы — из успешных
+записей LoginHistory (accounts/signals.py пишет их на user_logged_in).
+
+backtest() прогоняет правила по истории PurchaseRequest пачками и
+считает срабатывания, долю сделок со спором среди помеченных и
+пропускную способность (событий в секунду).
+"""
+
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import logging
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "fraud_rules:version"
+USER_FEATURES_PREFIX = "fraud_features:user"
+IP_FEATURES_PREFIX = "fraud_features:ip"
+
+EVENT_KINDS = ("listing_created", "purchase_request", "withdrawal", "user_check")
+PRICED_KINDS = ("listing_created", "purchase_request")
+ACTION_SEVERITY = {"allow": 0, "flag": 1, "review": 2, "block": 3}
+RISK_LEVELS = {"flag": "medium", "review": "high", "block": "critical"}
+# Споры, проигранные продавцом / покупателем.
+LOST_AS_SELLER = ("resolved_buyer", "resolved_partial")
+LOST_AS_BUYER = ("resolved_seller",)
+# Сколько последних регистраций с IP хранить в признаках.
+MAX_IP_JOINS = 50
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    id: int
+    rule_type: str
+    pattern: str
+    risk_score: int
+    action: str
+
+    def __str__(self):
+        return f"{self.rule_type}:{self.pattern}"
+
+
+@dataclass
+class FraudEvent:
+    kind: str
+    user_id: int
+    object_id: Optional[int] = None
+    amount: Optional[Decimal] = None
+    game_id: Optional[int] = None
+    category_id: Optional[int] = None
+    ip: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["amount"] = None if self.amount is None else str(self.amount)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FraudEvent":
+        amount = data.get("amount")
+        return cls(**{**data, "amount": None if amount is None else Decimal(amount)})
+
+
+@dataclass
+class FraudVerdict:
+    event: FraudEvent
+    hits: List[CompiledRule] = field(default_factory=list)
+
+    @property
+    def risk_score(self) -> int:
+        return min(sum(rule.risk_score for rule in self.hits), 100)
+
+    @property
+    def action(self) -> str:
+        return max((rule.action for rule in self.hits), key=ACTION_SEVERITY.get, default="allow")
+
+
+# ---------------------------------------------------------------------------
+# Компиляция
+# ---------------------------------------------------------------------------
+
+
+def _digits(phone: str) -> str:
+    return re.sub(r"\D", "", phone or "")
+
+
+class PatternMatcher:
+    """Точные значения — словарём, маски — одним regex с группой на правило."""
+
+    def __init__(self, rules: Iterable[CompiledRule], normalize):
+        self.exact: Dict[str, List[CompiledRule]] = defaultdict(list)
+        self.by_group: Dict[str, CompiledRule] = {}
+        alternatives = []
+        for rule in rules:
+            value = normalize(rule.pattern)
+            if not value:
+                continue
+            if "*" in rule.pattern or "?" in rule.pattern:
+                group = f"r{rule.id}"
+                self.by_group[group] = rule
+                alternatives.append(f"(?P<{group}>{fnmatch.translate(value)[4:-3]})")
+            else:
+                self.exact[value].append(rule)
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def match(self, value: str) -> List[CompiledRule]:
+        if not value:
+            return []
+        hits = list(self.exact.get(value, ()))
+        if self.regex is not None:
+            found = self.regex.fullmatch(value)
+            if found is not None:
+                hits.append(self.by_group[found.lastgroup])
+        return hits
+
+
+class ThresholdMatcher:
+    """Правила «значение ≥ N»: отсортированы по N, сработавшие — префикс."""
+
+    def __init__(self, rules: Iterable[Tuple[Decimal, CompiledRule]]):
+        ordered = sorted(rules, key=lambda item: item[0])
+        self.thresholds = [threshold for threshold, _ in ordered]
+        self.rules = [rule for _, rule in ordered]
+
+    def at_least(self, value) -> List[CompiledRule]:
+        return self.rules[: bisect.bisect_right(self.thresholds, value)]
+
+    def above(self, value) -> List[CompiledRule]:
+        return self.rules[bisect.bisect_right(self.thresholds, value) :]
+
+    def __bool__(self):
+        return bool(self.rules)
+
+
+def _number(pattern: str) -> Optional[Decimal]:
+    try:
+        return Decimal(pattern.strip().replace(",", "."))
+    except (InvalidOperation, AttributeError):
+        return None
+
+
+class RuleSet:
+    """Скомпилированный набор активных правил."""
+
+    def __init__(self, rules: Iterable[CompiledRule], version=None):
+        self.version = version
+        by_type = defaultdict(list)
+        for rule in rules:
+            by_type[rule.rule_type].append(rule)
+
+        self.emails = PatternMatcher(
+            by_type["blacklist_email"], lambda value: value.lower().strip()
+        )
+        self.phones = PatternMatcher(
+            by_type["blacklist_phone"],
+            lambda value: _digits(value) + ("*" if value.rstrip().endswith("*") else ""),
+        )
+        self.price = ThresholdMatcher(self._thresholds(by_type["suspicious_price"]))
+        self.chargebacks = ThresholdMatcher(self._thresholds(by_type["chargeback_history"]))
+        self.ip_accounts = ThresholdMatcher(self._thresholds(by_type["multiple_accounts_ip"]))
+        # rapid_account_creation: окно в часах → правила «≥ N регистраций».
+        rapid = defaultdict(list)
+        for rule in by_type["rapid_account_creation"]:
+            count, _, hours = rule.pattern.partition("/")
+            count, hours = _number(count), _number(hours or "24")
+            if count is not None and hours is not None:
+                rapid[int(hours)].append((count, rule))
+        self.rapid = {hours: ThresholdMatcher(items) for hours, items in rapid.items()}
+        self.size = sum(len(items) for items in by_type.values())
+
+    @staticmethod
+    def _thresholds(rules):
+        return [(value, rule) for rule in rules if (value := _number(rule.pattern)) is not None]
+
+    @property
+    def needs_ip(self) -> bool:
+        return bool(self.ip_accounts or self.rapid)
+
+    def evaluate(self, event: FraudEvent, user: dict, ip: dict, median) -> FraudVerdict:
+        verdict = FraudVerdict(event)
+        hits = verdict.hits
+        hits += self.emails.match(user.get("email", ""))
+        phone = user.get("phone", "")
+        hits += self.phones.match(phone)
+        if self.chargebacks:
+            hits += self.chargebacks.at_least(user.get("lost_disputes", 0))
+        if ip:
+            hits += self.ip_accounts.at_least(ip["accounts"])
+            now = timezone.now().timestamp()
+            for hours, matcher in self.rapid.items():
+                since = now - hours * 3600
+                hits += matcher.at_least(sum(1 for joined in ip["joins"] if joined >= since))
+        if event.kind in PRICED_KINDS and event.amount is not None and median:
+            hits += self.price.above(event.amount / median)
+        return verdict
+
+
+# ---------------------------------------------------------------------------
+# Кэш набора правил
+# ---------------------------------------------------------------------------
+
+_local = {"ruleset": None}
+
+
+def current_version() -> str:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version() -> None:
+    """Новая версия — процессы перекомпилируют набор при следующей пачке."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_ruleset() -> RuleSet:
+    from core.models_faq import AntiFraudRule
+
+    version = current_version()
+    ruleset = _local["ruleset"]
+    if ruleset is None or ruleset.version != version:
+        rules = [
+            CompiledRule(**row)
+            for row in AntiFraudRule.objects.filter(is_active=True).values(
+                "id", "rule_type", "pattern", "risk_score", "action"
+            )
+        ]
+        ruleset = RuleSet(rules, version=version)
+        _local["ruleset"] = ruleset
+    return ruleset
+
+
+# ---------------------------------------------------------------------------
+# Признаки
+# ---------------------------------------------------------------------------
+
+
+def _feature_ttl() -> int:
+    return getattr(settings, "FRAUD_FEATURE_TTL", 300)
+
+
+def _ip_since():
+    return timezone.now() - timedelta(days=getattr(settings, "FRAUD_IP_WINDOW_DAYS", 30))
+
+
+def _load_user_features(user_ids) -> Dict[int, dict]:
+    from accounts.models import CustomUser
+    from accounts.models_security import LoginHistory
+    from payments.models_disputes import Dispute
+
+    features = {
+        row["id"]: {
+            "email": (row["email"] or "").lower(),
+            "phone": _digits(row["profile__phone"]),
+            "lost_disputes": 0,
+            "last_ip": None,
+        }
+        for row in CustomUser.objects.filter(pk__in=user_ids).values(
+            "id", "email", "profile__phone"
+        )
+    }
+    lost = Dispute.objects.filter(
+        Q(escrow__purchase_request__seller_id__in=user_ids, status__in=LOST_AS_SELLER)
+        | Q(escrow__purchase_request__buyer_id__in=user_ids, status__in=LOST_AS_BUYER)
+    ).values_list(
+        "escrow__purchase_request__seller_id", "escrow__purchase_request__buyer_id", "status"
+    )
+    for seller_id, buyer_id, status in lost:
+        loser = seller_id if status in LOST_AS_SELLER else buyer_id
+        if loser in features:
+            features[loser]["lost_disputes"] += 1
+
+    logins = (
+        LoginHistory.objects.filter(
+            user_id__in=user_ids,
+            success=True,
+            created_at__gte=_ip_since(),
+        )
+        .order_by("user_id", "-created_at")
+        .values_list("user_id", "ip_address")
+    )
+    for user_id, ip_address in logins:
+        if user_id in features and features[user_id]["last_ip"] is None:
+            features[user_id]["last_ip"] = ip_address
+    return features
+
+
+def _load_ip_features(ips) -> Dict[str, dict]:
+    from accounts.models_security import LoginHistory
+
+    rows = (
+        LoginHistory.objects.filter(ip_address__in=ips, success=True, created_at__gte=_ip_since())
+        .order_by()
+        .values_list("ip_address", "user_id", "user__date_joined")
+        .distinct()
+    )
+    accounts = defaultdict(set)
+    joins = defaultdict(list)
+    for ip_address, user_id, date_joined in rows:
+        if user_id is None or user_id in accounts[ip_address]:
+            continue
+        accounts[ip_address].add(user_id)
+        joins[ip_address].append(date_joined.timestamp())
+    return {
+        ip_address: {
+            "accounts": len(accounts[ip_address]),
+            "joins": sorted(joins[ip_address])[-MAX_IP_JOINS:],
+        }
+        for ip_address in ips
+    }
+
+
+def _cached_features(prefix: str, keys, loader) -> dict:
+    keys = set(keys)
+    if not keys:
+        return {}
+    cached = cache.get_many([f"{prefix}:{key}" for key in keys])
+    result = {key: cached[f"{prefix}:{key}"] for key in keys if f"{prefix}:{key}" in cached}
+    missing = keys - set(result)
+    if missing:
+        loaded = loader(missing)
+        cache.set_many(
+            {f"{prefix}:{key}": value for key, value in loaded.items()}, timeout=_feature_ttl()
+        )
+        result.update(loaded)
+    return result
+
+
+def get_user_features(user_ids) -> Dict[int, dict]:
+    return _cached_features(USER_FEATURES_PREFIX, user_ids, _load_user_features)
+
+
+def get_ip_features(ips) -> Dict[str, dict]:
+    return _cached_features(IP_FEATURES_PREFIX, ips, _load_ip_features)
+
+
+# ---------------------------------------------------------------------------
+# Оценка
+# ---------------------------------------------------------------------------
+
+
+def _medians(events) -> dict:
+    from listings import market_index
+
+    pairs = {
+        (event.game_id, event.category_id)
+        for event in events
+        if event.kind in PRICED_KINDS and event.game_id is not None
+    }
+    if not pairs:
+        return {}
+    stats = market_index.get_stats(pairs | {(game_id, None) for game_id, _ in pairs})
+    min_sample = getattr(settings, "MARKET_INDEX_MIN_SAMPLE", 5)
+    medians = {}
+    for game_id, category_id in pairs:
+        stat = stats.get((game_id, category_id)) if category_id else None
+        if not stat or stat["sample_size"] < min_sample:
+            stat = stats.get((game_id, None))
+        if stat and stat["p50"] > 0:
+            medians[(game_id, category_id)] = stat["p50"]
+    return medians
+
+
+def evaluate(events: Iterable[FraudEvent], ruleset: Optional[RuleSet] = None) -> List[FraudVerdict]:
+    """Оценить пачку событий: признаки и медианы грузятся один раз на пачку."""
+    events = list(events)
+    ruleset = ruleset or get_ruleset()
+    if not ruleset.size or not events:
+        return [FraudVerdict(event) for event in events]
+
+    users = get_user_features({event.user_id for event in events})
+    ips = {}
+    if ruleset.needs_ip:
+        wanted = {event.ip or users.get(event.user_id, {}).get("last_ip") for event in events} - {
+            None
+        }
+        ips = get_ip_features(wanted)
+    medians = _medians(events) if ruleset.price else {}
+
+    verdicts = []
+    for event in events:
+        user = users.get(event.user_id, {})
+        ip = ips.get(event.ip or user.get("last_ip"))
+        median = medians.get((event.game_id, event.category_id))
+        verdicts.append(ruleset.evaluate(event, user, ip, median))
+    return verdicts
+
+
+def record(verdicts: Iterable[FraudVerdict]) -> int:
+    """Записать сработавшие вердикты в SecurityAuditLog."""
+    from accounts.models import CustomUser
+    from core.models import SecurityAuditLog
+
+    flagged = [verdict for verdict in verdicts if verdict.hits]
+    if not flagged:
+        return 0
+    users = CustomUser.objects.in_bulk({verdict.event.user_id for verdict in flagged})
+    for verdict in flagged:
+        SecurityAuditLog.log(
+            action_type="suspicious_activity",
+            user=users.get(verdict.event.user_id),
+            description=f"Антифрод: {verdict.event.kind} — {', '.join(map(str, verdict.hits))}",
+            risk_level=RISK_LEVELS[verdict.action],
+            metadata={
+                "event": verdict.event.as_dict(),
+                "rule_ids": [rule.id for rule in verdict.hits],
+                "risk_score": verdict.risk_score,
+                "action": verdict.action,
+            },
+        )
+    return len(flagged)
+
+
+def publish(event: FraudEvent) -> None:
+    """Отправить событие в Celery-пайплайн после коммита транзакции."""
+    publish_many([event])
+
+
+def publish_many(events: Iterable[FraudEvent]) -> None:
+    """Несколько событий одной задачей (массовые операции)."""
+    if not getattr(settings, "FRAUD_RULES_ENABLED", True):
+        return
+    payload = [event.as_dict() for event in events]
+    if not payload:
+        return
+
+    def _send():
+        from core.tasks import evaluate_fraud_events
+
+        try:
+            evaluate_fraud_events.delay(payload)
+        except Exception:  # брокер недоступен — событие теряется, сделка нет
+            logger.exception("fraud event publish failed: %s", payload)
+
+    transaction.on_commit(_send)
+
+
+# ---------------------------------------------------------------------------
+# Бэктест
+# ---------------------------------------------------------------------------
+
+
+def backtest(
+    *, since: Optional[datetime] = None, batch_size: int = 500, limit: Optional[int] = None
+) -> dict:
+    """Прогнать активные правила по истории PurchaseRequest.
+
+    Признаки берутся текущие (на момент запуска), а не на дату сделки.
+    """
+    from django.db.models import Exists, OuterRef
+
+    from payments.models_disputes import Dispute
+    from transactions.models import PurchaseRequest
+
+    ruleset = get_ruleset()
+    queryset = (
+        PurchaseRequest.objects.annotate(
+            disputed=Exists(Dispute.objects.filter(escrow__purchase_request=OuterRef("pk")))
+        )
+        .order_by("pk")
+        .values_list(
+            "pk", "buyer_id", "amount", "listing__game_id", "listing__category_id", "disputed"
+        )
+    )
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if limit:
+        queryset = queryset[:limit]
+
+    report = {
+        "rules": ruleset.size,
+        "events": 0,
+        "flagged": 0,
+        "disputed": 0,
+        "flagged_disputed": 0,
+        "by_rule": Counter(),
+        "by_action": Counter(),
+    }
+    started = time.perf_counter()
+    batch = []
+
+    def _flush():
+        events = [
+            FraudEvent(
+                "purchase_request",
+                buyer_id,
+                object_id=pk,
+                amount=amount,
+                game_id=game_id,
+                category_id=category_id,
+            )
+            for pk, buyer_id, amount, game_id, category_id, _ in batch
+        ]
+        for verdict, row in zip(evaluate(events, ruleset), batch):
+            report["events"] += 1
+            report["disputed"] += row[-1]
+            if verdict.hits:
+                report["flagged"] += 1
+                report["flagged_disputed"] += row[-1]
+                report["by_action"][verdict.action] += 1
+                report["by_rule"].update(str(rule) for rule in verdict.hits)
+        batch.clear()
+
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+
+    elapsed = time.perf_counter() - started
+    report["seconds"] = elapsed
+    report["events_per_second"] = report["events"] / elapsed if elapsed else 0.0
+    report["dispute_rate_flagged"] = (
+        report["flagged_disputed"] / report["flagged"] if report["flagged"] else 0.0
+    )
+    report["dispute_rate_overall"] = (
+        report["disputed"] / report["events"] if report["events"] else 0.0
+    )
+    return report
+
+
+def reset_local() -> None:
+    """Сбросить скомпилированный набор процесса (тесты)."""
+    _local["ruleset"] = None
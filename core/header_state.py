@@ -0,0 +1,223 @@
+"""
+Состояние шапки сайта на пользователя: баланс кошелька + непрочитанные.
+
+Раньше каждый рендер страницы для авторизованного пользователя делал
+Wallet.objects.get_or_create (запрос, а на первом заходе — INSERT с гонкой)
+и отдельно кэшированный COUNT уведомлений.
+
+Теперь оба значения лежат в одном Redis hash `header_state:{user_id}`:
+    wallet_balance        — Wallet.balance (0, если кошелька ещё нет);
+    unread_notifications  — число непрочитанных уведомлений.
+
+Чтение — один HGETALL; недостающие поля досчитываются из БД (только
+чтение, без создания кошелька) и дописываются в hash с TTL
+HEADER_STATE_TTL. Запись в леджер/уведомления удаляет своё поле
+(core/signals.py, NotificationService.bulk_notify, mark_all_as_read,
+массовые bulk_update кошельков) — после коммита транзакции.
+
+Без Redis (dev, тесты) hash заменяется словарём под одним ключом кэша.
+
+Для async-вью — aget_header_state(): тот же hash через redis.asyncio
+(core/async_cache.py) и async ORM для недостающих полей.
+
+В контекст шаблона значения попадают лениво (LazyHeaderState): страница,
+которая не выводит шапку, в кэш и БД не ходит.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+WALLET_BALANCE = "wallet_balance"
+UNREAD_NOTIFICATIONS = "unread_notifications"
+FIELDS = (WALLET_BALANCE, UNREAD_NOTIFICATIONS)
+
+KEY_PREFIX = "header_state"
+
+
+def _key(user_id) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _ttl() -> int:
+    return getattr(settings, "HEADER_STATE_TTL", 300)
+
+
+def _decode(field: str, value):
+    if isinstance(value, bytes):
+        value = value.decode()
+    return Decimal(value) if field == WALLET_BALANCE else int(value)
+
+
+class RedisStore:
+    """Поля в настоящем Redis hash (HGETALL / HSET / HDEL)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, user_id) -> Dict[str, object]:
+        raw = self.client.hgetall(cache.make_key(_key(user_id)))
+        return {field.decode(): value for field, value in raw.items()}
+
+    def write(self, user_id, values: Dict[str, object]) -> None:
+        key = cache.make_key(_key(user_id))
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={field: str(value) for field, value in values.items()})
+        pipe.expire(key, _ttl())
+        pipe.execute()
+
+    def forget(self, user_ids: Iterable, fields: Iterable[str]) -> None:
+        fields = list(fields)
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            pipe.hdel(cache.make_key(_key(user_id)), *fields)
+        pipe.execute()
+
+
+class AsyncRedisStore:
+    """RedisStore на клиенте redis.asyncio (только чтение и дозапись)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def aread(self, user_id) -> Dict[str, object]:
+        raw = await self.client.hgetall(cache.make_key(_key(user_id)))
+        return {field.decode(): value for field, value in raw.items()}
+
+    async def awrite(self, user_id, values: Dict[str, object]) -> None:
+        key = cache.make_key(_key(user_id))
+        async with self.client.pipeline() as pipe:
+            pipe.hset(key, mapping={field: str(value) for field, value in values.items()})
+            pipe.expire(key, _ttl())
+            await pipe.execute()
+
+
+class CacheStore:
+    """Словарь под одним ключом Django cache (LocMem и прочие бэкенды)."""
+
+    def read(self, user_id) -> Dict[str, object]:
+        return cache.get(_key(user_id)) or {}
+
+    def write(self, user_id, values: Dict[str, object]) -> None:
+        cache.set(_key(user_id), {**self.read(user_id), **values}, _ttl())
+
+    async def aread(self, user_id) -> Dict[str, object]:
+        return await cache.aget(_key(user_id)) or {}
+
+    async def awrite(self, user_id, values: Dict[str, object]) -> None:
+        await cache.aset(_key(user_id), {**await self.aread(user_id), **values}, _ttl())
+
+    def forget(self, user_ids: Iterable, fields: Iterable[str]) -> None:
+        cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def get_store():
+    if getattr(settings, "USE_REDIS", False):
+        from django_redis import get_redis_connection
+
+        return RedisStore(get_redis_connection("default"))
+    return CacheStore()
+
+
+def get_async_store():
+    from core import async_cache
+
+    client = async_cache.get_client()
+    return AsyncRedisStore(client) if client is not None else CacheStore()
+
+
+def _load_wallet_balance(user_id) -> Decimal:
+    from payments.models import Wallet
+
+    balance = Wallet.objects.filter(user_id=user_id).values_list("balance", flat=True).first()
+    return balance if balance is not None else Decimal("0")
+
+
+def _load_unread_notifications(user_id) -> int:
+    from core.models import Notification
+
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+async def _aload_wallet_balance(user_id) -> Decimal:
+    from payments.models import Wallet
+
+    balance = (
+        await Wallet.objects.filter(user_id=user_id).values_list("balance", flat=True).afirst()
+    )
+    return balance if balance is not None else Decimal("0")
+
+
+async def _aload_unread_notifications(user_id) -> int:
+    from core.models import Notification
+
+    return await Notification.objects.filter(user_id=user_id, is_read=False).acount()
+
+
+LOADERS = {
+    WALLET_BALANCE: _load_wallet_balance,
+    UNREAD_NOTIFICATIONS: _load_unread_notifications,
+}
+ALOADERS = {
+    WALLET_BALANCE: _aload_wallet_balance,
+    UNREAD_NOTIFICATIONS: _aload_unread_notifications,
+}
+
+
+def get_header_state(user_id) -> Dict[str, object]:
+    """Все поля шапки: из hash, недостающие — из БД с дозаписью в hash."""
+    store = get_store()
+    cached = store.read(user_id)
+    state = {field: _decode(field, value) for field, value in cached.items() if field in LOADERS}
+    missing = {field: LOADERS[field](user_id) for field in FIELDS if field not in state}
+    if missing:
+        store.write(user_id, missing)
+        state.update(missing)
+    return state
+
+
+async def aget_header_state(user_id, fields: Iterable[str] = FIELDS) -> Dict[str, object]:
+    """get_header_state для async-вью; fields — какие поля досчитывать при промахе."""
+    store = get_async_store()
+    cached = await store.aread(user_id)
+    state = {field: _decode(field, value) for field, value in cached.items() if field in ALOADERS}
+    missing = {field: await ALOADERS[field](user_id) for field in fields if field not in state}
+    if missing:
+        await store.awrite(user_id, missing)
+        state.update(missing)
+    return state
+
+
+def invalidate(user_ids: Iterable, fields: Iterable[str] = FIELDS) -> None:
+    """Удалить поля у пользователей после коммита текущей транзакции."""
+    user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+    if not user_ids:
+        return
+    fields = tuple(fields)
+    transaction.on_commit(lambda: get_store().forget(user_ids, fields))
+
+
+def invalidate_wallet(user_ids: Iterable) -> None:
+    invalidate(user_ids, (WALLET_BALANCE,))
+
+
+def invalidate_notifications(user_ids: Iterable) -> None:
+    invalidate(user_ids, (UNREAD_NOTIFICATIONS,))
+
+
+class LazyHeaderState:
+    """Загружает состояние шапки при первом обращении к любому полю."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._state: Optional[Dict[str, object]] = None
+
+    def __getitem__(self, field: str):
+        if self._state is None:
+            self._state = get_header_state(self.user_id)
+        return self._state[field]
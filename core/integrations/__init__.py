@@ -6,6 +6,7 @@
 - sms_service   — SMS через SMS.ru
 - telegram_bot  — нотификации в Telegram
 - push_notifications — Web Push (VAPID)
+- http          — общие HTTP-сессии с пулом соединений
 
 Все эти модули — без БД-моделей. Если нужно добавить интеграцию
 (например, S3, Stripe, OAuth), её место — здесь.
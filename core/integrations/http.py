@@ -0,0 +1,26 @@
+"""
+Общие HTTP-сессии для интеграций.
+
+Одна requests.Session на сервис в процессе воркера: TCP/TLS-соединения
+переиспользуются между сообщениями пачки и между задачами, вместо
+нового рукопожатия на каждый запрос к Telegram Bot API / push-серверу.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 20
+
+_sessions = {}
+
+
+def pooled_session(name: str) -> requests.Session:
+    """Сессия с пулом соединений, общая для всех вызовов с этим name."""
+    session = _sessions.get(name)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions[name] = session
+    return session
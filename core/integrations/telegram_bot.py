@@ -12,12 +12,15 @@ from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
+import requests
 from celery import shared_task
 from telegram import Bot
 from telegram.error import TelegramError
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_URL = "https://api.telegram.org"
+
 
 def _get_bot():
     """
@@ -74,6 +77,57 @@ def send_telegram_async(self, chat_id, text, parse_mode="HTML"):
         logger.exception(f"Unexpected error sending Telegram to {chat_id}: {e}")
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def send_telegram_batch(self, messages, parse_mode="HTML"):
+    """
+    Отправка пачки Telegram-сообщений через Bot API одной HTTP-сессией.
+
+    Args:
+        messages: Список пар [chat_id, text].
+        parse_mode: HTML или Markdown.
+
+    Поведение:
+        - Без токена — тихо выходит.
+        - 429/5xx и сетевые ошибки — retry задачи только с неотправленными
+          сообщениями; прочие 4xx (бот заблокирован, чат удалён) — пропуск.
+
+    Returns:
+        int: Сколько сообщений отправлено.
+    """
+    token = getattr(settings, "TELEGRAM_BOT_TOKEN", "")
+    if not token or not messages:
+        return 0
+
+    from .http import pooled_session
+
+    session = pooled_session("telegram")
+    url = f"{TELEGRAM_API_URL}/bot{token}/sendMessage"
+    sent = 0
+    failed = []
+    for chat_id, text in messages:
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+        try:
+            response = session.post(url, json=payload, timeout=10)
+        except requests.RequestException as e:
+            logger.warning(f"Failed to send Telegram message to {chat_id}: {e}")
+            failed.append([chat_id, text])
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            failed.append([chat_id, text])
+        elif response.status_code >= 400:
+            logger.warning(f"Telegram rejected message to {chat_id}: {response.status_code}")
+        else:
+            sent += 1
+
+    logger.info(f"Telegram batch: sent={sent} failed={len(failed)}")
+    if failed:
+        try:
+            raise self.retry(args=[failed, parse_mode])
+        except self.MaxRetriesExceededError:
+            logger.error(f"Max retries exceeded sending Telegram batch ({len(failed)} messages)")
+    return sent
+
+
 def _enqueue_telegram(chat_id, text, parse_mode="HTML"):
     """
     Внутренний хелпер: ставит отправку в Celery, корректно работая внутри
@@ -0,0 +1,159 @@
+"""
+Счётчики неудачных входов со скользящим окном (Redis через Django cache).
+
+BruteForceProtectionMiddleware раньше на каждый заход на страницу входа
+делал COUNT по SecurityAuditLog (IP + время). Во время атаки таблица
+растёт, и проверка дорожает ровно тогда, когда нужна больше всего.
+
+Здесь — приближённое скользящее окно на двух фиксированных корзинах:
+
+    count ≈ current + previous * (1 - elapsed / window)
+
+где current/previous — счётчики текущей и предыдущей корзины длиной
+window. На каждое измерение (IP, имя пользователя, подсеть) — два ключа
+в кэше. Проверка — один get_many (MGET в Redis) на все измерения, запись
+неудачи — add + incr на ключ. Стоимость не зависит от интенсивности атаки
+и объёма audit log'а; SecurityAuditLog остаётся только журналом для
+расследований.
+
+Измерения и лимиты — settings.LOGIN_THROTTLE:
+    ip        — один адрес;
+    subnet    — /24 для IPv4, /64 для IPv6 (ротация адресов внутри сети);
+    username  — нормализованный логин (распределённый перебор пароля).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_THROTTLE = {
+    "window": 1800,
+    "limits": {"ip": 10, "subnet": 50, "username": 20},
+}
+
+KEY_PREFIX = "login_fail"
+
+
+def get_config() -> dict:
+    config = getattr(settings, "LOGIN_THROTTLE", None) or {}
+    return {
+        "window": config.get("window", DEFAULT_THROTTLE["window"]),
+        "limits": {**DEFAULT_THROTTLE["limits"], **config.get("limits", {})},
+    }
+
+
+def subnet_of(ip: str) -> Optional[str]:
+    """Сеть адреса: /24 для IPv4, /64 для IPv6. None — невалидный IP."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except (TypeError, ValueError):
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def normalize_username(username: str) -> str:
+    return (username or "").strip().lower()
+
+
+def dimensions(*, ip: str = "", username: str = "") -> Dict[str, str]:
+    """Значения измерений для запроса (пустые пропускаются)."""
+    values = {}
+    if ip:
+        values["ip"] = ip
+        subnet = subnet_of(ip)
+        if subnet:
+            values["subnet"] = subnet
+    username = normalize_username(username)
+    if username:
+        values["username"] = username
+    return values
+
+
+def _bucket_keys(dimension: str, value: str, bucket: int) -> Tuple[str, str]:
+    digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:20]
+    base = f"{KEY_PREFIX}:{dimension}:{digest}"
+    return f"{base}:{bucket}", f"{base}:{bucket - 1}"
+
+
+def record_failure(*, ip: str = "", username: str = "", now: Optional[float] = None) -> None:
+    """Учесть неудачную попытку входа во всех измерениях."""
+    window = get_config()["window"]
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    for dimension, value in dimensions(ip=ip, username=username).items():
+        current_key, _ = _bucket_keys(dimension, value, bucket)
+        # add не перезаписывает существующий счётчик; TTL = две корзины,
+        # чтобы текущая дожила до роли «предыдущей».
+        cache.add(current_key, 0, timeout=window * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            # Ключ истёк между add и incr — начинаем корзину заново.
+            cache.set(current_key, 1, timeout=window * 2)
+
+
+def failure_counts(
+    *, ip: str = "", username: str = "", now: Optional[float] = None
+) -> Dict[str, float]:
+    """Оценка числа неудач за скользящее окно по каждому измерению.
+
+    Один get_many на все измерения.
+    """
+    window = get_config()["window"]
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    weight = 1 - (now % window) / window
+
+    keys = {
+        dimension: _bucket_keys(dimension, value, bucket)
+        for dimension, value in dimensions(ip=ip, username=username).items()
+    }
+    if not keys:
+        return {}
+    stored = cache.get_many([key for pair in keys.values() for key in pair])
+    return {
+        dimension: stored.get(current, 0) + stored.get(previous, 0) * weight
+        for dimension, (current, previous) in keys.items()
+    }
+
+
+def exceeded(
+    *, ip: str = "", username: str = "", now: Optional[float] = None
+) -> Optional[Tuple[str, float]]:
+    """Первое измерение, превысившее лимит: (dimension, count) или None."""
+    limits = get_config()["limits"]
+    counts = failure_counts(ip=ip, username=username, now=now)
+    for dimension, count in counts.items():
+        limit = limits.get(dimension)
+        if limit and count >= limit:
+            return dimension, count
+    return None
+
+
+def reset(*, username: str, now: Optional[float] = None) -> None:
+    """Сбросить счётчик логина (после успешного входа).
+
+    Счётчики IP/подсети не сбрасываются: иначе атакующий с одной валидной
+    учётной записью обнулял бы лимит своего адреса.
+    """
+    username = normalize_username(username)
+    if not username:
+        return
+    window = get_config()["window"]
+    now = time.time() if now is None else now
+    cache.delete_many(_bucket_keys("username", username, int(now // window)))
+
+
+def should_audit_block(dimension: str, value: str) -> bool:
+    """True один раз за окно на заблокированное значение — чтобы волна
+    заблокированных запросов не порождала запись в audit log на каждый."""
+    window = get_config()["window"]
+    digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:20]
+    return cache.add(f"{KEY_PREFIX}:blocked:{dimension}:{digest}", 1, timeout=window)
@@ -0,0 +1,50 @@
+"""
+Бэктест правил антифрода (AntiFraudRule) по истории запросов на покупку.
+
+Каждый PurchaseRequest превращается в событие purchase_request покупателя
+и прогоняется через core.fraud_rules пачками. В отчёте: сколько событий
+помечено, срабатывания по правилам и действиям, доля сделок со спором
+среди помеченных и в целом, пропускная способность.
+
+Признаки пользователей берутся текущие, а не на дату сделки.
+
+Примеры:
+    python manage.py backtest_fraud_rules
+    python manage.py backtest_fraud_rules --days 30 --batch-size 1000
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import fraud_rules
+
+
+class Command(BaseCommand):
+    help = "Прогнать правила антифрода по истории PurchaseRequest"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Глубина истории в днях (0 — вся)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Событий в пачке")
+        parser.add_argument("--limit", type=int, default=None, help="Не больше N сделок")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"]) if options["days"] else None
+        report = fraud_rules.backtest(
+            since=since, batch_size=options["batch_size"], limit=options["limit"]
+        )
+
+        self.stdout.write(f"Правил активно: {report['rules']}")
+        self.stdout.write(
+            f"Событий: {report['events']}, помечено: {report['flagged']} "
+            f"за {report['seconds']:.2f} с ({report['events_per_second']:.0f} событий/с)"
+        )
+        self.stdout.write(
+            f"Доля споров: среди помеченных {report['dispute_rate_flagged']:.1%}, "
+            f"в целом {report['dispute_rate_overall']:.1%}"
+        )
+        for action, count in report["by_action"].most_common():
+            self.stdout.write(f"  действие {action}: {count}")
+        for rule, count in report["by_rule"].most_common():
+            self.stdout.write(f"  {rule}: {count}")
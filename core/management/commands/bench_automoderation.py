@@ -0,0 +1,132 @@
+"""
+Бенчмарк AutoModerator: один проход объединённым regex против трёх regex.
+
+Корпус — объявления реального размера: заголовок + описание на
+несколько сотен символов, в части из них спрятаны нарушения. С --from-db
+берутся настоящие листинги (title + description).
+
+Сравниваются:
+    legacy — прежняя схема: три IGNORECASE alternation-regex (мат, спам,
+             скам) последовательно по тексту, search + findall + findall;
+    single — core.automoderation: нормализация + один finditer по regex-trie.
+
+Примеры:
+    python manage.py bench_automoderation
+    python manage.py bench_automoderation --texts 20000
+    python manage.py bench_automoderation --from-db --texts 5000
+"""
+
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.automoderation import AutoModerator
+
+WORDS = (
+    "аккаунт прокачанный персонаж уровень скины редкие предметы гарантия быстрая "
+    "передача данных почта привязка steam epic игра сервер европа донат валюта "
+    "золото броня оружие легендарное рейтинг ранг сезон пропуск коллекция "
+    "продаю обмен торг уместен отвечу быстро отзывы смотрите профиль"
+).split()
+
+VIOLATIONS = (
+    "пиши в telegram: seller_shop",
+    "предоплата обязательна",
+    "звони 89001234567",
+    "х у й",
+    "это не кидала нет",
+    "https://bit.ly/promo",
+)
+
+
+# Прежние паттерны AutoModerator (до объединения в regex-trie).
+LEGACY_PROFANITY = [
+    r"\b(хуй|пизд|ебл|бля|сук|муда|пидор|гандон)\w*",
+    r"\b(fuck|shit|bitch|ass)\w*",
+]
+LEGACY_SPAM = [
+    r"(купи|продам|заработок|доход)\s+(здесь|тут|сейчас)",
+    r"(telegram|whatsapp|viber)\s*[@:]\s*[\w\d]+",
+    r"https?://(bit\.ly|goo\.gl|tinyurl|vk\.cc)",
+    r"(\d{10,})",
+]
+LEGACY_SCAM = [
+    r"(гарант|гарантия)\s+(100%|обязательно)",
+    r"(обман|мошенник|кидала)\s+(не|нет)",
+    r"предоплата\s+обязательна",
+    r"(яндекс|киви|карта)\s+\d{10,}",
+]
+
+
+def _legacy_check(profanity, spam, scam, text):
+    # Как прежний check_text: все три regex по каждому тексту.
+    found = bool(profanity.search(text))
+    found = bool(spam.findall(text)) or found
+    return bool(scam.findall(text)) or found
+
+
+def synthetic_corpus(count, seed=42):
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        title = " ".join(rnd.choices(WORDS, k=rnd.randint(4, 9)))
+        description = " ".join(rnd.choices(WORDS, k=rnd.randint(60, 140)))
+        if rnd.random() < 0.05:
+            description += " " + rnd.choice(VIOLATIONS)
+        corpus.append(f"{title} {description}")
+    return corpus
+
+
+class Command(BaseCommand):
+    help = "Сравнение скорости AutoModerator: один проход против трёх regex"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--texts", type=int, default=5000, help="Размер корпуса")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Корпус из реальных листингов (title + description)",
+        )
+
+    def handle(self, *args, **options):
+        corpus = self._corpus(options["texts"], options["from_db"])
+        if not corpus:
+            self.stdout.write("Корпус пуст")
+            return
+        size_mb = sum(len(text.encode("utf-8")) for text in corpus) / 1024 / 1024
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{len(corpus)} текстов, {size_mb:.1f} МБ"))
+
+        moderator = AutoModerator()
+        flags = re.IGNORECASE
+        legacy = (
+            re.compile("|".join(LEGACY_PROFANITY), flags),
+            re.compile("|".join(LEGACY_SPAM), flags),
+            re.compile("|".join(LEGACY_SCAM), flags),
+        )
+
+        runs = {
+            "legacy": lambda: [_legacy_check(*legacy, text) for text in corpus],
+            "single": lambda: [not result["is_clean"] for result in moderator.check_texts(corpus)],
+        }
+        self.stdout.write(f"{'схема':<8} {'сек':>8} {'текстов/с':>12} {'МБ/с':>8} {'помечено':>9}")
+        for name, run in runs.items():
+            started = time.perf_counter()
+            flagged = sum(run())
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name:<8} {elapsed:>8.3f} {len(corpus) / elapsed:>12.0f} "
+                f"{size_mb / elapsed:>8.1f} {flagged:>9}"
+            )
+
+    @staticmethod
+    def _corpus(count, from_db):
+        if not from_db:
+            return synthetic_corpus(count)
+        from listings.models import Listing
+
+        return [
+            f"{title} {description}"
+            for title, description in Listing.objects.values_list("title", "description")[:count]
+        ]
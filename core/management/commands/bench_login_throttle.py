@@ -0,0 +1,140 @@
+"""
+Бенчмарк проверки BruteForceProtectionMiddleware под атакой.
+
+Моделирует волну неудачных входов с адресов одной /24 подсети
+(198.18.0.0/15 — диапазон для бенчмарков, RFC 2544) и после каждой
+ступени измеряет задержку проверки:
+    throttle — core.login_throttle.exceeded (get_many по счётчикам в кэше);
+    legacy   — прежний COUNT по SecurityAuditLog за окно (--legacy,
+               вставляет строки login_failed в audit log).
+
+Ожидаемый результат: задержка throttle не зависит от числа неудач,
+задержка legacy растёт вместе с таблицей.
+
+Примеры:
+    python manage.py bench_login_throttle
+    python manage.py bench_login_throttle --steps 1000 10000 100000 --legacy
+
+Созданные ключи кэша и строки audit log удаляются по завершении.
+"""
+
+import random
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from core import login_throttle
+from core.models_audit import SecurityAuditLog
+
+BENCH_DESCRIPTION = "bench_login_throttle"
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = "Задержка проверки брутфорс-лимита в зависимости от интенсивности атаки"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--steps",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000],
+            help="Накопленное число неудач, после которого делается замер",
+        )
+        parser.add_argument(
+            "--checks", type=int, default=500, help="Проверок на замер (по умолчанию 500)"
+        )
+        parser.add_argument(
+            "--legacy",
+            action="store_true",
+            help="Также замерить прежний COUNT по SecurityAuditLog",
+        )
+
+    def handle(self, *args, **options):
+        subnet = f"198.{random.randint(18, 19)}.{random.randint(0, 255)}"
+        ips = [f"{subnet}.{host}" for host in range(1, 255)]
+        usernames = [f"bench_victim_{i}" for i in range(50)]
+        window_minutes = login_throttle.get_config()["window"] // 60
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"Атака с {subnet}.0/24, cache: {cache.__class__.__name__}")
+        )
+        header = f"{'неудач':>10} {'throttle p50':>14} {'p99':>10}"
+        if options["legacy"]:
+            header += f" {'legacy p50':>12} {'p99':>10}"
+        self.stdout.write(header)
+
+        recorded = 0
+        try:
+            for step in sorted(options["steps"]):
+                audit_rows = []
+                while recorded < step:
+                    ip = random.choice(ips)
+                    username = random.choice(usernames)
+                    login_throttle.record_failure(ip=ip, username=username)
+                    if options["legacy"]:
+                        audit_rows.append(
+                            SecurityAuditLog(
+                                action_type="login_failed",
+                                description=BENCH_DESCRIPTION,
+                                ip_address=ip,
+                            )
+                        )
+                    recorded += 1
+                if audit_rows:
+                    SecurityAuditLog.objects.bulk_create(audit_rows, batch_size=1000)
+
+                throttle = self._measure(
+                    options["checks"],
+                    lambda ip: login_throttle.exceeded(ip=ip, username=random.choice(usernames)),
+                    ips,
+                )
+                line = (
+                    f"{recorded:>10} {statistics.median(throttle):>12.3f}ms "
+                    f"{_percentile(throttle, 99):>8.3f}ms"
+                )
+                if options["legacy"]:
+                    legacy = self._measure(
+                        options["checks"],
+                        lambda ip: SecurityAuditLog.get_failed_login_attempts(
+                            ip_address=ip, minutes=window_minutes
+                        ),
+                        ips,
+                    )
+                    line += (
+                        f" {statistics.median(legacy):>10.3f}ms "
+                        f"{_percentile(legacy, 99):>8.3f}ms"
+                    )
+                self.stdout.write(line)
+        finally:
+            self._cleanup(ips, usernames, options["legacy"])
+
+    @staticmethod
+    def _measure(checks, check, ips):
+        timings = []
+        for _ in range(checks):
+            ip = random.choice(ips)
+            started = time.perf_counter()
+            check(ip)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _cleanup(self, ips, usernames, legacy):
+        window = login_throttle.get_config()["window"]
+        bucket = int(time.time() // window)
+        keys = []
+        for ip in ips:
+            for dimension, value in login_throttle.dimensions(ip=ip).items():
+                keys.extend(login_throttle._bucket_keys(dimension, value, bucket))
+        for username in usernames:
+            keys.extend(login_throttle._bucket_keys("username", username, bucket))
+        cache.delete_many(keys)
+        if legacy:
+            deleted, _ = SecurityAuditLog.objects.filter(description=BENCH_DESCRIPTION).delete()
+            self.stdout.write(f"Удалено строк audit log: {deleted}")
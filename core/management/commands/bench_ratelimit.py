@@ -0,0 +1,120 @@
+"""
+Микробенчмарк rate-limit: core.ratelimit против прежних лимитеров.
+
+Сравниваются на текущем кэше (Redis при USE_REDIS, иначе LocMem):
+    gcra      — core.ratelimit.hit (Lua в Redis / get+set в кэше);
+    drf       — штатный SimpleRateThrottle DRF: список timestamp'ов в кэше,
+                стоимость растёт с числом запросов в окне;
+    fixed     — прежний fixed window на cache.incr (middleware, чат);
+    routing   — поиск правила: линейный перебор префиксов против RouteTrie.
+
+Лимит ставится заведомо большим (--limit в час), чтобы все проверки
+проходили и история DRF росла, как у активного клиента.
+
+Примеры:
+    python manage.py bench_ratelimit
+    python manage.py bench_ratelimit --requests 20000 --limit 100000
+"""
+
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from core import ratelimit
+from core.middleware import SimpleRateLimitMiddleware
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _DRFThrottle(SimpleRateThrottle):
+    """Штатное хранилище DRF с фиксированным ключом."""
+
+    def __init__(self, key, rate):
+        self.key_name = key
+        self.rate = rate
+        self.num_requests, self.duration = self.parse_rate(rate)
+
+    def get_cache_key(self, request, view):
+        return self.key_name
+
+
+class Command(BaseCommand):
+    help = "Сравнение стоимости проверки лимита: GCRA vs DRF timestamps vs fixed window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000, help="Проверок на лимитер")
+        parser.add_argument(
+            "--limit", type=int, default=100000, help="Лимит запросов в час (не достигается)"
+        )
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        count = options["requests"]
+        rate = f"{options['limit']}/hour"
+        backend = ratelimit.get_backend()
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{count} проверок, лимит {rate}, backend: {backend.name} "
+                f"({settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]})"
+            )
+        )
+        self.stdout.write(f"{'лимитер':<10} {'p50':>10} {'p99':>10} {'ops/s':>10}")
+
+        drf = _DRFThrottle(f"bench_rl_drf_{run}", rate)
+        fixed_key = f"bench_rl_fixed_{run}"
+
+        def fixed_window():
+            try:
+                cache.incr(fixed_key)
+            except ValueError:
+                cache.set(fixed_key, 1, 3600)
+
+        limiters = {
+            "gcra": lambda: ratelimit.hit("bench", run, rate),
+            "drf": lambda: drf.allow_request(None, None),
+            "fixed": fixed_window,
+        }
+
+        routes = SimpleRateLimitMiddleware.RATE_LIMITS
+        trie = ratelimit.RouteTrie(routes)
+        path = "/notifications/mark-all-read/42/"
+
+        def linear_match():
+            for prefix in routes:
+                if path.startswith(prefix):
+                    return prefix
+            return None
+
+        limiters["route:lin"] = linear_match
+        limiters["route:trie"] = lambda: trie.match(path)
+
+        try:
+            for name, check in limiters.items():
+                self._report(name, self._measure(check, count))
+        finally:
+            cache.delete_many([f"{ratelimit.KEY_PREFIX}:bench:{run}", drf.key_name, fixed_key])
+
+    @staticmethod
+    def _measure(check, count):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            check()
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        return timings
+
+    def _report(self, name, timings):
+        total = sum(timings) / 1_000_000
+        self.stdout.write(
+            f"{name:<10} {statistics.median(timings):>8.1f}µs "
+            f"{_percentile(timings, 99):>8.1f}µs {len(timings) / total:>10.0f}"
+        )
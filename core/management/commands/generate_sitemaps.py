@@ -0,0 +1,27 @@
+"""
+Генерация статических sitemap-файлов (core/sitemap_files.py).
+
+Примеры:
+    python manage.py generate_sitemaps
+    python manage.py generate_sitemaps --full
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import sitemap_files
+
+
+class Command(BaseCommand):
+    help = "Сгенерировать sitemap-индекс и gzip-части в storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Перегенерировать все части")
+
+    def handle(self, *args, **options):
+        result = sitemap_files.generate(full=options["full"])
+        self.stdout.write(
+            f"Записано частей: {len(result['written'])}, без изменений: {result['kept']}, "
+            f"удалено: {len(result['removed'])}"
+        )
+        for name in result["written"]:
+            self.stdout.write(f"  {name}")
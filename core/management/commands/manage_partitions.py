@@ -0,0 +1,112 @@
+"""
+Обслуживание помесячных партиций (PostgreSQL).
+
+Примеры:
+    python manage.py manage_partitions                         # статус + партиции на 3 мес. вперёд
+    python manage.py manage_partitions --months-ahead 6
+    python manage.py manage_partitions --table core_securityauditlog --drop-before-days 90
+    python manage.py manage_partitions --table payments_transaction \\
+        --detach-before-days 730                                # отсоединить для архива
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import partitioning
+
+
+class Command(BaseCommand):
+    help = "Создаёт будущие партиции и удаляет/отсоединяет истёкшие (PostgreSQL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="tables",
+            help="Таблица из PARTITIONED_TABLES (можно несколько раз). По умолчанию — все.",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "PARTITION_PREMAKE_MONTHS", 3),
+            help="На сколько месяцев вперёд создавать партиции",
+        )
+        retention = parser.add_mutually_exclusive_group()
+        retention.add_argument(
+            "--drop-before-days",
+            type=int,
+            help="Удалить партиции, целиком старше N дней",
+        )
+        retention.add_argument(
+            "--detach-before-days",
+            type=int,
+            help="Только отсоединить партиции старше N дней (для архивации)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Показать, что будет сделано, ничего не меняя",
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported():
+            self.stdout.write(
+                self.style.WARNING("Партиционирование поддерживается только на PostgreSQL")
+            )
+            return
+
+        configured = partitioning.get_partitioned_tables()
+        tables = options["tables"] or list(configured)
+        unknown = [t for t in tables if t not in configured]
+        if unknown:
+            raise CommandError(f"Таблицы не в PARTITIONED_TABLES: {', '.join(unknown)}")
+
+        days = options["drop_before_days"] or options["detach_before_days"]
+        detach_only = options["detach_before_days"] is not None
+        threshold = timezone.now() - timedelta(days=days) if days else None
+
+        for table in tables:
+            if not partitioning.is_partitioned(table):
+                self.stdout.write(self.style.WARNING(f"{table}: не партиционирована"))
+                continue
+
+            if options["dry_run"]:
+                self._print_plan(table, options["months_ahead"], threshold)
+                continue
+
+            created = partitioning.ensure_partitions(table, months_ahead=options["months_ahead"])
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f"  Создана партиция: {name}"))
+
+            if threshold is not None:
+                removed = partitioning.drop_partitions_before(
+                    table, threshold, detach_only=detach_only
+                )
+                verb = "Отсоединена" if detach_only else "Удалена"
+                for name in removed:
+                    self.stdout.write(self.style.SUCCESS(f"  {verb} партиция: {name}"))
+
+            partitions = partitioning.list_partitions(table)
+            self.stdout.write(
+                f"{table}: партиций {len(partitions)}"
+                + (
+                    f" ({partitions[0].start:%Y-%m} … {partitions[-1].start:%Y-%m})"
+                    if partitions
+                    else ""
+                )
+            )
+
+    def _print_plan(self, table, months_ahead, threshold):
+        existing = {p.name for p in partitioning.list_partitions(table)}
+        current = partitioning.month_start(timezone.now())
+        for offset in range(months_ahead + 1):
+            partition = partitioning.partition_for(table, partitioning.add_months(current, offset))
+            if partition.name not in existing:
+                self.stdout.write(f"  [dry-run] создать {partition.name}")
+        if threshold is not None:
+            for partition in partitioning.list_partitions(table):
+                if partition.end <= threshold.date():
+                    self.stdout.write(f"  [dry-run] убрать {partition.name}")
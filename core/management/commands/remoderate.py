@@ -0,0 +1,48 @@
+"""
+Перепроверка объявлений или сообщений текущими правилами AutoModerator.
+
+Прогресс хранится в RemoderationJob: прерванный запуск продолжается с
+последнего обработанного pk, завершённый для той же версии правил
+повторно не выполняется (--restart — пройти заново).
+
+Примеры:
+    python manage.py remoderate
+    python manage.py remoderate --content message --workers 4
+    python manage.py remoderate --batch-size 5000 --max-batches 10
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import remoderation
+
+
+class Command(BaseCommand):
+    help = "Перепроверить контент текущими правилами AutoModerator"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--content", choices=("listing", "message"), default="listing", help="Тип контента"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Процессов (по умолчанию CPU)"
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="Строк в порции")
+        parser.add_argument("--max-batches", type=int, default=None, help="Не больше N порций")
+        parser.add_argument("--restart", action="store_true", help="Начать проход заново")
+
+    def handle(self, *args, **options):
+        job = remoderation.run(
+            options["content"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            max_batches=options["max_batches"],
+            restart=options["restart"],
+        )
+        if job is None:
+            self.stdout.write("Перепроверка уже выполняется")
+            return
+        self.stdout.write(
+            f"Версия правил {job.rules_version[:12]}: {job.get_status_display()}, "
+            f"проверено {job.scanned}/{job.total} ({job.progress:.0%}), "
+            f"помечено {job.flagged}, заблокировано {job.blocked}"
+        )
@@ -3,12 +3,15 @@ Middleware для rate limiting и защиты от брутфорса.
 """
 
 import logging
-import time
+import math
 
 from django.conf import settings
-from django.core.cache import cache
 from django.http import HttpResponseForbidden
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from core import ratelimit
+
 # Логгер для безопасности
 security_logger = logging.getLogger("django.security")
 
@@ -17,8 +20,18 @@ class SimpleRateLimitMiddleware:
     """
     Простое middleware для ограничения количества запросов.
     Защита от брутфорса на критичных эндпоинтах.
+
+    Лимиты считает core.ratelimit (GCRA, скользящее окно) по IP; путь
+    сопоставляется с RATE_LIMITS через префиксное дерево, собранное один
+    раз при старте. Лимит общий для всех путей под префиксом.
+
+    Работает и в sync, и в async цепочке: под ASGI запросы вне RATE_LIMITS
+    проходят без перехода в поток, проверка лимита — через sync_to_async.
     """
 
+    sync_capable = True
+    async_capable = True
+
     # Настройки rate limiting
     RATE_LIMITS = {
         # Аутентификация
@@ -36,68 +49,62 @@ class SimpleRateLimitMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.routes = ratelimit.RouteTrie(
+            {prefix: ratelimit.Rate.parse(limits) for prefix, limits in self.RATE_LIMITS.items()}
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Проверяем POST запросы и определенные пути на rate limiting
-        should_check = False
-
-        # Проверяем POST запросы на защищенные эндпоинты
-        if request.method == "POST":
-            for path in self.RATE_LIMITS:
-                if request.path.startswith(path):
-                    should_check = True
-                    break
-
-        if should_check:
-            if not self._check_rate_limit(request):
-                # Логируем подозрительную активность.
-                # request.user может отсутствовать если AuthenticationMiddleware
-                # не выполнился (например, в unit-тестах с голым RequestFactory).
-                ip = self._get_client_ip(request)
-                request_user = getattr(request, "user", None)
-                if request_user is not None and request_user.is_authenticated:
-                    user_repr = request_user
-                else:
-                    user_repr = "Anonymous"
-                security_logger.warning(
-                    f"Rate limit exceeded: {request.path} | User: {user_repr} | IP: {ip}"
-                )
-                return HttpResponseForbidden(
-                    "Слишком много попыток. Пожалуйста, подождите несколько минут."
-                )
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        route = self._route(request)
+        if route is not None:
+            limited = self._limited_response(request, route)
+            if limited is not None:
+                return limited
 
         response = self.get_response(request)
         return response
 
-    def _check_rate_limit(self, request):
-        """Атомарная проверка лимита запросов через cache.incr.
-
-        cache.incr — атомарная операция в Redis, что закрывает race condition
-        (несколько параллельных запросов больше не могут все пройти лимит).
-        """
+    async def __acall__(self, request):
+        route = self._route(request)
+        if route is not None:
+            limited = await sync_to_async(self._limited_response)(request, route)
+            if limited is not None:
+                return limited
+        return await self.get_response(request)
+
+    def _route(self, request):
+        # Проверяем только POST запросы на защищенные эндпоинты
+        return self.routes.match(request.path) if request.method == "POST" else None
+
+    def _limited_response(self, request, route):
+        decision = self._check_rate_limit(request, *route)
+        if decision.allowed:
+            return None
+        # Логируем подозрительную активность.
+        # request.user может отсутствовать если AuthenticationMiddleware
+        # не выполнился (например, в unit-тестах с голым RequestFactory).
         ip = self._get_client_ip(request)
-
-        # Точное соответствие пути → точный лимит. Иначе — startswith.
-        if request.path in self.RATE_LIMITS:
-            max_attempts, time_window = self.RATE_LIMITS[request.path]
+        request_user = getattr(request, "user", None)
+        if request_user is not None and request_user.is_authenticated:
+            user_repr = request_user
         else:
-            for prefix, limits in self.RATE_LIMITS.items():
-                if request.path.startswith(prefix):
-                    max_attempts, time_window = limits
-                    break
-            else:
-                max_attempts, time_window = (10, 60)
-
-        # Используем разные buckets per time-window для fixed-window лимита.
-        cache_key = f"rate_limit:{request.path}:{ip}"
-
-        try:
-            current = cache.incr(cache_key)
-        except ValueError:
-            cache.set(cache_key, 1, time_window)
-            current = 1
+            user_repr = "Anonymous"
+        security_logger.warning(
+            f"Rate limit exceeded: {request.path} | User: {user_repr} | IP: {ip}"
+        )
+        response = HttpResponseForbidden(
+            "Слишком много попыток. Пожалуйста, подождите несколько минут."
+        )
+        response["Retry-After"] = str(math.ceil(decision.retry_after))
+        return response
 
-        return current <= max_attempts
+    def _check_rate_limit(self, request, prefix, rate):
+        """Один атомарный GCRA-шаг (Lua в Redis) для пары префикс + IP."""
+        ip = self._get_client_ip(request)
+        return ratelimit.hit(f"path:{prefix}", ip, rate)
 
     @staticmethod
     def _get_client_ip(request):
@@ -111,12 +118,24 @@ class SecurityHeadersMiddleware:
     Middleware для добавления заголовков безопасности.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._add_headers(self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._add_headers(await self.get_response(request))
 
+    @staticmethod
+    def _add_headers(response):
         # Заголовки безопасности.
         # X-XSS-Protection УДАЛЁН: deprecated в современных браузерах,
         # фактически может включать уязвимости в IE/старом Safari
@@ -4,7 +4,7 @@ Middleware для автоматического аудита безопасно
 
 import logging
 
-from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.signals import user_logged_in, user_login_failed
 from django.dispatch import receiver
 from django.http import HttpResponseForbidden
 from django.utils.deprecation import MiddlewareMixin
@@ -17,43 +17,56 @@ logger = logging.getLogger("django.security")
 class BruteForceProtectionMiddleware(MiddlewareMixin):
     """
     Защита от брутфорс атак на основе количества неудачных попыток входа.
+
+    Неудачи считаются скользящим окном в кэше (core/login_throttle.py)
+    по IP, подсети и имени пользователя — проверка O(1), без COUNT по
+    SecurityAuditLog. Лимиты и окно — settings.LOGIN_THROTTLE.
     """
 
-    MAX_FAILED_ATTEMPTS = 10  # Максимум попыток за период
-    LOCKOUT_MINUTES = 30  # Время блокировки
+    LOGIN_PATHS = ("/accounts/login/", "/api/auth/login/")
 
     def process_request(self, request):
-        """Проверяем количество неудачных попыток входа с IP."""
+        """Проверяем счётчики неудачных входов для IP/подсети/логина."""
 
         # Проверяем только страницы входа
-        if request.path in ["/accounts/login/", "/api/auth/login/"]:
-            ip_address = self._get_client_ip(request)
+        if request.path not in self.LOGIN_PATHS:
+            return None
 
-            # Проверяем количество неудачных попыток
-            failed_attempts = SecurityAuditLog.get_failed_login_attempts(
-                ip_address=ip_address, minutes=self.LOCKOUT_MINUTES
-            )
+        from core import login_throttle
+
+        ip_address = self._get_client_ip(request)
+        username = request.POST.get("username", "") if request.method == "POST" else ""
+
+        blocked = login_throttle.exceeded(ip=ip_address, username=username)
+        if blocked is None:
+            return None
 
-            if failed_attempts >= self.MAX_FAILED_ATTEMPTS:
-                SecurityAuditLog.log(
-                    action_type="suspicious_activity",
-                    description=f"IP заблокирован за превышение попыток входа: {ip_address}",
-                    risk_level="critical",
-                    ip_address=ip_address,
-                    metadata={
-                        "failed_attempts": failed_attempts,
-                        "lockout_minutes": self.LOCKOUT_MINUTES,
-                    },
-                )
+        dimension, failed_attempts = blocked
+        window_minutes = login_throttle.get_config()["window"] // 60
+        value = login_throttle.dimensions(ip=ip_address, username=username)[dimension]
 
-                logger.error(f"Brute force attempt blocked from IP: {ip_address}")
+        if login_throttle.should_audit_block(dimension, value):
+            SecurityAuditLog.log(
+                action_type="suspicious_activity",
+                description=(
+                    f"Вход заблокирован за превышение попыток ({dimension}={value}), "
+                    f"IP: {ip_address}"
+                ),
+                risk_level="critical",
+                ip_address=ip_address,
+                metadata={
+                    "dimension": dimension,
+                    "failed_attempts": round(failed_attempts, 1),
+                    "lockout_minutes": window_minutes,
+                },
+            )
 
-                return HttpResponseForbidden(
-                    "🚫 Слишком много неудачных попыток входа. "
-                    f"Попробуйте снова через {self.LOCKOUT_MINUTES} минут."
-                )
+        logger.error(f"Brute force attempt blocked ({dimension}) from IP: {ip_address}")
 
-        return None
+        return HttpResponseForbidden(
+            "🚫 Слишком много неудачных попыток входа. "
+            f"Попробуйте снова через {window_minutes} минут."
+        )
 
     @staticmethod
     def _get_client_ip(request):
@@ -109,11 +122,19 @@ class SecurityAuditMiddleware(MiddlewareMixin):
 @receiver(user_login_failed)
 def log_failed_login(sender, credentials, request, **kwargs):
     """Логируем неудачные попытки входа (через trusted-proxy-aware IP)."""
+    from core import login_throttle
     from core.utils import get_client_ip
 
     username = credentials.get("username", "unknown")
     ip_address = get_client_ip(request) if request else "unknown"
 
+    # Счётчики для BruteForceProtectionMiddleware; audit log ниже — только
+    # журнал для расследований.
+    login_throttle.record_failure(
+        ip=ip_address if request else "",
+        username=credentials.get("username", ""),
+    )
+
     SecurityAuditLog.log(
         action_type="login_failed",
         description=f"Неудачная попытка входа: {username}",
@@ -126,3 +147,11 @@ def log_failed_login(sender, credentials, request, **kwargs):
     )
 
     logger.warning(f"Failed login attempt for user: {username} from IP: {ip_address}")
+
+
+@receiver(user_logged_in)
+def reset_login_failures(sender, request, user, **kwargs):
+    """Успешный вход сбрасывает счётчик неудач по логину."""
+    from core import login_throttle
+
+    login_throttle.reset(username=user.get_username())
@@ -1,16 +1,22 @@
 """
 Middleware для request_id — уникальный идентификатор каждого HTTP-запроса.
 Позволяет связывать все логи одного запроса между собой.
+
+Идентификатор хранится в ContextVar, а не в threading.local: под ASGI
+async-запросы одного event loop делят поток, а контекст у каждого свой
+(и копируется в sync_to_async).
 """
+import contextvars
 import logging
-import threading
 import uuid
 
-_request_id = threading.local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+_request_id = contextvars.ContextVar('request_id', default=None)
 
 
 def get_request_id():
-    return getattr(_request_id, 'id', '-')
+    return _request_id.get() or '-'
 
 
 class RequestIDFilter(logging.Filter):
@@ -23,20 +29,40 @@ class RequestIDFilter(logging.Filter):
 
 class RequestIDMiddleware:
     """
-    Генерирует UUID для каждого запроса, сохраняет в thread-local
+    Генерирует UUID для каждого запроса, сохраняет в контексте
     и пробрасывает в заголовок ответа X-Request-ID.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        rid = request.META.get('HTTP_X_REQUEST_ID', uuid.uuid4().hex[:12])
-        _request_id.id = rid
-        request.request_id = rid
-
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        rid, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
         response['X-Request-ID'] = rid
+        return response
 
-        _request_id.id = None
+    async def __acall__(self, request):
+        rid, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = rid
         return response
+
+    @staticmethod
+    def _start(request):
+        rid = request.META.get('HTTP_X_REQUEST_ID', uuid.uuid4().hex[:12])
+        request.request_id = rid
+        return rid, _request_id.set(rid)
@@ -0,0 +1,198 @@
+"""
+Полностраничный кэш публичных страниц для анонимных посетителей.
+
+Анонимный трафик (поисковые боты, первые заходы) на главную, каталог,
+страницы игр и объявлений проходил весь стек: сессии, auth, CSRF,
+messages, кастомные middleware, Prometheus-хуки, контекст-процессоры
+кошелька и уведомлений. Ответ при этом одинаковый для всех анонимов.
+
+AnonymousPageCacheMiddleware стоит в MIDDLEWARE до SessionMiddleware:
+    - GET/HEAD на маршрут из ANON_PAGE_CACHE_ROUTES без cookie сессии и
+      messages → одна выборка из кэша; при попадании ответ уходит сразу,
+      без сессии, БД и шаблонов;
+    - при промахе запрос идёт по обычному пути, а готовый ответ 200
+      сохраняется на ANON_PAGE_CACHE_TTL секунд, если он не ставит
+      никаких cookie, кроме CSRF, и не помечен private/no-store.
+
+Ключ — путь + нормализованный querystring (параметры отсортированы,
+utm_*/gclid/fbclid/yclid отброшены). Инвалидация — поколением: сигналы
+листингов (listings/signals.py) увеличивают его, и все страницы
+старого поколения считаются промахом. Поколение читается тем же
+get_many, что и страница.
+
+CSRF: шаблоны рендерят токен (meta csrf-token, формы). В кэш тело
+кладётся с плейсхолдером вместо токена; при выдаче подставляется токен
+текущего посетителя, и cookie ставится штатным CsrfViewMiddleware.
+
+Метрика: lootlink_pagecache_requests_total{route, result=hit|miss|bypass}.
+
+В async-цепочке (ASGI) запросы не на ANON_PAGE_CACHE_ROUTES проходят без
+перехода в поток; чтение и запись кэша для кэшируемых маршрутов — через
+sync_to_async.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware, get_token
+from django.urls import Resolver404, resolve
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from prometheus_client import Counter
+
+REQUESTS = Counter(
+    "lootlink_pagecache_requests_total",
+    "Anonymous page cache lookups by route",
+    ["route", "result"],
+)
+
+GENERATION_KEY = "pagecache:generation"
+CSRF_PLACEHOLDER = b"__PAGECACHE_CSRF_TOKEN__"
+CSRF_TOKEN_RE = re.compile(
+    rb'((?:name="csrfmiddlewaretoken" value=|name="csrf-token" content=)")[A-Za-z0-9]{32,64}(")'
+)
+TRACKING_PARAMS = ("gclid", "fbclid", "yclid", "_openstat")
+MESSAGES_COOKIE = "messages"
+# Заголовки, которые нельзя тиражировать между посетителями.
+SKIP_HEADERS = {"set-cookie", "x-request-id", "content-length"}
+
+
+def bump_generation() -> None:
+    """Сбросить все закэшированные страницы (новое поколение)."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+def normalized_query(query_dict) -> str:
+    items = sorted(
+        (key, value)
+        for key, values in query_dict.lists()
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+        for value in values
+    )
+    return urlencode(items)
+
+
+def page_key(path: str, query: str) -> str:
+    digest = hashlib.sha1(f"{path}?{query}".encode("utf-8")).hexdigest()
+    return f"pagecache:page:{digest}"
+
+
+class AnonymousPageCacheMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = frozenset(getattr(settings, "ANON_PAGE_CACHE_ROUTES", ()))
+        self.ttl = getattr(settings, "ANON_PAGE_CACHE_TTL", 60)
+        self.csrf = CsrfViewMiddleware(lambda request: None)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        route = self._cacheable_route(request)
+        if route is None:
+            return self.get_response(request)
+
+        key, generation, hit = self._lookup(request, route)
+        if hit is not None:
+            return hit
+        response = self.get_response(request)
+        self._store(request, response, route, key, generation)
+        return response
+
+    async def __acall__(self, request):
+        route = self._cacheable_route(request)
+        if route is None:
+            return await self.get_response(request)
+
+        key, generation, hit = await sync_to_async(self._lookup)(request, route)
+        if hit is not None:
+            return hit
+        response = await self.get_response(request)
+        await sync_to_async(self._store)(request, response, route, key, generation)
+        return response
+
+    def _lookup(self, request, route):
+        """(ключ, поколение, готовый ответ при попадании или None)."""
+        key = page_key(request.path, normalized_query(request.GET))
+        stored = cache.get_many([GENERATION_KEY, key])
+        generation = stored.get(GENERATION_KEY, 0)
+        entry = stored.get(key)
+        if entry is not None and entry["generation"] == generation:
+            REQUESTS.labels(route=route, result="hit").inc()
+            return key, generation, self._replay(request, entry)
+        return key, generation, None
+
+    def _store(self, request, response, route, key, generation) -> None:
+        if request.method == "GET" and self._storable(request, response):
+            REQUESTS.labels(route=route, result="miss").inc()
+            cache.set(key, self._snapshot(response, generation), timeout=self.ttl)
+        else:
+            REQUESTS.labels(route=route, result="bypass").inc()
+
+    def _cacheable_route(self, request):
+        if not getattr(settings, "ANON_PAGE_CACHE_ENABLED", True):
+            return None
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or MESSAGES_COOKIE in request.COOKIES:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        return match.view_name if match.view_name in self.routes else None
+
+    @staticmethod
+    def _storable(request, response) -> bool:
+        if response.status_code != 200 or response.streaming:
+            return False
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return False
+        cache_control = response.get("Cache-Control", "")
+        if "private" in cache_control or "no-store" in cache_control:
+            return False
+        return set(response.cookies) <= {settings.CSRF_COOKIE_NAME}
+
+    @staticmethod
+    def _snapshot(response, generation) -> dict:
+        content, replaced = CSRF_TOKEN_RE.subn(rb"\1" + CSRF_PLACEHOLDER + rb"\2", response.content)
+        return {
+            "generation": generation,
+            "status": response.status_code,
+            "headers": [
+                (name, value)
+                for name, value in response.items()
+                if name.lower() not in SKIP_HEADERS
+            ],
+            "content": content,
+            "csrf": bool(replaced),
+        }
+
+    def _replay(self, request, entry) -> HttpResponse:
+        content = entry["content"]
+        if entry["csrf"]:
+            # Секрет из cookie посетителя (или новый) — как сделал бы
+            # CsrfViewMiddleware при обычном рендере.
+            self.csrf.process_request(request)
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode("ascii"))
+        response = HttpResponse(content, status=entry["status"])
+        for name, value in entry["headers"]:
+            response[name] = value
+        response["X-Page-Cache"] = "hit"
+        if entry["csrf"]:
+            self.csrf.process_response(request, response)
+        return response
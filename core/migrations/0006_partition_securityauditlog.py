@@ -0,0 +1,30 @@
+"""
+Помесячное партиционирование core_securityauditlog (PostgreSQL).
+
+Retention логов аудита становится DROP PARTITION вместо массового DELETE
+(см. core.partitioning и core.tasks.cleanup_security_audit_logs).
+На SQLite — no-op: таблица остаётся обычной.
+"""
+
+from django.db import migrations
+
+
+def partition_audit_log(apps, schema_editor):
+    from core.partitioning import convert_to_partitioned
+
+    convert_to_partitioned(
+        "core_securityauditlog", "created_at", connection=schema_editor.connection
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_notification_notif_user_unread_idx"),
+    ]
+
+    operations = [
+        # Обратная миграция не нужна: колонки партиционированной таблицы
+        # совпадают с моделью, Django работает с ней как с обычной.
+        migrations.RunPython(partition_audit_log, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_partition_securityauditlog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RemoderationJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[("listing", "Объявления"), ("message", "Сообщения")],
+                        max_length=20,
+                        verbose_name="Тип контента",
+                    ),
+                ),
+                (
+                    "rules_version",
+                    models.CharField(
+                        help_text="Хэш скомпилированных правил AutoModerator",
+                        max_length=40,
+                        verbose_name="Версия правил",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Выполняется"),
+                            ("paused", "Прервана"),
+                            ("done", "Завершена"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="running",
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "last_pk",
+                    models.BigIntegerField(default=0, verbose_name="Последний обработанный ID"),
+                ),
+                ("total", models.PositiveIntegerField(default=0, verbose_name="Всего к проверке")),
+                ("scanned", models.PositiveIntegerField(default=0, verbose_name="Проверено")),
+                (
+                    "flagged",
+                    models.PositiveIntegerField(default=0, verbose_name="Отправлено на модерацию"),
+                ),
+                ("blocked", models.PositiveIntegerField(default=0, verbose_name="Заблокировано")),
+                ("error", models.TextField(blank=True, verbose_name="Ошибка")),
+                ("started_at", models.DateTimeField(auto_now_add=True, verbose_name="Запущена")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Обновлена")),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Завершена"),
+                ),
+            ],
+            options={
+                "verbose_name": "Перемодерация",
+                "verbose_name_plural": "Перемодерация",
+                "ordering": ["-started_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "rules_version"),
+                        name="remoderation_job_content_rules_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_remoderation_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationsettings",
+            name="last_digest_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Последняя сводка"),
+        ),
+    ]
@@ -3,6 +3,8 @@ from accounts.models import CustomUser
 
 # Импортируем audit модели
 from .models_audit import SecurityAuditLog, DataChangeLog
+from .models_faq import AntiFraudRule  # noqa: F401
+from .moderation_models import AutoModeration, ModerationQueue, RemoderationJob  # noqa: F401
 
 
 class Notification(models.Model):
@@ -82,16 +84,12 @@ class Notification(models.Model):
     def mark_as_read(self):
         """Отметить уведомление как прочитанное."""
         from django.utils import timezone
-        from django.core.cache import cache
         
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
+            # Счётчик в шапке сбрасывает post_save (core/signals.py)
             self.save(update_fields=['is_read', 'read_at'])
-            
-            # Инвалидируем кэш количества уведомлений
-            cache_key = f'unread_notif_count_{self.user.id}'
-            cache.delete(cache_key)
     
     @classmethod
     def create_notification(cls, user, notification_type, title, message, link=''):
@@ -108,14 +106,14 @@ class Notification(models.Model):
     def mark_all_as_read(cls, user):
         """Отметить все уведомления пользователя как прочитанные."""
         from django.utils import timezone
-        from django.core.cache import cache
+
+        from core.header_state import invalidate_notifications
         
         cls.objects.filter(user=user, is_read=False).update(
             is_read=True,
             read_at=timezone.now()
         )
         
-        # Инвалидируем кэш количества уведомлений
-        cache_key = f'unread_notif_count_{user.id}'
-        cache.delete(cache_key)
+        # UPDATE не шлёт сигналов — сбрасываем счётчик в шапке явно
+        invalidate_notifications([user.id])
 
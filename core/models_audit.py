@@ -140,9 +140,14 @@ class SecurityAuditLog(models.Model):
     
     @classmethod
     def log(cls, action_type, user=None, description='', risk_level='low', 
-            ip_address=None, user_agent='', metadata=None, request=None):
+            ip_address=None, user_agent='', metadata=None, request=None, sync=None):
         """
         Создает запись в логе аудита.
+
+        При AUDIT_ASYNC запись ставится в буфер и пишется фоновым
+        bulk_create (core/audit_writer.py); возвращается несохранённый
+        объект. Финансовые события (audit_writer.SYNC_ACTION_TYPES)
+        и sync=True пишутся сразу — в транзакции вызывающего кода.
         
         Args:
             action_type: Тип действия из ACTION_TYPES
@@ -153,6 +158,7 @@ class SecurityAuditLog(models.Model):
             user_agent: User Agent браузера
             metadata: Дополнительные данные (dict)
             request: Django request объект (автоматически извлечет IP и User-Agent)
+            sync: True — записать немедленно; None — по типу события
         """
         # Если передан request, извлекаем из него данные
         if request:
@@ -169,7 +175,7 @@ class SecurityAuditLog(models.Model):
             if not user and request.user.is_authenticated:
                 user = request.user
         
-        return cls.objects.create(
+        record = cls(
             user=user,
             action_type=action_type,
             risk_level=risk_level,
@@ -178,6 +184,14 @@ class SecurityAuditLog(models.Model):
             ip_address=ip_address,
             user_agent=user_agent
         )
+
+        from core import audit_writer
+
+        if sync or (sync is None and audit_writer.should_write_sync(action_type)):
+            record.save(force_insert=True)
+        else:
+            audit_writer.enqueue(record)
+        return record
     
     @classmethod
     def get_suspicious_activity(cls, user, hours=24):
@@ -68,6 +68,11 @@ class NotificationSettings(models.Model):
         default='realtime',
         verbose_name='Частота сводок'
     )
+    last_digest_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя сводка'
+    )
     
     created_at = models.DateTimeField(
         auto_now_add=True,
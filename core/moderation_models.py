@@ -282,3 +282,98 @@ class ModerationQueue(models.Model):
     def __str__(self):
         return f'{self.get_content_type_display()} #{self.content_id}'
 
+
+class RemoderationJob(models.Model):
+    """
+    Фоновая перепроверка контента после смены правил AutoModerator.
+
+    Одна задача на (тип контента, версия правил). Прогресс сохраняется
+    после каждой порции (last_pk), поэтому прерванная задача продолжается
+    с места остановки (core/remoderation.py).
+    """
+    CONTENT_TYPES = [
+        ('listing', 'Объявления'),
+        ('message', 'Сообщения'),
+    ]
+
+    STATUS_CHOICES = [
+        ('running', 'Выполняется'),
+        ('paused', 'Прервана'),
+        ('done', 'Завершена'),
+        ('failed', 'Ошибка'),
+    ]
+
+    content_type = models.CharField(
+        max_length=20,
+        choices=CONTENT_TYPES,
+        verbose_name='Тип контента'
+    )
+    rules_version = models.CharField(
+        max_length=40,
+        verbose_name='Версия правил',
+        help_text='Хэш скомпилированных правил AutoModerator'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='running',
+        verbose_name='Статус'
+    )
+    last_pk = models.BigIntegerField(
+        default=0,
+        verbose_name='Последний обработанный ID'
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Всего к проверке'
+    )
+    scanned = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Проверено'
+    )
+    flagged = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Отправлено на модерацию'
+    )
+    blocked = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Заблокировано'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Запущена'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Обновлена'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена'
+    )
+
+    class Meta:
+        verbose_name = 'Перемодерация'
+        verbose_name_plural = 'Перемодерация'
+        ordering = ['-started_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'rules_version'],
+                name='remoderation_job_content_rules_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_content_type_display()} {self.rules_version[:8]}: {self.progress:.0%}'
+
+    @property
+    def progress(self):
+        if self.status == 'done':
+            return 1.0
+        return min(self.scanned / self.total, 1.0) if self.total else 0.0
@@ -0,0 +1,289 @@
+"""
+Рассылка уведомлений по каналам: email, Telegram, web-push.
+
+Для пачки уведомлений настройки получателей, адреса, Telegram chat_id и
+push-подписки читаются по одному запросу на пачку, а доставки
+группируются по каналу и уходят в Celery пачками по
+NOTIFICATION_BATCH_SIZE после коммита:
+
+    email    → core.tasks.send_notification_emails (одно SMTP-соединение
+               на пачку);
+    telegram → core.integrations.telegram_bot.send_telegram_batch
+               (общая HTTP-сессия к Bot API);
+    push     → accounts.utils_push.send_push_batch (общая HTTP-сессия
+               к push-серверам).
+
+Email уважает NotificationSettings: выключенные типы не отправляются,
+при digest_frequency hourly/daily письма не уходят сразу, а собираются
+в одну сводку (send_digests, задача core.tasks.send_notification_digests),
+never — без email. Telegram и push — мгновенные каналы вне сводок.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import escape
+
+from accounts.models import CustomUser, Profile
+from core.models import Notification
+from core.models_notifications import NotificationSettings, PushSubscription
+from core.services import NotificationService
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "telegram", "push")
+
+DIGEST_PERIODS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+# Сколько уведомлений перечислять в сводке, остальные — «и ещё N».
+DIGEST_MAX_ITEMS = 20
+
+
+def _batch_size() -> int:
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 100)
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def _enqueue(task, messages) -> int:
+    """Поставить messages в task пачками после коммита."""
+    for batch in _chunks(messages, _batch_size()):
+        transaction.on_commit(lambda batch=batch: task.delay(batch))
+    return len(messages)
+
+
+def wants_email(prefs: Optional[NotificationSettings], notification_type: str) -> bool:
+    """Включён ли email этого типа (нет настроек — по умолчанию да)."""
+    if prefs is None:
+        return True
+    field_name = NotificationService.EMAIL_PREFERENCE_MAP.get(notification_type)
+    return not field_name or bool(getattr(prefs, field_name, True))
+
+
+def _frequency(prefs: Optional[NotificationSettings]) -> str:
+    return prefs.digest_frequency if prefs is not None else "realtime"
+
+
+def _recipients(notifications) -> dict:
+    """{user_id: user}: уже загруженные из notification.user, остальные одним запросом."""
+    users = {}
+    for notification in notifications:
+        if Notification.user.is_cached(notification):
+            users[notification.user_id] = notification.user
+    missing = {n.user_id for n in notifications} - users.keys()
+    if missing:
+        users.update(
+            (user.pk, user)
+            for user in CustomUser.objects.filter(pk__in=missing).only("id", "username", "email")
+        )
+    return users
+
+
+def _email_messages(notifications, prefs) -> list:
+    users = _recipients(notifications)
+    messages = []
+    for notification in notifications:
+        user = users.get(notification.user_id)
+        user_prefs = prefs.get(notification.user_id)
+        if (
+            user is None
+            or not user.email
+            or _frequency(user_prefs) != "realtime"
+            or not wants_email(user_prefs, notification.notification_type)
+        ):
+            continue
+        body = NotificationService._format_email_body(user, notification.message, notification.link)
+        messages.append([f"{notification.title} - LootLink", body, user.email])
+    return messages
+
+
+def _telegram_text(notification) -> str:
+    text = f"<b>{escape(notification.title)}</b>\n\n{escape(notification.message)}"
+    if notification.link:
+        text += f"\n\n{escape(NotificationService._absolute_link(notification.link))}"
+    return text
+
+
+def _telegram_messages(notifications, prefs) -> list:
+    chat_ids = dict(
+        Profile.objects.filter(
+            user_id__in={n.user_id for n in notifications}, telegram_notifications=True
+        )
+        .exclude(telegram_chat_id="")
+        .values_list("user_id", "telegram_chat_id")
+    )
+    messages = []
+    for notification in notifications:
+        user_prefs = prefs.get(notification.user_id)
+        chat_id = chat_ids.get(notification.user_id)
+        if chat_id and (user_prefs is None or user_prefs.telegram_enabled):
+            messages.append([chat_id, _telegram_text(notification)])
+    return messages
+
+
+def _push_deliveries(notifications, prefs) -> list:
+    from accounts.utils_push import build_push_payload
+
+    subscriptions = defaultdict(list)
+    for sub_id, user_id in PushSubscription.objects.filter(
+        user_id__in={n.user_id for n in notifications}, is_active=True
+    ).values_list("id", "user_id"):
+        subscriptions[user_id].append(sub_id)
+
+    deliveries = []
+    for notification in notifications:
+        user_prefs = prefs.get(notification.user_id)
+        if user_prefs is not None and not user_prefs.push_enabled:
+            continue
+        sub_ids = subscriptions.get(notification.user_id)
+        if not sub_ids:
+            continue
+        payload_json = build_push_payload(
+            notification.title, notification.message, notification.link or None
+        )
+        deliveries.extend([sub_id, payload_json] for sub_id in sub_ids)
+    return deliveries
+
+
+def deliver(notifications: Iterable[Notification], *, channels=None) -> dict:
+    """
+    Разослать уже созданные уведомления по каналам.
+
+    Args:
+        notifications: Уведомления (с pk и user_id)
+        channels: Подмножество CHANNELS (по умолчанию settings.NOTIFICATION_CHANNELS)
+
+    Returns:
+        dict: {канал: сколько доставок поставлено в очередь}
+    """
+    from accounts.utils_push import enqueue_push_batches
+    from core.integrations.telegram_bot import send_telegram_batch
+    from core.tasks import send_notification_emails
+
+    if channels is None:
+        channels = getattr(settings, "NOTIFICATION_CHANNELS", CHANNELS)
+    notifications = list(notifications)
+    if not notifications or not channels:
+        return {}
+
+    prefs = {
+        prefs.user_id: prefs
+        for prefs in NotificationSettings.objects.filter(
+            user_id__in={n.user_id for n in notifications}
+        )
+    }
+    queued = {}
+    if "email" in channels:
+        queued["email"] = _enqueue(send_notification_emails, _email_messages(notifications, prefs))
+    if "telegram" in channels and getattr(settings, "TELEGRAM_BOT_TOKEN", ""):
+        queued["telegram"] = _enqueue(send_telegram_batch, _telegram_messages(notifications, prefs))
+    if "push" in channels and getattr(settings, "VAPID_PRIVATE_KEY", ""):
+        queued["push"] = enqueue_push_batches(_push_deliveries(notifications, prefs))
+    return queued
+
+
+def notify(entries, *, channels=None) -> list:
+    """
+    Создать пачку уведомлений одним bulk_create и разослать по каналам.
+
+    Args:
+        entries: iterable dict с ключами user_id, notification_type,
+                 title, message и опционально link
+        channels: см. deliver()
+
+    Returns:
+        Список созданных уведомлений
+    """
+    notifications = NotificationService.bulk_notify(entries, batch_size=_batch_size())
+    deliver(notifications, channels=channels)
+    return notifications
+
+
+def _digest_email(user, items, frequency) -> list:
+    period = "час" if frequency == "hourly" else "день"
+    lines = [
+        f"Здравствуйте, {user.username}!",
+        "",
+        f"Новые уведомления за {period}: {len(items)}.",
+        "",
+    ]
+    for notification_type, title, link, created_at in items[:DIGEST_MAX_ITEMS]:
+        line = f"• {timezone.localtime(created_at):%d.%m %H:%M} {escape(title)}"
+        if link:
+            line += f" — {NotificationService._absolute_link(link)}"
+        lines.append(line)
+    if len(items) > DIGEST_MAX_ITEMS:
+        lines.append(f"…и ещё {len(items) - DIGEST_MAX_ITEMS}")
+    lines += ["", "С уважением,", "Команда LootLink"]
+    subject = f"Сводка уведомлений: {len(items)} новых - LootLink"
+    return [subject, "\n".join(lines), user.email]
+
+
+def send_digests(frequency: str, *, now=None) -> int:
+    """
+    Собрать сводки email для пользователей с digest_frequency=frequency.
+
+    В сводку попадают непрочитанные уведомления с прошлой сводки
+    (или за последний период) тех типов, что включены в настройках.
+    Одна сводка — одно письмо, письма уходят пачками одним соединением.
+
+    Returns:
+        Сколько сводок поставлено в очередь
+    """
+    from core.tasks import send_notification_emails
+
+    period = DIGEST_PERIODS[frequency]
+    now = now or timezone.now()
+    queued = 0
+    due = (
+        NotificationSettings.objects.filter(digest_frequency=frequency)
+        .select_related("user")
+        .order_by("pk")
+        .iterator(chunk_size=_batch_size())
+    )
+    for chunk in _chunks(due, _batch_size()):
+        since = {prefs.user_id: prefs.last_digest_at or now - period for prefs in chunk}
+        grouped = defaultdict(list)
+        for user_id, *item in (
+            Notification.objects.filter(
+                user_id__in=since,
+                is_read=False,
+                created_at__gt=min(since.values()),
+                created_at__lte=now,
+            )
+            .order_by("user_id", "-created_at")
+            .values_list("user_id", "notification_type", "title", "link", "created_at")
+        ):
+            grouped[user_id].append(item)
+
+        messages = []
+        for prefs in chunk:
+            items = [
+                item
+                for item in grouped.get(prefs.user_id, ())
+                if item[3] > since[prefs.user_id] and wants_email(prefs, item[0])
+            ]
+            if items and prefs.user.email:
+                messages.append(_digest_email(prefs.user, items, frequency))
+
+        queued += _enqueue(send_notification_emails, messages)
+        NotificationSettings.objects.filter(pk__in=[prefs.pk for prefs in chunk]).update(
+            last_digest_at=now
+        )
+
+    logger.info("notification digests: frequency=%s queued=%s", frequency, queued)
+    return queued
@@ -0,0 +1,322 @@
+"""
+Помесячное range-партиционирование append-heavy таблиц (PostgreSQL).
+
+`payments_transaction` и `core_securityauditlog` только растут и читаются
+почти исключительно по свежему диапазону `created_at`. Партиционирование
+по месяцам даёт:
+    - partition pruning для запросов «за последние N дней»;
+    - retention через DETACH + DROP PARTITION — O(1) вместо массового
+      DELETE, который раздувает таблицу и нагружает autovacuum.
+
+Имена партиций: ``<table>_pYYYYMM`` (диапазон [1-е число месяца; 1-е число
+следующего)). Плюс ``<table>_default`` — страховка на случай, если beat
+не успел создать партицию заранее.
+
+На SQLite (dev/тесты) все функции — no-op: таблицы остаются обычными,
+а retention выполняется прежним DELETE.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime
+from typing import Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connection as default_connection
+
+logger = logging.getLogger(__name__)
+
+# Таблица → колонка партиционирования. Переопределяется через settings.
+DEFAULT_PARTITIONED_TABLES = {
+    "core_securityauditlog": "created_at",
+    "payments_transaction": "created_at",
+}
+
+_PARTITION_SUFFIX_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+class MonthPartition(NamedTuple):
+    """Партиция одного месяца: имя и полуинтервал [start; end)."""
+
+    name: str
+    start: date
+    end: date
+
+
+def get_partitioned_tables() -> dict:
+    """Таблицы под партиционированием: settings.PARTITIONED_TABLES или дефолт."""
+    return getattr(settings, "PARTITIONED_TABLES", DEFAULT_PARTITIONED_TABLES)
+
+
+def is_supported(connection=None) -> bool:
+    """Нативное партиционирование есть только в PostgreSQL."""
+    connection = connection or default_connection
+    return connection.vendor == "postgresql"
+
+
+def month_start(value) -> date:
+    """Первое число месяца для date/datetime."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Сдвиг первого числа месяца на N месяцев (N может быть отрицательным)."""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_for(table: str, value) -> MonthPartition:
+    """Партиция, в которую попадает момент времени value."""
+    start = month_start(value)
+    return MonthPartition(f"{table}_p{start:%Y%m}", start, add_months(start, 1))
+
+
+def parse_partition_name(table: str, name: str) -> Optional[MonthPartition]:
+    """Восстановить границы партиции по имени. None — не помесячная партиция."""
+    if not name.startswith(f"{table}_p"):
+        return None
+    match = _PARTITION_SUFFIX_RE.search(name)
+    if not match:
+        return None
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return MonthPartition(name, start, add_months(start, 1))
+
+
+def is_partitioned(table: str, connection=None) -> bool:
+    """True, если таблица уже переведена на PARTITION BY RANGE."""
+    connection = connection or default_connection
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table: str, connection=None) -> List[MonthPartition]:
+    """Помесячные партиции таблицы, отсортированные по дате."""
+    connection = connection or default_connection
+    if not is_partitioned(table, connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = [p for p in (parse_partition_name(table, n) for n in names) if p]
+    return sorted(partitions, key=lambda p: p.start)
+
+
+def _create_partition_sql(connection, table: str, partition: MonthPartition) -> str:
+    qn = connection.ops.quote_name
+    return (
+        f"CREATE TABLE IF NOT EXISTS {qn(partition.name)} PARTITION OF {qn(table)} "
+        f"FOR VALUES FROM ('{partition.start.isoformat()}') "
+        f"TO ('{partition.end.isoformat()}')"
+    )
+
+
+def ensure_partitions(
+    table: str,
+    *,
+    months_ahead: int = 3,
+    start=None,
+    connection=None,
+) -> List[str]:
+    """Создать недостающие партиции от start (по умолчанию — текущий месяц)
+    до текущего месяца + months_ahead включительно.
+
+    Идемпотентно: существующие партиции пропускаются.
+
+    Returns:
+        Имена созданных партиций.
+    """
+    from django.utils import timezone
+
+    connection = connection or default_connection
+    if not is_partitioned(table, connection):
+        return []
+
+    existing = {p.name for p in list_partitions(table, connection)}
+    current = month_start(start or timezone.now())
+    last = add_months(month_start(timezone.now()), months_ahead)
+
+    created = []
+    with connection.cursor() as cursor:
+        while current <= last:
+            partition = partition_for(table, current)
+            if partition.name not in existing:
+                cursor.execute(_create_partition_sql(connection, table, partition))
+                created.append(partition.name)
+            current = partition.end
+
+    if created:
+        logger.info("partitions created: table=%s partitions=%s", table, created)
+    return created
+
+
+def drop_partitions_before(
+    table: str,
+    threshold,
+    *,
+    detach_only: bool = False,
+    connection=None,
+) -> List[str]:
+    """Отсоединить (и удалить) партиции, целиком лежащие раньше threshold.
+
+    Партиция удаляется, только если её верхняя граница <= threshold, т.е.
+    в ней гарантированно нет строк новее порога. Остаток «граничного»
+    месяца дочищается обычным DELETE вызывающим кодом — это не больше
+    одной партиции.
+
+    Args:
+        detach_only: только DETACH (таблица остаётся для архивации/pg_dump).
+
+    Returns:
+        Имена отсоединённых партиций.
+    """
+    connection = connection or default_connection
+    if not is_partitioned(table, connection):
+        return []
+
+    cutoff = threshold.date() if isinstance(threshold, datetime) else threshold
+    qn = connection.ops.quote_name
+    expired = [p for p in list_partitions(table, connection) if p.end <= cutoff]
+
+    with connection.cursor() as cursor:
+        for partition in expired:
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(partition.name)}")
+            if not detach_only:
+                cursor.execute(f"DROP TABLE {qn(partition.name)}")
+
+    names = [p.name for p in expired]
+    if names:
+        logger.info(
+            "partitions %s: table=%s partitions=%s",
+            "detached" if detach_only else "dropped",
+            table,
+            names,
+        )
+    return names
+
+
+def convert_to_partitioned(
+    table: str,
+    column: str = "created_at",
+    *,
+    months_ahead: int = 3,
+    connection=None,
+) -> bool:
+    """Перевести обычную таблицу на PARTITION BY RANGE (column) по месяцам.
+
+    Используется из миграций. Шаги:
+        1. Запоминаем определения вторичных индексов и FK исходной таблицы.
+        2. Переименовываем её в <table>_legacy.
+        3. Создаём партиционированную таблицу с теми же колонками, default'ами,
+           identity и CHECK-ограничениями. PK становится (id, column) —
+           в PostgreSQL уникальный ключ обязан включать ключ партиционирования.
+        4. Создаём помесячные партиции на весь диапазон данных + DEFAULT,
+           переносим строки, выравниваем identity-последовательность.
+        5. Удаляем legacy-таблицу и восстанавливаем индексы и FK.
+
+    Уникальные индексы, кроме PK, не поддерживаются (их нельзя перенести
+    без ключа партиционирования) — в этом случае бросаем RuntimeError.
+
+    Returns:
+        True, если таблица была сконвертирована; False — no-op
+        (не PostgreSQL или уже партиционирована).
+    """
+    connection = connection or default_connection
+    if not is_supported(connection) or is_partitioned(table, connection):
+        return False
+
+    qn = connection.ops.quote_name
+    legacy = f"{table}_legacy"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid), "
+            "i.indisunique, i.indisprimary "
+            "FROM pg_index i WHERE i.indrelid = %s::regclass",
+            [table],
+        )
+        index_defs = []
+        for name, definition, is_unique, is_primary in cursor.fetchall():
+            if is_primary:
+                continue
+            if is_unique:
+                raise RuntimeError(
+                    f"{table}: уникальный индекс {name} несовместим с партиционированием"
+                )
+            index_defs.append(definition)
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        fk_defs = cursor.fetchall()
+
+        cursor.execute(f"SELECT MIN({qn(column)}) FROM {qn(table)}")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} "
+            f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_pkey')} "
+            f"PRIMARY KEY (id, {qn(column)})"
+        )
+        cursor.execute(f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT")
+
+    ensure_partitions(table, months_ahead=months_ahead, start=oldest, connection=connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {qn(table)}), 0) + 1, false)",
+            [table],
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+        for definition in index_defs:
+            cursor.execute(definition)
+        for name, definition in fk_defs:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+
+    logger.info("table converted to monthly partitions: table=%s column=%s", table, column)
+    return True
+
+
+def maintain(
+    tables: Optional[Iterable[str]] = None,
+    *,
+    months_ahead: int = 3,
+    connection=None,
+) -> dict:
+    """Создать партиции на months_ahead вперёд для всех (или указанных) таблиц.
+
+    Returns:
+        {table: [созданные партиции]}
+    """
+    configured = get_partitioned_tables()
+    result = {}
+    for table in tables or configured:
+        result[table] = ensure_partitions(table, months_ahead=months_ahead, connection=connection)
+    return result
@@ -0,0 +1,242 @@
+"""
+Единый rate-limit движок: GCRA поверх Redis (Lua) или локального кэша.
+
+Раньше в проекте было три независимых лимитера:
+    - SimpleRateLimitMiddleware — fixed window на cache.incr и линейный
+      перебор префиксов RATE_LIMITS на каждый POST;
+    - DRF throttles (api/throttling.py) — список timestamp'ов в кэше,
+      O(n) на запрос (get → фильтрация → set всего списка);
+    - ChatConsumer._check_rate_limit_atomic — ещё один fixed window.
+
+Здесь один алгоритм — GCRA (generic cell rate algorithm). На ключ хранится
+одно число — TAT (theoretical arrival time):
+
+    T        = period / limit                 (интервал между запросами)
+    tat      = max(TAT, now)
+    allow_at = tat + T * cost - period
+    now < allow_at  → отказ, retry_after = allow_at - now
+    иначе           → TAT = tat + T * cost
+
+Это эквивалент скользящего окна без границ-«ступенек» fixed window: не
+больше limit запросов за любые period секунд, всплеск до limit разрешён.
+
+Бэкенды:
+    RedisBackend — один EVALSHA на проверку; время берётся из Redis
+                   (TIME), чтобы воркеры с разными часами делили лимит;
+    CacheBackend — любой Django cache (LocMem в dev/тестах), атомарность
+                   в пределах процесса через lock.
+
+Маршрутизация путей — RouteTrie: префиксы компилируются в дерево
+сегментов один раз, поиск не зависит от числа правил.
+
+Метрики Prometheus:
+    lootlink_ratelimit_decisions_total{scope, decision}
+    lootlink_ratelimit_check_seconds{backend}
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from prometheus_client import Counter, Histogram
+
+DECISIONS = Counter(
+    "lootlink_ratelimit_decisions_total",
+    "Rate-limit decisions by scope",
+    ["scope", "decision"],
+)
+CHECK_SECONDS = Histogram(
+    "lootlink_ratelimit_check_seconds",
+    "Rate-limit check duration",
+    ["backend"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+
+KEY_PREFIX = "rl"
+EPSILON = 1e-6
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# "minute", "hour", "5m", "10s" — как в DRF, по первой букве единицы.
+RATE_PERIOD_RE = re.compile(r"^(\d*)([smhd])")
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+    @classmethod
+    def parse(cls, rate) -> "Rate":
+        """(limit, period) или DRF-строка вида "60/minute", "5/5m"."""
+        if isinstance(rate, Rate):
+            return rate
+        if isinstance(rate, (tuple, list)):
+            limit, period = rate
+            return cls(int(limit), float(period))
+        limit, _, duration = str(rate).partition("/")
+        match = RATE_PERIOD_RE.match(duration.strip())
+        if not match:
+            raise ValueError(f"Некорректный rate: {rate!r}")
+        multiplier = int(match.group(1) or 1)
+        return cls(int(limit), multiplier * PERIODS[match.group(2)])
+
+
+GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval * cost
+local allow_at = new_tat - period
+if allow_at - now > 1e-6 then
+    return {0, 0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - allow_at) / interval), '0'}
+"""
+
+
+def gcra(tat: Optional[float], now: float, rate: Rate, cost: int = 1) -> Tuple[Decision, float]:
+    """Шаг GCRA: (решение, новый TAT). Та же формула, что в GCRA_LUA."""
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + rate.interval * cost
+    allow_at = new_tat - rate.period
+    # Допуск на погрешность float: limit запросов подряд дают
+    # allow_at == now с точностью до округления T * limit.
+    if allow_at - now > EPSILON:
+        return Decision(False, 0, allow_at - now), tat
+    return Decision(True, int((now - allow_at) // rate.interval), 0.0), new_tat
+
+
+class CacheBackend:
+    """GCRA на Django cache: get + set под локом процесса."""
+
+    name = "cache"
+
+    def __init__(self, cache_backend=None):
+        self.cache = cache_backend or cache
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, rate: Rate, cost: int = 1, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        with self._lock:
+            decision, new_tat = gcra(self.cache.get(key), now, rate, cost)
+            if decision.allowed:
+                self.cache.set(key, new_tat, timeout=math.ceil(new_tat - now) or 1)
+        return decision
+
+
+class RedisBackend:
+    """GCRA в Redis: один EVALSHA (Lua) на проверку."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+        self.script = client.register_script(GCRA_LUA)
+
+    def hit(self, key: str, rate: Rate, cost: int = 1, now: Optional[float] = None) -> Decision:
+        allowed, remaining, retry_after = self.script(
+            keys=[cache.make_key(key)], args=[rate.interval, rate.period, cost]
+        )
+        return Decision(bool(allowed), int(remaining), float(retry_after))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Redis-бэкенд при django-redis кэше, иначе — Django cache."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if getattr(settings, "USE_REDIS", False):
+                    from django_redis import get_redis_connection
+
+                    _backend = RedisBackend(get_redis_connection("default"))
+                else:
+                    _backend = CacheBackend()
+    return _backend
+
+
+def reset_backend() -> None:
+    global _backend
+    _backend = None
+
+
+def hit(scope: str, ident: str, rate, *, cost: int = 1) -> Decision:
+    """Учесть запрос ident в лимите scope. Основная точка входа для адаптеров."""
+    rate = Rate.parse(rate)
+    backend = get_backend()
+    started = time.perf_counter()
+    try:
+        decision = backend.hit(f"{KEY_PREFIX}:{scope}:{ident}", rate, cost)
+    except Exception:
+        # Недоступный Redis не должен ронять запросы (как IGNORE_EXCEPTIONS
+        # у кэша): пропускаем и учитываем в метрике.
+        DECISIONS.labels(scope=scope, decision="error").inc()
+        return Decision(True, rate.limit, 0.0)
+    finally:
+        CHECK_SECONDS.labels(backend=backend.name).observe(time.perf_counter() - started)
+    DECISIONS.labels(scope=scope, decision="allow" if decision.allowed else "deny").inc()
+    return decision
+
+
+class RouteTrie:
+    """Префиксное дерево путей по сегментам: путь → самое длинное правило.
+
+    Префиксы сопоставляются по границам сегментов ("/chat/conversation/"
+    покрывает "/chat/conversation/5/"), поиск — один проход по сегментам
+    пути без перебора правил.
+    """
+
+    _RULE = object()
+
+    def __init__(self, routes: Dict[str, object]):
+        self._root: dict = {}
+        for prefix, value in routes.items():
+            node = self._root
+            for segment in self._segments(prefix):
+                node = node.setdefault(segment, {})
+            node[self._RULE] = (prefix, value)
+
+    @staticmethod
+    def _segments(path: str) -> Iterable[str]:
+        return [segment for segment in path.split("/") if segment]
+
+    def match(self, path: str) -> Optional[Tuple[str, object]]:
+        """(префикс, значение) самого длинного совпавшего правила или None."""
+        node = self._root
+        found = node.get(self._RULE)
+        for segment in self._segments(path):
+            node = node.get(segment)
+            if node is None:
+                break
+            found = node.get(self._RULE, found)
+        return found
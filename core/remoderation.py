@@ -0,0 +1,226 @@
+"""
+Фоновая перепроверка объявлений и сообщений после смены правил AutoModerator.
+
+Версия правил — sha1 скомпилированного regex AutoModerator. На каждую
+пару (тип контента, версия) заводится RemoderationJob; завершённая задача
+повторно не запускается, пока правила не изменятся.
+
+Проход:
+    1. строки читаются .iterator() по возрастанию pk начиная с
+       job.last_pk и режутся на порции по batch_size (keyset — без OFFSET);
+    2. тексты порций проверяются AutoModerator.check_texts в пуле процессов
+       (ProcessPoolExecutor, workers штук, не больше 2 × workers порций
+       в полёте); в демоническом процессе (prefork-воркер Celery) — в
+       текущем процессе;
+    3. результаты порции применяются bulk-операциями в одной транзакции
+       вместе с сохранением прогресса: cancelled — одним UPDATE без save(),
+       очередь модерации и логи — bulk_create, кэш каталога — один сброс
+       на порцию.
+
+Прерванная задача (ошибка, рестарт, лимит max_batches) продолжается с
+job.last_pk. Параллельный запуск для одного типа контента исключён
+блокировкой в кэше.
+
+Объявления, которые модератор уже одобрил (ModerationQueue.approved),
+повторно не блокируются и не ставятся в очередь.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core import automoderation
+from core.moderation_models import ModerationQueue, RemoderationJob
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "remoderation:lock:{content_type}"
+LOCK_TTL = 60 * 60
+
+# Статусы объявлений, которые перепроверяются (и могут быть заблокированы).
+LISTING_STATUSES = ("active",)
+
+
+def rules_version() -> str:
+    pattern = automoderation.auto_moderator.matcher.pattern
+    return hashlib.sha1(pattern.encode("utf-8")).hexdigest()
+
+
+def _source(content_type: str):
+    """(queryset, поля values_list, текст строки) для типа контента."""
+    if content_type == "listing":
+        from listings.models import Listing
+
+        return (
+            Listing.objects.filter(status__in=LISTING_STATUSES),
+            ("pk", "seller_id", "title", "description"),
+            lambda row: f"{row[2]} {row[3]}",
+        )
+    if content_type == "message":
+        from chat.models import Message
+
+        return Message.objects.all(), ("pk", "sender_id", "content"), lambda row: row[2]
+    raise ValueError(f"Неизвестный тип контента: {content_type}")
+
+
+class _InlineExecutor:
+    """Исполнитель в текущем процессе с интерфейсом Executor.submit."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _executor(workers: int):
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return _InlineExecutor()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _scanned(chunks, pool, text_of, ahead):
+    """(порция, результаты) по порядку; не больше ahead порций в полёте."""
+    pending = deque()
+    for chunk in chunks:
+        texts = [text_of(row) for row in chunk]
+        pending.append((chunk, pool.submit(automoderation.check_texts, texts)))
+        if len(pending) > ahead:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+    while pending:
+        chunk, future = pending.popleft()
+        yield chunk, future.result()
+
+
+def _apply(job: RemoderationJob, chunk, results) -> None:
+    moderator = automoderation.auto_moderator
+    entries = [(row[0], row[1], result) for row, result in zip(chunk, results)]
+
+    if job.content_type == "listing":
+        approved = set(
+            ModerationQueue.objects.filter(
+                content_type="listing",
+                status="approved",
+                content_id__in=[row[0] for row in chunk],
+            ).values_list("content_id", flat=True)
+        )
+        entries = [entry for entry in entries if entry[0] not in approved]
+        outcomes = moderator.apply_listing_results(entries, block_statuses=LISTING_STATUSES)
+        job.flagged += sum(1 for outcome in outcomes.values() if outcome == "flagged")
+        job.blocked += sum(1 for outcome in outcomes.values() if outcome == "blocked")
+    else:
+        outcomes = moderator.apply_message_results(entries)
+        job.flagged += sum(1 for outcome in outcomes.values() if outcome == "warned")
+        job.blocked += sum(1 for outcome in outcomes.values() if outcome == "blocked")
+
+    job.last_pk = chunk[-1][0]
+    job.scanned += len(chunk)
+    job.save(update_fields=["last_pk", "scanned", "flagged", "blocked", "updated_at"])
+
+
+def get_job(content_type: str, *, restart: bool = False) -> RemoderationJob:
+    """Задача для текущей версии правил (restart — начать заново)."""
+    job, created = RemoderationJob.objects.get_or_create(
+        content_type=content_type, rules_version=rules_version()
+    )
+    if restart and not created:
+        job.status = "running"
+        job.last_pk = job.scanned = job.flagged = job.blocked = 0
+        job.error = ""
+        job.finished_at = None
+        job.save()
+    return job
+
+
+def run(
+    content_type: str = "listing",
+    *,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    restart: bool = False,
+) -> Optional[RemoderationJob]:
+    """Перепроверить контент текущими правилами (или продолжить прерванную задачу).
+
+    Returns:
+        RemoderationJob или None, если задача уже выполняется другим процессом.
+    """
+    batch_size = batch_size or getattr(settings, "REMODERATION_BATCH_SIZE", 1000)
+    if workers is None:
+        workers = getattr(settings, "REMODERATION_WORKERS", 0) or os.cpu_count() or 1
+    queryset, fields, text_of = _source(content_type)
+
+    lock = LOCK_KEY.format(content_type=content_type)
+    if not cache.add(lock, 1, timeout=LOCK_TTL):
+        logger.info("remoderation %s: already running", content_type)
+        return None
+
+    try:
+        job = get_job(content_type, restart=restart)
+        if job.status == "done":
+            return job
+
+        remaining = queryset.filter(pk__gt=job.last_pk)
+        job.status = "running"
+        job.total = job.scanned + remaining.count()
+        job.save(update_fields=["status", "total", "updated_at"])
+
+        rows = remaining.order_by("pk").values_list(*fields).iterator(chunk_size=batch_size)
+        batches = 0
+        try:
+            with _executor(workers) as pool:
+                for chunk, results in _scanned(
+                    _chunks(rows, batch_size), pool, text_of, ahead=2 * workers
+                ):
+                    with transaction.atomic():
+                        _apply(job, chunk, results)
+                    batches += 1
+                    logger.info(
+                        "remoderation %s: %s/%s flagged=%s blocked=%s",
+                        content_type,
+                        job.scanned,
+                        job.total,
+                        job.flagged,
+                        job.blocked,
+                    )
+                    if max_batches and batches >= max_batches:
+                        break
+                else:
+                    job.status = "done"
+                    job.finished_at = timezone.now()
+        except Exception as exc:
+            job.status = "failed"
+            job.error = repr(exc)
+            job.save(update_fields=["status", "error", "updated_at"])
+            raise
+
+        if job.status != "done":
+            job.status = "paused"
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        return job
+    finally:
+        cache.delete(lock)
@@ -7,7 +7,6 @@ from typing import Optional
 
 from django.conf import settings
 from django.core.mail import send_mail
-from django.db import transaction
 from django.utils.html import escape
 
 from .models import Notification
@@ -30,28 +29,6 @@ class NotificationService:
         "new_review": "email_review",
     }
 
-    @staticmethod
-    def _user_wants_email(user, notification_type: str) -> bool:
-        """Проверяет, хочет ли пользователь получать email этого типа.
-
-        Если у пользователя нет NotificationSettings — считаем согласие
-        (default=True в модели). Если поле не маппится — отправляем.
-        """
-        if not user.email:
-            return False
-        field_name = NotificationService.EMAIL_PREFERENCE_MAP.get(notification_type)
-        if not field_name:
-            return True
-        try:
-            from core.models_notifications import NotificationSettings
-
-            settings_obj = NotificationSettings.objects.filter(user=user).first()
-            if settings_obj is None:
-                return True
-            return bool(getattr(settings_obj, field_name, True))
-        except Exception:
-            return True
-
     @staticmethod
     def create_and_notify(
         user,
@@ -66,7 +43,8 @@ class NotificationService:
         Создает уведомление в БД и опционально отправляет email.
 
         P2-24: уважает NotificationSettings пользователя — если он отключил
-        email-уведомления данного типа, отправка пропускается.
+        email-уведомления данного типа, отправка пропускается; при сводках
+        hourly/daily уведомление попадёт в сводку, а не в отдельное письмо.
 
         Args:
             user: Пользователь-получатель
@@ -81,46 +59,57 @@ class NotificationService:
         Returns:
             Созданное уведомление
         """
+        from core import notification_dispatch
+
         notification = Notification.objects.create(
             user=user, notification_type=notification_type, title=title, message=message, link=link
         )
 
-        # Учитываем пользовательские настройки
-        if send_email and not NotificationService._user_wants_email(user, notification_type):
-            send_email = False
-
-        # Отправляем email асинхронно через Celery если требуется
-        if send_email and user.email:
-            try:
-                # Используем Celery для асинхронной отправки
-                from core.tasks import send_email_async
-
-                # Формируем email
-                email_subject = f"{title} - LootLink"
-                email_body = NotificationService._format_email_body(user, message, link)
-
-                # Phase 13: откладываем .delay() до фактического коммита БД,
-                # иначе worker может попытаться отправить email о сущности,
-                # которая ещё не видна в реплике (или будет откатана).
-                user_email = user.email
-                transaction.on_commit(
-                    lambda: send_email_async.delay(email_subject, email_body, user_email)
-                )
-            except Exception as e:
-                # Fallback на синхронную отправку если Celery недоступен
-                try:
-                    NotificationService._send_notification_email(
-                        user=user, title=title, message=message, link=link
-                    )
-                except Exception as email_error:
-                    # Логируем ошибку но не ломаем функциональность
-                    import logging
-
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Ошибка отправки email уведомления: {email_error}")
+        # Email / Telegram / push — пачками в Celery после коммита; email
+        # учитывает настройки типов и сводки (core/notification_dispatch.py).
+        channels = getattr(settings, "NOTIFICATION_CHANNELS", notification_dispatch.CHANNELS)
+        if not send_email:
+            channels = tuple(channel for channel in channels if channel != "email")
+        notification_dispatch.deliver([notification], channels=channels)
 
         return notification
 
+    @staticmethod
+    def bulk_notify(entries, *, batch_size: int = 500) -> list:
+        """
+        Создаёт пачку in-app уведомлений одним bulk_create (без email).
+
+        Для массовых системных событий (истечение запросов, предложений),
+        где create_and_notify на каждую строку дал бы N INSERT'ов.
+        Сбрасывает закэшированные счётчики непрочитанных у получателей.
+
+        Args:
+            entries: iterable dict с ключами user_id, notification_type,
+                     title, message и опционально link
+
+        Returns:
+            Список созданных уведомлений
+        """
+        from core.header_state import invalidate_notifications
+
+        notifications = [
+            Notification(
+                user_id=entry["user_id"],
+                notification_type=entry["notification_type"],
+                title=entry["title"][:200],
+                message=entry["message"][:500],
+                link=entry.get("link", ""),
+            )
+            for entry in entries
+        ]
+        if not notifications:
+            return []
+
+        created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        # bulk_create не шлёт post_save — сбрасываем счётчики в шапке явно
+        invalidate_notifications(n.user_id for n in notifications)
+        return created
+
     @staticmethod
     def _format_email_body(user, message: str, link: str = "") -> str:
         """
@@ -144,14 +133,7 @@ class NotificationService:
 """
 
         if link:
-            # SITE_URL уже содержит схему — просто склеиваем без ручного разбора.
-            if link.startswith("/"):
-                base = settings.SITE_URL.rstrip("/")
-                full_link = f"{base}{link}"
-            else:
-                full_link = link
-
-            email_body += f"\nПерейдите по ссылке: {full_link}\n"
+            email_body += f"\nПерейдите по ссылке: {NotificationService._absolute_link(link)}\n"
 
         email_body += """
 С уважением,
@@ -159,6 +141,14 @@ class NotificationService:
 """
         return email_body
 
+    @staticmethod
+    def _absolute_link(link: str) -> str:
+        """Абсолютная ссылка на сайт для писем и мессенджеров."""
+        # SITE_URL уже содержит схему — просто склеиваем без ручного разбора.
+        if link.startswith("/"):
+            return f"{settings.SITE_URL.rstrip('/')}{link}"
+        return link
+
     @staticmethod
     def _send_notification_email(user, title: str, message: str, link: str = ""):
         """
@@ -0,0 +1,33 @@
+"""Сигналы core: инвалидация кэша состояния шапки (core/header_state.py)
+и скомпилированного набора правил антифрода (core/fraud_rules.py).
+
+Ловят save/delete кошельков, уведомлений и правил. Массовые UPDATE/bulk_*
+сигналов не шлют — там инвалидация вызывается явно.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import fraud_rules
+from core.header_state import invalidate_notifications, invalidate_wallet
+from core.models import AntiFraudRule, Notification
+from payments.models import Wallet
+
+
+@receiver(post_save, sender=Wallet)
+@receiver(post_delete, sender=Wallet)
+def _invalidate_wallet_balance(sender, instance, **kwargs) -> None:
+    invalidate_wallet([instance.user_id])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def _invalidate_unread_notifications(sender, instance, **kwargs) -> None:
+    invalidate_notifications([instance.user_id])
+
+
+@receiver(post_save, sender=AntiFraudRule)
+@receiver(post_delete, sender=AntiFraudRule)
+def _invalidate_fraud_rules(sender, instance, **kwargs) -> None:
+    transaction.on_commit(fraud_rules.bump_version)
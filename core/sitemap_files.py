@@ -0,0 +1,277 @@
+"""
+Статические sitemap-файлы: индекс + gzip-части в default storage.
+
+Вместо генерации sitemap на каждый заход краулера Celery-задача
+generate_sitemaps раскладывает разделы core.sitemaps по файлам:
+
+    sitemaps/sitemap.xml                  — индекс (отдаётся как /sitemap.xml)
+    sitemaps/sitemap-<раздел>-<N>.xml.gz  — части, отдаются как /sitemaps/<имя>
+
+Часть N раздела — строки с pk в [N × SITEMAP_PART_SIZE, (N + 1) × SITEMAP_PART_SIZE),
+поэтому изменение строки затрагивает ровно одну часть, а в части не больше
+50 000 URL (лимит протокола). Для каждой части одним GROUP BY-запросом на
+раздел считается сигнатура (число строк, max(lastmod), сумма pk); части с
+неизменной сигнатурой из manifest.json не перезаписываются. Строки
+изменившихся частей читаются потоково: .values_list() по диапазону pk
+через .iterator().
+
+Файлы отдаёт веб-сервер из MEDIA_ROOT (Caddyfile / nginx.conf); вью
+core.views.sitemap_file — запасной путь для dev и до первой генерации.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Count, F, Max, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from core import sitemaps
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+# Как в django.urls.reverse: подставленные аргументы экранируются так же.
+URL_SAFE = "-._~!$&'()*+,;=:@"
+
+
+@dataclass(frozen=True)
+class Section:
+    """Раздел sitemap: queryset + поля аргумента URL и lastmod."""
+
+    name: str
+    sitemap: type
+    url_name: str
+    url_field: str
+    lastmod_field: str
+    queryset: Callable
+
+    def url_template(self):
+        """(префикс, суффикс) пути: reverse() один раз на раздел, а не на строку."""
+        marker = "0" if self.url_field == "pk" else "sitemap-marker"
+        path = reverse(self.url_name, args=[marker])
+        prefix, _, suffix = path.rpartition(marker)
+        return prefix, suffix
+
+
+SECTIONS = (
+    Section(
+        "games",
+        sitemaps.GameSitemap,
+        "listings:game_listings",
+        "slug",
+        "created_at",
+        lambda: sitemaps.GameSitemap().items(),
+    ),
+    Section(
+        "listings",
+        sitemaps.ListingSitemap,
+        "listings:listing_detail",
+        "pk",
+        "updated_at",
+        lambda: sitemaps.ListingSitemap().items().select_related(None),
+    ),
+    Section(
+        "profiles",
+        sitemaps.ProfileSitemap,
+        "accounts:profile",
+        "username",
+        "profile__updated_at",
+        lambda: sitemaps.ProfileSitemap().items(),
+    ),
+)
+
+
+def _dir() -> str:
+    return getattr(settings, "SITEMAP_DIR", "sitemaps")
+
+
+def _part_size() -> int:
+    return getattr(settings, "SITEMAP_PART_SIZE", 50000)
+
+
+def _site_url() -> str:
+    return settings.SITE_URL.rstrip("/")
+
+
+def _path(name: str) -> str:
+    return f"{_dir()}/{name}"
+
+
+def _w3c(value) -> str:
+    return timezone.localtime(value).isoformat(timespec="seconds") if value else ""
+
+
+def _gzip(text: str) -> bytes:
+    # mtime=0 — одинаковое содержимое даёт одинаковые байты
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as archive:
+        archive.write(text.encode("utf-8"))
+    return buffer.getvalue()
+
+
+def _write(name: str, data: bytes) -> None:
+    path = _path(name)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(data))
+
+
+def _url_entry(loc, lastmod, changefreq, priority) -> str:
+    entry = f"<url><loc>{escape(loc)}</loc>"
+    if lastmod:
+        entry += f"<lastmod>{lastmod}</lastmod>"
+    return entry + f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n"
+
+
+def _urlset(entries) -> str:
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+        + "".join(entries)
+        + "</urlset>\n"
+    )
+
+
+def load_manifest() -> dict:
+    path = _path(MANIFEST_NAME)
+    if not default_storage.exists(path):
+        return {}
+    with default_storage.open(path) as handle:
+        return json.load(handle).get("parts", {})
+
+
+def _signatures(section: Section, part_size: int) -> dict:
+    """{номер части: (строк, max lastmod, сумма pk)} одним запросом на раздел."""
+    rows = (
+        section.queryset()
+        .annotate(part=F("pk") / part_size)
+        .order_by("part")
+        .values("part")
+        .annotate(rows=Count("pk"), last=Max(section.lastmod_field), checksum=Sum("pk"))
+    )
+    return {row["part"]: (row["rows"], row["last"], row["checksum"]) for row in rows}
+
+
+def _render_part(section: Section, part: int, part_size: int) -> str:
+    prefix, suffix = section.url_template()
+    site = _site_url()
+    sitemap = section.sitemap
+    rows = (
+        section.queryset()
+        .filter(pk__gte=part * part_size, pk__lt=(part + 1) * part_size)
+        .order_by("pk")
+        .values_list(section.url_field, section.lastmod_field)
+        .iterator(chunk_size=2000)
+    )
+    return _urlset(
+        _url_entry(
+            f"{site}{prefix}{quote(str(arg), safe=URL_SAFE)}{suffix}",
+            _w3c(lastmod),
+            sitemap.changefreq,
+            sitemap.priority,
+        )
+        for arg, lastmod in rows
+    )
+
+
+def _render_static() -> str:
+    sitemap = sitemaps.StaticViewSitemap()
+    site = _site_url()
+    return _urlset(
+        _url_entry(f"{site}{sitemap.location(item)}", "", sitemap.changefreq, sitemap.priority)
+        for item in sitemap.items()
+    )
+
+
+def _render_index(parts: dict) -> str:
+    site = _site_url()
+    entries = []
+    for name in sorted(parts):
+        entry = f"<sitemap><loc>{escape(f'{site}/{_dir()}/{name}')}</loc>"
+        if parts[name]["lastmod"]:
+            entry += f"<lastmod>{parts[name]['lastmod']}</lastmod>"
+        entries.append(entry + "</sitemap>\n")
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+        + "".join(entries)
+        + "</sitemapindex>\n"
+    )
+
+
+def generate(*, full: bool = False, part_size: Optional[int] = None) -> dict:
+    """
+    Обновить sitemap-файлы в storage.
+
+    Args:
+        full: Перегенерировать все части (смена SITE_URL, переименования
+            пользователей — их сигнатура не ловит)
+        part_size: Ширина диапазона pk одной части (по умолчанию SITEMAP_PART_SIZE)
+
+    Returns:
+        dict: written — перезаписанные части, kept — нетронутые, removed — удалённые
+    """
+    part_size = part_size or _part_size()
+    manifest = load_manifest()
+    previous = {} if full else manifest
+    parts = {}
+    written = []
+
+    static_name = "sitemap-static.xml.gz"
+    static_signature = json.dumps([part_size, list(sitemaps.StaticViewSitemap().items())])
+    parts[static_name] = {"signature": static_signature, "lastmod": ""}
+    if previous.get(static_name, {}).get("signature") != static_signature:
+        _write(static_name, _gzip(_render_static()))
+        written.append(static_name)
+
+    for section in SECTIONS:
+        for part, (rows, last, checksum) in sorted(_signatures(section, part_size).items()):
+            name = f"sitemap-{section.name}-{part}.xml.gz"
+            signature = json.dumps([part_size, rows, last.isoformat() if last else "", checksum])
+            parts[name] = {"signature": signature, "lastmod": _w3c(last)}
+            if previous.get(name, {}).get("signature") == signature:
+                continue
+            _write(name, _gzip(_render_part(section, part, part_size)))
+            written.append(name)
+
+    removed = sorted(set(manifest) - set(parts))
+    for name in removed:
+        default_storage.delete(_path(name))
+
+    if written or removed or not default_storage.exists(_path(INDEX_NAME)):
+        _write(INDEX_NAME, _render_index(parts).encode("utf-8"))
+    _write(
+        MANIFEST_NAME,
+        json.dumps({"generated_at": _w3c(timezone.now()), "parts": parts}).encode("utf-8"),
+    )
+
+    result = {"written": written, "kept": len(parts) - len(written), "removed": removed}
+    logger.info(
+        "sitemaps: written=%s kept=%s removed=%s",
+        len(written),
+        result["kept"],
+        len(removed),
+    )
+    return result
+
+
+def open_file(name: str):
+    """Открыть сгенерированный файл (индекс или часть) или None."""
+    if name != INDEX_NAME and not (name.startswith("sitemap-") and name.endswith(".xml.gz")):
+        return None
+    path = _path(name)
+    if "/" in name or not default_storage.exists(path):
+        return None
+    return default_storage.open(path, "rb")
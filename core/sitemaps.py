@@ -64,7 +64,11 @@ class ProfileSitemap(Sitemap):
     priority = 0.6
 
     def items(self):
-        return CustomUser.objects.filter(is_active=True, profile__is_verified=True).order_by("pk")
+        return (
+            CustomUser.objects.filter(is_active=True, profile__is_verified=True)
+            .select_related("profile")
+            .order_by("pk")
+        )
 
     def lastmod(self, obj):
         return obj.profile.updated_at if hasattr(obj, "profile") else obj.date_joined
@@ -73,6 +73,60 @@ def send_bulk_emails_async(subject: str, message: str, recipients: List[str]):
         return f"Ошибка отправки: {str(e)}"
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_notification_emails(self, messages):
+    """
+    Отправка пачки писем уведомлений через одно SMTP-соединение.
+
+    Args:
+        messages: Список [subject, body, recipient]
+
+    Неотправленные письма уходят в retry задачи, отправленные — нет.
+    """
+    from django.core.mail import EmailMessage, get_connection
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning("notification emails: smtp connect failed: %s", e)
+        raise self.retry(exc=e)
+
+    sent = 0
+    failed = []
+    try:
+        for subject, body, recipient in messages:
+            email = EmailMessage(
+                subject, body, settings.DEFAULT_FROM_EMAIL, [recipient], connection=connection
+            )
+            try:
+                sent += connection.send_messages([email]) or 0
+            except Exception:
+                logger.exception("notification email failed: recipient=%s", recipient)
+                failed.append([subject, body, recipient])
+    finally:
+        connection.close()
+
+    logger.info("notification emails: sent=%s failed=%s", sent, len(failed))
+    if failed:
+        try:
+            raise self.retry(args=[failed])
+        except self.MaxRetriesExceededError:
+            logger.error("notification emails: max retries exceeded (%s)", len(failed))
+    return sent
+
+
+@shared_task
+def send_notification_digests(frequency="daily"):
+    """
+    Сводки уведомлений для пользователей с digest_frequency hourly/daily
+    (core/notification_dispatch.py): одно письмо вместо письма на событие.
+    """
+    from . import notification_dispatch
+
+    return notification_dispatch.send_digests(frequency)
+
+
 @shared_task
 def cleanup_old_data():
     """
@@ -193,15 +247,28 @@ def cleanup_security_audit_logs(days=90):
 
     from django.utils import timezone
 
+    from . import partitioning
     from .models_audit import SecurityAuditLog
 
     threshold = timezone.now() - timedelta(days=days)
+
+    # На партиционированной таблице (PostgreSQL) целые истёкшие месяцы
+    # удаляются через DROP PARTITION — O(1) без vacuum-нагрузки.
+    # DELETE ниже дочищает только граничный месяц.
+    dropped = partitioning.drop_partitions_before(SecurityAuditLog._meta.db_table, threshold)
+
     deleted_count, _ = SecurityAuditLog.objects.filter(created_at__lt=threshold).delete()
     logger.info(
-        "cleanup_security_audit_logs: deleted=%s threshold_days=%s",
+        "cleanup_security_audit_logs: deleted=%s dropped_partitions=%s threshold_days=%s",
         deleted_count,
+        len(dropped),
         days,
     )
+    if dropped:
+        return (
+            f"Удалено {deleted_count} записей audit log старше {days} дней "
+            f"(+ партиций: {len(dropped)})"
+        )
     return f"Удалено {deleted_count} записей audit log старше {days} дней"
 
 
@@ -231,3 +298,91 @@ def cleanup_login_attempts(days=30):
         days,
     )
     return f"Удалено {deleted_count} записей неудачных входов старше {days} дней"
+
+
+@shared_task
+def maintain_partitions(months_ahead=None):
+    """
+    Заранее создаёт помесячные партиции для таблиц из settings.PARTITIONED_TABLES.
+
+    Без запаса партиций новые строки попадали бы в DEFAULT-партицию,
+    и pruning по created_at перестал бы работать. На SQLite — no-op.
+
+    Args:
+        months_ahead: На сколько месяцев вперёд создавать партиции
+            (по умолчанию settings.PARTITION_PREMAKE_MONTHS)
+    """
+    from . import partitioning
+
+    if months_ahead is None:
+        months_ahead = getattr(settings, "PARTITION_PREMAKE_MONTHS", 3)
+
+    created = partitioning.maintain(months_ahead=months_ahead)
+    total = sum(len(names) for names in created.values())
+    logger.info("maintain_partitions: created=%s months_ahead=%s", total, months_ahead)
+    return created
+
+
+@shared_task
+def evaluate_fraud_events(events):
+    """
+    Оценить пачку событий антифрода правилами AntiFraudRule (core/fraud_rules.py).
+
+    Args:
+        events: Список FraudEvent.as_dict()
+    """
+    from . import fraud_rules
+
+    verdicts = fraud_rules.evaluate(fraud_rules.FraudEvent.from_dict(event) for event in events)
+    flagged = fraud_rules.record(verdicts)
+    if flagged:
+        logger.info("evaluate_fraud_events: events=%s flagged=%s", len(verdicts), flagged)
+    return flagged
+
+
+@shared_task
+def remoderate_content(content_type="listing", max_batches=None):
+    """
+    Перепроверить контент текущими правилами AutoModerator (core/remoderation.py).
+
+    Без изменения правил завершённая задача — no-op; прерванная
+    продолжается с последнего обработанного pk.
+
+    Args:
+        content_type: "listing" или "message"
+        max_batches: Порций за запуск (по умолчанию
+            settings.REMODERATION_MAX_BATCHES_PER_RUN)
+    """
+    from . import remoderation
+
+    if max_batches is None:
+        max_batches = getattr(settings, "REMODERATION_MAX_BATCHES_PER_RUN", 50)
+
+    job = remoderation.run(content_type, max_batches=max_batches)
+    if job is None:
+        return None
+    logger.info(
+        "remoderate_content: %s status=%s scanned=%s/%s flagged=%s blocked=%s",
+        content_type,
+        job.status,
+        job.scanned,
+        job.total,
+        job.flagged,
+        job.blocked,
+    )
+    return job.status
+
+
+@shared_task
+def generate_sitemaps(full=False):
+    """
+    Обновить статические sitemap-файлы (core/sitemap_files.py): перезаписываются
+    только части, строки которых изменились с прошлого запуска.
+
+    Args:
+        full: Перегенерировать все части
+    """
+    from . import sitemap_files
+
+    result = sitemap_files.generate(full=full)
+    return {"written": len(result["written"]), "kept": result["kept"]}
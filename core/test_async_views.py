@@ -0,0 +1,107 @@
+"""Тесты async-вью и async-цепочки middleware под ASGI (AsyncClient)."""
+
+import asyncio
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from chat.views import get_new_messages
+from core.middleware_logging import get_request_id
+from core.models import Notification
+from core.views import health_ready, unread_notifications_count
+from listings.models import Category
+from listings.search_views import search_suggest
+from listings.views import get_categories_by_game
+
+
+def _run(coroutine_fn, *args, **kwargs):
+    return async_to_sync(coroutine_fn)(*args, **kwargs)
+
+
+def test_views_are_native_coroutines():
+    for view in (
+        search_suggest,
+        unread_notifications_count,
+        get_categories_by_game,
+        health_ready,
+        get_new_messages,
+    ):
+        assert asyncio.iscoroutinefunction(view), view.__name__
+
+
+def test_middleware_chain_is_async_capable():
+    # Один sync-only middleware — и Django гонит async-вью через поток
+    for path in settings.MIDDLEWARE:
+        assert getattr(import_string(path), "async_capable", False), path
+
+
+@pytest.mark.django_db
+def test_search_suggest_over_asgi(seller, listing_factory, django_assert_num_queries):
+    listing_factory(seller, title="Меч дракона", price=Decimal("10.50"))
+    client = AsyncClient()
+    url = reverse("listings:search_suggest")
+
+    response = _run(client.get, url, {"q": "дракон"})
+    assert response.status_code == 200
+    assert response.json()["listings"][0]["price"] == "10.50"
+    assert response["X-Request-ID"]
+
+    with django_assert_num_queries(0):
+        cached = _run(client.get, url, {"q": "дракон"})
+    assert cached.json() == response.json()
+    assert get_request_id() == "-"
+
+
+@pytest.mark.django_db
+def test_unread_count_over_asgi(buyer):
+    Notification.objects.create(user=buyer, notification_type="system", title="t", message="m")
+
+    async def fetch():
+        async_client = AsyncClient()
+        anonymous = await async_client.get(reverse("core:unread_notifications_count"))
+        await async_client.aforce_login(buyer)
+        return anonymous, await async_client.get(reverse("core:unread_notifications_count"))
+
+    anonymous, response = _run(fetch)
+
+    assert anonymous.status_code == 302
+    assert response.json() == {"count": 1}
+
+
+@pytest.mark.django_db
+def test_categories_and_health_over_asgi(game):
+    Category.objects.create(game=game, name="Скины", slug="skins")
+    client = AsyncClient()
+
+    categories = _run(client.get, reverse("listings:api_categories"), {"game": game.pk})
+    assert [item["name"] for item in categories.json()["categories"]] == ["Скины"]
+    assert _run(client.get, reverse("listings:api_categories")).status_code == 400
+
+    health = _run(client.get, "/health/ready/").json()
+    assert health["checks"] == {"database": "ok", "cache": "ok"}
+
+
+@pytest.mark.django_db
+def test_get_new_messages_over_asgi(
+    buyer, seller, user_factory, conversation_factory, message_factory
+):
+    conversation = conversation_factory(buyer, seller)
+    first = message_factory(conversation, seller, "Первое")
+    message_factory(conversation, seller, "Второе")
+    stranger = user_factory()
+    url = reverse("chat:get_new_messages", kwargs={"conversation_pk": conversation.pk})
+
+    async def fetch(user):
+        async_client = AsyncClient()
+        await async_client.aforce_login(user)
+        return await async_client.get(url, {"after": first.pk})
+
+    response = _run(fetch, buyer)
+    assert [item["content"] for item in response.json()["messages"]] == ["Второе"]
+    assert _run(fetch, stranger).status_code == 403
@@ -0,0 +1,77 @@
+"""Тесты асинхронной пакетной записи SecurityAuditLog (core/audit_writer.py)."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from core import audit_writer
+from core.models_audit import SecurityAuditLog
+
+
+@pytest.fixture
+def async_audit(settings, monkeypatch):
+    """Включённый async-режим со свежим буфером без фонового потока."""
+    settings.AUDIT_ASYNC = True
+    buffer = audit_writer.AuditBuffer(maxlen=5, batch_size=2, interval=3600)
+    monkeypatch.setattr(buffer, "_ensure_thread", lambda: None)
+    monkeypatch.setattr(audit_writer, "_buffer", buffer)
+    return buffer
+
+
+@pytest.mark.django_db
+def test_log_is_synchronous_when_async_disabled(settings):
+    settings.AUDIT_ASYNC = False
+
+    record = SecurityAuditLog.log(action_type="login_failed", description="sync")
+
+    assert record.pk is not None
+    assert audit_writer.queue_depth() == 0
+
+
+@pytest.mark.django_db
+def test_log_enqueues_and_flush_bulk_creates(async_audit):
+    for i in range(3):
+        record = SecurityAuditLog.log(action_type="login_failed", description=f"wave {i}")
+        assert record.pk is None
+
+    assert SecurityAuditLog.objects.count() == 0
+    assert audit_writer.queue_depth() == 3
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert audit_writer.flush() == 3
+
+    # batch_size=2 → два INSERT'а на три записи
+    inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 2
+    assert SecurityAuditLog.objects.filter(action_type="login_failed").count() == 3
+    assert audit_writer.queue_depth() == 0
+
+
+@pytest.mark.django_db
+def test_financial_events_bypass_buffer(async_audit, verified_user):
+    record = SecurityAuditLog.log(
+        action_type="escrow_release", user=verified_user, description="financial"
+    )
+
+    assert record.pk is not None
+    assert audit_writer.queue_depth() == 0
+
+
+@pytest.mark.django_db
+def test_explicit_sync_bypasses_buffer(async_audit):
+    record = SecurityAuditLog.log(action_type="login_failed", description="forced", sync=True)
+
+    assert record.pk is not None
+    assert audit_writer.queue_depth() == 0
+
+
+def test_full_buffer_evicts_oldest(async_audit):
+    dropped_before = audit_writer.DROPPED._value.get()
+
+    for i in range(7):
+        async_audit.enqueue(SecurityAuditLog(action_type="login_failed", description=str(i)))
+
+    assert len(async_audit) == 5
+    assert [r.description for r in async_audit.drain()] == ["2", "3", "4", "5", "6"]
+    assert audit_writer.DROPPED._value.get() - dropped_before == 2
@@ -4,13 +4,15 @@
 - check_text: clean/profanity/spam/scam + правильная severity
 - moderate_listing: high → cancelled, medium → ModerationQueue
 - moderate_message: high → blocked, medium → warned
+- normalize_text / find_matches: leetspeak, двойники, морфология, один проход
+- пакетные moderate_listings / moderate_messages
 """
 
 from decimal import Decimal
 
 import pytest
 
-from core.automoderation import AutoModerator, auto_moderator
+from core.automoderation import AutoModerator, auto_moderator, normalize_text
 from core.moderation_models import AutoModeration, ModerationQueue
 
 # ─────────────────────────────────────────────────────────────────────
@@ -154,3 +156,113 @@ def test_moderate_message_profanity_warns(buyer, seller, conversation_factory, m
     msg = message_factory(conv, buyer, content="бляха ну и хуйня")
     result = auto_moderator.moderate_message(msg)
     assert result == "warned"
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Нормализация и один проход
+# ─────────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    "text, normalized",
+    [
+        ("xyй", "хуй"),  # латинские двойники в кириллическом слове
+        ("fuсk", "fuck"),  # кириллическая «с» в английском слове
+        ("пи3дец", "пиздец"),
+        ("sh1t", "shit"),
+        ("х у й", "хуй"),
+        ("х.у.й", "хуй"),
+        ("бляяяяя", "бля"),
+        ("Ёжик", "ежик"),
+        ("звоните 89001234567", "звоните 89001234567"),
+        ("steam 2015 года", "steam 2015 года"),
+    ],
+)
+def test_normalize_text(text, normalized):
+    assert normalize_text(text) == normalized
+
+
+@pytest.mark.parametrize("text", ["нахуй", "отпиздить", "ХУЁВЫЙ", "п и з д е ц", "fuсking"])
+def test_check_text_profanity_morphology_and_obfuscation(mod, text):
+    result = mod.check_text(text)
+    assert [v["type"] for v in result["violations"]] == ["profanity"]
+
+
+def test_find_matches_all_categories_in_one_pass(mod):
+    matches = mod.find_matches("продам тут, предоплата обязательна, звони 89001234567, сука")
+
+    assert matches == {
+        "spam": ["продам тут", "89001234567"],
+        "scam": ["предоплата обязательна"],
+        "profanity": ["сука"],
+    }
+
+
+def test_rules_compile_to_single_pattern(mod):
+    # Одна ветка на первую букву — без отдельных regex на категорию.
+    assert mod.matcher.pattern.startswith("(?:")
+    assert set(mod.group_types.values()) == {"profanity", "spam", "scam"}
+
+
+def test_word_start_rules_do_not_match_inside_words(mod):
+    assert mod.check_text("класс, отличный bass и ассортимент")["is_clean"] is True
+
+
+@pytest.mark.parametrize("text", ["Себастьян продаёт аккаунт", "Себу привет"])
+def test_names_starting_with_s_eb_are_clean(mod, text):
+    assert mod.check_text(text)["is_clean"] is True
+
+
+def test_longer_prefixes_keep_eb_roots(mod):
+    assert [v["type"] for v in mod.check_text("заебал")["violations"]] == ["profanity"]
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Пакетный API
+# ─────────────────────────────────────────────────────────────────────
+
+
+def test_check_texts_keeps_order(mod):
+    results = mod.check_texts(["чистый текст", "предоплата обязательна", "сука"])
+    assert [r["severity"] for r in results] == ["low", "high", "medium"]
+
+
+@pytest.mark.django_db
+def test_moderate_listings_batch(seller, listing_factory, django_assert_max_num_queries):
+    clean = listing_factory(seller, title="Аккаунт", description="Хорошее состояние")
+    scam = listing_factory(seller, title="Аккаунт", description="предоплата обязательна")
+    rude = [listing_factory(seller, title="сука", description="нормально") for _ in range(3)]
+    listings = list(
+        type(clean)
+        .objects.select_related("seller")
+        .filter(pk__in=[clean.pk, scam.pk] + [listing.pk for listing in rude])
+    )
+
+    # Блокировка (save) + лог bulk_create + очередь: проверка и bulk_create.
+    with django_assert_max_num_queries(6):
+        outcomes = auto_moderator.moderate_listings(listings)
+
+    assert outcomes[clean.pk] == "approved"
+    assert outcomes[scam.pk] == "blocked"
+    assert {outcomes[listing.pk] for listing in rude} == {"flagged"}
+    assert AutoModeration.objects.count() == 4
+    assert ModerationQueue.objects.filter(content_type="listing").count() == 3
+
+    # Повторная проверка не дублирует очередь модерации.
+    auto_moderator.moderate_listings(listings)
+    assert ModerationQueue.objects.filter(content_type="listing").count() == 3
+
+
+@pytest.mark.django_db
+def test_moderate_messages_batch(buyer, seller, conversation_factory, message_factory):
+    conv = conversation_factory(buyer, seller)
+    messages = [
+        message_factory(conv, buyer, content="Привет"),
+        message_factory(conv, buyer, content="предоплата обязательна"),
+        message_factory(conv, buyer, content="ну и хуйня"),
+    ]
+
+    outcomes = auto_moderator.moderate_messages(messages)
+
+    assert [outcomes[m.id] for m in messages] == ["approved", "blocked", "warned"]
+    assert AutoModeration.objects.filter(content_type="message").count() == 2
@@ -31,10 +31,10 @@ class WalletBalanceProcessorTest(TestCase):
         result = wallet_balance_processor(request)
         self.assertEqual(result['wallet_balance'], Decimal('750.50'))
 
-    def test_creates_wallet_if_missing(self):
+    def test_missing_wallet_shows_zero_without_creating_it(self):
         user = User.objects.create_user(username='bob', password='test123', email='b@t.com')
         request = self.factory.get('/')
         request.user = user
         result = wallet_balance_processor(request)
         self.assertEqual(result['wallet_balance'], Decimal('0'))
-        self.assertTrue(Wallet.objects.filter(user=user).exists())
+        self.assertFalse(Wallet.objects.filter(user=user).exists())
@@ -0,0 +1,209 @@
+"""Тесты движка правил антифрода (core/fraud_rules.py)."""
+
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from core import fraud_rules
+from core.antifraud import AntiFraudSystem
+from core.fraud_rules import CompiledRule, FraudEvent, RuleSet
+from core.models import AntiFraudRule, SecurityAuditLog
+from listings import market_index
+
+
+def _rule(rule_id, rule_type, pattern, risk_score=50, action="flag"):
+    return CompiledRule(rule_id, rule_type, pattern, risk_score, action)
+
+
+def test_blacklists_match_exact_values_and_masks():
+    ruleset = RuleSet(
+        [
+            _rule(1, "blacklist_email", "Bad@Example.com"),
+            _rule(2, "blacklist_email", "*@tempmail.io"),
+            _rule(3, "blacklist_phone", "+7 (999) 123-45-67"),
+            _rule(4, "blacklist_phone", "+7800*"),
+        ]
+    )
+    event = FraudEvent("user_check", 1)
+
+    def hits(email="", phone=""):
+        verdict = ruleset.evaluate(event, {"email": email, "phone": phone}, None, None)
+        return [rule.id for rule in verdict.hits]
+
+    assert hits(email="bad@example.com") == [1]
+    assert hits(email="someone@tempmail.io") == [2]
+    assert hits(email="someone@tempmail.io.evil") == []
+    assert hits(phone="79991234567") == [3]
+    assert hits(phone="78005553535") == [4]
+    assert hits(email="ok@example.com", phone="79990000000") == []
+
+
+def test_threshold_rules_and_verdict_aggregation():
+    ruleset = RuleSet(
+        [
+            _rule(1, "suspicious_price", "0.3", risk_score=40, action="review"),
+            _rule(2, "suspicious_price", "0.5", risk_score=20),
+            _rule(3, "chargeback_history", "2", risk_score=70, action="block"),
+            _rule(4, "suspicious_price", "не число"),
+        ]
+    )
+    event = FraudEvent("listing_created", 1, amount=Decimal("40"), game_id=1)
+
+    verdict = ruleset.evaluate(event, {"lost_disputes": 2}, None, Decimal("100"))
+
+    assert sorted(rule.id for rule in verdict.hits) == [2, 3]
+    assert verdict.risk_score == 90
+    assert verdict.action == "block"
+    assert ruleset.size == 4
+
+
+def test_event_roundtrip_through_dict():
+    event = FraudEvent("withdrawal", 7, object_id=3, amount=Decimal("12.50"))
+
+    assert FraudEvent.from_dict(event.as_dict()) == event
+
+
+@pytest.mark.django_db
+def test_ruleset_recompiles_after_rule_change(buyer, django_capture_on_commit_callbacks):
+    assert fraud_rules.get_ruleset().size == 0
+    with CaptureQueriesContext(connection) as ctx:
+        fraud_rules.get_ruleset()
+    assert len(ctx.captured_queries) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rule = AntiFraudRule.objects.create(rule_type="blacklist_email", pattern=buyer.email)
+    assert fraud_rules.get_ruleset().size == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rule.is_active = False
+        rule.save()
+    assert fraud_rules.get_ruleset().size == 0
+
+
+@pytest.mark.django_db
+def test_evaluate_batch_uses_cached_features(user_factory, django_capture_on_commit_callbacks):
+    users = [user_factory() for _ in range(10)]
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(rule_type="blacklist_email", pattern=users[3].email)
+        AntiFraudRule.objects.create(rule_type="chargeback_history", pattern="1")
+    events = [FraudEvent("withdrawal", user.pk, amount=Decimal("10")) for user in users]
+    fraud_rules.get_ruleset()
+
+    with CaptureQueriesContext(connection) as ctx:
+        verdicts = fraud_rules.evaluate(events)
+    # Пользователи + споры + последние входы — на всю пачку.
+    assert len(ctx.captured_queries) == 3
+    assert [bool(verdict.hits) for verdict in verdicts] == [i == 3 for i in range(10)]
+
+    with CaptureQueriesContext(connection) as ctx:
+        fraud_rules.evaluate(events)
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_ip_rules_use_login_history(client, user_factory, django_capture_on_commit_callbacks):
+    users = [user_factory() for _ in range(3)]
+    for user in users:
+        # Настоящий вход: LoginHistory пишет сигнал user_logged_in
+        response = client.post(
+            reverse("accounts:login"),
+            {"username": user.username, "password": "testpass123"},
+            REMOTE_ADDR="10.0.0.7",
+        )
+        assert response.status_code == 302
+        client.logout()
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(rule_type="multiple_accounts_ip", pattern="3")
+        AntiFraudRule.objects.create(rule_type="rapid_account_creation", pattern="3/24")
+        AntiFraudRule.objects.create(rule_type="rapid_account_creation", pattern="4/24")
+
+    (verdict,) = fraud_rules.evaluate([FraudEvent("user_check", users[0].pk)])
+
+    assert sorted(str(rule) for rule in verdict.hits) == [
+        "multiple_accounts_ip:3",
+        "rapid_account_creation:3/24",
+    ]
+
+
+@pytest.mark.django_db
+def test_purchase_request_is_evaluated_after_commit(
+    buyer, active_listing, django_capture_on_commit_callbacks
+):
+    from transactions.services import create_purchase_request
+
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(
+            rule_type="blacklist_email", pattern=buyer.email, action="review"
+        )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_purchase_request(listing=active_listing, buyer=buyer)
+
+    entry = SecurityAuditLog.objects.get(action_type="suspicious_activity", user=buyer)
+    assert entry.risk_level == "high"
+    assert entry.metadata["event"]["kind"] == "purchase_request"
+    assert entry.metadata["action"] == "review"
+
+
+@pytest.mark.django_db
+def test_price_rule_uses_market_index(
+    seller, buyer, listing_factory, django_capture_on_commit_callbacks
+):
+    for _ in range(5):
+        listing_factory(seller, price=1000)
+    market_index.refresh(full=True)
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(rule_type="suspicious_price", pattern="0.3")
+    cheap = listing_factory(seller, price=100)
+
+    (verdict,) = fraud_rules.evaluate(
+        [FraudEvent("listing_created", seller.pk, amount=cheap.price, game_id=cheap.game_id)]
+    )
+
+    assert [str(rule) for rule in verdict.hits] == ["suspicious_price:0.3"]
+
+
+@pytest.mark.django_db
+def test_check_user_includes_rule_hits(buyer, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(
+            rule_type="blacklist_email", pattern=buyer.email, risk_score=60
+        )
+
+    result = AntiFraudSystem().check_user(buyer)
+
+    assert f"Правило антифрода: blacklist_email:{buyer.email}" in result["flags"]
+    assert result["risk_score"] >= 60
+
+
+@pytest.mark.django_db
+def test_backtest_reports_hits_and_throughput(
+    buyer,
+    seller,
+    listing_factory,
+    purchase_request_factory,
+    django_capture_on_commit_callbacks,
+):
+    for _ in range(3):
+        purchase_request_factory(listing_factory(seller), buyer)
+    with django_capture_on_commit_callbacks(execute=True):
+        AntiFraudRule.objects.create(rule_type="blacklist_email", pattern=buyer.email)
+
+    report = fraud_rules.backtest(batch_size=2)
+
+    assert report["events"] == 3
+    assert report["flagged"] == 3
+    assert report["by_rule"][f"blacklist_email:{buyer.email}"] == 3
+    assert report["events_per_second"] > 0
+
+
+@pytest.mark.django_db
+def test_backtest_command_prints_report(capsys):
+    call_command("backtest_fraud_rules", "--days", "0")
+
+    assert "Событий: 0" in capsys.readouterr().out
@@ -0,0 +1,104 @@
+"""Тесты кэша состояния шапки (core/header_state.py)."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from core import header_state
+from core.context_processors import notifications_processor, wallet_balance_processor
+from core.models import Notification
+from core.services import NotificationService
+from payments.models import Wallet
+
+
+def _request(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return request
+
+
+@pytest.fixture
+def wallet(buyer):
+    wallet, _ = Wallet.objects.update_or_create(
+        user=buyer, defaults={"balance": Decimal("150.00"), "frozen_balance": 0}
+    )
+    return wallet
+
+
+@pytest.mark.django_db
+def test_processors_are_lazy_and_share_one_load(buyer, wallet):
+    request = _request(buyer)
+
+    with CaptureQueriesContext(connection) as ctx:
+        context = {**wallet_balance_processor(request), **notifications_processor(request)}
+    assert len(ctx.captured_queries) == 0
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert context["wallet_balance"] == Decimal("150.00")
+        assert context["unread_notifications_count"] == 0
+    # Баланс + COUNT уведомлений, один раз на оба процессора.
+    assert len(ctx.captured_queries) == 2
+
+    with CaptureQueriesContext(connection) as ctx:
+        fresh = wallet_balance_processor(_request(buyer))
+        assert fresh["wallet_balance"] == Decimal("150.00")
+    assert len(ctx.captured_queries) == 0
+
+
+def test_anonymous_gets_zeros():
+    request = _request(AnonymousUser())
+
+    assert wallet_balance_processor(request) == {"wallet_balance": 0}
+    assert notifications_processor(request) == {"unread_notifications_count": 0}
+
+
+@pytest.mark.django_db
+def test_wallet_save_invalidates_balance(buyer, wallet, django_capture_on_commit_callbacks):
+    assert header_state.get_header_state(buyer.pk)["wallet_balance"] == Decimal("150.00")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        wallet.balance = Decimal("90.00")
+        wallet.save(update_fields=["balance"])
+
+    assert header_state.get_header_state(buyer.pk)["wallet_balance"] == Decimal("90.00")
+
+
+@pytest.mark.django_db
+def test_notification_writes_invalidate_unread(buyer, django_capture_on_commit_callbacks):
+    assert header_state.get_header_state(buyer.pk)["unread_notifications"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.create_notification(buyer, "system", "Тест", "Сообщение")
+    assert header_state.get_header_state(buyer.pk)["unread_notifications"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        NotificationService.bulk_notify(
+            [
+                {
+                    "user_id": buyer.pk,
+                    "notification_type": "system",
+                    "title": "Пачка",
+                    "message": "Сообщение",
+                }
+            ]
+        )
+    assert header_state.get_header_state(buyer.pk)["unread_notifications"] == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.mark_all_as_read(buyer)
+    assert header_state.get_header_state(buyer.pk)["unread_notifications"] == 0
+
+
+@pytest.mark.django_db
+def test_unread_count_endpoint_uses_header_state(client, buyer):
+    client.force_login(buyer)
+    Notification.create_notification(buyer, "system", "Тест", "Сообщение")
+
+    response = client.get("/notifications/unread-count/")
+
+    assert response.json() == {"count": 1}
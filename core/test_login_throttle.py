@@ -0,0 +1,140 @@
+"""Тесты счётчиков неудачных входов (core/login_throttle.py) и брутфорс-middleware."""
+
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from core import login_throttle
+from core.middleware_audit import BruteForceProtectionMiddleware
+from core.models_audit import SecurityAuditLog
+
+WINDOW = 600
+NOW = 1_000 * WINDOW  # начало корзины
+
+
+@pytest.fixture(autouse=True)
+def throttle_settings(settings):
+    settings.LOGIN_THROTTLE = {
+        "window": WINDOW,
+        "limits": {"ip": 3, "subnet": 5, "username": 4},
+    }
+
+
+def _fail(n, *, ip="203.0.113.7", username="victim", now=NOW):
+    for _ in range(n):
+        login_throttle.record_failure(ip=ip, username=username, now=now)
+
+
+def test_subnet_of_groups_ipv4_and_ipv6():
+    assert login_throttle.subnet_of("203.0.113.7") == "203.0.113.0/24"
+    assert login_throttle.subnet_of("2001:db8::1") == "2001:db8::/64"
+    assert login_throttle.subnet_of("unknown") is None
+
+
+def test_failures_are_counted_per_dimension():
+    _fail(2)
+
+    counts = login_throttle.failure_counts(ip="203.0.113.7", username=" Victim ", now=NOW)
+
+    assert counts == {"ip": 2, "subnet": 2, "username": 2}
+    assert login_throttle.exceeded(ip="203.0.113.7", now=NOW) is None
+
+    _fail(1)
+    assert login_throttle.exceeded(ip="203.0.113.7", now=NOW) == ("ip", 3)
+
+
+def test_subnet_limit_catches_address_rotation():
+    for host in range(1, 6):
+        _fail(1, ip=f"203.0.113.{host}", username="")
+
+    # Новый адрес той же /24 — по IP чисто, но подсеть уже на лимите.
+    assert login_throttle.exceeded(ip="203.0.113.200", now=NOW) == ("subnet", 5)
+    assert login_throttle.exceeded(ip="198.51.100.1", now=NOW) is None
+
+
+def test_username_limit_catches_distributed_guessing():
+    for host in range(4):
+        _fail(1, ip=f"198.51.{host}.1", username="victim")
+
+    assert login_throttle.exceeded(ip="192.0.2.1", username="VICTIM", now=NOW) == ("username", 4)
+
+
+def test_previous_bucket_decays_over_window():
+    _fail(3)
+
+    # Середина следующей корзины: предыдущая учитывается с весом 0.5.
+    half = login_throttle.failure_counts(ip="203.0.113.7", now=NOW + WINDOW * 1.5)
+    assert half["ip"] == pytest.approx(1.5)
+    # Через два окна неудачи полностью выпадают.
+    assert login_throttle.failure_counts(ip="203.0.113.7", now=NOW + WINDOW * 2)["ip"] == 0
+
+
+def test_reset_clears_username_only():
+    _fail(3)
+
+    login_throttle.reset(username="victim", now=NOW)
+
+    counts = login_throttle.failure_counts(ip="203.0.113.7", username="victim", now=NOW)
+    assert counts["username"] == 0
+    assert counts["ip"] == 3
+
+
+@pytest.mark.django_db
+class TestBruteForceProtectionMiddleware:
+    def _call(self, ip="203.0.113.7", username="victim"):
+        request = RequestFactory().post("/accounts/login/", {"username": username}, REMOTE_ADDR=ip)
+        middleware = BruteForceProtectionMiddleware(lambda r: HttpResponse("OK"))
+        return middleware(request)
+
+    def test_blocks_after_signal_counted_failures(self):
+        request = RequestFactory().post("/accounts/login/", REMOTE_ADDR="203.0.113.7")
+        request.user = AnonymousUser()
+        for _ in range(3):
+            user_login_failed.send(
+                sender=__name__, credentials={"username": "victim"}, request=request
+            )
+
+        assert self._call().status_code == 403
+        assert self._call(ip="198.51.100.1", username="other").status_code == 200
+
+    def test_block_is_audited_once_per_window(self):
+        _fail(3, now=None)
+
+        for _ in range(5):
+            assert self._call().status_code == 403
+
+        assert (
+            SecurityAuditLog.objects.filter(
+                action_type="suspicious_activity", ip_address="203.0.113.7"
+            ).count()
+            == 1
+        )
+
+    def test_successful_login_resets_username_counter(self, verified_user):
+        _fail(4, ip="", username=verified_user.username, now=None)
+        assert self._call(ip="192.0.2.1", username=verified_user.username).status_code == 403
+
+        user_logged_in.send(sender=__name__, request=None, user=verified_user)
+
+        assert self._call(ip="192.0.2.1", username=verified_user.username).status_code == 200
+
+    def test_other_paths_are_not_checked(self):
+        _fail(3, now=None)
+        request = RequestFactory().post("/listings/", REMOTE_ADDR="203.0.113.7")
+
+        response = BruteForceProtectionMiddleware(lambda r: HttpResponse("OK"))(request)
+
+        assert response.status_code == 200
+
+
+def test_bench_login_throttle_command_runs():
+    out = StringIO()
+    call_command("bench_login_throttle", steps=[10], checks=5, stdout=out)
+
+    assert "throttle p50" in out.getvalue()
@@ -0,0 +1,92 @@
+"""Тесты полностраничного кэша для анонимов (core/middleware_pagecache.py)."""
+
+import re
+
+from django.http import QueryDict
+from django.middleware.csrf import _unmask_cipher_token
+from django.urls import reverse
+
+import pytest
+
+from core import middleware_pagecache
+
+
+@pytest.fixture(autouse=True)
+def page_cache(settings):
+    settings.ANON_PAGE_CACHE_ENABLED = True
+    settings.ANON_PAGE_CACHE_TTL = 60
+
+
+def _csrf_meta(response):
+    return re.search(rb'name="csrf-token" content="([^"]+)"', response.content).group(1).decode()
+
+
+def test_normalized_query_sorts_and_drops_tracking():
+    query = QueryDict("utm_source=vk&b=2&a=1&gclid=xyz")
+
+    assert middleware_pagecache.normalized_query(query) == "a=1&b=2"
+
+
+@pytest.mark.django_db
+def test_anonymous_hit_skips_database(client, active_listing, django_assert_num_queries):
+    url = reverse("listings:listing_detail", args=[active_listing.pk])
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "X-Page-Cache" not in first
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+
+    assert second.status_code == 200
+    assert second["X-Page-Cache"] == "hit"
+    assert active_listing.title.encode() in second.content
+    assert middleware_pagecache.CSRF_PLACEHOLDER not in second.content
+
+
+@pytest.mark.django_db
+def test_hit_renders_token_for_visitor_cookie(client, active_listing):
+    url = reverse("listings:listing_detail", args=[active_listing.pk])
+    client.get(url)
+
+    client.cookies.clear()
+    response = client.get(url)
+
+    assert response["X-Page-Cache"] == "hit"
+    # Новый посетитель получает свой секрет в cookie, и токен в разметке
+    # соответствует именно ему.
+    from django.conf import settings
+
+    secret = response.cookies[settings.CSRF_COOKIE_NAME].value
+    assert _unmask_cipher_token(_csrf_meta(response)) == secret
+
+
+@pytest.mark.django_db
+def test_listing_change_invalidates_pages(client, active_listing):
+    url = reverse("listings:listing_detail", args=[active_listing.pk])
+    client.get(url)
+
+    active_listing.title = "Обновлённый заголовок"
+    active_listing.save()
+    response = client.get(url)
+
+    assert "X-Page-Cache" not in response
+    assert "Обновлённый заголовок".encode() in response.content
+
+
+@pytest.mark.django_db
+def test_logged_in_user_bypasses_cache(client, active_listing, buyer):
+    url = reverse("listings:listing_detail", args=[active_listing.pk])
+    client.get(url)
+
+    client.force_login(buyer)
+    response = client.get(url)
+
+    assert "X-Page-Cache" not in response
+
+
+@pytest.mark.django_db
+def test_uncached_routes_are_not_stored(client, settings):
+    settings.ANON_PAGE_CACHE_ROUTES = ("listings:catalog",)
+    client.get(reverse("listings:home"))
+
+    assert "X-Page-Cache" not in client.get(reverse("listings:home"))
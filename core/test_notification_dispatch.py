@@ -0,0 +1,199 @@
+"""Тесты рассылки уведомлений по каналам (core/notification_dispatch.py)."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core import mail
+from django.utils import timezone
+
+import pytest
+from pywebpush import WebPushException
+
+from core import notification_dispatch
+from core.models import Notification
+from core.models_notifications import NotificationSettings, PushSubscription
+from core.services import NotificationService
+
+
+def _entry(user, notification_type="purchase_request", title="Новый запрос"):
+    return {
+        "user_id": user.pk,
+        "notification_type": notification_type,
+        "title": title,
+        "message": "Покупатель хочет купить товар",
+        "link": "/transactions/",
+    }
+
+
+@pytest.mark.django_db
+def test_notify_honors_email_preferences_and_digests(
+    user_factory, django_capture_on_commit_callbacks
+):
+    realtime, muted, digest = (user_factory() for _ in range(3))
+    NotificationSettings.objects.create(user=muted, email_purchase_request=False)
+    NotificationSettings.objects.create(user=digest, digest_frequency="daily")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        created = notification_dispatch.notify(
+            [_entry(user) for user in (realtime, muted, digest)], channels=("email",)
+        )
+
+    assert len(created) == 3
+    assert Notification.objects.count() == 3
+    assert [message.to for message in mail.outbox] == [[realtime.email]]
+    assert mail.outbox[0].subject == "Новый запрос - LootLink"
+
+
+@pytest.mark.django_db
+def test_emails_share_one_smtp_connection(user_factory, django_capture_on_commit_callbacks):
+    from django.core.mail import get_connection
+
+    users = [user_factory() for _ in range(5)]
+
+    with patch("django.core.mail.get_connection", wraps=get_connection) as connect:
+        with django_capture_on_commit_callbacks(execute=True):
+            notification_dispatch.notify([_entry(user) for user in users], channels=("email",))
+
+    assert connect.call_count == 1
+    assert len(mail.outbox) == 5
+
+
+@pytest.mark.django_db
+def test_deliver_query_count_does_not_grow_with_recipients(
+    user_factory, django_assert_max_num_queries, settings
+):
+    settings.TELEGRAM_BOT_TOKEN = "token"
+    settings.VAPID_PRIVATE_KEY = "key"
+    notifications = [
+        Notification.objects.create(
+            user=user_factory(), notification_type="system", title="t", message="m"
+        )
+        for _ in range(10)
+    ]
+    notifications = list(Notification.objects.filter(pk__in=[n.pk for n in notifications]))
+
+    # Настройки, пользователи, Telegram chat_id, push-подписки.
+    with django_assert_max_num_queries(4):
+        notification_dispatch.deliver(notifications)
+
+
+@pytest.mark.django_db
+def test_daily_digest_sends_one_email(user_factory, django_capture_on_commit_callbacks):
+    seller = user_factory()
+    NotificationSettings.objects.create(user=seller, digest_frequency="daily")
+    with django_capture_on_commit_callbacks(execute=True):
+        notification_dispatch.notify(
+            [_entry(seller, title=f"Запрос #{i}") for i in range(30)], channels=("email",)
+        )
+    assert mail.outbox == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert notification_dispatch.send_digests("daily") == 1
+
+    (digest,) = mail.outbox
+    assert digest.to == [seller.email]
+    assert digest.subject == "Сводка уведомлений: 30 новых - LootLink"
+    assert "Запрос #29" in digest.body
+    assert "…и ещё 10" in digest.body
+    assert NotificationSettings.objects.get(user=seller).last_digest_at is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert notification_dispatch.send_digests("daily") == 0
+
+
+@pytest.mark.django_db
+def test_digest_skips_read_old_and_muted_notifications(user_factory):
+    user = user_factory()
+    prefs = NotificationSettings.objects.create(
+        user=user, digest_frequency="hourly", email_price_offer=False
+    )
+    NotificationService.bulk_notify(
+        [_entry(user), _entry(user, "price_offer"), _entry(user, title="Прочитано")]
+    )
+    Notification.objects.filter(title="Прочитано").update(is_read=True)
+    prefs.last_digest_at = timezone.now() - timedelta(minutes=5)
+    prefs.save()
+    Notification.objects.create(user=user, notification_type="system", title="Старое", message="m")
+    Notification.objects.filter(title="Старое").update(
+        created_at=timezone.now() - timedelta(hours=2)
+    )
+
+    with patch("core.tasks.send_notification_emails.delay") as delay:
+        with patch("core.notification_dispatch.transaction.on_commit", lambda fn: fn()):
+            notification_dispatch.send_digests("hourly")
+
+    (messages,), _ = delay.call_args
+    assert len(messages) == 1
+    assert "Новые уведомления за час: 1." in messages[0][1]
+
+
+@pytest.mark.django_db
+def test_telegram_batch_uses_pooled_session(
+    user_factory, settings, django_capture_on_commit_callbacks
+):
+    settings.TELEGRAM_BOT_TOKEN = "token"
+    users = [user_factory() for _ in range(3)]
+    for i, user in enumerate(users[:2]):
+        user.profile.telegram_chat_id = str(100 + i)
+        user.profile.telegram_notifications = True
+        user.profile.save()
+
+    session = MagicMock()
+    session.post.return_value.status_code = 200
+    with patch("core.integrations.http.pooled_session", return_value=session) as pooled:
+        with django_capture_on_commit_callbacks(execute=True):
+            queued = notification_dispatch.deliver(
+                notification_dispatch.notify([_entry(user) for user in users], channels=()),
+                channels=("telegram",),
+            )
+
+    assert queued == {"telegram": 2}
+    pooled.assert_called_once_with("telegram")
+    assert [call.kwargs["json"]["chat_id"] for call in session.post.call_args_list] == [
+        "100",
+        "101",
+    ]
+    assert "<b>Новый запрос</b>" in session.post.call_args.kwargs["json"]["text"]
+
+
+@pytest.mark.django_db
+def test_push_batch_deactivates_gone_subscriptions(
+    user_factory, settings, django_capture_on_commit_callbacks
+):
+    settings.VAPID_PRIVATE_KEY = "key"
+    user = user_factory()
+    live, gone = (
+        PushSubscription.objects.create(user=user, subscription_info={"endpoint": endpoint})
+        for endpoint in ("https://push/1", "https://push/2")
+    )
+
+    def fake_webpush(subscription_info, **kwargs):
+        if subscription_info["endpoint"] == "https://push/2":
+            raise WebPushException("gone", response=MagicMock(status_code=410))
+
+    with patch("accounts.utils_push.webpush", side_effect=fake_webpush) as webpush:
+        with django_capture_on_commit_callbacks(execute=True):
+            queued = notification_dispatch.deliver(
+                notification_dispatch.notify([_entry(user)], channels=()), channels=("push",)
+            )
+
+    assert queued == {"push": 2}
+    assert webpush.call_count == 2
+    sessions = {call.kwargs["requests_session"] for call in webpush.call_args_list}
+    assert len(sessions) == 1
+    live.refresh_from_db()
+    gone.refresh_from_db()
+    assert live.is_active and not gone.is_active
+
+
+@pytest.mark.django_db
+def test_create_and_notify_routes_through_dispatcher(
+    verified_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        NotificationService.create_and_notify(
+            verified_user, "system", "Без письма", "m", send_email=False
+        )
+        NotificationService.create_and_notify(verified_user, "system", "С письмом", "m")
+
+    assert [message.subject for message in mail.outbox] == ["С письмом - LootLink"]
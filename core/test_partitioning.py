@@ -0,0 +1,87 @@
+"""Тесты помесячного партиционирования core/partitioning.py.
+
+Покрывают:
+- вычисление границ и имён партиций (чистые функции)
+- no-op поведение на SQLite: ensure/drop/convert ничего не делают
+- management-команду manage_partitions и beat-задачу maintain_partitions
+"""
+
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+
+import pytest
+
+from core import partitioning
+from core.tasks import maintain_partitions
+
+# ─────────────────────────────────────────────────────────────────────
+# Границы партиций
+# ─────────────────────────────────────────────────────────────────────
+
+
+def test_add_months_crosses_year_boundary():
+    assert partitioning.add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert partitioning.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_for_datetime_uses_month_range():
+    partition = partitioning.partition_for("core_securityauditlog", datetime(2026, 2, 17, 23, 59))
+
+    assert partition.name == "core_securityauditlog_p202602"
+    assert partition.start == date(2026, 2, 1)
+    assert partition.end == date(2026, 3, 1)
+
+
+def test_parse_partition_name_roundtrip():
+    partition = partitioning.partition_for("payments_transaction", date(2026, 12, 5))
+
+    assert partitioning.parse_partition_name("payments_transaction", partition.name) == partition
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "payments_transaction_default",
+        "payments_transaction_legacy",
+        "core_securityauditlog_p202601",
+    ],
+)
+def test_parse_partition_name_ignores_foreign_tables(name):
+    assert partitioning.parse_partition_name("payments_transaction", name) is None
+
+
+# ─────────────────────────────────────────────────────────────────────
+# SQLite: всё no-op
+# ─────────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="проверка fallback для SQLite")
+def test_operations_are_noop_without_postgres():
+    table = "core_securityauditlog"
+
+    assert partitioning.is_partitioned(table) is False
+    assert partitioning.ensure_partitions(table) == []
+    assert partitioning.drop_partitions_before(table, date(2030, 1, 1)) == []
+    assert partitioning.convert_to_partitioned(table) is False
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="проверка fallback для SQLite")
+def test_manage_partitions_command_reports_unsupported():
+    out = StringIO()
+    call_command("manage_partitions", stdout=out)
+
+    assert "только на PostgreSQL" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_maintain_partitions_task_returns_per_table_result(settings):
+    settings.PARTITIONED_TABLES = {"core_securityauditlog": "created_at"}
+
+    result = maintain_partitions(months_ahead=1)
+
+    assert set(result) == {"core_securityauditlog"}
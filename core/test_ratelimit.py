@@ -0,0 +1,119 @@
+"""Тесты единого rate-limit движка (core/ratelimit.py) и его адаптеров."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import BurstRateThrottle, CreateRateThrottle
+from core import ratelimit
+from core.middleware import SimpleRateLimitMiddleware
+
+
+@pytest.fixture(autouse=True)
+def cache_backend():
+    ratelimit.reset_backend()
+    yield
+    ratelimit.reset_backend()
+
+
+@pytest.mark.parametrize(
+    "rate,expected",
+    [
+        ("60/minute", (60, 60)),
+        ("100/hour", (100, 3600)),
+        ("5/5m", (5, 300)),
+        ((3, 600), (3, 600)),
+    ],
+)
+def test_rate_parse(rate, expected):
+    parsed = ratelimit.Rate.parse(rate)
+    assert (parsed.limit, parsed.period) == expected
+
+
+def test_gcra_allows_burst_then_refills_by_interval():
+    backend = ratelimit.CacheBackend()
+    rate = ratelimit.Rate(50, 60)  # интервал 1.2с — проверка допуска float
+    now = 1_000_000.0
+
+    decisions = [backend.hit("rl:test:burst", rate, now=now) for _ in range(51)]
+
+    assert all(d.allowed for d in decisions[:50])
+    assert decisions[0].remaining == 49
+    assert not decisions[50].allowed
+    assert decisions[50].retry_after == pytest.approx(1.2)
+    # Через один интервал освобождается ровно один слот.
+    assert backend.hit("rl:test:burst", rate, now=now + 1.2).allowed
+    assert not backend.hit("rl:test:burst", rate, now=now + 1.2).allowed
+
+
+def test_gcra_has_no_fixed_window_boundary_burst():
+    backend = ratelimit.CacheBackend()
+    rate = ratelimit.Rate(5, 300)
+    now = 1_000_000.0
+
+    for _ in range(5):
+        assert backend.hit("rl:test:edge", rate, now=now).allowed
+
+    # Fixed window пропустил бы ещё 5 сразу после границы окна.
+    allowed = sum(backend.hit("rl:test:edge", rate, now=now + 61).allowed for _ in range(5))
+    assert allowed == 1
+
+
+def test_route_trie_matches_longest_segment_prefix():
+    trie = ratelimit.RouteTrie(
+        {"/chat/": "chat", "/chat/conversation/": "conversation", "/accounts/login/": "login"}
+    )
+
+    assert trie.match("/chat/conversation/5/send/") == ("/chat/conversation/", "conversation")
+    assert trie.match("/chat/list/") == ("/chat/", "chat")
+    assert trie.match("/accounts/login/") == ("/accounts/login/", "login")
+    assert trie.match("/accounts/loginx/") is None
+    assert trie.match("/") is None
+
+
+def test_middleware_blocks_with_retry_after():
+    middleware = SimpleRateLimitMiddleware(lambda r: HttpResponse("OK"))
+    factory = RequestFactory()
+
+    for i in range(5):
+        request = factory.post("/notifications/mark-all-read/", REMOTE_ADDR="10.0.0.1")
+        assert middleware(request).status_code == 200
+
+    response = middleware(factory.post("/notifications/mark-all-read/", REMOTE_ADDR="10.0.0.1"))
+
+    assert response.status_code == 403
+    assert int(response["Retry-After"]) >= 1
+
+
+@pytest.mark.django_db
+def test_drf_throttle_uses_engine_and_reports_wait(verified_user):
+    class TwoPerMinute(BurstRateThrottle):
+        rate = "2/minute"
+
+    request = APIRequestFactory().get("/api/listings/")
+    request.user = verified_user
+
+    throttle = TwoPerMinute()
+    assert throttle.allow_request(request, None)
+    assert throttle.allow_request(request, None)
+    assert not throttle.allow_request(request, None)
+    assert throttle.wait() == pytest.approx(30, abs=1)
+
+
+def test_create_throttle_ignores_safe_methods():
+    request = APIRequestFactory().get("/api/listings/")
+
+    assert CreateRateThrottle().allow_request(request, None)
+
+
+def test_bench_ratelimit_command_runs():
+    out = StringIO()
+    call_command("bench_ratelimit", requests=20, stdout=out)
+
+    assert "gcra" in out.getvalue()
+    assert "route:trie" in out.getvalue()
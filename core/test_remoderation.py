@@ -0,0 +1,115 @@
+"""Тесты фоновой перепроверки контента (core/remoderation.py)."""
+
+from unittest import mock
+
+from django.core.management import call_command
+
+import pytest
+
+from core import remoderation
+from core.moderation_models import AutoModeration, ModerationQueue, RemoderationJob
+from listings.models import Listing
+
+SCAM = "предоплата обязательна без обмана"
+PROFANITY = "блять, какая хуйня"
+
+
+@pytest.fixture
+def listings(seller, listing_factory):
+    return [
+        listing_factory(seller, title="Хорошая книга", description="Отличное состояние"),
+        listing_factory(seller, title="продам", description=SCAM),
+        listing_factory(seller, title=PROFANITY, description="нормально"),
+        listing_factory(seller, title="Аккаунт", description="Быстрая передача"),
+    ]
+
+
+@pytest.mark.django_db
+def test_run_blocks_and_flags_in_bulk(listings):
+    with mock.patch.object(Listing, "save") as save:
+        job = remoderation.run(batch_size=2, workers=1)
+
+    save.assert_not_called()
+    assert job.status == "done"
+    assert (job.scanned, job.total, job.flagged, job.blocked) == (4, 4, 1, 1)
+    assert job.last_pk == listings[-1].pk
+    statuses = dict(Listing.objects.values_list("pk", "status"))
+    assert statuses[listings[1].pk] == "cancelled"
+    assert statuses[listings[2].pk] == "active"
+    assert ModerationQueue.objects.filter(content_id=listings[2].pk).count() == 1
+
+
+@pytest.mark.django_db
+def test_run_resumes_from_last_pk(listings):
+    job = remoderation.run(batch_size=2, workers=1, max_batches=1)
+
+    assert job.status == "paused"
+    assert job.scanned == 2
+    assert job.last_pk == listings[1].pk
+
+    job = remoderation.run(batch_size=2, workers=1)
+
+    assert job.status == "done"
+    assert job.scanned == 4
+    assert RemoderationJob.objects.count() == 1
+    assert AutoModeration.objects.filter(content_type="listing").count() == 2
+
+
+@pytest.mark.django_db
+def test_finished_job_is_noop_until_rules_change(listings):
+    remoderation.run(workers=1)
+    ModerationQueue.objects.all().delete()
+
+    remoderation.run(workers=1)
+    assert not ModerationQueue.objects.exists()
+
+    with mock.patch.object(remoderation, "rules_version", return_value="new-rules"):
+        job = remoderation.run(workers=1)
+    assert job.rules_version == "new-rules"
+    assert ModerationQueue.objects.filter(content_id=listings[2].pk).exists()
+
+
+@pytest.mark.django_db
+def test_approved_listings_are_skipped(seller, listing_factory):
+    listing = listing_factory(seller, title=PROFANITY, description="нормально")
+    ModerationQueue.objects.create(
+        content_type="listing", content_id=listing.pk, user=seller, status="approved"
+    )
+
+    job = remoderation.run(workers=1)
+
+    assert job.flagged == 0
+    assert ModerationQueue.objects.filter(content_id=listing.pk).count() == 1
+    assert not AutoModeration.objects.exists()
+
+
+@pytest.mark.django_db
+def test_run_skips_when_locked(listings):
+    remoderation.cache.add(remoderation.LOCK_KEY.format(content_type="listing"), 1)
+
+    assert remoderation.run(workers=1) is None
+    assert not RemoderationJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_messages_are_rechecked(buyer, seller, conversation_factory, message_factory):
+    conversation = conversation_factory(buyer, seller)
+    message_factory(conversation, buyer, "Привет, ещё продаёшь?")
+    blocked = message_factory(conversation, seller, SCAM)
+
+    call_command("remoderate", "--content", "message", "--workers", "1")
+
+    job = RemoderationJob.objects.get(content_type="message")
+    assert (job.status, job.scanned, job.blocked) == ("done", 2, 1)
+    assert AutoModeration.objects.get(content_type="message").content_id == blocked.pk
+
+
+def test_process_pool_matches_inline():
+    texts = [SCAM, PROFANITY, "обычный текст"] * 3
+
+    with remoderation._executor(2) as pool:
+        pooled = list(remoderation._scanned([texts[:4], texts[4:]], pool, str, ahead=1))
+
+    assert [result for _, results in pooled for result in results] == (
+        remoderation.automoderation.check_texts(texts)
+    )
@@ -0,0 +1,108 @@
+"""Тесты статических sitemap-файлов (core/sitemap_files.py)."""
+
+import gzip
+from pathlib import Path
+
+from django.core.management import call_command
+
+import pytest
+
+from core import sitemap_files
+from listings.models import Listing
+
+
+@pytest.fixture
+def sitemap_dir(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.SITE_URL = "https://example.test"
+    return Path(tmp_path) / "sitemaps"
+
+
+def _read(path):
+    data = path.read_bytes()
+    return gzip.decompress(data).decode() if path.suffix == ".gz" else data.decode()
+
+
+@pytest.mark.django_db
+def test_generate_writes_index_and_gzip_parts(sitemap_dir, seller, listing_factory, game):
+    listing = listing_factory(seller)
+    seller.profile.is_verified = True
+    seller.profile.save()
+
+    result = sitemap_files.generate(part_size=1000)
+
+    part = f"sitemap-listings-{listing.pk // 1000}.xml.gz"
+    assert part in result["written"]
+    index = _read(sitemap_dir / "sitemap.xml")
+    assert f"<loc>https://example.test/sitemaps/{part}</loc>" in index
+    assert "sitemap-static.xml.gz" in index
+    listings = _read(sitemap_dir / part)
+    assert f"<loc>https://example.test/listing/{listing.pk}/</loc>" in listings
+    assert "<changefreq>hourly</changefreq>" in listings
+    profiles = _read(sitemap_dir / f"sitemap-profiles-{seller.pk // 1000}.xml.gz")
+    assert f"/accounts/profile/{seller.username}/" in profiles
+    games = _read(sitemap_dir / f"sitemap-games-{game.pk // 1000}.xml.gz")
+    assert f"/game/{game.slug}/" in games
+
+
+@pytest.mark.django_db
+def test_only_changed_parts_are_rewritten(sitemap_dir, seller, listing_factory):
+    listings = [listing_factory(seller) for _ in range(4)]
+    sitemap_files.generate(part_size=2)
+
+    assert sitemap_files.generate(part_size=2)["written"] == []
+
+    changed = listings[0]
+    changed.title = "Новый заголовок"
+    changed.save()
+
+    assert sitemap_files.generate(part_size=2)["written"] == [
+        f"sitemap-listings-{changed.pk // 2}.xml.gz"
+    ]
+
+
+@pytest.mark.django_db
+def test_empty_parts_are_removed(sitemap_dir, seller, listing_factory):
+    listing = listing_factory(seller)
+    sitemap_files.generate(part_size=1000)
+    part = f"sitemap-listings-{listing.pk // 1000}.xml.gz"
+
+    Listing.objects.filter(pk=listing.pk).update(status="cancelled")
+    result = sitemap_files.generate(part_size=1000)
+
+    assert result["removed"] == [part]
+    assert not (sitemap_dir / part).exists()
+    assert part not in _read(sitemap_dir / "sitemap.xml")
+
+
+@pytest.mark.django_db
+def test_sitemap_views_serve_generated_files(client, sitemap_dir, seller, listing_factory):
+    listing_factory(seller)
+
+    # До генерации — динамический sitemap
+    response = client.get("/sitemap.xml")
+    assert response.status_code == 200
+    assert b"<urlset" in response.content
+
+    call_command("generate_sitemaps")
+
+    response = client.get("/sitemap.xml")
+    assert b"<sitemapindex" in b"".join(response.streaming_content)
+    response = client.get("/sitemaps/sitemap-static.xml.gz")
+    assert response["Content-Type"] == "application/gzip"
+    assert b"<urlset" in gzip.decompress(b"".join(response.streaming_content))
+    assert client.get("/sitemaps/manifest.json").status_code == 404
+
+
+@pytest.mark.django_db
+def test_dynamic_profile_sitemap_has_no_n_plus_one(
+    client, user_factory, django_assert_max_num_queries
+):
+    for _ in range(5):
+        user = user_factory()
+        user.profile.is_verified = True
+        user.profile.save()
+
+    with django_assert_max_num_queries(8):
+        response = client.get("/sitemap.xml")
+    assert response.content.count(b"/accounts/profile/") == 5
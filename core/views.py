@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from django.contrib.auth.decorators import login_required
@@ -7,6 +8,8 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
+from asgiref.sync import sync_to_async
+
 from .models import Notification
 
 logger = logging.getLogger(__name__)
@@ -22,13 +25,13 @@ def custom_500(request):
     return render(request, "500.html", status=500)
 
 
-def health_check(request):
+async def health_check(request):
     """Health-check для обратной совместимости — alias на /health/ready.
 
     Caddy / docker healthcheck исторически смотрят сюда. Для k8s-стиля
     отдельных liveness/readiness probes используем /health/live и /health/ready.
     """
-    return health_ready(request)
+    return await health_ready(request)
 
 
 def metrics_view(request):
@@ -77,7 +80,14 @@ def health_live(request):
     return JsonResponse({"status": "ok", "check": "live"})
 
 
-def health_ready(request):
+def _probe_database() -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return "ok"
+
+
+async def health_ready(request):
     """Readiness probe: instance готов принимать трафик.
 
     Проверяет:
@@ -87,33 +97,34 @@ def health_ready(request):
 
     503 если БД недоступна — балансер должен вывести инстанс из ротации.
     200 с warnings если Redis недоступен — приложение деградировало, но работает.
+
+    Async-вью: проверки идут параллельно, Redis — через redis.asyncio
+    (core/async_cache.py), БД — в потоке (async-драйвера у Django нет).
     """
+    from core import async_cache
+
+    database, cache_ok = await asyncio.gather(
+        sync_to_async(_probe_database)(), async_cache.aping(), return_exceptions=True
+    )
     checks = {}
     overall_ok = True
 
     # БД — критичная зависимость
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        checks["database"] = "ok"
-    except Exception as exc:
-        logger.exception("Health ready: DB probe failed")
-        checks["database"] = f"error: {exc.__class__.__name__}"
+    if isinstance(database, BaseException):
+        logger.error("Health ready: DB probe failed", exc_info=database)
+        checks["database"] = f"error: {database.__class__.__name__}"
         overall_ok = False
+    else:
+        checks["database"] = database
 
     # Redis — деградация без выхода из ротации
-    try:
-        from django.core.cache import cache
-
-        cache.set("health:ready:probe", "1", 5)
-        if cache.get("health:ready:probe") == "1":
-            checks["cache"] = "ok"
-        else:
-            checks["cache"] = "warn: read after write returned None"
-    except Exception as exc:
-        logger.warning("Health ready: cache probe failed: %s", exc)
-        checks["cache"] = f"warn: {exc.__class__.__name__}"
+    if isinstance(cache_ok, BaseException):
+        logger.warning("Health ready: cache probe failed: %s", cache_ok)
+        checks["cache"] = f"warn: {cache_ok.__class__.__name__}"
+    elif cache_ok:
+        checks["cache"] = "ok"
+    else:
+        checks["cache"] = "warn: read after write returned None"
 
     status_code = 200 if overall_ok else 503
     return JsonResponse(
@@ -208,9 +219,16 @@ def mark_all_notifications_read(request):
 
 @login_required
 @require_http_methods(["GET"])
-def unread_notifications_count(request):
-    """API endpoint для получения количества непрочитанных уведомлений (AJAX)."""
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
+async def unread_notifications_count(request):
+    """API endpoint для получения количества непрочитанных уведомлений (AJAX).
+
+    Async: опрашивается каждой открытой вкладкой, под ASGI не занимает поток.
+    """
+    from core.header_state import UNREAD_NOTIFICATIONS, aget_header_state
+
+    user = await request.auser()
+    state = await aget_header_state(user.pk, (UNREAD_NOTIFICATIONS,))
+    count = state[UNREAD_NOTIFICATIONS]
 
     return JsonResponse({"count": count})
 
@@ -228,6 +246,30 @@ def yandex_verification(request):
     return HttpResponse(html_content, content_type="text/html")
 
 
+def sitemap_file(request, name="sitemap.xml"):
+    """Сгенерированный sitemap (core/sitemap_files.py) из storage.
+
+    В проде /sitemap.xml и /sitemaps/* отдаёт веб-сервер прямо из
+    MEDIA_ROOT; вью — запасной путь (dev, S3). Пока индекс не
+    сгенерирован, /sitemap.xml строится динамически.
+    """
+    from django.contrib.sitemaps.views import sitemap
+    from django.http import FileResponse, Http404
+
+    from . import sitemap_files
+    from .sitemaps import sitemaps
+
+    handle = sitemap_files.open_file(name)
+    if handle is None:
+        if name == sitemap_files.INDEX_NAME:
+            return sitemap(request, sitemaps=sitemaps)
+        raise Http404
+    content_type = "application/xml" if name.endswith(".xml") else "application/gzip"
+    response = FileResponse(handle, content_type=content_type)
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
 def requisites(request):
     """Страница с реквизитами для платежных систем.
 
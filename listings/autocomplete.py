@@ -0,0 +1,553 @@
+"""
+Индекс автодополнения для /api/search/suggest/.
+
+Раньше каждый новый префикс (а при наборе это каждое нажатие клавиши)
+промахивался мимо 60-секундного кэша по сырому запросу и шёл в БД двумя
+icontains-сканами: Game.name и Listing.title. Теперь:
+
+Игры — GameIndex в памяти процесса. Отсортированный массив ключей
+«название с начала каждого слова» ("counter strike", "strike") и bisect:
+O(log n) на префикс, несколько микросекунд на ~770 игр. Актуальность —
+токен в кэше (GAMES_TOKEN_KEY): сигналы Game/Category его удаляют, процесс
+сверяет токен не чаще AUTOCOMPLETE_GAMES_CHECK_SECONDS и при расхождении
+перестраивает индекс одним запросом.
+
+Объявления — edge n-gram: каждое слово активного заголовка даёт префиксы
+длины MIN_PREFIX..MAX_PREFIX; префикс → множество id с весом популярности
+(просмотры + FAVORITE_WEIGHT × избранное). Запрос из нескольких слов —
+пересечение множеств по словам, лучшие SUGGEST_LIMIT по весу. Хранилище:
+
+    RedisStore  — sorted set на префикс и hash с компактными строками
+                  ответа; поиск — один EVALSHA (ZREVRANGE или
+                  ZINTERSTORE + HMGET), async через redis.asyncio;
+    MemoryStore — словари в памяти процесса (dev, тесты).
+
+Индекс обновляет сигнал listings_changed (listings/models_changes.py) —
+его шлёт журнал delta-sync на каждое изменение листинга, включая
+bulk-операции и автомодерацию, — после коммита транзакции. Популярность
+пересчитывается полной перестройкой (beat-задача
+listings.tasks.rebuild_autocomplete_index): новая версия индекса строится
+рядом с действующей, поиск переключается указателем active, правки,
+пришедшие во время постройки, дописываются в новую версию. Пока индекса
+нет совсем (первый запуск, сброс Redis), подсказки по объявлениям идут
+старым icontains-запросом, а перестройка ставится в очередь.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from asgiref.sync import sync_to_async
+
+from core import async_cache
+
+from .models import Favorite, Game, Listing, ViewHistory
+
+logger = logging.getLogger(__name__)
+
+MIN_PREFIX = 2
+MAX_PREFIX = 20
+SUGGEST_LIMIT = 5
+FAVORITE_WEIGHT = 5
+REBUILD_BATCH = 2000
+
+GAMES_TOKEN_KEY = "autocomplete:games:token"
+LISTINGS_PREFIX = "autocomplete:listings"
+REBUILD_LOCK_KEY = "autocomplete:rebuild_lock"
+REBUILD_QUEUED_KEY = "autocomplete:rebuild_queued"
+REBUILD_LOCK_TTL = 3600
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokens(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def normalize(text: str) -> str:
+    return " ".join(tokens(text))
+
+
+def edge_ngrams(title: str) -> set:
+    return {
+        token[:length]
+        for token in tokens(title)
+        for length in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1)
+    }
+
+
+# ─── Игры ────────────────────────────────────────────────────────────
+
+
+class GameIndex:
+    """Префиксный поиск по названиям игр: sorted keys + bisect."""
+
+    def __init__(self, games: Iterable[dict], token: Optional[str] = None):
+        self.token = token
+        entries = []
+        for rank, game in enumerate(games):
+            words = tokens(game["name"])
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), rank, game["name"], game["slug"]))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def search(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[dict]:
+        matches = {}
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            _, rank, name, slug = self.entries[position]
+            matches[slug] = (rank, name)
+            position += 1
+        best = sorted(matches.items(), key=lambda item: item[1][0])[:limit]
+        return [{"name": name, "slug": slug} for slug, (_, name) in best]
+
+
+_games = {"index": None, "checked_at": 0.0}
+_games_lock = threading.Lock()
+
+
+def _build_game_index(token: Optional[str]) -> GameIndex:
+    games = Game.objects.filter(is_active=True).order_by("order", "name").values("name", "slug")
+    index = GameIndex(games, token)
+    logger.debug("autocomplete games index built: entries=%s", len(index.keys))
+    return index
+
+
+def _game_index_for(token: Optional[str]) -> GameIndex:
+    with _games_lock:
+        index = _games["index"]
+        if index is None or token is None or index.token != token:
+            if token is None:
+                token = uuid.uuid4().hex
+                cache.add(GAMES_TOKEN_KEY, token, None)
+                token = cache.get(GAMES_TOKEN_KEY, token)
+            index = _games["index"] = _build_game_index(token)
+        _games["checked_at"] = time.monotonic()
+        return index
+
+
+async def agame_index() -> GameIndex:
+    index = _games["index"]
+    interval = getattr(settings, "AUTOCOMPLETE_GAMES_CHECK_SECONDS", 1)
+    if index is not None and time.monotonic() - _games["checked_at"] < interval:
+        return index
+    token = await async_cache.aget(GAMES_TOKEN_KEY)
+    if index is not None and token is not None and index.token == token:
+        _games["checked_at"] = time.monotonic()
+        return index
+    return await sync_to_async(_game_index_for)(token)
+
+
+def invalidate_games() -> None:
+    """Сбросить индекс игр во всех процессах (свой — сразу)."""
+    cache.delete(GAMES_TOKEN_KEY)
+    _games["index"] = None
+
+
+# ─── Объявления ──────────────────────────────────────────────────────
+
+
+def _key(suffix: str) -> str:
+    return async_cache.make_key(f"{LISTINGS_PREFIX}:{suffix}")
+
+
+# Ключи версии собираются внутри скрипта из указателя active: один вызов
+# вместо GET + EVALSHA. Для Redis Cluster так нельзя — у нас один узел.
+SEARCH_LUA = """
+local version = redis.call('GET', KEYS[1])
+if not version then return false end
+local base = ARGV[1] .. version .. ':'
+local limit = tonumber(ARGV[2])
+local ids
+if #ARGV == 4 then
+    ids = redis.call('ZREVRANGE', base .. 'p:' .. ARGV[4], 0, limit - 1)
+else
+    local sources = {}
+    for i = 4, #ARGV do sources[#sources + 1] = base .. 'p:' .. ARGV[i] end
+    local tmp = base .. 'tmp:' .. ARGV[3]
+    redis.call('ZINTERSTORE', tmp, #sources, unpack(sources))
+    ids = redis.call('ZREVRANGE', tmp, 0, limit - 1)
+    redis.call('DEL', tmp)
+end
+if #ids == 0 then return {} end
+return redis.call('HMGET', base .. 'docs', unpack(ids))
+"""
+
+
+class RedisStore:
+    """Версии индекса в Redis: sorted set на префикс + hash документов.
+
+    autocomplete:listings:active   — версия, по которой идёт поиск;
+    autocomplete:listings:building — версия, которую строит rebuild;
+    autocomplete:listings:<v>:...  — данные версии, <v>:dirty — id,
+                                     изменённые во время её постройки.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def _get(self, name: str) -> Optional[str]:
+        value = self.client.get(_key(name))
+        return value.decode() if isinstance(value, bytes) else value
+
+    def active(self) -> Optional[str]:
+        return self._get("active")
+
+    def building(self) -> Optional[str]:
+        return self._get("building")
+
+    def begin_build(self, version: str) -> None:
+        self.client.set(_key("building"), version)
+
+    def activate(self, version: str) -> Optional[str]:
+        """Переключить поиск на version атомарно; вернуть прежнюю версию."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.getset(_key("active"), version)
+        pipe.delete(_key("building"))
+        previous, _ = pipe.execute()
+        return previous.decode() if isinstance(previous, bytes) else previous
+
+    def abort(self, version: str) -> None:
+        self.client.delete(_key("building"))
+        self.drop(version)
+
+    def drop(self, version: str) -> None:
+        batch = []
+        for key in self.client.scan_iter(match=_key(f"{version}:*"), count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                self.client.unlink(*batch)
+                batch = []
+        if batch:
+            self.client.unlink(*batch)
+
+    def mark_dirty(self, version: str, ids: List[int]) -> None:
+        self.client.sadd(_key(f"{version}:dirty"), *ids)
+
+    def pop_dirty(self, version: str) -> List[int]:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.smembers(_key(f"{version}:dirty"))
+        pipe.delete(_key(f"{version}:dirty"))
+        members, _ = pipe.execute()
+        return [int(pk) for pk in members]
+
+    def docs(self, version: str, ids: List[int]) -> Dict[int, dict]:
+        if not ids:
+            return {}
+        raw = self.client.hmget(_key(f"{version}:docs"), ids)
+        return {pk: json.loads(value) for pk, value in zip(ids, raw) if value is not None}
+
+    def write(self, version: str, added: Dict[int, tuple], removed: Dict[int, set]) -> None:
+        """added: id → (doc, префиксы, вес); removed: id → префиксы к удалению."""
+        pipe = self.client.pipeline(transaction=False)
+        for pk, prefixes in removed.items():
+            for prefix in prefixes:
+                pipe.zrem(_key(f"{version}:p:{prefix}"), pk)
+        for pk, (doc, prefixes, score) in added.items():
+            for prefix in prefixes:
+                pipe.zadd(_key(f"{version}:p:{prefix}"), {pk: score})
+        gone = [pk for pk in removed if pk not in added]
+        if gone:
+            pipe.hdel(_key(f"{version}:docs"), *gone)
+        if added:
+            pipe.hset(
+                _key(f"{version}:docs"),
+                mapping={
+                    pk: json.dumps(doc, ensure_ascii=False) for pk, (doc, _, _) in added.items()
+                },
+            )
+        pipe.execute()
+
+    @staticmethod
+    def _search_args(prefixes: List[str], limit: int) -> tuple:
+        return [_key("active")], [_key(""), limit, uuid.uuid4().hex, *prefixes]
+
+    def search(self, prefixes: List[str], limit: int) -> Optional[List[dict]]:
+        keys, args = self._search_args(prefixes, limit)
+        result = self.client.register_script(SEARCH_LUA)(keys=keys, args=args)
+        return None if result is None else [json.loads(doc) for doc in result if doc]
+
+    @classmethod
+    async def asearch(cls, client, prefixes: List[str], limit: int) -> Optional[List[dict]]:
+        keys, args = cls._search_args(prefixes, limit)
+        result = await client.register_script(SEARCH_LUA)(keys=keys, args=args)
+        return None if result is None else [json.loads(doc) for doc in result if doc]
+
+
+class MemoryStore:
+    """Те же версии в словарях процесса (без Redis: dev, тесты).
+
+    Указатель active — в Django cache: после cache.clear() индекс
+    считается непостроенным и перестраивается из БД.
+    """
+
+    ACTIVE_KEY = f"{LISTINGS_PREFIX}:active"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # версия → (префикс → {id: вес}, id → документ)
+        self.versions: Dict[str, tuple] = {}
+        self.dirty: Dict[str, set] = {}
+        self.building_version: Optional[str] = None
+
+    def active(self) -> Optional[str]:
+        version = cache.get(self.ACTIVE_KEY)
+        return version if version in self.versions else None
+
+    def building(self) -> Optional[str]:
+        return self.building_version
+
+    def begin_build(self, version: str) -> None:
+        with self.lock:
+            self.versions[version] = ({}, {})
+            self.dirty[version] = set()
+            self.building_version = version
+
+    def activate(self, version: str) -> Optional[str]:
+        with self.lock:
+            previous = cache.get(self.ACTIVE_KEY)
+            cache.set(self.ACTIVE_KEY, version, None)
+            self.building_version = None
+            return previous
+
+    def abort(self, version: str) -> None:
+        with self.lock:
+            self.building_version = None
+        self.drop(version)
+
+    def drop(self, version: str) -> None:
+        with self.lock:
+            self.versions.pop(version, None)
+            self.dirty.pop(version, None)
+
+    def mark_dirty(self, version: str, ids: List[int]) -> None:
+        with self.lock:
+            self.dirty.setdefault(version, set()).update(ids)
+
+    def pop_dirty(self, version: str) -> List[int]:
+        with self.lock:
+            return list(self.dirty.pop(version, set()))
+
+    def docs(self, version: str, ids: List[int]) -> Dict[int, dict]:
+        documents = self.versions.get(version, ({}, {}))[1]
+        return {pk: documents[pk] for pk in ids if pk in documents}
+
+    def write(self, version: str, added: Dict[int, tuple], removed: Dict[int, set]) -> None:
+        with self.lock:
+            if version not in self.versions:
+                return
+            index, documents = self.versions[version]
+            for pk, prefixes in removed.items():
+                for prefix in prefixes:
+                    index.get(prefix, {}).pop(pk, None)
+                documents.pop(pk, None)
+            for pk, (doc, prefixes, score) in added.items():
+                for prefix in prefixes:
+                    index.setdefault(prefix, {})[pk] = score
+                documents[pk] = doc
+
+    def search(self, prefixes: List[str], limit: int) -> Optional[List[dict]]:
+        version = self.active()
+        if version is None:
+            return None
+        with self.lock:
+            index, documents = self.versions[version]
+            sets = [index.get(prefix, {}) for prefix in prefixes]
+            smallest = min(sets, key=len)
+            scored = [
+                (score, pk)
+                for pk, score in smallest.items()
+                if all(pk in candidates for candidates in sets)
+            ]
+            best = heapq.nlargest(limit, scored)
+            return [documents[pk] for _, pk in best]
+
+
+_memory_store = MemoryStore()
+
+
+def get_store():
+    if getattr(settings, "USE_REDIS", False):
+        from django_redis import get_redis_connection
+
+        return RedisStore(get_redis_connection("default"))
+    return _memory_store
+
+
+def _popularity_queryset(ids: Optional[List[int]] = None):
+    views = (
+        ViewHistory.objects.filter(listing=OuterRef("pk"))
+        .order_by()
+        .values("listing")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    favorites = (
+        Favorite.objects.filter(listing=OuterRef("pk"))
+        .order_by()
+        .values("listing")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    queryset = Listing.objects.filter(status="active")
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    return (
+        queryset.order_by("pk")
+        .annotate(
+            view_count=Coalesce(Subquery(views, output_field=IntegerField()), 0),
+            favorite_count=Coalesce(Subquery(favorites, output_field=IntegerField()), 0),
+        )
+        .values("pk", "title", "price", "game__name", "view_count", "favorite_count")
+    )
+
+
+def _entry(row: dict) -> tuple:
+    doc = {
+        "pk": row["pk"],
+        "title": row["title"],
+        "price": str(row["price"]),
+        "game__name": row["game__name"],
+    }
+    score = row["view_count"] + FAVORITE_WEIGHT * row["favorite_count"]
+    return doc, edge_ngrams(row["title"]), score
+
+
+def _reindex_into(store, version: str, ids: List[int]) -> None:
+    if not ids:
+        return
+    added = {row["pk"]: _entry(row) for row in _popularity_queryset(ids)}
+    removed = {pk: edge_ngrams(doc["title"]) for pk, doc in store.docs(version, ids).items()}
+    for pk, (_, prefixes, _) in added.items():
+        if pk in removed:
+            removed[pk] -= prefixes
+    store.write(version, added, removed)
+
+
+def reindex_listings(ids: Iterable[int]) -> None:
+    """Привести записи индекса по ids к состоянию БД (неактивные — удалить).
+
+    Идёт перестройка — ids помечаются в строящейся версии и дописываются в
+    неё после переключения (строка могла быть прочитана до правки).
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return
+    store = get_store()
+    building = store.building()
+    if building:
+        store.mark_dirty(building, ids)
+    active = store.active()
+    if active:
+        _reindex_into(store, active, ids)
+
+
+def schedule_reindex(ids: Iterable[int]) -> None:
+    ids = list(ids)
+    transaction.on_commit(lambda: reindex_listings(ids))
+
+
+def rebuild_listings() -> Optional[int]:
+    """Полная перестройка индекса объявлений (с пересчётом популярности).
+
+    Новая версия строится рядом с действующей, поиск переключается на неё
+    одной записью указателя, старая удаляется. Одновременно идёт не больше
+    одной перестройки (REBUILD_LOCK_KEY); занято — None.
+    """
+    if not cache.add(REBUILD_LOCK_KEY, 1, REBUILD_LOCK_TTL):
+        logger.info("autocomplete listings rebuild skipped: already running")
+        return None
+    store = get_store()
+    version = uuid.uuid4().hex[:12]
+    try:
+        store.begin_build(version)
+        total, batch = 0, {}
+        for row in _popularity_queryset().iterator(chunk_size=REBUILD_BATCH):
+            batch[row["pk"]] = _entry(row)
+            if len(batch) >= REBUILD_BATCH:
+                store.write(version, batch, {})
+                total += len(batch)
+                batch = {}
+        if batch:
+            store.write(version, batch, {})
+            total += len(batch)
+        previous = store.activate(version)
+        # Правки, пришедшие во время постройки, — уже в новую версию
+        _reindex_into(store, version, store.pop_dirty(version))
+        if previous and previous != version:
+            store.drop(previous)
+    except Exception:
+        store.abort(version)
+        raise
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+    logger.info("autocomplete listings index rebuilt: version=%s listings=%s", version, total)
+    return total
+
+
+def _ensure_built() -> None:
+    """Без Redis — построить сразу; с Redis — поставить задачу (одну)."""
+    if not getattr(settings, "USE_REDIS", False):
+        rebuild_listings()
+        return
+    if cache.add(REBUILD_QUEUED_KEY, 1, REBUILD_LOCK_TTL):
+        from .tasks import rebuild_autocomplete_index
+
+        rebuild_autocomplete_index.delay()
+
+
+def _search_database(query: str, limit: int) -> List[dict]:
+    rows = (
+        Listing.objects.filter(status="active", title__icontains=query)
+        .select_related("game")
+        .values("pk", "title", "price", "game__name")[:limit]
+    )
+    return [{**row, "price": str(row["price"])} for row in rows]
+
+
+async def asearch_listings(query: str, limit: int = SUGGEST_LIMIT) -> List[dict]:
+    # Однобуквенные слова («cs 2») в индекс не попадают — их не требуем
+    prefixes = list(
+        dict.fromkeys(token[:MAX_PREFIX] for token in tokens(query) if len(token) >= MIN_PREFIX)
+    )
+    if not prefixes:
+        return []
+    client = async_cache.get_client()
+    if client is not None:
+        try:
+            result = await RedisStore.asearch(client, prefixes, limit)
+        except Exception as exc:
+            logger.warning("autocomplete redis search failed: error=%s", exc)
+            return await sync_to_async(_search_database)(query, limit)
+    else:
+        result = _memory_store.search(prefixes, limit)
+        if result is None:
+            await sync_to_async(_ensure_built)()
+            result = _memory_store.search(prefixes, limit)
+    if result is None:
+        await sync_to_async(_ensure_built)()
+        result = await sync_to_async(_search_database)(query, limit)
+    return result
+
+
+async def asuggest(query: str, limit: int = SUGGEST_LIMIT) -> dict:
+    """Подсказки для строки поиска: {"games": [...], "listings": [...]}."""
+    games = (await agame_index()).search(normalize(query), limit)
+    listings = await asearch_listings(query, limit)
+    return {"games": games, "listings": listings}
@@ -0,0 +1,227 @@
+"""
+Индекс рыночных цен (MarketPriceStat): расчёт и чтение перцентилей.
+
+Выборка — листинги в статусах active/reserved/sold за последние
+MARKET_INDEX_WINDOW_DAYS дней. Для каждой пары (игра, категория) и для
+игры целиком считаются P10/P25/P50/P75/P90:
+    - PostgreSQL — percentile_cont(...) WITHIN GROUP одним GROUP BY;
+    - прочие БД — та же линейная интерполяция в Python.
+
+Обновление инкрементальное: refresh() пересчитывает только группы, в
+которых листинги менялись (updated_at) с прошлого запуска. Полный
+пересчёт (full=True) раз в сутки подхватывает листинги, выпавшие из окна.
+
+Чтение — get_stats(): get_many из кэша, промахи — одним запросом к
+MarketPriceStat.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Listing
+from .models_market import MarketPriceStat
+
+PERCENTILES = (("p10", 0.10), ("p25", 0.25), ("p50", 0.50), ("p75", 0.75), ("p90", 0.90))
+SAMPLE_STATUSES = ("active", "reserved", "sold")
+
+CACHE_PREFIX = "market_stat"
+LAST_REFRESH_KEY = "market_index:last_refresh"
+CENT = Decimal("0.01")
+
+Group = Tuple[int, Optional[int]]
+
+
+class PercentileCont(models.Aggregate):
+    """percentile_cont(fraction) WITHIN GROUP (ORDER BY expr) — PostgreSQL."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(
+            expression,
+            fraction=float(fraction),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            **extra,
+        )
+
+
+def percentile_cont(ordered, fraction):
+    """Линейная интерполяция по отсортированным значениям (как в PostgreSQL)."""
+    position = (len(ordered) - 1) * Decimal(str(fraction))
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _cache_key(group: Group) -> str:
+    game_id, category_id = group
+    return f"{CACHE_PREFIX}:{game_id}:{category_id or 0}"
+
+
+def _cache_ttl() -> int:
+    return getattr(settings, "MARKET_INDEX_CACHE_TTL", 3600)
+
+
+def _sample(now=None):
+    window = getattr(settings, "MARKET_INDEX_WINDOW_DAYS", 90)
+    since = (now or timezone.now()) - timedelta(days=window)
+    return Listing.objects.filter(status__in=SAMPLE_STATUSES, created_at__gte=since)
+
+
+def _compute(queryset, group_fields) -> Dict[Group, dict]:
+    """Перцентили по группам group_fields (game_id[, category_id])."""
+    by_category = "category_id" in group_fields
+    if connection.vendor == "postgresql":
+        rows = (
+            queryset.order_by()
+            .values(*group_fields)
+            .annotate(
+                sample_size=Count("id"),
+                **{name: PercentileCont("price", fraction) for name, fraction in PERCENTILES},
+            )
+        )
+        return {
+            (row["game_id"], row["category_id"] if by_category else None): {
+                "sample_size": row["sample_size"],
+                **{
+                    name: Decimal(row[name]).quantize(CENT, ROUND_HALF_UP)
+                    for name, _ in PERCENTILES
+                },
+            }
+            for row in rows
+        }
+
+    rows = queryset.order_by(*group_fields, "price").values_list(*group_fields, "price")
+    stats = {}
+    for key, items in groupby(rows, key=lambda row: row[:-1]):
+        prices = [row[-1] for row in items]
+        group = (key[0], key[1] if by_category else None)
+        stats[group] = {
+            "sample_size": len(prices),
+            **{
+                name: percentile_cont(prices, fraction).quantize(CENT, ROUND_HALF_UP)
+                for name, fraction in PERCENTILES
+            },
+        }
+    return stats
+
+
+def _store(groups: Iterable[Group], computed: Dict[Group, dict]) -> None:
+    """Upsert пересчитанных групп; группы без выборки удаляются."""
+    groups = set(groups)
+    game_ids = {game_id for game_id, _ in groups}
+    existing = {
+        (stat.game_id, stat.category_id): stat
+        for stat in MarketPriceStat.objects.filter(game_id__in=game_ids)
+    }
+    to_create, to_update, to_delete = [], [], []
+    for group in groups:
+        values = computed.get(group)
+        stat = existing.get(group)
+        if values is None:
+            if stat is not None:
+                to_delete.append(stat.pk)
+            continue
+        if stat is None:
+            to_create.append(MarketPriceStat(game_id=group[0], category_id=group[1], **values))
+        else:
+            for field, value in values.items():
+                setattr(stat, field, value)
+            stat.updated_at = timezone.now()
+            to_update.append(stat)
+
+    with transaction.atomic():
+        if to_delete:
+            MarketPriceStat.objects.filter(pk__in=to_delete).delete()
+        MarketPriceStat.objects.bulk_create(to_create)
+        MarketPriceStat.objects.bulk_update(
+            to_update, ["sample_size", *(name for name, _ in PERCENTILES), "updated_at"]
+        )
+
+    cache.set_many(
+        {_cache_key(group): computed.get(group) or {} for group in groups},
+        timeout=_cache_ttl(),
+    )
+
+
+def refresh(*, full: bool = False, now=None) -> dict:
+    """Пересчитать индекс: изменившиеся группы или (full=True) все."""
+    now = now or timezone.now()
+    since = None if full else cache.get(LAST_REFRESH_KEY)
+    sample = _sample(now)
+
+    if since is None:
+        game_ids = None
+        category_ids = None
+        stale = set(MarketPriceStat.objects.values_list("game_id", "category_id"))
+    else:
+        changed = set(
+            Listing.objects.filter(updated_at__gte=since)
+            .order_by()
+            .values_list("game_id", "category_id")
+            .distinct()
+        )
+        if not changed:
+            cache.set(LAST_REFRESH_KEY, now, timeout=None)
+            return {"groups": 0, "full": False}
+        game_ids = {game_id for game_id, _ in changed}
+        category_ids = {category_id for _, category_id in changed if category_id}
+        stale = changed | {(game_id, None) for game_id in game_ids}
+        sample = sample.filter(game_id__in=game_ids)
+
+    by_game = _compute(sample, ("game_id",))
+    by_category = _compute(
+        (
+            sample.filter(category_id__isnull=False)
+            if category_ids is None
+            else sample.filter(category_id__in=category_ids)
+        ),
+        ("game_id", "category_id"),
+    )
+    computed = {**by_game, **by_category}
+    groups = stale | set(computed)
+    _store(groups, computed)
+    cache.set(LAST_REFRESH_KEY, now, timeout=None)
+    return {"groups": len(groups), "full": since is None}
+
+
+def get_stats(groups: Iterable[Group]) -> Dict[Group, dict]:
+    """Статистика групп: кэш, промахи — одним запросом к MarketPriceStat.
+
+    Группы без статистики возвращаются пустым dict.
+    """
+    groups = set(groups)
+    if not groups:
+        return {}
+    cached = cache.get_many([_cache_key(group) for group in groups])
+    result = {group: cached[_cache_key(group)] for group in groups if _cache_key(group) in cached}
+    missing = groups - set(result)
+    if missing:
+        condition = Q()
+        for game_id, category_id in missing:
+            condition |= Q(game_id=game_id, category_id=category_id)
+        loaded = {
+            (stat.game_id, stat.category_id): {
+                "sample_size": stat.sample_size,
+                **{name: getattr(stat, name) for name, _ in PERCENTILES},
+            }
+            for stat in MarketPriceStat.objects.filter(condition)
+        }
+        fetched = {group: loaded.get(group, {}) for group in missing}
+        cache.set_many(
+            {_cache_key(group): values for group, values in fetched.items()},
+            timeout=_cache_ttl(),
+        )
+        result.update(fetched)
+    return result
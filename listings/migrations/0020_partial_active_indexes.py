@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0019_protect_fks"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="priceoffer",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["listing", "buyer"],
+                name="offer_listing_buyer_open_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="priceoffer",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "countered"])),
+                fields=["expires_at"],
+                name="offer_open_expires_idx",
+            ),
+        ),
+    ]
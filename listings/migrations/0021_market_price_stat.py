@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0020_partial_active_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MarketPriceStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "sample_size",
+                    models.PositiveIntegerField(default=0, verbose_name="Размер выборки"),
+                ),
+                ("p10", models.DecimalField(decimal_places=2, max_digits=10, verbose_name="P10")),
+                ("p25", models.DecimalField(decimal_places=2, max_digits=10, verbose_name="P25")),
+                (
+                    "p50",
+                    models.DecimalField(decimal_places=2, max_digits=10, verbose_name="Медиана"),
+                ),
+                ("p75", models.DecimalField(decimal_places=2, max_digits=10, verbose_name="P75")),
+                ("p90", models.DecimalField(decimal_places=2, max_digits=10, verbose_name="P90")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Обновлено")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Пусто — статистика по игре целиком",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_stats",
+                        to="listings.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+                (
+                    "game",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_stats",
+                        to="listings.game",
+                        verbose_name="Игра",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рыночная статистика цен",
+                "verbose_name_plural": "Рыночная статистика цен",
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("category__isnull", True)),
+                        fields=("game",),
+                        name="market_stat_game_uniq",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("category__isnull", False)),
+                        fields=("game", "category"),
+                        name="market_stat_game_category_uniq",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0022_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("listing_id", models.BigIntegerField(verbose_name="ID объявления")),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Создано"),
+                            ("updated", "Изменено"),
+                            ("deleted", "Удалено"),
+                        ],
+                        max_length=10,
+                        verbose_name="Действие",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Время"),
+                ),
+            ],
+            options={
+                "verbose_name": "Изменение объявления",
+                "verbose_name_plural": "Журнал изменений объявлений",
+                "ordering": ["id"],
+            },
+        ),
+    ]
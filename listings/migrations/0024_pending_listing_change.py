@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0023_listing_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingListingChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("listing_id", models.BigIntegerField(verbose_name="ID объявления")),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Создано"),
+                            ("updated", "Изменено"),
+                            ("deleted", "Удалено"),
+                        ],
+                        max_length=10,
+                        verbose_name="Действие",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Время")),
+            ],
+            options={
+                "verbose_name": "Изменение объявления (до публикации)",
+                "verbose_name_plural": "Изменения объявлений до публикации",
+            },
+        ),
+    ]
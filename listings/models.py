@@ -13,7 +13,9 @@ from core.validators import ListingImageValidator, validate_image_size, validate
 __all__ = ["validate_image_size", "validate_image_type"]
 
 # Import additional models
+from .models_changes import ListingChange, PendingListingChange  # noqa: F401
 from .models_history import ViewHistory
+from .models_market import MarketPriceStat  # noqa: F401
 
 
 class Favorite(models.Model):
@@ -292,15 +294,23 @@ class Listing(models.Model):
         ):
             return
 
-        db_alias = kwargs.get("using") or self._state.db or "default"
-        if self.pk and connections[db_alias].vendor == "postgresql":
-            from django.contrib.postgres.search import SearchVector
-
-            Listing.objects.filter(pk=self.pk).update(
-                search_vector=SearchVector("title", weight="A", config="russian")
-                + SearchVector("description", weight="B", config="russian")
+        if self.pk:
+            Listing.reindex_search_vector(
+                [self.pk], using=kwargs.get("using") or self._state.db or "default"
             )
 
+    @classmethod
+    def reindex_search_vector(cls, pks, using="default"):
+        """Пересчитать search_vector строк одним UPDATE (только PostgreSQL)."""
+        if not pks or connections[using].vendor != "postgresql":
+            return
+        from django.contrib.postgres.search import SearchVector
+
+        cls.objects.using(using).filter(pk__in=pks).update(
+            search_vector=SearchVector("title", weight="A", config="russian")
+            + SearchVector("description", weight="B", config="russian")
+        )
+
 
 class Report(models.Model):
     """
@@ -0,0 +1,122 @@
+"""
+Журнал изменений листингов для delta-sync (/api/listings/changes/).
+
+Каждое сохранение или удаление листинга дописывает строку; id строки —
+монотонная последовательность и служит курсором клиента. Чистится
+beat-задачей listings.tasks.prune_listing_changes.
+
+Курсор должен расти в порядке коммитов, а не INSERT'ов: иначе транзакция,
+которая вставила строку раньше, а закоммитилась позже (приём заявки с
+эскроу, порция перепроверки), получит id меньше уже отданных клиенту, и
+тот её не увидит. Поэтому запись в два шага:
+
+    1. record() — в той же транзакции, что и сам листинг
+       (listings/signals.py, массовые операции listings/services.py,
+       автомодерация) — пишет PendingListingChange: запись переживает
+       падение процесса и откатывается вместе с листингом;
+    2. publish_pending() — после коммита (on_commit) короткой отдельной
+       транзакцией переносит видимые, то есть уже закоммиченные, строки в
+       ListingChange; id выделяется здесь. Тот же перенос делает читатель
+       журнала (api/delta_sync.py) — на случай, если процесс упал между
+       коммитом и on_commit.
+
+Между выделением id при переносе и его коммитом остаётся короткое окно;
+его закрывает LISTING_CHANGES_SETTLE_SECONDS у читателя, а
+statement_timeout переноса ограничен четвертью этого окна.
+
+Каждая запись журнала шлёт сигнал listings_changed(listing_ids, action) —
+по нему обновляются производные структуры (индекс автодополнения).
+"""
+
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.dispatch import Signal
+
+listings_changed = Signal()
+
+PUBLISH_BATCH = 1000
+
+
+class ListingChange(models.Model):
+    """Факт изменения листинга: создание, правка или удаление."""
+
+    ACTION_CHOICES = [
+        ("created", "Создано"),
+        ("updated", "Изменено"),
+        ("deleted", "Удалено"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # Не ForeignKey: строка должна пережить удаление листинга
+    listing_id = models.BigIntegerField(verbose_name="ID объявления")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Действие")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Время")
+
+    class Meta:
+        verbose_name = "Изменение объявления"
+        verbose_name_plural = "Журнал изменений объявлений"
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} listing={self.listing_id}"
+
+    @classmethod
+    def record(cls, listing_ids: Iterable[int], action: str) -> None:
+        """Записать изменение пачки листингов одним INSERT (в журнал — после коммита)."""
+        listing_ids = list(listing_ids)
+        PendingListingChange.objects.bulk_create(
+            [
+                PendingListingChange(listing_id=listing_id, action=action)
+                for listing_id in listing_ids
+            ]
+        )
+        transaction.on_commit(cls.publish_pending)
+        listings_changed.send(sender=cls, listing_ids=listing_ids, action=action)
+
+    @classmethod
+    def publish_pending(cls) -> int:
+        """Перенести закоммиченные PendingListingChange в журнал; id — здесь."""
+        published = 0
+        # Обычно переносить нечего — без транзакции и блокировок
+        if not PendingListingChange.objects.exists():
+            return published
+        while True:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    timeout_ms = settings.LISTING_CHANGES_SETTLE_SECONDS * 1000 // 4
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL statement_timeout = %s", [max(timeout_ms, 100)])
+                pending = list(
+                    PendingListingChange.objects.select_for_update(skip_locked=True)
+                    .order_by("id")
+                    .values_list("id", "listing_id", "action")[:PUBLISH_BATCH]
+                )
+                if not pending:
+                    return published
+                cls.objects.bulk_create(
+                    [cls(listing_id=listing_id, action=action) for _, listing_id, action in pending]
+                )
+                PendingListingChange.objects.filter(id__in=[row[0] for row in pending]).delete()
+            published += len(pending)
+            if len(pending) < PUBLISH_BATCH:
+                return published
+
+
+class PendingListingChange(models.Model):
+    """Изменение листинга, ещё не получившее место в журнале (см. модуль)."""
+
+    id = models.BigAutoField(primary_key=True)
+    listing_id = models.BigIntegerField(verbose_name="ID объявления")
+    action = models.CharField(
+        max_length=10, choices=ListingChange.ACTION_CHOICES, verbose_name="Действие"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Время")
+
+    class Meta:
+        verbose_name = "Изменение объявления (до публикации)"
+        verbose_name_plural = "Изменения объявлений до публикации"
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} listing={self.listing_id}"
@@ -0,0 +1,56 @@
+"""
+Индекс рыночных цен: перцентили цен по игре и категории.
+
+Заполняется listings/market_index.py (инкрементально, beat-задачей) и
+читается антифродом вместо Avg("price") по всем листингам игры на каждый
+вызов.
+"""
+
+from django.db import models
+
+
+class MarketPriceStat(models.Model):
+    """Перцентили цен листингов игры (category=None) или категории игры."""
+
+    game = models.ForeignKey(
+        "listings.Game",
+        on_delete=models.CASCADE,
+        related_name="price_stats",
+        verbose_name="Игра",
+    )
+    category = models.ForeignKey(
+        "listings.Category",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="price_stats",
+        verbose_name="Категория",
+        help_text="Пусто — статистика по игре целиком",
+    )
+    sample_size = models.PositiveIntegerField(default=0, verbose_name="Размер выборки")
+    p10 = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="P10")
+    p25 = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="P25")
+    p50 = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Медиана")
+    p75 = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="P75")
+    p90 = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="P90")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        verbose_name = "Рыночная статистика цен"
+        verbose_name_plural = "Рыночная статистика цен"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game"],
+                condition=models.Q(category__isnull=True),
+                name="market_stat_game_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["game", "category"],
+                condition=models.Q(category__isnull=False),
+                name="market_stat_game_category_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.category.name if self.category_id else "вся игра"
+        return f"{self.game} / {scope}: медиана {self.p50} (n={self.sample_size})"
@@ -145,6 +145,18 @@ class PriceOffer(models.Model):
             models.Index(fields=['buyer', '-created_at']),
             models.Index(fields=['seller', 'status', '-created_at']),
             models.Index(fields=['listing', '-created_at']),
+            # Partial-индексы по открытым предложениям: проверка активного
+            # предложения покупателя и скан истёкших (price_offers_expire).
+            models.Index(
+                fields=['listing', 'buyer'],
+                condition=models.Q(status='pending'),
+                name='offer_listing_buyer_open_idx',
+            ),
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status__in=['pending', 'countered']),
+                name='offer_open_expires_idx',
+            ),
         ]
     
     def __str__(self):
@@ -0,0 +1,172 @@
+"""
+Кэш результатов глобального поиска /search/ (listings/search_views.py).
+
+Без кэша каждый запрос — FTS по объявлениям, Min/Max цены по всей
+выборке, COUNT пагинатора и GROUP BY игр с количеством объявлений.
+Популярные запросы («cs2», «аккаунт») повторяются тысячи раз в час.
+
+Ключ — sha1 от нормализованных параметров (search_views._search_params):
+запрос без лишних пробелов, фильтры в каноническом виде (цены как
+Decimal без хвостовых нулей, неизвестная сортировка = по умолчанию),
+отсортированные по имени. В записи — список id результата в порядке
+выдачи (первые SEARCH_CACHE_MAX_IDS), общее число и диапазон цен; фасет
+«игры с количеством объявлений» от запроса не зависит и лежит отдельным
+ключом. Запись, фасет и штампы читаются одним get_many; повторный запрос
+стоит одного MGET и выборки страницы по id.
+
+Инвалидация — грубая, штампами версий (как api/caching.py):
+    - search:stamp:game:<slug> — правка листинга игры (сигнал
+      listings_changed после коммита) устаревает все запросы с фильтром
+      по этой игре;
+    - search:stamp:all — удаление листинга и правка Game/Category
+      устаревают всё.
+Запросы без фильтра по игре на создание/правку листингов не реагируют и
+живут SEARCH_CACHE_TTL секунд; проданные за это время объявления на
+страницу не попадают (выборка по id берёт только активные).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from prometheus_client import Counter
+
+from .models import Listing
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = Counter(
+    "lootlink_search_cache_requests_total",
+    "Global search result cache lookups",
+    ["result"],
+)
+
+STAMP_ALL_KEY = "search:stamp:all"
+FACET_KEY = "search:facet:games"
+RESULT_PREFIX = "search:result:"
+
+
+def _game_stamp_key(slug: str) -> str:
+    return f"search:stamp:game:{slug}"
+
+
+def result_key(params: Dict[str, str]) -> str:
+    digest = hashlib.sha1(repr(sorted(params.items())).encode("utf-8")).hexdigest()
+    return f"{RESULT_PREFIX}{digest}"
+
+
+def bump(game_slugs: Optional[Iterable[str]] = None) -> None:
+    """Устаревить запросы по играм game_slugs (None — все записи)."""
+    now = time.time()
+    if game_slugs is None:
+        cache.set(STAMP_ALL_KEY, now, timeout=None)
+        return
+    keys = {_game_stamp_key(slug): now for slug in game_slugs}
+    if keys:
+        cache.set_many(keys, timeout=None)
+
+
+def invalidate_listings(listing_ids: Iterable[int]) -> None:
+    """После коммита правки листингов: штампы их игр (удалённые — всё)."""
+    listing_ids = set(listing_ids)
+    rows = Listing.objects.filter(pk__in=listing_ids).values_list("pk", "game__slug")
+    slugs = {slug for _, slug in rows}
+    if len(rows) < len(listing_ids):
+        bump()
+    else:
+        bump(slugs)
+
+
+class ResultWindow:
+    """object_list для Paginator: count — из записи, срез — объявления по id.
+
+    Страницы за пределами закэшированных id берут id из queryset'а
+    (OFFSET/LIMIT по той же выборке) — глубокие страницы редки.
+    """
+
+    def __init__(self, entry: dict, queryset_factory: Callable):
+        self.entry = entry
+        self.queryset_factory = queryset_factory
+
+    def count(self) -> int:
+        return self.entry["total"]
+
+    def __len__(self) -> int:
+        return self.entry["total"]
+
+    def __getitem__(self, window: slice) -> List[Listing]:
+        ids = self.entry["ids"]
+        if window.stop <= len(ids) or len(ids) == self.entry["total"]:
+            page_ids = ids[window]
+        else:
+            page_ids = list(self.queryset_factory().values_list("pk", flat=True)[window])
+        listings = Listing.objects.filter(pk__in=page_ids, status="active").select_related(
+            "seller", "seller__profile", "game", "category"
+        )
+        by_id = {listing.pk: listing for listing in listings}
+        return [by_id[pk] for pk in page_ids if pk in by_id]
+
+
+class SearchCache:
+    """Запись результата, фасет игр и штампы одного запроса — одним get_many."""
+
+    def __init__(self, params: Dict[str, str]):
+        self.enabled = getattr(settings, "SEARCH_CACHE_ENABLED", True)
+        self.key = result_key(params)
+        self.stamp_keys = [STAMP_ALL_KEY]
+        if params.get("game"):
+            self.stamp_keys.append(_game_stamp_key(params["game"]))
+        self.found = {}
+        if self.enabled:
+            self.found = cache.get_many([self.key, FACET_KEY, *self.stamp_keys])
+
+    def _stamps(self, keys: List[str]) -> Dict[str, float]:
+        # Нет штампа (сброс кэша) — заводим: всё, что лежало до него, промах
+        missing = [key for key in keys if key not in self.found]
+        if missing:
+            for key in missing:
+                cache.add(key, time.time(), timeout=None)
+            self.found.update(cache.get_many(missing))
+        return {key: self.found.get(key) for key in keys}
+
+    def _valid(self, entry: Optional[dict], keys: List[str]) -> bool:
+        return entry is not None and entry["stamps"] == {key: self.found.get(key) for key in keys}
+
+    def result(self, queryset_factory: Callable, aggregate: Callable) -> dict:
+        """{ids, total, price_range} — из кэша или посчитанные по queryset'у."""
+        entry = self.found.get(self.key)
+        if self.enabled and self._valid(entry, self.stamp_keys):
+            REQUESTS.labels(result="hit").inc()
+            return entry
+        REQUESTS.labels(result="miss" if self.enabled else "bypass").inc()
+        # Штампы — до выборки: правка во время подсчёта сделает запись промахом
+        stamps = self._stamps(self.stamp_keys) if self.enabled else {}
+        queryset = queryset_factory()
+        limit = settings.SEARCH_CACHE_MAX_IDS
+        ids = list(queryset.values_list("pk", flat=True)[:limit])
+        total = len(ids) if len(ids) < limit else queryset.count()
+        entry = {
+            "ids": ids,
+            "total": total,
+            "price_range": aggregate(queryset),
+            "stamps": stamps,
+        }
+        if self.enabled:
+            cache.set(self.key, entry, settings.SEARCH_CACHE_TTL)
+        return entry
+
+    def games_facet(self, build: Callable) -> list:
+        facet = self.found.get(FACET_KEY)
+        if self.enabled and self._valid(facet, [STAMP_ALL_KEY]):
+            return facet["games"]
+        stamps = self._stamps([STAMP_ALL_KEY]) if self.enabled else {}
+        games = list(build())
+        if self.enabled:
+            cache.set(FACET_KEY, {"games": games, "stamps": stamps}, settings.SEARCH_CACHE_TTL)
+        return games
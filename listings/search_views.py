@@ -15,128 +15,146 @@ from django.views.decorators.http import require_GET
 
 from accounts.models import Profile
 
+from . import autocomplete, search_cache
 from .models import Category, Game, Listing
 
 logger = logging.getLogger(__name__)
 
 
-def global_search(request):  # noqa: C901
-    """Глобальный поиск по всем объявлениям с расширенными фильтрами.
+SORT_ORDERS = {
+    "price_asc": ("price", "-created_at"),
+    "price_desc": ("-price", "-created_at"),
+    "rating": ("-seller__profile__rating", "-created_at"),
+    "oldest": ("created_at",),
+}
+
+
+def _decimal_param(value: str) -> str:
+    """Каноническая запись числа-фильтра ('10.00' → '10'); мусор — ''."""
+    try:
+        number = Decimal(value)
+    except (ValueError, TypeError, ArithmeticError):
+        return ""
+    return f"{number.normalize():f}" if number.is_finite() else ""
 
-    Сейчас держит 8 необязательных параметров (q, game, category, price-range,
-    seller_rating, verified_only, sort) каждый со своей веткой — оттого
-    McCabe ~20. Технический долг, отдельная задача рефакторинга на DTO.
+
+def _search_params(query_dict) -> dict:
+    """Нормализованные параметры поиска — они же ключ кэша (listings/search_cache.py).
+
+    Разные строки с одинаковой выдачей дают одинаковые параметры: лишние
+    пробелы в запросе, '10' и '10.00' в цене, неизвестная сортировка.
     """
-    # Получаем параметры поиска
-    search_query = request.GET.get("q", "").strip()
-    game_slug = request.GET.get("game", "")
-    category_slug = request.GET.get("category", "")
-    min_price = request.GET.get("min_price", "")
-    max_price = request.GET.get("max_price", "")
-    seller_rating = request.GET.get("seller_rating", "")
-    verified_only = request.GET.get("verified_only", False)
-    sort_by = request.GET.get("sort", "-created_at")
-
-    # Базовый queryset
-    listings = Listing.objects.filter(status="active").select_related(
-        "seller", "seller__profile", "game", "category"
-    )
+    query = " ".join(query_dict.get("q", "").split())
+    # ILIKE и FTS в PostgreSQL регистронезависимы; LIKE в SQLite — только
+    # для ASCII, там регистр запроса влияет на выдачу и остаётся в ключе
+    if connection.vendor == "postgresql":
+        query = query.lower()
+    sort_by = query_dict.get("sort", "-created_at")
+    return {
+        "q": query,
+        "game": query_dict.get("game", ""),
+        "category": query_dict.get("category", ""),
+        "min_price": _decimal_param(query_dict.get("min_price", "")),
+        "max_price": _decimal_param(query_dict.get("max_price", "")),
+        "seller_rating": _decimal_param(query_dict.get("seller_rating", "")),
+        "verified_only": "1" if query_dict.get("verified_only") else "",
+        "sort": sort_by if sort_by in SORT_ORDERS else "-created_at",
+    }
 
-    # Полнотекстовый поиск — PostgreSQL FTS в prod, icontains как fallback для SQLite/dev
-    if search_query:
-        if connection.vendor == "postgresql":
-            search_vector = SearchVector("title", weight="A", config="russian") + SearchVector(
-                "description", weight="B", config="russian"
-            )
-            search_q = SearchQuery(search_query, config="russian")
-            listings = (
-                listings.annotate(rank=SearchRank(search_vector, search_q))
-                .filter(
-                    Q(search_vector=search_q)
-                    | Q(title__icontains=search_query)
-                    | Q(description__icontains=search_query)
-                )
-                .order_by("-rank", "-created_at")
+
+def _text_search(listings, search_query: str):
+    """Полнотекстовый поиск — PostgreSQL FTS в prod, icontains как fallback для SQLite/dev."""
+    if connection.vendor == "postgresql":
+        search_vector = SearchVector("title", weight="A", config="russian") + SearchVector(
+            "description", weight="B", config="russian"
+        )
+        search_q = SearchQuery(search_query, config="russian")
+        return (
+            listings.annotate(rank=SearchRank(search_vector, search_q))
+            .filter(
+                Q(search_vector=search_q)
+                | Q(title__icontains=search_query)
+                | Q(description__icontains=search_query)
             )
-        else:
-            listings = listings.filter(
-                Q(title__icontains=search_query) | Q(description__icontains=search_query)
-            ).order_by("-created_at")
-
-    # Фильтр по игре
-    if game_slug:
-        listings = listings.filter(game__slug=game_slug)
-
-    # Фильтр по категории
-    if category_slug:
-        listings = listings.filter(category__slug=category_slug)
-
-    # Фильтр по цене
-    if min_price:
-        try:
-            listings = listings.filter(price__gte=Decimal(min_price))
-        except (ValueError, TypeError, ArithmeticError):
-            pass
-
-    if max_price:
-        try:
-            listings = listings.filter(price__lte=Decimal(max_price))
-        except (ValueError, TypeError, ArithmeticError):
-            pass
-
-    # Фильтр по рейтингу продавца
-    if seller_rating:
-        try:
-            min_rating = Decimal(seller_rating)
-            listings = listings.filter(seller__profile__rating__gte=min_rating)
-        except (ValueError, TypeError, ArithmeticError):
-            pass
-
-    # Только верифицированные продавцы
-    if verified_only:
+            .order_by("-rank", "-created_at")
+        )
+    return listings.filter(
+        Q(title__icontains=search_query) | Q(description__icontains=search_query)
+    ).order_by("-created_at")
+
+
+def _search_queryset(params: dict):
+    """Выборка активных объявлений по нормализованным параметрам."""
+    listings = Listing.objects.filter(status="active")
+    if params["q"]:
+        listings = _text_search(listings, params["q"])
+
+    if params["game"]:
+        listings = listings.filter(game__slug=params["game"])
+    if params["category"]:
+        listings = listings.filter(category__slug=params["category"])
+    if params["min_price"]:
+        listings = listings.filter(price__gte=Decimal(params["min_price"]))
+    if params["max_price"]:
+        listings = listings.filter(price__lte=Decimal(params["max_price"]))
+    if params["seller_rating"]:
+        listings = listings.filter(seller__profile__rating__gte=Decimal(params["seller_rating"]))
+    if params["verified_only"]:
         listings = listings.filter(seller__profile__is_verified=True)
 
-    # Сортировка
-    if sort_by == "price_asc":
-        listings = listings.order_by("price", "-created_at")
-    elif sort_by == "price_desc":
-        listings = listings.order_by("-price", "-created_at")
-    elif sort_by == "rating":
-        listings = listings.order_by("-seller__profile__rating", "-created_at")
-    elif sort_by == "oldest":
-        listings = listings.order_by("created_at")
-    elif sort_by != "-created_at" and not search_query:
+    if params["sort"] in SORT_ORDERS:
+        listings = listings.order_by(*SORT_ORDERS[params["sort"]])
+    elif not params["q"]:
         listings = listings.order_by("-created_at")
+    return listings
 
-    # Статистика для фильтров
-    price_range = listings.aggregate(min_price=Min("price"), max_price=Max("price"))
 
-    # Пагинация
-    paginator = Paginator(listings, 24)  # 24 объявления на странице
-    page_number = request.GET.get("page", 1)
-    page_obj = paginator.get_page(page_number)
+def _price_range(listings) -> dict:
+    return listings.aggregate(min_price=Min("price"), max_price=Max("price"))
 
-    # Список игр с количеством объявлений
-    games_with_count = (
+
+def _games_with_count():
+    return (
         Game.objects.filter(is_active=True, listings__status="active")
         .annotate(listing_count=Count("listings"))
         .filter(listing_count__gt=0)
         .order_by("-listing_count")[:20]
     )
 
+
+def global_search(request):
+    """Глобальный поиск по всем объявлениям с расширенными фильтрами.
+
+    Параметры: q, game, category, min_price, max_price, seller_rating,
+    verified_only, sort. id результата, общее число, диапазон цен и
+    фасет игр кэшируются (listings/search_cache.py); страница —
+    выборка объявлений по id.
+    """
+    params = _search_params(request.GET)
+    cached = search_cache.SearchCache(params)
+
+    def queryset():
+        return _search_queryset(params)
+
+    entry = cached.result(queryset, _price_range)
+
+    # Пагинация: 24 объявления на странице
+    paginator = Paginator(search_cache.ResultWindow(entry, queryset), 24)
+    page_obj = paginator.get_page(request.GET.get("page", 1))
+
     context = {
         "page_obj": page_obj,
-        "search_query": search_query,
-        "games": games_with_count,
-        "selected_game": game_slug,
-        "selected_category": category_slug,
-        "min_price": min_price,
-        "max_price": max_price,
-        "seller_rating": seller_rating,
-        "verified_only": verified_only,
-        "sort_by": sort_by,
-        "price_range": price_range,
-        "total_count": paginator.count,
+        "search_query": request.GET.get("q", "").strip(),
+        "games": cached.games_facet(_games_with_count),
+        "selected_game": request.GET.get("game", ""),
+        "selected_category": request.GET.get("category", ""),
+        "min_price": request.GET.get("min_price", ""),
+        "max_price": request.GET.get("max_price", ""),
+        "seller_rating": request.GET.get("seller_rating", ""),
+        "verified_only": request.GET.get("verified_only", False),
+        "sort_by": request.GET.get("sort", "-created_at"),
+        "price_range": entry["price_range"],
+        "total_count": entry["total"],
     }
 
     return render(request, "listings/global_search.html", context)
@@ -185,48 +203,27 @@ def save_search(request):
 
 
 @require_GET
-def search_suggest(request):
+async def search_suggest(request):
     """
     Autocomplete API для строки поиска.
 
     GET /api/search/suggest/?q=<query>
     Returns JSON: {"games": [...], "listings": [...]}
 
-    Кэшируется на 60 секунд по нормализованному запросу.
-    Минимум 2 символа в запросе.
+    Минимум 2 символа в запросе. Совпадение — по началу слов названия
+    игры / заголовка объявления; объявления ранжируются по популярности.
+    Ответ строится из префиксного индекса (listings/autocomplete.py), без
+    запросов в БД и без кэша по сырой строке запроса.
+
+    Async: дёргается на каждое нажатие клавиши — под ASGI ожидание
+    Redis не держит поток.
     """
     query = request.GET.get("q", "").strip()
 
     if len(query) < 2:
         return JsonResponse({"games": [], "listings": []})
 
-    cache_key = f"search:suggest:{query.lower()}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return JsonResponse(cached)
-
-    games = list(
-        Game.objects.filter(is_active=True, name__icontains=query).values("name", "slug")[:5]
-    )
-
-    listings = list(
-        Listing.objects.filter(status="active", title__icontains=query)
-        .select_related("game")
-        .values("pk", "title", "price", "game__name")[:5]
-    )
-    # Decimal не сериализуется в JSON напрямую
-    for item in listings:
-        item["price"] = str(item["price"])
-
-    payload = {"games": games, "listings": listings}
-    cache.set(cache_key, payload, 60)
-    logger.debug(
-        "search_suggest MISS: q=%r games=%s listings=%s",
-        query,
-        len(games),
-        len(listings),
-    )
-    return JsonResponse(payload)
+    return JsonResponse(await autocomplete.asuggest(query))
 
 
 def quick_filters(request):
@@ -18,8 +18,9 @@ Naming: `listing_<action>`, например `listing_create`, `listing_archive`
 
 import logging
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
 
+from django.conf import settings
 from django.db import transaction
 
 if TYPE_CHECKING:
@@ -64,7 +65,6 @@ def listing_create(
                 return redirect('listings:listing_detail', pk=listing.pk)
             return render(request, 'listings/listing_create.html', {'form': form})
     """
-    from django.conf import settings
     from django.core.exceptions import ValidationError
 
     from listings.models import Listing
@@ -98,4 +98,315 @@ def listing_create(
         price,
         bool(image),
     )
+    from core import fraud_rules
+
+    fraud_rules.publish(
+        fraud_rules.FraudEvent(
+            "listing_created",
+            seller.pk,
+            object_id=listing.pk,
+            amount=listing.price,
+            game_id=listing.game_id,
+            category_id=listing.category_id,
+        )
+    )
     return listing
+
+
+# ---------------------------------------------------------------------------
+# Массовые операции продавца (REST API: /api/listings/bulk/)
+# ---------------------------------------------------------------------------
+
+# Статусы, которые продавец меняет сам; reserved/sold двигают сделки.
+SELLER_STATUSES = ("active", "cancelled")
+
+
+def _item_result(index: int, status: str, listing_id=None, errors=None) -> dict:
+    result = {"index": index, "status": status, "id": listing_id}
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def _lock_free_slots(seller: "CustomUser") -> int:
+    """Блокирует строку продавца и возвращает число свободных активных слотов."""
+    from accounts.models import CustomUser
+    from listings.models import Listing
+
+    # Блокировка пользователя, как в listing_create view: параллельные
+    # запросы не обойдут лимит (на SQLite — блокировка всей БД на запись).
+    CustomUser.objects.select_for_update().filter(pk=seller.pk).first()
+    active = Listing.objects.filter(seller=seller, status="active").count()
+    return max(settings.MAX_ACTIVE_LISTINGS - active, 0)
+
+
+def _after_bulk_write(seller: "CustomUser", listing_ids: List[int], action: str) -> None:
+    from accounts import stats
+    from listings.models import ListingChange
+    from listings.signals import invalidate_catalog_cache
+
+    # bulk_create/bulk_update не шлют post_save — журнал delta-sync пишем сами
+    ListingChange.record(listing_ids, action)
+    invalidate_catalog_cache(("listings",))
+    stats.invalidate([seller.pk])
+
+
+@transaction.atomic
+def listing_bulk_create(*, seller: "CustomUser", items: List[dict]) -> List[dict]:
+    """
+    Создать объявления пачкой одним bulk_create.
+
+    items — уже провалидированные по полям словари (title, description,
+    price, game, category — id) с ключом index. Игры и категории
+    проверяются двумя запросами на всю пачку, лимит MAX_ACTIVE_LISTINGS —
+    одним COUNT под блокировкой продавца; не уместившиеся в лимит элементы
+    получают ошибку, остальные создаются.
+
+    Returns:
+        Результаты по элементам: index, status (created / error), id, errors.
+    """
+    from core import fraud_rules
+    from listings.models import Category, Game, Listing
+
+    games = set(
+        Game.objects.filter(pk__in={item["game"] for item in items}, is_active=True).values_list(
+            "pk", flat=True
+        )
+    )
+    categories = dict(
+        Category.objects.filter(
+            pk__in={item["category"] for item in items if item.get("category")}, is_active=True
+        ).values_list("pk", "game_id")
+    )
+    free_slots = _lock_free_slots(seller)
+
+    results, pending = [], []
+    for item in items:
+        errors = {}
+        if item["game"] not in games:
+            errors["game"] = ["Игра не найдена."]
+        category = item.get("category")
+        if category and categories.get(category) != item["game"]:
+            errors["category"] = ["Категория не найдена в этой игре."]
+        if not errors and len(pending) >= free_slots:
+            errors["non_field_errors"] = [
+                f"Достигнут лимит активных объявлений ({settings.MAX_ACTIVE_LISTINGS})"
+            ]
+        if errors:
+            results.append(_item_result(item["index"], "error", errors=errors))
+            continue
+        pending.append(
+            (
+                item["index"],
+                Listing(
+                    seller=seller,
+                    game_id=item["game"],
+                    category_id=category or None,
+                    title=item["title"],
+                    description=item["description"],
+                    price=item["price"],
+                    status="active",
+                ),
+            )
+        )
+
+    created = Listing.objects.bulk_create([listing for _, listing in pending])
+    results.extend(
+        _item_result(index, "created", listing.pk) for (index, _), listing in zip(pending, created)
+    )
+    if created:
+        created_ids = [listing.pk for listing in created]
+        Listing.reindex_search_vector(created_ids)
+        _after_bulk_write(seller, created_ids, "created")
+        fraud_rules.publish_many(
+            fraud_rules.FraudEvent(
+                "listing_created",
+                seller.pk,
+                object_id=listing.pk,
+                amount=listing.price,
+                game_id=listing.game_id,
+                category_id=listing.category_id,
+            )
+            for listing in created
+        )
+    logger.info(
+        "listing bulk create: seller=%s requested=%s created=%s",
+        seller.pk,
+        len(items),
+        len(created),
+    )
+    return sorted(results, key=lambda result: result["index"])
+
+
+@transaction.atomic
+def listing_bulk_update(*, seller: "CustomUser", items: List[dict]) -> List[dict]:  # noqa: C901
+    """
+    Изменить цену и/или статус объявлений продавца одним bulk_update.
+
+    items — словари с index, id и необязательными price, status
+    (active / cancelled). Чужие и несуществующие id — not_found;
+    reserved/sold не меняются. Перевод в active укладывается в
+    MAX_ACTIVE_LISTINGS по одному COUNT под блокировкой продавца.
+    """
+    from django.utils import timezone
+
+    from listings.models import Listing
+
+    free_slots = _lock_free_slots(seller)
+    listings = Listing.objects.select_for_update().in_bulk(
+        [item["id"] for item in items if item.get("id")]
+    )
+
+    now = timezone.now()
+    results, changed, fields = [], {}, {"updated_at"}
+    for item in items:
+        listing = listings.get(item["id"])
+        if listing is None or listing.seller_id != seller.pk:
+            results.append(
+                _item_result(item["index"], "error", item["id"], {"id": ["Объявление не найдено."]})
+            )
+            continue
+        if listing.pk in changed:
+            results.append(
+                _item_result(item["index"], "error", listing.pk, {"id": ["Повтор в запросе."]})
+            )
+            continue
+        if listing.status not in SELLER_STATUSES:
+            results.append(
+                _item_result(
+                    item["index"],
+                    "error",
+                    listing.pk,
+                    {"status": [f"Объявление в статусе {listing.status} не изменить."]},
+                )
+            )
+            continue
+        status = item.get("status")
+        if status == "active" and listing.status != "active":
+            if free_slots <= 0:
+                results.append(
+                    _item_result(
+                        item["index"],
+                        "error",
+                        listing.pk,
+                        {
+                            "status": [
+                                f"Достигнут лимит активных объявлений ({settings.MAX_ACTIVE_LISTINGS})"
+                            ]
+                        },
+                    )
+                )
+                continue
+            free_slots -= 1
+        elif status == "cancelled" and listing.status == "active":
+            free_slots += 1
+        if "price" in item:
+            listing.price = item["price"]
+            fields.add("price")
+        if status:
+            listing.status = status
+            fields.add("status")
+        listing.updated_at = now
+        changed[listing.pk] = listing
+        results.append(_item_result(item["index"], "updated", listing.pk))
+
+    if changed:
+        Listing.objects.bulk_update(list(changed.values()), sorted(fields))
+        _after_bulk_write(seller, list(changed), "updated")
+    logger.info(
+        "listing bulk update: seller=%s requested=%s updated=%s",
+        seller.pk,
+        len(items),
+        len(changed),
+    )
+    return results
+
+
+@transaction.atomic
+def listing_bulk_delete(*, seller: "CustomUser", ids: List[int]) -> List[dict]:
+    """
+    Удалить объявления продавца одним DELETE.
+
+    Объявления со сделками (PurchaseRequest.listing — PROTECT) не
+    удаляются: для них ошибка, остальные удаляются. post_delete-сигналы
+    Django шлёт на каждую строку — инвалидация каталога внутри
+    deferred_invalidation() схлопывается в одну.
+    """
+    from listings.models import Listing
+    from listings.signals import deferred_invalidation
+    from transactions.models import PurchaseRequest
+
+    owned = set(
+        Listing.objects.select_for_update()
+        .filter(pk__in=ids, seller=seller)
+        .values_list("pk", flat=True)
+    )
+    with_deals = set(
+        PurchaseRequest.objects.filter(listing_id__in=owned).values_list("listing_id", flat=True)
+    )
+
+    results, deletable = [], {}
+    for index, listing_id in enumerate(ids):
+        if listing_id not in owned:
+            errors = {"id": ["Объявление не найдено."]}
+        elif listing_id in deletable:
+            errors = {"id": ["Повтор в запросе."]}
+        elif listing_id in with_deals:
+            errors = {"id": ["По объявлению есть сделки — его можно только снять с продажи."]}
+        else:
+            deletable[listing_id] = index
+            results.append(_item_result(index, "deleted", listing_id))
+            continue
+        results.append(_item_result(index, "error", listing_id, errors))
+
+    if deletable:
+        with deferred_invalidation():
+            Listing.objects.filter(pk__in=list(deletable)).delete()
+    logger.info(
+        "listing bulk delete: seller=%s requested=%s deleted=%s",
+        seller.pk,
+        len(ids),
+        len(deletable),
+    )
+    return results
+
+
+def price_offers_expire(*, batch_size: int = 500, now=None) -> int:
+    """
+    Перевести просроченные предложения цены (``pending``/``countered``
+    с ``expires_at`` в прошлом) в ``expired``.
+
+    Set-based UPDATE порциями (см. core.bulk_transitions); покупатели
+    получают in-app уведомление одним bulk_create на порцию.
+
+    Returns:
+        Число истёкших предложений.
+    """
+    from django.utils import timezone
+
+    from core.bulk_transitions import bulk_transition
+    from core.services import NotificationService
+    from listings.models_trading import PriceOffer
+
+    now = now or timezone.now()
+
+    def _notify_batch(rows):
+        entries = [
+            {
+                "user_id": row["buyer_id"],
+                "notification_type": "system",
+                "title": f"Предложение истекло: {row['listing__title']}",
+                "message": (f"Срок действия предложения {row['offered_price']} ₽ истёк."),
+                "link": "/my-offers/",
+            }
+            for row in rows
+        ]
+        transaction.on_commit(lambda: NotificationService.bulk_notify(entries))
+
+    return bulk_transition(
+        PriceOffer.objects.filter(status__in=["pending", "countered"], expires_at__lt=now),
+        updates={"status": "expired"},
+        fields=("buyer_id", "listing__title", "offered_price"),
+        batch_size=batch_size,
+        on_batch=_notify_batch,
+    )
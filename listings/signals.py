@@ -4,18 +4,39 @@ Game/Category/Listing.
 
 Кэш каталога (`games_catalog_ctx_v1`) и фрагменты шаблона
 (`catalog_alphabet_v1`, `catalog_games_v1`) живут 5 минут.
-Любая правка структурных данных — сбрасывает кэш сразу.
+Любая правка структурных данных — сбрасывает кэш сразу, вместе с
+полностраничным кэшем анонимов (core/middleware_pagecache.py) и штампами
+версий коллекций REST API (api/caching.py).
+
+Массовые операции (listings/services.py: listing_bulk_*) оборачиваются в
+deferred_invalidation(): вызовы внутри блока копятся, и на выходе
+выполняется одна инвалидация вместо одной на строку.
+
+Сохранение и удаление Listing дописывает строку в журнал delta-sync
+(listings/models_changes.py) в той же транзакции; по сигналу журнала
+listings_changed после коммита обновляется индекс автодополнения
+(listings/autocomplete.py) и устаревают штампы кэша поиска по играм
+(listings/search_cache.py); правка Game/Category сбрасывает индекс игр
+автодополнения и весь кэш поиска.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
+from contextlib import contextmanager
 
 from django.core.cache import cache
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Category, Game, Listing
+from api import caching as api_cache
+from core.middleware_pagecache import bump_generation
+
+from . import autocomplete, search_cache
+from .models import Category, Game, Listing, ListingChange
+from .models_changes import listings_changed
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +56,34 @@ TEMPLATE_FRAGMENT_KEYS = (
 )
 
 
-def invalidate_catalog_cache() -> None:
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_invalidation():
+    """Схлопнуть инвалидации внутри блока в одну на выходе (вложенность допустима)."""
+    if getattr(_deferred, "collections", None) is not None:
+        yield
+        return
+    _deferred.collections = set()
+    try:
+        yield
+    finally:
+        collections, _deferred.collections = _deferred.collections, None
+        if collections:
+            invalidate_catalog_cache(tuple(sorted(collections)))
+
+
+def invalidate_catalog_cache(api_collections: tuple = api_cache.COLLECTIONS) -> None:
+    pending = getattr(_deferred, "collections", None)
+    if pending is not None:
+        pending.update(api_collections)
+        return
     cache.delete_many(CATALOG_CACHE_KEYS + TEMPLATE_FRAGMENT_KEYS)
+    # Полностраничный кэш анонимов (главная, каталог, игры, объявления).
+    bump_generation()
+    # ETag и кэш страниц API затронутых коллекций.
+    api_cache.bump(*api_collections)
 
 
 @receiver(post_save, sender=Game)
@@ -45,7 +92,9 @@ def invalidate_catalog_cache() -> None:
 @receiver(post_delete, sender=Category)
 def _invalidate_on_taxonomy_change(sender, **kwargs) -> None:
     logger.debug("catalog cache invalidated (taxonomy): sender=%s", sender.__name__)
-    invalidate_catalog_cache()
+    invalidate_catalog_cache(("games", "categories"))
+    autocomplete.invalidate_games()
+    search_cache.bump()
 
 
 @receiver(post_save, sender=Listing)
@@ -57,4 +106,26 @@ def _invalidate_on_listing_change(sender, instance, **kwargs) -> None:
         getattr(instance, "pk", "?"),
         getattr(instance, "status", "?"),
     )
-    invalidate_catalog_cache()
+    invalidate_catalog_cache(("listings",))
+
+
+@receiver(post_save, sender=Listing)
+def _record_listing_save(sender, instance, created, raw=False, **kwargs) -> None:
+    if not raw:
+        ListingChange.record([instance.pk], "created" if created else "updated")
+
+
+@receiver(post_delete, sender=Listing)
+def _record_listing_delete(sender, instance, **kwargs) -> None:
+    ListingChange.record([instance.pk], "deleted")
+
+
+@receiver(listings_changed)
+def _reindex_autocomplete(sender, listing_ids, **kwargs) -> None:
+    autocomplete.schedule_reindex(listing_ids)
+
+
+@receiver(listings_changed)
+def _invalidate_search_cache(sender, listing_ids, **kwargs) -> None:
+    listing_ids = list(listing_ids)
+    transaction.on_commit(lambda: search_cache.invalidate_listings(listing_ids))
@@ -60,3 +60,59 @@ def warm_catalog_cache() -> str:
     msg = f'warm_catalog_cache: {len(games)} games, {total_categories} categories cached'
     logger.info(msg)
     return msg
+
+
+@shared_task
+def refresh_market_price_index(full: bool = False) -> str:
+    """Пересчитать индекс рыночных цен (listings/market_index.py).
+
+    Без full — только группы (игра, категория), где листинги менялись с
+    прошлого запуска; full=True — все группы (листинги, выпавшие из окна).
+    """
+    from .market_index import refresh
+
+    result = refresh(full=full)
+    msg = f'refresh_market_price_index: {result["groups"]} groups (full={result["full"]})'
+    logger.info(msg)
+    return msg
+
+
+@shared_task
+def prune_listing_changes() -> str:
+    """Удалить строки журнала delta-sync старше LISTING_CHANGES_RETENTION_DAYS.
+
+    Последняя строка остаётся всегда: по ней api/delta_sync.py отличает
+    «изменений не было» от «курсор устарел».
+    """
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.utils import timezone
+
+    from listings.models import ListingChange
+
+    last_id = ListingChange.objects.order_by('-id').values_list('id', flat=True).first()
+    if last_id is None:
+        return 'prune_listing_changes: 0 rows'
+    cutoff = timezone.now() - timedelta(days=settings.LISTING_CHANGES_RETENTION_DAYS)
+    deleted, _ = ListingChange.objects.filter(created_at__lt=cutoff, id__lt=last_id).delete()
+    msg = f'prune_listing_changes: {deleted} rows'
+    logger.info(msg)
+    return msg
+
+
+@shared_task
+def rebuild_autocomplete_index() -> str:
+    """Полная перестройка индекса автодополнения объявлений (listings/autocomplete.py).
+
+    Блокировку от параллельных перестроек берёт сама rebuild_listings().
+    """
+    from django.core.cache import cache
+
+    from listings import autocomplete
+
+    cache.delete(autocomplete.REBUILD_QUEUED_KEY)
+    total = autocomplete.rebuild_listings()
+    if total is None:
+        return 'rebuild_autocomplete_index: skipped, already running'
+    return f'rebuild_autocomplete_index: {total} listings'
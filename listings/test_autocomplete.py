@@ -0,0 +1,133 @@
+"""Тесты префиксного индекса автодополнения (listings/autocomplete.py)."""
+
+from django.core.cache import cache
+from django.urls import reverse
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from listings import autocomplete
+from listings.models import Favorite, ViewHistory
+
+
+def _suggest(query):
+    return async_to_sync(autocomplete.asuggest)(query)
+
+
+def test_edge_ngrams_and_normalization():
+    assert autocomplete.edge_ngrams("Ёлка CS") == {"ел", "елк", "елка", "cs"}
+    assert autocomplete.normalize("  Counter-Strike: Ёж ") == "counter strike еж"
+
+
+def test_game_index_matches_word_prefixes_in_order():
+    index = autocomplete.GameIndex(
+        [
+            {"name": "Counter-Strike 2", "slug": "cs2"},
+            {"name": "World of Warcraft", "slug": "wow"},
+            {"name": "Warframe", "slug": "warframe"},
+        ]
+    )
+    assert [game["slug"] for game in index.search("war")] == ["wow", "warframe"]
+    assert [game["slug"] for game in index.search("strike")] == ["cs2"]
+    assert index.search("ike") == []
+
+
+@pytest.mark.django_db
+def test_suggest_ranks_listings_by_popularity(seller, buyer, user_factory, listing_factory):
+    quiet = listing_factory(seller, title="Меч дракона")
+    popular = listing_factory(seller, title="Драконий меч")
+    Favorite.objects.create(user=buyer, listing=popular)
+    ViewHistory.objects.create(user=user_factory(), listing=quiet)
+
+    titles = [item["title"] for item in _suggest("мечь")["listings"]]
+    assert titles == []
+    titles = [item["title"] for item in _suggest("меч дра")["listings"]]
+    assert titles == ["Драконий меч", "Меч дракона"]
+
+
+@pytest.mark.django_db
+def test_suggest_serves_repeat_queries_without_database(
+    seller, game, listing_factory, django_assert_num_queries
+):
+    listing_factory(seller, title="Аккаунт с редкими скинами")
+    _suggest("ак")
+
+    with django_assert_num_queries(0):
+        result = _suggest("акк")
+        _suggest("скин")
+    assert result["listings"][0]["title"] == "Аккаунт с редкими скинами"
+
+
+@pytest.mark.django_db
+def test_listing_changes_reindex_after_commit(
+    seller, listing_factory, django_capture_on_commit_callbacks
+):
+    listing = listing_factory(seller, title="Старый щит")
+    assert _suggest("щит")["listings"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        listing.title = "Новый шлем"
+        listing.save()
+    assert _suggest("щит")["listings"] == []
+    assert _suggest("шлем")["listings"][0]["pk"] == listing.pk
+
+    with django_capture_on_commit_callbacks(execute=True):
+        listing.status = "sold"
+        listing.save()
+    assert _suggest("шлем")["listings"] == []
+
+
+@pytest.mark.django_db
+def test_game_changes_invalidate_index(client, game_factory):
+    game = game_factory(name="Apex Legends", slug="apex-legends")
+    url = reverse("listings:search_suggest")
+    assert client.get(url, {"q": "leg"}).json()["games"][0]["slug"] == "apex-legends"
+
+    game.is_active = False
+    game.save()
+    assert client.get(url, {"q": "leg"}).json()["games"] == []
+
+
+@pytest.mark.django_db
+def test_rebuild_switches_versions_and_keeps_edits(seller, listing_factory, monkeypatch):
+    listing = listing_factory(seller, title="Старый лук")
+    other = listing_factory(seller, title="Посох")
+    assert _suggest("лук")["listings"]
+    store = autocomplete.get_store()
+    previous = store.active()
+    full_scan = autocomplete._popularity_queryset
+
+    class EditDuringScan:
+        def iterator(self, chunk_size):
+            for row in full_scan().iterator(chunk_size=chunk_size):
+                if row["pk"] == other.pk:
+                    # Строка листинга уже прочитана — его правка приходит позже
+                    listing.title = "Новый арбалет"
+                    listing.save()
+                    # Пока новая версия строится, поиск идёт по прежней
+                    assert _suggest("лук")["listings"][0]["pk"] == listing.pk
+                    autocomplete.reindex_listings([listing.pk])
+                yield row
+
+    monkeypatch.setattr(
+        autocomplete,
+        "_popularity_queryset",
+        lambda ids=None: EditDuringScan() if ids is None else full_scan(ids),
+    )
+    assert autocomplete.rebuild_listings() == 2
+
+    assert store.active() != previous and previous not in store.versions
+    assert _suggest("лук")["listings"] == []
+    assert _suggest("арбалет")["listings"][0]["pk"] == listing.pk
+
+
+@pytest.mark.django_db
+def test_rebuild_is_single_flight(seller, listing_factory):
+    listing_factory(seller, title="Кинжал")
+    assert _suggest("кинжал")["listings"]
+    active = autocomplete.get_store().active()
+
+    cache.add(autocomplete.REBUILD_LOCK_KEY, 1, 60)
+    assert autocomplete.rebuild_listings() is None
+    assert autocomplete.get_store().active() == active
+    assert _suggest("кинжал")["listings"]
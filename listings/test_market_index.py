@@ -0,0 +1,120 @@
+"""Тесты индекса рыночных цен (listings/market_index.py) и его чтения антифродом."""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from core import fraud_rules
+from core.antifraud import AntiFraudSystem
+from listings import market_index
+from listings.models import Category, MarketPriceStat
+
+
+@pytest.fixture
+def category(game):
+    return Category.objects.create(game=game, name="Аккаунты", slug="accounts")
+
+
+def test_percentile_cont_interpolates():
+    prices = [Decimal(value) for value in ("10", "20", "30", "40")]
+
+    assert market_index.percentile_cont(prices, 0.5) == Decimal("25")
+    assert market_index.percentile_cont(prices, 0.9) == Decimal("37")
+    assert market_index.percentile_cont([Decimal("7")], 0.1) == Decimal("7")
+
+
+@pytest.mark.django_db
+def test_full_refresh_builds_game_and_category_stats(seller, game, category, listing_factory):
+    for price in (100, 200, 300):
+        listing_factory(seller, category=category, price=price)
+    listing_factory(seller, price=1000)
+    listing_factory(seller, price=5, status="cancelled")
+
+    market_index.refresh(full=True)
+
+    by_game = MarketPriceStat.objects.get(game=game, category__isnull=True)
+    by_category = MarketPriceStat.objects.get(game=game, category=category)
+    assert (by_game.sample_size, by_game.p50) == (4, Decimal("250.00"))
+    assert (by_category.sample_size, by_category.p50) == (3, Decimal("200.00"))
+    assert by_category.p10 == Decimal("120.00")
+
+
+@pytest.mark.django_db
+def test_incremental_refresh_touches_changed_groups_only(
+    seller, game, game_factory, category, listing_factory
+):
+    other_game = game_factory()
+    listing_factory(seller, category=category, price=100)
+    listing_factory(seller, game=other_game, price=50)
+    market_index.refresh(full=True)
+    other_stat = MarketPriceStat.objects.get(game=other_game)
+
+    listing_factory(seller, category=category, price=300)
+    result = market_index.refresh()
+
+    assert result == {"groups": 2, "full": False}
+    assert market_index.get_stats([(game.pk, category.pk)])[(game.pk, category.pk)]["p50"] == (
+        Decimal("200.00")
+    )
+    assert MarketPriceStat.objects.get(pk=other_stat.pk).updated_at == other_stat.updated_at
+
+
+@pytest.mark.django_db
+def test_refresh_drops_groups_without_sample(seller, game, listing_factory):
+    listing = listing_factory(seller, price=100)
+    market_index.refresh(full=True)
+
+    listing.status = "cancelled"
+    listing.save(update_fields=["status", "updated_at"])
+    market_index.refresh()
+
+    assert not MarketPriceStat.objects.filter(game=game).exists()
+    assert market_index.get_stats([(game.pk, None)]) == {(game.pk, None): {}}
+
+
+@pytest.mark.django_db
+def test_get_stats_reads_cache_after_first_load(seller, game, listing_factory):
+    listing_factory(seller, price=100)
+    market_index.refresh(full=True)
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as ctx:
+        market_index.get_stats([(game.pk, None)])
+        market_index.get_stats([(game.pk, None)])
+    assert len(ctx.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_antifraud_flags_price_below_category_median(
+    seller, game, category, listing_factory, user_factory, settings
+):
+    settings.MARKET_INDEX_MIN_SAMPLE = 3
+    for price in (1000, 1000, 1000):
+        listing_factory(seller, category=category, price=price)
+    market_index.refresh(full=True)
+    dumper = user_factory()
+    listing_factory(dumper, category=category, price=100, title="Дешёвый аккаунт")
+
+    result = AntiFraudSystem().check_user(dumper)
+
+    assert "Подозрительно низкая цена: Дешёвый аккаунт" in result["flags"]
+
+
+@pytest.mark.django_db
+def test_score_users_uses_constant_queries(user_factory, listing_factory):
+    users = [user_factory() for _ in range(5)]
+    for user in users:
+        listing_factory(user)
+    system = AntiFraudSystem()
+    fraud_rules.get_ruleset()
+
+    with CaptureQueriesContext(connection) as ctx:
+        results = system.score_users(users)
+
+    # Профили + листинги за час + активные листинги + индекс цен (промах кэша).
+    assert len(ctx.captured_queries) == 4
+    assert set(results) == {user.pk for user in users}
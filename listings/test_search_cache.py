@@ -0,0 +1,104 @@
+"""Тесты кэша результатов глобального поиска (listings/search_cache.py)."""
+
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.urls import reverse
+
+import pytest
+
+from listings import search_cache
+from listings.search_views import _search_params
+
+URL = reverse("listings:global_search")
+
+
+def _titles(response):
+    return [listing.title for listing in response.context["page_obj"]]
+
+
+def test_equivalent_queries_share_key():
+    first = _search_params(QueryDict("q=%20меч%20%20дракона&min_price=10.00&sort=bogus"))
+    second = _search_params(QueryDict("sort=-created_at&min_price=10&q=меч+дракона"))
+    assert search_cache.result_key(first) == search_cache.result_key(second)
+    other = _search_params(QueryDict("q=меч+дракона&min_price=11"))
+    assert search_cache.result_key(first) != search_cache.result_key(other)
+
+
+@pytest.mark.django_db
+def test_repeat_search_is_single_listing_fetch(
+    client, seller, game, listing_factory, django_assert_num_queries
+):
+    for index in range(3):
+        listing_factory(seller, title=f"Редкий меч {index}", price=Decimal(10 + index))
+    first = client.get(URL, {"q": "меч", "game": game.slug})
+
+    with django_assert_num_queries(1):
+        repeat = client.get(URL, {"q": " меч ", "game": game.slug})
+
+    assert _titles(repeat) == _titles(first)
+    assert repeat.context["total_count"] == 3
+    assert repeat.context["price_range"] == {
+        "min_price": Decimal("10.00"),
+        "max_price": Decimal("12.00"),
+    }
+    assert [item.slug for item in repeat.context["games"]] == [game.slug]
+
+
+@pytest.mark.django_db
+def test_listing_change_invalidates_its_game_only(
+    client, seller, game, game_factory, listing_factory, django_capture_on_commit_callbacks
+):
+    other = game_factory(name="Other", slug="other")
+    listing_factory(seller, title="Щит A", game=game)
+    listing_factory(seller, title="Щит B", game=other)
+    assert client.get(URL, {"q": "Щит", "game": game.slug}).context["total_count"] == 1
+    assert client.get(URL, {"q": "Щит", "game": other.slug}).context["total_count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        listing_factory(seller, title="Щит C", game=game)
+
+    assert client.get(URL, {"q": "Щит", "game": game.slug}).context["total_count"] == 2
+    untouched = search_cache.SearchCache(_search_params(QueryDict(f"q=Щит&game={other.slug}")))
+    assert untouched.result(None, None)["total"] == 1
+
+
+@pytest.mark.django_db
+def test_deleted_listing_invalidates_everything(
+    client, seller, game, listing_factory, django_capture_on_commit_callbacks
+):
+    doomed = listing_factory(seller, title="Шлем X")
+    listing_factory(seller, title="Шлем Y")
+    assert client.get(URL, {"q": "Шлем"}).context["total_count"] == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        doomed.delete()
+
+    response = client.get(URL, {"q": "Шлем"})
+    assert response.context["total_count"] == 1
+    assert _titles(response) == ["Шлем Y"]
+
+
+@pytest.mark.django_db
+def test_pages_beyond_cached_ids_come_from_database(client, seller, listing_factory, settings):
+    settings.SEARCH_CACHE_MAX_IDS = 30
+    for index in range(30):
+        listing_factory(seller, title=f"Лук {index:02d}")
+    listing_factory(seller, title="Лук 30")
+
+    first = client.get(URL, {"q": "Лук", "sort": "oldest"})
+    second = client.get(URL, {"q": "Лук", "sort": "oldest", "page": 2})
+
+    assert first.context["total_count"] == 31
+    assert len(_titles(first)) == 24
+    assert _titles(second) == [f"Лук {index:02d}" for index in range(24, 31)]
+
+
+@pytest.mark.django_db
+def test_disabled_cache_bypasses_storage(client, seller, listing_factory, settings):
+    settings.SEARCH_CACHE_ENABLED = False
+    listing_factory(seller, title="Кольцо")
+
+    assert client.get(URL, {"q": "Кольцо"}).context["total_count"] == 1
+    cached = search_cache.SearchCache(_search_params(QueryDict("q=Кольцо")))
+    assert cached.found == {}
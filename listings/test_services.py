@@ -77,3 +77,54 @@ def test_listing_create_ignores_sold_in_limit(seller, game, settings, listing_fa
         price=Decimal("50"),
     )
     assert listing.pk is not None
+
+
+@pytest.mark.django_db
+def test_price_offers_expire_bulk(
+    active_listing, buyer, user_factory, django_capture_on_commit_callbacks
+):
+    """Просроченные pending/countered → expired одним UPDATE на порцию + bulk-уведомления."""
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from core.models import Notification
+    from listings.models_trading import PriceOffer
+    from listings.services import price_offers_expire
+
+    now = timezone.now()
+    other = user_factory()
+
+    def offer(user, status, expires_at):
+        return PriceOffer.objects.create(
+            listing=active_listing,
+            buyer=user,
+            seller=active_listing.seller,
+            offered_price=Decimal("1.00"),
+            original_price=active_listing.price,
+            status=status,
+            expires_at=expires_at,
+        )
+
+    stale = [
+        offer(buyer, "pending", now - timedelta(hours=1)),
+        offer(other, "countered", now - timedelta(minutes=1)),
+        offer(buyer, "pending", now - timedelta(days=2)),
+    ]
+    fresh = offer(other, "pending", now + timedelta(hours=1))
+    answered = offer(buyer, "rejected", now - timedelta(hours=1))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert price_offers_expire(batch_size=2, now=now) == 3
+
+    assert set(PriceOffer.objects.filter(status="expired").values_list("pk", flat=True)) == {
+        o.pk for o in stale
+    }
+    fresh.refresh_from_db()
+    answered.refresh_from_db()
+    assert fresh.status == "pending"
+    assert answered.status == "rejected"
+    assert Notification.objects.filter(notification_type="system").count() == 3
+
+    # Повторный запуск — no-op.
+    assert price_offers_expire(now=now) == 0
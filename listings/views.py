@@ -427,21 +427,25 @@ def game_listings(request, game_slug):
 
 
 @require_http_methods(["GET"])
-def get_categories_by_game(request):
-    """API endpoint для получения категорий по игре (для AJAX, legacy by id)."""
+async def get_categories_by_game(request):
+    """API endpoint для получения категорий по игре (для AJAX, legacy by id).
+
+    Async: под ASGI ожидание БД не занимает поток.
+    """
     game_id = request.GET.get("game")
 
     if not game_id:
         return JsonResponse({"error": "game_id required"}, status=400)
 
     try:
-        categories = (
-            Category.objects.filter(game_id=game_id, is_active=True)
+        categories = [
+            category
+            async for category in Category.objects.filter(game_id=game_id, is_active=True)
             .order_by("order", "name")
             .values("id", "name", "icon")
-        )
+        ]
 
-        return JsonResponse({"categories": list(categories)})
+        return JsonResponse({"categories": categories})
     except Exception:
         logger.exception("Error fetching categories for game %s", game_id)
         return JsonResponse({"error": "Ошибка загрузки категорий"}, status=500)
@@ -192,45 +192,45 @@ class WithdrawalAdmin(admin.ModelAdmin):
     status_display.short_description = "Статус"
 
     def approve_withdrawals(self, request, queryset):
-        """P0-8: одобрение через сервис, чтобы списать balance и frozen_balance."""
-        from .services import InsufficientFundsError, WithdrawalStateError, complete_withdrawal
-
-        ok, fail = 0, 0
-        for w in queryset.filter(status__in=["pending", "processing"]):
-            try:
-                complete_withdrawal(
-                    withdrawal_id=w.id,
-                    admin_comment=f"Одобрено админом {request.user.username}",
-                )
-                ok += 1
-            except (InsufficientFundsError, WithdrawalStateError) as exc:
-                fail += 1
-                self.message_user(request, f"#{w.id}: {exc}", level="warning")
+        """P0-8: одобрение через сервис, чтобы списать balance и frozen_balance.
+
+        Вся выборка обрабатывается одной пачкой (process_withdrawals_batch).
+        """
+        from .services import process_withdrawals_batch
+
+        result = process_withdrawals_batch(
+            withdrawal_ids=queryset.filter(status__in=["pending", "processing"]).values_list(
+                "id", flat=True
+            ),
+            action="complete",
+            admin_comment=f"Одобрено админом {request.user.username}",
+        )
+        for pk, reason in result["failed"].items():
+            self.message_user(request, f"#{pk}: {reason}", level="warning")
         self.message_user(
             request,
-            f"Одобрено {ok} заявок, ошибок {fail}",
+            f"Одобрено {len(result['processed'])} заявок, ошибок {len(result['failed'])}",
         )
 
     approve_withdrawals.short_description = "Одобрить (списать средства)"
 
     def reject_withdrawals(self, request, queryset):
         """P0-8: отклонение через сервис, чтобы разморозить средства."""
-        from .services import WithdrawalStateError, reject_withdrawal
-
-        ok, fail = 0, 0
-        for w in queryset.filter(status__in=["pending", "processing"]):
-            try:
-                reject_withdrawal(
-                    withdrawal_id=w.id,
-                    admin_comment=f"Отклонено админом {request.user.username}",
-                )
-                ok += 1
-            except WithdrawalStateError as exc:
-                fail += 1
-                self.message_user(request, f"#{w.id}: {exc}", level="warning")
+        from .services import process_withdrawals_batch
+
+        result = process_withdrawals_batch(
+            withdrawal_ids=queryset.filter(status__in=["pending", "processing"]).values_list(
+                "id", flat=True
+            ),
+            action="reject",
+            admin_comment=f"Отклонено админом {request.user.username}",
+        )
+        for pk, reason in result["failed"].items():
+            self.message_user(request, f"#{pk}: {reason}", level="warning")
         self.message_user(
             request,
-            f"Отклонено {ok} заявок (средства разморожены), ошибок {fail}",
+            f"Отклонено {len(result['processed'])} заявок (средства разморожены), "
+            f"ошибок {len(result['failed'])}",
         )
 
     reject_withdrawals.short_description = "Отклонить (разморозить средства)"
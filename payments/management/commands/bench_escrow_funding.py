@@ -0,0 +1,260 @@
+"""
+Бенчмарк конкурентного accept → фондирование эскроу (PostgreSQL).
+
+Сравнивает два пути на одном кошельке покупателя (максимальный contention):
+    legacy  — цепочка SELECT FOR UPDATE: PR → эскроу → кошелёк,
+              проверка баланса в Python, затем save();
+    guarded — transactions.services.accept_purchase_request: условные
+              UPDATE с проверкой rowcount (без явных блокировок).
+
+Параллельно сэмплирует pg_stat_activity и считает backend'ы в ожидании
+блокировки (wait_event_type = 'Lock').
+
+Примеры:
+    python manage.py bench_escrow_funding
+    python manage.py bench_escrow_funding --requests 500 --threads 32 --mode guarded
+
+Все созданные данные (префикс bench_escrow_) удаляются по завершении.
+"""
+
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from listings.models import Game, Listing
+from payments.models import Escrow, Transaction, Wallet
+from transactions.models import PurchaseRequest
+from transactions.services import accept_purchase_request
+
+PREFIX = "bench_escrow_"
+PRICE = Decimal("10.00")
+
+
+def _legacy_accept(request_id, seller):
+    """Прежняя реализация accept: блокирующая цепочка SELECT FOR UPDATE."""
+    with transaction.atomic():
+        pr = PurchaseRequest.objects.select_for_update().get(pk=request_id)
+        if pr.seller_id != seller.pk or pr.status != "pending":
+            raise ValueError("Этот запрос уже обработан.")
+
+        escrow, _ = Escrow.objects.get_or_create(
+            purchase_request=pr,
+            defaults={"buyer_id": pr.buyer_id, "seller_id": pr.seller_id, "amount": pr.amount},
+        )
+        escrow = Escrow.objects.select_for_update().get(pk=escrow.pk)
+        wallet = Wallet.objects.select_for_update().get(user_id=escrow.buyer_id)
+        if wallet.get_available_balance() < escrow.amount:
+            raise ValueError("Недостаточно средств на балансе")
+        wallet.frozen_balance += escrow.amount
+        wallet.save(update_fields=["frozen_balance", "updated_at"])
+
+        now = timezone.now()
+        escrow.status = "funded"
+        escrow.funded_at = now
+        escrow.release_deadline = now + timezone.timedelta(days=escrow.auto_release_days)
+        escrow.save(update_fields=["status", "funded_at", "release_deadline"])
+        Transaction.objects.create(
+            user_id=escrow.buyer_id,
+            transaction_type="escrow_freeze",
+            amount=escrow.amount,
+            status="completed",
+            purchase_request=pr,
+        )
+
+        pr.status = "accepted"
+        pr.accepted_at = now
+        pr.save(update_fields=["status", "accepted_at"])
+        pr.listing.status = "reserved"
+        pr.listing.save(update_fields=["status"])
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Бенчмарк конкурентного фондирования эскроу: SELECT FOR UPDATE vs условный UPDATE"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Число accept на прогон")
+        parser.add_argument("--threads", type=int, default=16, help="Параллельных потоков")
+        parser.add_argument(
+            "--mode",
+            choices=["legacy", "guarded", "both"],
+            default="both",
+            help="Какой путь измерять",
+        )
+        parser.add_argument(
+            "--sample-interval-ms",
+            type=int,
+            default=5,
+            help="Период опроса pg_stat_activity",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Бенчмарк имеет смысл только на PostgreSQL")
+        if options["requests"] < 1 or options["threads"] < 1:
+            raise CommandError("--requests и --threads должны быть положительными")
+
+        modes = ["legacy", "guarded"] if options["mode"] == "both" else [options["mode"]]
+        for mode in modes:
+            fixture = self._setup(options["requests"])
+            try:
+                stats = self._run(mode, fixture, options)
+            finally:
+                self._cleanup(fixture)
+            self._report(mode, stats)
+
+    # ------------------------------------------------------------------
+
+    def _setup(self, count):
+        user_model = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        seller = user_model.objects.create_user(
+            username=f"{PREFIX}seller_{tag}", email=f"{PREFIX}s_{tag}@example.com"
+        )
+        buyer = user_model.objects.create_user(
+            username=f"{PREFIX}buyer_{tag}", email=f"{PREFIX}b_{tag}@example.com"
+        )
+        game = Game.objects.create(name=f"{PREFIX}game_{tag}", slug=f"{PREFIX}game-{tag}")
+        # Денег хватает ровно на половину запросов: проверяем, что ни один
+        # путь не замораживает больше доступного.
+        Wallet.objects.update_or_create(
+            user=buyer, defaults={"balance": PRICE * (count // 2), "frozen_balance": 0}
+        )
+        listings = Listing.objects.bulk_create(
+            Listing(
+                seller=seller,
+                game=game,
+                title=f"{PREFIX}{i}",
+                description="bench",
+                price=PRICE,
+            )
+            for i in range(count)
+        )
+        requests = PurchaseRequest.objects.bulk_create(
+            PurchaseRequest(listing=listing, buyer=buyer, seller=seller, amount=PRICE)
+            for listing in listings
+        )
+        return {
+            "seller": seller,
+            "buyer": buyer,
+            "game": game,
+            "request_ids": [pr.pk for pr in requests],
+        }
+
+    def _run(self, mode, fixture, options):
+        seller = fixture["seller"]
+        latencies, errors = [], {"ok": 0, "rejected": 0}
+        lock = threading.Lock()
+
+        def _call(request_id):
+            started = time.perf_counter()
+            try:
+                if mode == "legacy":
+                    _legacy_accept(request_id, seller)
+                else:
+                    accept_purchase_request(request_id=request_id, user=seller)
+                outcome = "ok"
+            except Exception:
+                outcome = "rejected"
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors[outcome] += 1
+
+        stop = threading.Event()
+        samples = []
+        sampler = threading.Thread(
+            target=self._sample_lock_waits,
+            args=(stop, samples, options["sample_interval_ms"] / 1000),
+            daemon=True,
+        )
+        sampler.start()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=options["threads"], initializer=connections.close_all
+        ) as pool:
+            list(pool.map(_call, fixture["request_ids"]))
+            # Закрываем соединения воркеров (по одному на поток).
+            list(pool.map(lambda _: connections.close_all(), range(options["threads"])))
+        wall = time.perf_counter() - started
+
+        stop.set()
+        sampler.join()
+
+        wallet = Wallet.objects.get(user=fixture["buyer"])
+        return {
+            "latencies": latencies,
+            "wall": wall,
+            "ok": errors["ok"],
+            "rejected": errors["rejected"],
+            "lock_waits": samples,
+            "frozen": wallet.frozen_balance,
+            "balance": wallet.balance,
+        }
+
+    def _sample_lock_waits(self, stop, samples, interval):
+        try:
+            with connections["default"].cursor() as cursor:
+                while not stop.is_set():
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                    samples.append(cursor.fetchone()[0])
+                    time.sleep(interval)
+        finally:
+            connections.close_all()
+
+    def _cleanup(self, fixture):
+        ids = fixture["request_ids"]
+        users = [fixture["seller"].pk, fixture["buyer"].pk]
+        with transaction.atomic():
+            Transaction.objects.filter(user_id__in=users).delete()
+            Escrow.objects.filter(purchase_request_id__in=ids).delete()
+            PurchaseRequest.objects.filter(pk__in=ids).delete()
+            Listing.objects.filter(game=fixture["game"]).delete()
+            Wallet.objects.filter(user_id__in=users).delete()
+            get_user_model().objects.filter(pk__in=users).delete()
+            fixture["game"].delete()
+
+    def _report(self, mode, stats):
+        latencies = stats["latencies"]
+        waits = stats["lock_waits"]
+        total = stats["ok"] + stats["rejected"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"[{mode}]"))
+        self.stdout.write(
+            f"  accept: {total} (успешно {stats['ok']}, отклонено {stats['rejected']}), "
+            f"{total / stats['wall']:.1f} ops/s за {stats['wall']:.2f} с"
+        )
+        self.stdout.write(
+            f"  латентность, мс: p50={_percentile(latencies, 50):.1f} "
+            f"p95={_percentile(latencies, 95):.1f} p99={_percentile(latencies, 99):.1f} "
+            f"mean={statistics.mean(latencies):.1f}"
+        )
+        self.stdout.write(
+            f"  ожидания блокировок: max={max(waits, default=0)} "
+            f"avg={statistics.mean(waits) if waits else 0:.2f} (сэмплов {len(waits)})"
+        )
+        consistent = stats["frozen"] == PRICE * stats["ok"] and stats["frozen"] <= stats["balance"]
+        style = self.style.SUCCESS if consistent else self.style.ERROR
+        self.stdout.write(
+            style(
+                f"  frozen={stats['frozen']} balance={stats['balance']} консистентно={consistent}"
+            )
+        )
@@ -0,0 +1,74 @@
+"""
+Финансовый отчёт за месяц: комиссии и выплаты продавцам + сверка леджера.
+
+Примеры:
+    python manage.py finance_report                       # прошлый месяц, сводка
+    python manage.py finance_report --month 2026-09 --payouts-csv payouts.csv
+    python manage.py finance_report --reconciliation-csv mismatches.csv --tolerance 0.01
+"""
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments import reporting
+
+
+class Command(BaseCommand):
+    help = "Комиссии/выплаты продавцам по дням за месяц и сверка леджера с кошельками"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="Месяц YYYY-MM (по умолчанию — прошлый)")
+        parser.add_argument("--payouts-csv", help="Путь для CSV выплат по продавцам/дням")
+        parser.add_argument(
+            "--reconciliation-csv", help="Путь для CSV расхождений леджера и кошельков"
+        )
+        parser.add_argument(
+            "--tolerance",
+            default="0.00",
+            help="Допустимое расхождение в рублях (по умолчанию 0.00)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            month = (
+                datetime.strptime(options["month"], "%Y-%m").date()
+                if options["month"]
+                else reporting.previous_month()
+            )
+        except ValueError:
+            raise CommandError("--month должен быть в формате YYYY-MM")
+        try:
+            tolerance = Decimal(options["tolerance"])
+        except InvalidOperation:
+            raise CommandError("--tolerance должен быть числом")
+
+        payouts = reporting.seller_daily_payouts(month=month)
+        totals = reporting.payout_totals(payouts)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Выплаты за {month:%Y-%m}"))
+        self.stdout.write(
+            f"  продавцов: {totals['sellers']}, сделок: {totals['deals']}\n"
+            f"  оборот: {totals['gross']} ₽, комиссия: {totals['commission']} ₽, "
+            f"к выплате: {totals['net']} ₽"
+        )
+        if options["payouts_csv"]:
+            with open(options["payouts_csv"], "w", newline="", encoding="utf-8") as stream:
+                count = reporting.write_csv(payouts, reporting.PAYOUT_COLUMNS, stream)
+            self.stdout.write(f"  CSV: {options['payouts_csv']} ({count} строк)")
+
+        reconciliation = reporting.ledger_reconciliation(tolerance=tolerance)
+        mismatches = reconciliation["mismatches"]
+        self.stdout.write(self.style.MIGRATE_HEADING("Сверка леджера"))
+        self.stdout.write(f"  кошельков: {reconciliation['checked']}")
+        style = self.style.ERROR if mismatches else self.style.SUCCESS
+        self.stdout.write(style(f"  расхождений: {len(mismatches)}"))
+        for row in mismatches[:20]:
+            self.stdout.write(
+                f"    {row['username']}: balance {row['balance_diff']:+}, "
+                f"frozen {row['frozen_diff']:+}"
+            )
+        if options["reconciliation_csv"]:
+            with open(options["reconciliation_csv"], "w", newline="", encoding="utf-8") as stream:
+                reporting.write_csv(mismatches, reporting.RECONCILIATION_COLUMNS, stream)
+            self.stdout.write(f"  CSV: {options['reconciliation_csv']}")
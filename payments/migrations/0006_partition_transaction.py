@@ -0,0 +1,31 @@
+"""
+Помесячное партиционирование payments_transaction (PostgreSQL).
+
+История транзакций читается почти только по свежему диапазону created_at;
+старые месяцы можно отсоединять для архивации без DELETE
+(manage.py manage_partitions --detach-before-days).
+На SQLite — no-op: таблица остаётся обычной.
+"""
+
+from django.db import migrations
+
+
+def partition_transactions(apps, schema_editor):
+    from core.partitioning import convert_to_partitioned
+
+    convert_to_partitioned(
+        "payments_transaction", "created_at", connection=schema_editor.connection
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0005_alter_disputeevidence_file_and_more"),
+    ]
+
+    operations = [
+        # Обратная миграция не нужна: колонки партиционированной таблицы
+        # совпадают с моделью, Django работает с ней как с обычной.
+        migrations.RunPython(partition_transactions, reverse_code=migrations.RunPython.noop),
+    ]
@@ -61,27 +61,51 @@ class Wallet(models.Model):
         """Доступный баланс для вывода"""
         return self.balance - self.frozen_balance
 
-    def freeze_amount(self, amount):
-        """Заморозить средства для эскроу"""
-        from django.db import transaction
+    @classmethod
+    def try_freeze(cls, *, user_id, amount) -> bool:
+        """Заморозить amount на кошельке пользователя одним условным UPDATE.
+
+        UPDATE wallet SET frozen_balance = frozen_balance + amount
+        WHERE user_id = ? AND balance - frozen_balance >= amount
+
+        Без SELECT FOR UPDATE и перечитывания строки: проверка баланса и
+        запись — один statement. Конкурентные заморозки на одном кошельке
+        сериализуются row-lock'ом самого UPDATE, а условие WHERE
+        перепроверяется PostgreSQL после ожидания (READ COMMITTED), так что
+        суммарно заморозить больше доступного нельзя.
+
+        Returns:
+            True — средства заморожены; False — недостаточно средств
+            или кошелька нет.
+        """
+        from django.db.models import F
 
-        with transaction.atomic():
-            wallet = Wallet.objects.select_for_update().get(id=self.id)
-            if wallet.get_available_balance() < amount:
-                raise ValueError("Недостаточно средств на балансе")
-            wallet.frozen_balance += amount
-            wallet.save(update_fields=["frozen_balance"])
+        return bool(
+            cls.objects.filter(
+                user_id=user_id,
+                balance__gte=F("frozen_balance") + amount,
+            ).update(frozen_balance=F("frozen_balance") + amount)
+        )
 
-    def unfreeze_amount(self, amount):
-        """Разморозить средства"""
-        from django.db import transaction
+    def freeze_amount(self, amount):
+        """Заморозить средства для эскроу (условный UPDATE, см. try_freeze)."""
+        if not Wallet.try_freeze(user_id=self.user_id, amount=amount):
+            raise ValueError("Недостаточно средств на балансе")
+        self.frozen_balance += amount
 
-        with transaction.atomic():
-            wallet = Wallet.objects.select_for_update().get(id=self.id)
-            wallet.frozen_balance -= amount
-            if wallet.frozen_balance < 0:
-                wallet.frozen_balance = 0
-            wallet.save(update_fields=["frozen_balance"])
+    def unfreeze_amount(self, amount):
+        """Разморозить средства (не уходя ниже нуля) одним UPDATE."""
+        from django.db.models import F, Value
+        from django.db.models.functions import Greatest
+
+        Wallet.objects.filter(pk=self.pk).update(
+            frozen_balance=Greatest(
+                F("frozen_balance") - amount,
+                Value(Decimal("0")),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+        self.frozen_balance = max(Decimal("0"), self.frozen_balance - amount)
 
 
 class Transaction(models.Model):
@@ -245,44 +269,43 @@ class Escrow(models.Model):
     def fund(self):
         """Заморозить средства покупателя.
 
-        Использует select_for_update на самом эскроу для защиты от
-        конкурентных вызовов fund() и double-проверки статуса.
+        Hold-free путь: вместо цепочки SELECT FOR UPDATE (эскроу → кошелёк
+        с перечитыванием) — два условных UPDATE с проверкой rowcount:
+            1. escrow: created → funded  (WHERE status = 'created');
+            2. wallet: frozen += amount  (WHERE balance - frozen >= amount).
+        Если второй не прошёл — исключение откатывает первый.
+        Повторный/конкурентный fund() увидит rowcount=0 на шаге 1.
         """
         from django.db import transaction
 
+        now = timezone.now()
+        release_deadline = now + timezone.timedelta(days=self.auto_release_days)
+
         with transaction.atomic():
-            # Блокируем эскроу — защищаемся от двойного funding.
-            escrow = Escrow.objects.select_for_update().get(pk=self.pk)
-            if escrow.status != "created":
+            claimed = Escrow.objects.filter(pk=self.pk, status="created").update(
+                status="funded",
+                funded_at=now,
+                release_deadline=release_deadline,
+            )
+            if not claimed:
                 raise ValueError("Эскроу уже профинансирован")
 
-            # Замораживаем средства покупателя.
-            # freeze_amount сам берёт select_for_update на Wallet.
-            buyer_wallet = Wallet.objects.get(user=escrow.buyer)
-            buyer_wallet.freeze_amount(escrow.amount)
-
-            # Обновляем статус
-            escrow.status = "funded"
-            escrow.funded_at = timezone.now()
-            escrow.release_deadline = timezone.now() + timezone.timedelta(
-                days=escrow.auto_release_days
-            )
-            escrow.save(update_fields=["status", "funded_at", "release_deadline"])
+            if not Wallet.try_freeze(user_id=self.buyer_id, amount=self.amount):
+                raise ValueError("Недостаточно средств на балансе")
 
-            # Создаем транзакцию
             Transaction.objects.create(
-                user=escrow.buyer,
+                user_id=self.buyer_id,
                 transaction_type="escrow_freeze",
-                amount=escrow.amount,
+                amount=self.amount,
                 status="completed",
-                description=f"Заморозка средств для сделки #{escrow.purchase_request_id}",
-                purchase_request_id=escrow.purchase_request_id,
+                description=f"Заморозка средств для сделки #{self.purchase_request_id}",
+                purchase_request_id=self.purchase_request_id,
             )
 
-            # Синхронизируем self
-            self.status = escrow.status
-            self.funded_at = escrow.funded_at
-            self.release_deadline = escrow.release_deadline
+        # Синхронизируем self
+        self.status = "funded"
+        self.funded_at = now
+        self.release_deadline = release_deadline
 
     def release_to_seller(self):
         """Передать средства продавцу за вычетом комиссии платформы.
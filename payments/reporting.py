@@ -0,0 +1,282 @@
+"""
+Финансовая отчётность: комиссии, выплаты продавцам и сверка леджера.
+
+Все расчёты выполняются агрегатами в БД за один проход, без итерации
+ORM-объектов по строкам:
+
+    seller_daily_payouts   — GROUP BY (продавец, день) по sale/commission
+                             за месяц + нарастающий итог с начала месяца;
+    ledger_reconciliation  — один SELECT по кошелькам с коррелированными
+                             агрегатами леджера: ожидаемые balance/frozen
+                             против фактических.
+
+Экспорт — CSV по колонкам (payouts.csv, reconciliation.csv), пишется
+задачей payments.build_finance_report и командой finance_report.
+"""
+
+from __future__ import annotations
+
+import csv
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import IO, Iterable, List, Tuple
+
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Escrow, Transaction, Wallet, Withdrawal
+
+ZERO = Decimal("0.00")
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+# Типы транзакций, которые двигают Wallet.balance (со своим знаком).
+# commission — справочная запись: sale уже зачислен за вычетом комиссии.
+# escrow_freeze/refund — движение frozen_balance, а не balance.
+BALANCE_TRANSACTION_TYPES = ("deposit", "withdrawal", "purchase", "sale")
+
+PAYOUT_COLUMNS = (
+    "seller_id",
+    "seller",
+    "day",
+    "deals",
+    "gross",
+    "commission",
+    "net",
+    "net_mtd",
+    "commission_mtd",
+)
+RECONCILIATION_COLUMNS = (
+    "user_id",
+    "username",
+    "balance",
+    "expected_balance",
+    "balance_diff",
+    "frozen_balance",
+    "expected_frozen",
+    "frozen_diff",
+)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """Полуинтервал [1-е число месяца; 1-е следующего) в текущей таймзоне."""
+    start = month.replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end, time.min), tz),
+    )
+
+
+def previous_month(today: date | None = None) -> date:
+    """Первое число предыдущего месяца."""
+    today = today or timezone.localdate()
+    first = today.replace(day=1)
+    return date(first.year - (first.month == 1), (first.month - 2) % 12 + 1, 1)
+
+
+def seller_daily_payouts(*, month: date) -> List[dict]:
+    """
+    Комиссии и выплаты по продавцам и дням за месяц.
+
+    Один GROUP BY (user, day) по completed-транзакциям sale/commission;
+    gross = net + commission. Нарастающий итог (net_mtd, commission_mtd)
+    считается в том же проходе по уже агрегированным строкам,
+    отсортированным по (продавец, день).
+
+    Returns:
+        list[dict] с ключами PAYOUT_COLUMNS.
+    """
+    start, end = month_bounds(month)
+    sale = Q(transaction_type="sale")
+    commission = Q(transaction_type="commission")
+
+    grouped = (
+        Transaction.objects.filter(
+            status="completed",
+            transaction_type__in=("sale", "commission"),
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        .annotate(day=TruncDate("created_at"))
+        .values("user_id", "user__username", "day")
+        .annotate(
+            net=Coalesce(Sum("amount", filter=sale), Value(ZERO), output_field=_MONEY),
+            commission=Coalesce(Sum("amount", filter=commission), Value(ZERO), output_field=_MONEY),
+            deals=Count("purchase_request", filter=sale, distinct=True),
+        )
+        .order_by("user_id", "day")
+    )
+
+    rows = []
+    current_seller, net_mtd, commission_mtd = None, ZERO, ZERO
+    for row in grouped:
+        if row["user_id"] != current_seller:
+            current_seller, net_mtd, commission_mtd = row["user_id"], ZERO, ZERO
+        fee = -row["commission"]  # в леджере комиссия хранится со знаком минус
+        net_mtd += row["net"]
+        commission_mtd += fee
+        rows.append(
+            {
+                "seller_id": row["user_id"],
+                "seller": row["user__username"],
+                "day": row["day"],
+                "deals": row["deals"],
+                "gross": row["net"] + fee,
+                "commission": fee,
+                "net": row["net"],
+                "net_mtd": net_mtd,
+                "commission_mtd": commission_mtd,
+            }
+        )
+    return rows
+
+
+def payout_totals(rows: Iterable[dict]) -> dict:
+    """Итоги по отчёту seller_daily_payouts: по платформе и по продавцам."""
+    totals = {"sellers": 0, "deals": 0, "gross": ZERO, "commission": ZERO, "net": ZERO}
+    sellers = set()
+    for row in rows:
+        sellers.add(row["seller_id"])
+        totals["deals"] += row["deals"]
+        totals["gross"] += row["gross"]
+        totals["commission"] += row["commission"]
+        totals["net"] += row["net"]
+    totals["sellers"] = len(sellers)
+    return totals
+
+
+def ledger_reconciliation(*, tolerance: Decimal = ZERO) -> dict:
+    """
+    Сверка леджера с кошельками одним запросом.
+
+    Ожидаемый balance = сумма completed-транзакций BALANCE_TRANSACTION_TYPES
+    минус списание с покупателя при частичном возврате по спору (там
+    пишется только refund, а покупатель теряет escrow.amount - refund).
+    Ожидаемый frozen = funded/disputed-эскроу покупателя + pending/processing
+    выводы.
+
+    Returns:
+        {
+            'checked': число кошельков,
+            'mismatches': list[dict] (RECONCILIATION_COLUMNS) с |diff| > tolerance,
+            'totals': {'balance', 'expected_balance', 'frozen_balance',
+                       'expected_frozen'},
+        }
+    """
+    user = OuterRef("user_id")
+
+    ledger = (
+        Transaction.objects.filter(
+            user_id=user,
+            status="completed",
+            transaction_type__in=BALANCE_TRANSACTION_TYPES,
+        )
+        .order_by()
+        .values("user_id")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+    partial_refund_debit = (
+        Transaction.objects.filter(
+            user_id=user,
+            status="completed",
+            transaction_type="refund",
+            purchase_request__escrow__status="released",
+        )
+        .order_by()
+        .values("user_id")
+        .annotate(
+            total=Sum(
+                F("purchase_request__escrow__amount") - F("amount"),
+                output_field=_MONEY,
+            )
+        )
+        .values("total")[:1]
+    )
+    escrow_held = (
+        Escrow.objects.filter(buyer_id=user, status__in=("funded", "disputed"))
+        .order_by()
+        .values("buyer_id")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+    withdrawals_held = (
+        Withdrawal.objects.filter(user_id=user, status__in=("pending", "processing"))
+        .order_by()
+        .values("user_id")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+
+    def _coalesced(subquery):
+        return Coalesce(Subquery(subquery, output_field=_MONEY), Value(ZERO), output_field=_MONEY)
+
+    wallets = (
+        Wallet.objects.annotate(
+            ledger_sum=_coalesced(ledger),
+            partial_refund_debit=_coalesced(partial_refund_debit),
+            escrow_held=_coalesced(escrow_held),
+            withdrawals_held=_coalesced(withdrawals_held),
+        )
+        .values(
+            "user_id",
+            "user__username",
+            "balance",
+            "frozen_balance",
+            "ledger_sum",
+            "partial_refund_debit",
+            "escrow_held",
+            "withdrawals_held",
+        )
+        .order_by("user_id")
+    )
+
+    checked = 0
+    mismatches = []
+    totals = {
+        "balance": ZERO,
+        "expected_balance": ZERO,
+        "frozen_balance": ZERO,
+        "expected_frozen": ZERO,
+    }
+    for row in wallets.iterator(chunk_size=2000):
+        checked += 1
+        expected_balance = row["ledger_sum"] - row["partial_refund_debit"]
+        expected_frozen = row["escrow_held"] + row["withdrawals_held"]
+        balance_diff = row["balance"] - expected_balance
+        frozen_diff = row["frozen_balance"] - expected_frozen
+
+        totals["balance"] += row["balance"]
+        totals["expected_balance"] += expected_balance
+        totals["frozen_balance"] += row["frozen_balance"]
+        totals["expected_frozen"] += expected_frozen
+
+        if abs(balance_diff) > tolerance or abs(frozen_diff) > tolerance:
+            mismatches.append(
+                {
+                    "user_id": row["user_id"],
+                    "username": row["user__username"],
+                    "balance": row["balance"],
+                    "expected_balance": expected_balance,
+                    "balance_diff": balance_diff,
+                    "frozen_balance": row["frozen_balance"],
+                    "expected_frozen": expected_frozen,
+                    "frozen_diff": frozen_diff,
+                }
+            )
+
+    return {"checked": checked, "mismatches": mismatches, "totals": totals}
+
+
+def write_csv(rows: Iterable[dict], columns: Iterable[str], stream: IO[str]) -> int:
+    """Записать строки отчёта в CSV (колонки в заданном порядке). Возвращает число строк."""
+    columns = list(columns)
+    writer = csv.writer(stream)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        count += 1
+    return count
@@ -9,9 +9,12 @@ HackSoft styleguide:
 """
 from __future__ import annotations
 
+from datetime import timedelta
+from decimal import Decimal
 from typing import Optional
 
-from django.db.models import QuerySet
+from django.db.models import Count, Q, QuerySet, Sum
+from django.utils import timezone
 
 from .models import Escrow, Transaction, Wallet, Withdrawal
 
@@ -102,3 +105,78 @@ def pending_withdrawals_admin() -> QuerySet[Withdrawal]:
         .select_related('user')
         .order_by('-created_at')
     )
+
+
+# Возрастные корзины очереди выводов: (ключ, нижняя граница в часах, верхняя).
+WITHDRAWAL_AGE_BUCKETS = (
+    ('lt_24h', 0, 24),
+    ('24h_72h', 24, 72),
+    ('72h_7d', 72, 24 * 7),
+    ('gt_7d', 24 * 7, None),
+)
+
+
+def withdrawal_queue_summary(*, stale_after_hours: int = 24, now=None) -> dict:
+    """
+    Сводка очереди pending-выводов ОДНИМ агрегатным запросом.
+
+    Раньше check_pending_withdrawals делал .exists() + .count() и суммировал
+    amount в Python по всем строкам. Здесь всё считается в БД через
+    COUNT/SUM ... FILTER (WHERE ...): итог, «зависшие» старше
+    stale_after_hours, возрастные корзины и разбивка по способам вывода.
+
+    Returns:
+        {
+            'count', 'total_amount',             # весь pending
+            'stale_count', 'stale_amount',       # старше stale_after_hours
+            'buckets': {key: {'count', 'amount'}},
+            'by_method': {method: {'count', 'amount'}},
+        }
+    """
+    now = now or timezone.now()
+    aggregates = {
+        'count': Count('id'),
+        'total_amount': Sum('amount'),
+    }
+
+    stale = Q(created_at__lte=now - timedelta(hours=stale_after_hours))
+    aggregates['stale_count'] = Count('id', filter=stale)
+    aggregates['stale_amount'] = Sum('amount', filter=stale)
+
+    for key, lower, upper in WITHDRAWAL_AGE_BUCKETS:
+        condition = Q(created_at__lte=now - timedelta(hours=lower)) if lower else Q()
+        if upper is not None:
+            condition &= Q(created_at__gt=now - timedelta(hours=upper))
+        aggregates[f'bucket_{key}_count'] = Count('id', filter=condition)
+        aggregates[f'bucket_{key}_amount'] = Sum('amount', filter=condition)
+
+    for method, _label in Withdrawal.PAYMENT_METHODS:
+        condition = Q(payment_method=method)
+        aggregates[f'method_{method}_count'] = Count('id', filter=condition)
+        aggregates[f'method_{method}_amount'] = Sum('amount', filter=condition)
+
+    row = Withdrawal.objects.filter(status='pending').aggregate(**aggregates)
+
+    def _amount(value):
+        return value if value is not None else Decimal('0')
+
+    return {
+        'count': row['count'],
+        'total_amount': _amount(row['total_amount']),
+        'stale_count': row['stale_count'],
+        'stale_amount': _amount(row['stale_amount']),
+        'buckets': {
+            key: {
+                'count': row[f'bucket_{key}_count'],
+                'amount': _amount(row[f'bucket_{key}_amount']),
+            }
+            for key, _lower, _upper in WITHDRAWAL_AGE_BUCKETS
+        },
+        'by_method': {
+            method: {
+                'count': row[f'method_{method}_count'],
+                'amount': _amount(row[f'method_{method}_amount']),
+            }
+            for method, _label in Withdrawal.PAYMENT_METHODS
+        },
+    }
@@ -19,6 +19,8 @@ from typing import Optional
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
 
+from core import fraud_rules, header_state
+
 from .models import Transaction, Wallet, Withdrawal
 
 logger = logging.getLogger(__name__)
@@ -99,6 +101,9 @@ def create_withdrawal(
     # set_payment_details шифрует реквизиты и заполняет маску
     withdrawal.set_payment_details(payment_details)
     withdrawal.save()
+    fraud_rules.publish(
+        fraud_rules.FraudEvent("withdrawal", user.pk, object_id=withdrawal.pk, amount=amount)
+    )
 
     logger.info(
         "Withdrawal created id=%s user_id=%s amount=%s method=%s",
@@ -188,6 +193,128 @@ def complete_withdrawal(*, withdrawal_id: int, admin_comment: str = "") -> Withd
     return w
 
 
+WITHDRAWAL_BATCH_ACTIONS = ("complete", "reject")
+
+
+@transaction.atomic
+def process_withdrawals_batch(
+    *,
+    withdrawal_ids,
+    action: str,
+    admin_comment: str = "",
+) -> dict:
+    """
+    Завершить или отклонить пачку заявок на вывод одной транзакцией.
+
+    Вместо цикла complete_withdrawal/reject_withdrawal (по транзакции,
+    два SELECT FOR UPDATE и несколько UPDATE на заявку):
+        - заявки блокируются одним запросом в порядке pk;
+        - кошельки всех владельцев — одним запросом в порядке id.
+          Одинаковый порядок блокировок у всех конкурентных пачек
+          исключает deadlock;
+        - изменения копятся в памяти (несколько заявок одного
+          пользователя списываются последовательно) и пишутся через
+          bulk_update/bulk_create.
+
+    Семантика по каждой заявке совпадает с одиночными сервисами:
+    финальные статусы пропускаются (идемпотентность), нехватка баланса
+    или невалидный статус — ошибка только этой заявки, остальные
+    обрабатываются.
+
+    Args:
+        withdrawal_ids: Iterable pk заявок.
+        action: ``"complete"`` или ``"reject"``.
+        admin_comment: Комментарий администратора (обрезается до 500).
+
+    Raises:
+        WithdrawalStateError: Неизвестное действие.
+
+    Returns:
+        dict: ``{"processed": [pk], "skipped": [pk], "failed": {pk: reason}}``.
+    """
+    from django.utils import timezone
+
+    if action not in WITHDRAWAL_BATCH_ACTIONS:
+        raise WithdrawalStateError(f"Неизвестное действие для пачки выводов: {action}")
+
+    ids = sorted({int(pk) for pk in withdrawal_ids})
+    withdrawals = list(Withdrawal.objects.select_for_update().filter(pk__in=ids).order_by("pk"))
+    found = {w.pk for w in withdrawals}
+    failed = {pk: "Заявка не найдена" for pk in ids if pk not in found}
+
+    wallets = {
+        wallet.user_id: wallet
+        for wallet in Wallet.objects.select_for_update()
+        .filter(user_id__in={w.user_id for w in withdrawals})
+        .order_by("id")
+    }
+
+    final_statuses = ("completed",) if action == "complete" else ("rejected", "completed")
+    comment = (admin_comment or "")[:500]
+    now = timezone.now()
+    processed, skipped = [], []
+    changed_wallets = {}
+    ledger = []
+
+    for w in withdrawals:
+        if w.status in final_statuses:
+            skipped.append(w.pk)
+            continue
+        if w.status not in ("pending", "processing"):
+            failed[w.pk] = f"Невалидный статус: {w.status}"
+            continue
+        wallet = wallets.get(w.user_id)
+        if wallet is None:
+            failed[w.pk] = "Кошелёк не найден"
+            continue
+
+        if action == "complete":
+            if wallet.balance < w.amount:
+                failed[w.pk] = (
+                    f"Баланс пользователя ({wallet.balance}) меньше суммы вывода ({w.amount})"
+                )
+                continue
+            wallet.balance -= w.amount
+            w.status = "completed"
+            ledger.append(
+                Transaction(
+                    user_id=w.user_id,
+                    transaction_type="withdrawal",
+                    amount=-w.amount,
+                    status="completed",
+                    description=f"Вывод средств #{w.pk} ({w.get_payment_method_display()})",
+                )
+            )
+        else:
+            w.status = "rejected"
+
+        wallet.frozen_balance = max(Decimal("0"), wallet.frozen_balance - w.amount)
+        changed_wallets[wallet.pk] = wallet
+        w.admin_comment = comment
+        w.processed_at = now
+        processed.append(w.pk)
+
+    if processed:
+        processed_ids = set(processed)
+        Wallet.objects.bulk_update(changed_wallets.values(), ["balance", "frozen_balance"])
+        header_state.invalidate_wallet(wallet.user_id for wallet in changed_wallets.values())
+        Withdrawal.objects.bulk_update(
+            [w for w in withdrawals if w.pk in processed_ids],
+            ["status", "admin_comment", "processed_at"],
+        )
+        if ledger:
+            Transaction.objects.bulk_create(ledger)
+
+    logger.info(
+        "Withdrawal batch %s: processed=%s skipped=%s failed=%s",
+        action,
+        len(processed),
+        len(skipped),
+        len(failed),
+    )
+    return {"processed": processed, "skipped": skipped, "failed": failed}
+
+
 # ---------------------------------------------------------------------------
 # Deposit
 # ---------------------------------------------------------------------------
@@ -161,40 +161,42 @@ def auto_release_escrow(self):
 
 
 @shared_task(name='payments.check_pending_withdrawals')
-def check_pending_withdrawals():
+def check_pending_withdrawals(stale_after_hours=24):
     """
-    Проверка и уведомление о pending withdrawals.
-    Отправляет уведомления администратору о необработанных выводах.
+    Проверка очереди pending withdrawals.
+
+    Сводка (итог, зависшие, возрастные корзины, разбивка по способам вывода)
+    считается одним агрегатным запросом — без материализации строк.
+    count/total_amount — заявки старше stale_after_hours.
     """
-    from .models import Withdrawal
-    from datetime import timedelta
-    
-    # Находим выводы старше 24 часов в статусе pending
-    threshold = timezone.now() - timedelta(hours=24)
-    
-    pending_withdrawals = Withdrawal.objects.filter(
-        status='pending',
-        created_at__lte=threshold
-    ).select_related('user')
-    
-    if pending_withdrawals.exists():
-        count = pending_withdrawals.count()
-        total_amount = sum(w.amount for w in pending_withdrawals)
-        
+    from .selectors import withdrawal_queue_summary
+
+    summary = withdrawal_queue_summary(stale_after_hours=stale_after_hours)
+
+    if summary['stale_count']:
         logger.warning(
-            f'Found {count} pending withdrawals older than 24 hours. '
-            f'Total amount: {total_amount} RUB'
+            f'Found {summary["stale_count"]} pending withdrawals older than '
+            f'{stale_after_hours} hours. Total amount: {summary["stale_amount"]} RUB '
+            f'(queue: {summary["count"]} / {summary["total_amount"]} RUB)'
         )
-        
+
         # Здесь можно отправить email администратору
         # send_mail_to_admin(...)
-        
-        return {
-            'count': count,
-            'total_amount': float(total_amount)
-        }
-    
-    return {'count': 0, 'total_amount': 0}
+
+    return {
+        'count': summary['stale_count'],
+        'total_amount': float(summary['stale_amount']),
+        'queue_count': summary['count'],
+        'queue_amount': float(summary['total_amount']),
+        'buckets': {
+            key: {'count': b['count'], 'amount': float(b['amount'])}
+            for key, b in summary['buckets'].items()
+        },
+        'by_method': {
+            method: {'count': m['count'], 'amount': float(m['amount'])}
+            for method, m in summary['by_method'].items()
+        },
+    }
 
 
 @shared_task(name='payments.cleanup_old_transactions')
@@ -223,3 +225,84 @@ def cleanup_old_transactions():
     
     return {'count': count}
 
+
+@shared_task(name='payments.build_finance_report', acks_late=True)
+def build_finance_report(month=None):
+    """
+    Месячный финансовый отчёт: комиссии/выплаты продавцам по дням и
+    сверка леджера с кошельками.
+
+    Считается агрегатами в БД (см. payments/reporting.py), CSV кладутся
+    в приватный storage: reports/finance/<YYYY-MM>/payouts.csv. Сверка —
+    состояние кошельков на момент запуска, а не на конец месяца, поэтому
+    лежит под датой запуска: reports/finance/reconciliation/<YYYY-MM-DD>.csv.
+    Повторный запуск перезаписывает файлы.
+
+    Args:
+        month: 'YYYY-MM'; по умолчанию — предыдущий месяц.
+    """
+    import io
+    from datetime import datetime
+
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+
+    from config.storage_backends import get_private_storage
+
+    from . import reporting
+
+    if month:
+        month_start = datetime.strptime(month, '%Y-%m').date()
+    else:
+        month_start = reporting.previous_month()
+    label = f'{month_start:%Y-%m}'
+
+    payouts = reporting.seller_daily_payouts(month=month_start)
+    totals = reporting.payout_totals(payouts)
+    reconciliation = reporting.ledger_reconciliation()
+
+    storage = get_private_storage()
+    run_date = timezone.localdate()
+    files = {
+        f'reports/finance/{label}/payouts.csv': (payouts, reporting.PAYOUT_COLUMNS),
+        f'reports/finance/reconciliation/{run_date:%Y-%m-%d}.csv': (
+            reconciliation['mismatches'],
+            reporting.RECONCILIATION_COLUMNS,
+        ),
+    }
+    paths = []
+    for path, (rows, columns) in files.items():
+        buffer = io.StringIO()
+        reporting.write_csv(rows, columns, buffer)
+        if storage.exists(path):
+            storage.delete(path)
+        paths.append(storage.save(path, ContentFile(buffer.getvalue().encode('utf-8'))))
+
+    if reconciliation['mismatches']:
+        logger.warning(
+            'Finance reconciliation %s: %s of %s wallets do not match the ledger',
+            run_date,
+            len(reconciliation['mismatches']),
+            reconciliation['checked'],
+        )
+
+    logger.info(
+        'Finance report %s: sellers=%s deals=%s gross=%s commission=%s net=%s',
+        label,
+        totals['sellers'],
+        totals['deals'],
+        totals['gross'],
+        totals['commission'],
+        totals['net'],
+    )
+    return {
+        'month': label,
+        'sellers': totals['sellers'],
+        'deals': totals['deals'],
+        'gross': float(totals['gross']),
+        'commission': float(totals['commission']),
+        'net': float(totals['net']),
+        'wallets_checked': reconciliation['checked'],
+        'mismatches': len(reconciliation['mismatches']),
+        'files': paths,
+    }
@@ -68,6 +68,19 @@ class WalletModelTest(WalletTestMixin, TestCase):
         wallet.refresh_from_db()
         self.assertEqual(wallet.frozen_balance, Decimal('0.00'))
 
+    def test_freeze_amount_uses_db_state_not_stale_instance(self):
+        """Условный UPDATE проверяет баланс в БД, а не в устаревшем объекте."""
+        _, wallet = self.create_user(balance=Decimal('100.00'))
+        stale = Wallet.objects.get(pk=wallet.pk)
+        wallet.freeze_amount(Decimal('80.00'))
+        with self.assertRaises(ValueError):
+            stale.freeze_amount(Decimal('80.00'))
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.frozen_balance, Decimal('80.00'))
+
+    def test_try_freeze_returns_false_without_wallet(self):
+        self.assertFalse(Wallet.try_freeze(user_id=999999, amount=Decimal('1.00')))
+
     def test_str(self):
         user, wallet = self.create_user(username='alice', balance=Decimal('500.00'))
         self.assertIn('alice', str(wallet))
@@ -110,6 +123,25 @@ class EscrowModelTest(WalletTestMixin, TestCase):
         with self.assertRaises(ValueError):
             escrow.fund()
 
+    def test_fund_insufficient_rolls_back_status(self):
+        escrow, buyer, _ = self._create_escrow(buyer_balance=Decimal('100.00'))
+        with self.assertRaises(ValueError):
+            escrow.fund()
+        escrow.refresh_from_db()
+        self.assertEqual(escrow.status, 'created')
+        self.assertEqual(Wallet.objects.get(user=buyer).frozen_balance, Decimal('0.00'))
+        self.assertFalse(Transaction.objects.filter(user=buyer, transaction_type='escrow_freeze').exists())
+
+    def test_fund_does_not_lock_rows(self):
+        """Hold-free путь: без SELECT ... FOR UPDATE."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        escrow, _, _ = self._create_escrow()
+        with CaptureQueriesContext(connection) as ctx:
+            escrow.fund()
+        self.assertFalse(any('FOR UPDATE' in q['sql'] for q in ctx.captured_queries))
+
     def test_release_to_seller(self):
         escrow, buyer, seller = self._create_escrow()
         escrow.fund()
@@ -0,0 +1,147 @@
+"""Тесты payments/reporting.py — выплаты продавцам и сверка леджера."""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import pytest
+
+from payments import reporting
+from payments.models import Escrow, Transaction, Wallet
+from payments.tasks import build_finance_report
+from transactions.models import PurchaseRequest
+
+
+@pytest.fixture
+def funded_buyer(buyer):
+    """Покупатель с депозитом 1000 ₽, отражённым в леджере."""
+    Wallet.objects.update_or_create(
+        user=buyer, defaults={"balance": Decimal("1000.00"), "frozen_balance": 0}
+    )
+    Transaction.objects.create(
+        user=buyer, transaction_type="deposit", amount=Decimal("1000.00"), status="completed"
+    )
+    return buyer
+
+
+@pytest.fixture
+def deal(listing_factory, seller, funded_buyer):
+    """Профинансированный эскроу на заданную сумму."""
+
+    def make(amount):
+        listing = listing_factory(seller, price=amount)
+        pr = PurchaseRequest.objects.create(
+            listing=listing, buyer=funded_buyer, seller=seller, status="accepted", amount=amount
+        )
+        escrow = Escrow.objects.create(
+            purchase_request=pr, buyer=funded_buyer, seller=seller, amount=amount
+        )
+        escrow.fund()
+        return escrow
+
+    return make
+
+
+@pytest.mark.django_db
+def test_seller_daily_payouts_aggregates_commission(settings, deal, seller):
+    settings.PLATFORM_COMMISSION_PERCENT = "10"
+    deal(Decimal("500.00")).release_to_seller()
+    deal(Decimal("100.00")).release_to_seller()
+
+    with CaptureQueriesContext(connection) as ctx:
+        rows = reporting.seller_daily_payouts(month=timezone.localdate())
+
+    assert len(ctx.captured_queries) == 1
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["seller_id"] == seller.pk
+    assert row["day"] == timezone.localdate()
+    assert row["deals"] == 2
+    assert row["gross"] == Decimal("600.00")
+    assert row["commission"] == Decimal("60.00")
+    assert row["net"] == Decimal("540.00")
+    assert row["net_mtd"] == Decimal("540.00")
+
+    totals = reporting.payout_totals(rows)
+    assert totals == {
+        "sellers": 1,
+        "deals": 2,
+        "gross": Decimal("600.00"),
+        "commission": Decimal("60.00"),
+        "net": Decimal("540.00"),
+    }
+
+
+@pytest.mark.django_db
+def test_ledger_reconciliation_matches_after_release_and_partial_refund(
+    settings, deal, funded_buyer, seller
+):
+    settings.PLATFORM_COMMISSION_PERCENT = "10"
+    deal(Decimal("500.00")).release_to_seller()
+    deal(Decimal("200.00")).refund_to_buyer(reason="спор", amount=Decimal("50.00"))
+    deal(Decimal("100.00"))  # остаётся funded
+
+    with CaptureQueriesContext(connection) as ctx:
+        report = reporting.ledger_reconciliation()
+
+    assert len(ctx.captured_queries) == 1
+    assert report["checked"] == Wallet.objects.count()
+    assert report["mismatches"] == []
+    buyer_wallet = Wallet.objects.get(user=funded_buyer)
+    assert buyer_wallet.balance == Decimal("350.00")
+    assert buyer_wallet.frozen_balance == Decimal("100.00")
+
+
+@pytest.mark.django_db
+def test_ledger_reconciliation_reports_untracked_balance_change(funded_buyer):
+    Wallet.objects.filter(user=funded_buyer).update(balance=Decimal("1001.00"))
+
+    report = reporting.ledger_reconciliation()
+
+    assert [row["user_id"] for row in report["mismatches"]] == [funded_buyer.pk]
+    assert report["mismatches"][0]["balance_diff"] == Decimal("1.00")
+    assert reporting.ledger_reconciliation(tolerance=Decimal("1.00"))["mismatches"] == []
+
+
+def test_previous_month_crosses_year_boundary():
+    from datetime import date
+
+    assert reporting.previous_month(date(2026, 1, 15)) == date(2025, 12, 1)
+    assert reporting.previous_month(date(2026, 10, 1)) == date(2026, 9, 1)
+
+
+@pytest.mark.django_db
+def test_build_finance_report_task_writes_csv(settings, tmp_path, deal, monkeypatch):
+    from django.core.files.storage import FileSystemStorage
+
+    settings.PLATFORM_COMMISSION_PERCENT = "10"
+    deal(Decimal("500.00")).release_to_seller()
+    storage = FileSystemStorage(location=tmp_path)
+    monkeypatch.setattr("config.storage_backends.get_private_storage", lambda: storage)
+
+    result = build_finance_report(month=f"{timezone.localdate():%Y-%m}")
+
+    today = timezone.localdate()
+    assert result["files"] == [
+        f"reports/finance/{today:%Y-%m}/payouts.csv",
+        f"reports/finance/reconciliation/{today:%Y-%m-%d}.csv",
+    ]
+    assert result["deals"] == 1
+    assert result["commission"] == 50.0
+    assert result["mismatches"] == 0
+    payouts = (tmp_path / result["files"][0]).read_text(encoding="utf-8").splitlines()
+    assert payouts[0] == ",".join(reporting.PAYOUT_COLUMNS)
+    assert len(payouts) == 2
+
+
+@pytest.mark.django_db
+def test_finance_report_command_prints_summary(funded_buyer):
+    out = StringIO()
+    call_command("finance_report", month=f"{timezone.localdate():%Y-%m}", stdout=out)
+
+    assert "Сверка леджера" in out.getvalue()
+    assert "расхождений: 0" in out.getvalue()
@@ -1,7 +1,12 @@
 """Тесты payments/selectors.py — read-слой кошельков/транзакций/эскроу."""
 
+from datetime import timedelta
 from decimal import Decimal
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
 import pytest
 
 from payments.models import Escrow, Transaction, Wallet, Withdrawal
@@ -12,6 +17,7 @@ from payments.selectors import (
     user_pending_withdrawals,
     user_recent_transactions,
     user_transactions,
+    withdrawal_queue_summary,
 )
 
 # ─────────────────────────────────────────────────────────────────────
@@ -228,3 +234,39 @@ def test_pending_withdrawals_admin_returns_all_pending(verified_user, user_facto
 
     pks = set(pending_withdrawals_admin().values_list("pk", flat=True))
     assert {w1.pk, w2.pk} <= pks
+
+
+@pytest.mark.django_db
+def test_withdrawal_queue_summary_single_query(verified_user, user_factory):
+    """Итоги, корзины по возрасту и разбивка по методам — одним запросом."""
+    other = user_factory()
+    now = timezone.now()
+
+    fresh = Withdrawal.objects.create(
+        user=verified_user, amount=Decimal("100"), payment_method="card", status="pending"
+    )
+    stale = Withdrawal.objects.create(
+        user=other, amount=Decimal("250"), payment_method="yoomoney", status="pending"
+    )
+    ancient = Withdrawal.objects.create(
+        user=other, amount=Decimal("400"), payment_method="card", status="pending"
+    )
+    Withdrawal.objects.filter(pk=stale.pk).update(created_at=now - timedelta(hours=30))
+    Withdrawal.objects.filter(pk=ancient.pk).update(created_at=now - timedelta(days=10))
+    Withdrawal.objects.create(
+        user=verified_user, amount=Decimal("999"), payment_method="card", status="completed"
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        summary = withdrawal_queue_summary(now=now)
+
+    assert len(ctx.captured_queries) == 1
+    assert summary["count"] == 3
+    assert summary["total_amount"] == Decimal("750")
+    assert summary["stale_count"] == 2
+    assert summary["stale_amount"] == Decimal("650")
+    assert summary["buckets"]["lt_24h"] == {"count": 1, "amount": fresh.amount}
+    assert summary["buckets"]["24h_72h"] == {"count": 1, "amount": Decimal("250")}
+    assert summary["buckets"]["gt_7d"] == {"count": 1, "amount": Decimal("400")}
+    assert summary["by_method"]["card"] == {"count": 2, "amount": Decimal("500")}
+    assert summary["by_method"]["qiwi"] == {"count": 0, "amount": Decimal("0")}
@@ -0,0 +1,89 @@
+"""Тесты payments/services.py — пакетная обработка заявок на вывод."""
+
+from decimal import Decimal
+
+import pytest
+
+from payments.models import Transaction, Wallet, Withdrawal
+from payments.services import WithdrawalStateError, process_withdrawals_batch
+
+
+def _wallet(user, balance, frozen):
+    wallet, _ = Wallet.objects.get_or_create(user=user)
+    wallet.balance = balance
+    wallet.frozen_balance = frozen
+    wallet.save(update_fields=["balance", "frozen_balance"])
+    return wallet
+
+
+def _withdrawal(user, amount, status="pending"):
+    return Withdrawal.objects.create(
+        user=user, amount=Decimal(amount), payment_method="card", status=status
+    )
+
+
+@pytest.mark.django_db
+def test_batch_complete_debits_each_wallet_once(verified_user, user_factory):
+    """Несколько заявок одного пользователя списываются последовательно."""
+    other = user_factory()
+    _wallet(verified_user, Decimal("1000"), Decimal("500"))
+    _wallet(other, Decimal("300"), Decimal("300"))
+    w1 = _withdrawal(verified_user, "200")
+    w2 = _withdrawal(verified_user, "300")
+    w3 = _withdrawal(other, "300")
+
+    result = process_withdrawals_batch(
+        withdrawal_ids=[w3.pk, w1.pk, w2.pk], action="complete", admin_comment="ok"
+    )
+
+    assert result == {"processed": [w1.pk, w2.pk, w3.pk], "skipped": [], "failed": {}}
+    wallet = Wallet.objects.get(user=verified_user)
+    assert wallet.balance == Decimal("500")
+    assert wallet.frozen_balance == Decimal("0")
+    assert Wallet.objects.get(user=other).balance == Decimal("0")
+    assert set(Withdrawal.objects.values_list("status", flat=True)) == {"completed"}
+    assert Transaction.objects.filter(transaction_type="withdrawal").count() == 3
+
+
+@pytest.mark.django_db
+def test_batch_complete_isolates_failures(verified_user, user_factory):
+    """Нехватка баланса и финальный статус не мешают остальным заявкам."""
+    poor = user_factory()
+    _wallet(verified_user, Decimal("500"), Decimal("200"))
+    _wallet(poor, Decimal("50"), Decimal("0"))
+    ok = _withdrawal(verified_user, "200")
+    done = _withdrawal(verified_user, "100", status="completed")
+    rejected = _withdrawal(verified_user, "100", status="rejected")
+    broke = _withdrawal(poor, "100")
+
+    result = process_withdrawals_batch(
+        withdrawal_ids=[ok.pk, done.pk, rejected.pk, broke.pk, 999999], action="complete"
+    )
+
+    assert result["processed"] == [ok.pk]
+    assert result["skipped"] == [done.pk]
+    assert set(result["failed"]) == {rejected.pk, broke.pk, 999999}
+    broke.refresh_from_db()
+    assert broke.status == "pending"
+    assert Wallet.objects.get(user=poor).balance == Decimal("50")
+
+
+@pytest.mark.django_db
+def test_batch_reject_unfreezes(verified_user):
+    _wallet(verified_user, Decimal("500"), Decimal("300"))
+    w1 = _withdrawal(verified_user, "100")
+    w2 = _withdrawal(verified_user, "200")
+
+    result = process_withdrawals_batch(withdrawal_ids=[w1.pk, w2.pk], action="reject")
+
+    assert result["processed"] == [w1.pk, w2.pk]
+    wallet = Wallet.objects.get(user=verified_user)
+    assert wallet.balance == Decimal("500")
+    assert wallet.frozen_balance == Decimal("0")
+    assert not Transaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_batch_unknown_action_raises(verified_user):
+    with pytest.raises(WithdrawalStateError):
+        process_withdrawals_batch(withdrawal_ids=[1], action="approve")
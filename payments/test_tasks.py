@@ -150,6 +150,9 @@ class TestCheckPendingWithdrawals:
         result = check_pending_withdrawals()
         assert result['count'] == 1
         assert result['total_amount'] == 500.0
+        assert result['queue_count'] == 1
+        assert result['buckets']['24h_72h'] == {'count': 1, 'amount': 500.0}
+        assert result['by_method']['card']['count'] == 1
 
     def test_ignores_recent_pending(self, verified_user):
         """Свежие pending (<24h) — не попадают."""
@@ -0,0 +1,127 @@
+"""
+Ёмкость по одновременным соединениям: sync (WSGI) против async (ASGI) воркеров.
+
+Держит N одновременных клиентов, каждый без пауз опрашивает эндпоинт, и
+ступенчато поднимает N. На каждой ступени — RPS, p50/p95/p99 и доля
+ошибок (таймауты, 5xx, 429 не считается ошибкой сервера и выводится
+отдельно). Ёмкость — наибольшее N, при котором p95 ≤ --slo-ms и ошибок
+не больше --max-error-rate.
+
+Один и тот же набор запускается против двух серверов с одинаковым числом
+процессов:
+
+    # sync: gunicorn gthread, 4 процесса × 8 потоков
+    gunicorn config.wsgi:application --workers 4 --threads 8 --bind :8001
+
+    # async: gunicorn + uvicorn workers (как в Dockerfile)
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker \\
+        --workers 4 --bind :8002
+
+    python tests/locust/bench_concurrency.py --host http://localhost:8001 \\
+        --path "/api/search/suggest/?q=ак" --path /health/ready/
+    python tests/locust/bench_concurrency.py --host http://localhost:8002 \\
+        --path "/api/search/suggest/?q=ак" --path /health/ready/
+
+Эндпоинты с авторизацией (unread-count, опрос чата) — с cookie сессии:
+
+    --cookie sessionid=<...> --path /notifications/unread-count/
+
+Зависимость: pip install httpx.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def worker(client, paths, deadline, latencies, counters):
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except httpx.HTTPError:
+            counters["errors"] += 1
+            continue
+        elapsed = time.perf_counter() - started
+        if response.status_code == 429:
+            counters["throttled"] += 1
+        elif response.status_code >= 500:
+            counters["errors"] += 1
+        else:
+            latencies.append(elapsed)
+
+
+async def run_level(args, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    cookies = dict(cookie.split("=", 1) for cookie in args.cookie)
+    latencies, counters = [], {"errors": 0, "throttled": 0}
+    async with httpx.AsyncClient(
+        base_url=args.host, limits=limits, timeout=args.timeout, cookies=cookies
+    ) as client:
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, args.path, deadline, latencies, counters) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+    total = len(latencies) + counters["errors"] + counters["throttled"]
+    return {
+        "concurrency": concurrency,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "error_rate": counters["errors"] / total if total else 1.0,
+        "throttled": counters["throttled"],
+    }
+
+
+async def main(args):
+    print(f"{args.host}  paths={args.path}  {args.duration}s на ступень")
+    print(f"{'N':>6} {'rps':>9} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'ошибки':>7} {'429':>6}")
+    capacity = 0
+    for concurrency in args.levels:
+        row = await run_level(args, concurrency)
+        print(
+            f"{row['concurrency']:>6} {row['rps']:>9.1f} {row['p50']:>8.1f} {row['p95']:>8.1f} "
+            f"{row['p99']:>8.1f} {row['error_rate']:>7.1%} {row['throttled']:>6}"
+        )
+        if row["p95"] <= args.slo_ms and row["error_rate"] <= args.max_error_rate:
+            capacity = concurrency
+    print(f"Ёмкость: {capacity} одновременных соединений (p95 ≤ {args.slo_ms} мс)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--path", action="append", required=True)
+    parser.add_argument(
+        "--levels",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[25, 50, 100, 200, 400, 800],
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--slo-ms", type=float, default=250.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--cookie", action="append", default=[])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
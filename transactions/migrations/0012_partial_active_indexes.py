@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0020_partial_active_indexes"),
+        ("transactions", "0011_alter_purchaserequest_amount"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "accepted"])),
+                fields=["listing"],
+                name="pr_listing_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["created_at"],
+                name="pr_pending_created_idx",
+            ),
+        ),
+    ]
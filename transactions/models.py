@@ -78,6 +78,21 @@ class PurchaseRequest(models.Model):
             models.Index(fields=["buyer", "status"]),
             models.Index(fields=["seller", "status"]),
             models.Index(fields=["seller", "-completed_at"]),
+            # Partial-индексы по «живым» статусам: активных запросов на порядки
+            # меньше, чем завершённых, поэтому индексы остаются крошечными.
+            # Проверка «есть ли активные запросы на листинг» (listing_delete,
+            # admin delete_listing).
+            models.Index(
+                fields=["listing"],
+                condition=models.Q(status__in=["pending", "accepted"]),
+                name="pr_listing_active_idx",
+            ),
+            # Скан кандидатов на истечение (expire_stale_purchase_requests).
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="pr_pending_created_idx",
+            ),
         ]
 
     def __str__(self):
@@ -31,6 +31,7 @@ from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
 from django.utils import timezone
 
+from core import fraud_rules
 from listings.models import Listing
 
 from .models import PurchaseRequest
@@ -167,6 +168,16 @@ def create_purchase_request(
         NotificationService.notify_purchase_request(pr)
 
     _notify(_on_commit)
+    fraud_rules.publish(
+        fraud_rules.FraudEvent(
+            "purchase_request",
+            buyer.pk,
+            object_id=pr.pk,
+            amount=pr.amount,
+            game_id=locked_listing.game_id,
+            category_id=locked_listing.category_id,
+        )
+    )
 
     logger.info(
         "PurchaseRequest created id=%s listing_id=%s buyer_id=%s",
@@ -192,18 +203,29 @@ def accept_purchase_request(*, request_id: int, user) -> PurchaseRequest:
     листинга. Если средств у покупателя недостаточно — ничего не меняем
     и поднимаем :class:`EscrowFundingError`.
 
-    Выполняется под select_for_update — защита от двойного accept.
+    Hold-free путь: PR не блокируется SELECT FOR UPDATE. Переход
+    ``pending -> accepted`` — условный UPDATE с проверкой rowcount
+    (защита от двойного accept), заморозка средств — такой же условный
+    UPDATE кошелька (см. ``Wallet.try_freeze``). Row-lock'и держатся
+    только на время этих statement'ов до коммита.
     """
-    pr = PurchaseRequest.objects.select_for_update().get(pk=request_id)
+    pr = PurchaseRequest.objects.select_related("listing").get(pk=request_id)
 
     if pr.seller_id != user.pk:
         raise PermissionDenied("Только продавец может принять запрос.")
     if pr.status != "pending":
         raise PurchaseRequestStateError("Этот запрос уже обработан.")
 
+    now = timezone.now()
+    claimed = PurchaseRequest.objects.filter(pk=pr.pk, status="pending").update(
+        status="accepted", accepted_at=now, updated_at=now
+    )
+    if not claimed:
+        raise PurchaseRequestStateError("Этот запрос уже обработан.")
+
     # Создаём эскроу и пытаемся заморозить средства покупателя.
     # Если у покупателя нет кошелька с достаточным балансом —
-    # accept не выполняется, транзакция откатывается.
+    # исключение откатывает и переход PR в accepted.
     escrow = _get_or_create_escrow(pr)
     if escrow.status == "created":
         if not _try_fund_escrow(escrow):
@@ -214,8 +236,8 @@ def accept_purchase_request(*, request_id: int, user) -> PurchaseRequest:
             )
 
     pr.status = "accepted"
-    pr.accepted_at = timezone.now()
-    pr.save(update_fields=["status", "accepted_at"])
+    pr.accepted_at = now
+    pr.updated_at = now
 
     pr.listing.status = "reserved"
     pr.listing.save(update_fields=["status"])
@@ -388,3 +410,61 @@ def cancel_purchase_request(*, request_id: int, user) -> PurchaseRequest:
 
     logger.info("PurchaseRequest cancelled id=%s buyer_id=%s", pr.pk, user.pk)
     return pr
+
+
+# ---------------------------------------------------------------------------
+# Пакетные переходы
+# ---------------------------------------------------------------------------
+
+
+def expire_stale_purchase_requests(
+    *,
+    max_age_hours: int | None = None,
+    batch_size: int = 500,
+    now=None,
+) -> int:
+    """
+    Отменить ``pending``-запросы, на которые продавец не ответил за
+    ``max_age_hours`` (по умолчанию ``settings.PURCHASE_REQUEST_PENDING_TTL_HOURS``).
+
+    Переход ``pending -> cancelled`` — set-based UPDATE порциями
+    (см. :func:`core.bulk_transitions.bulk_transition`). Эскроу у pending
+    ещё нет, листинг остаётся ``active`` — трогать деньги не нужно.
+    Покупатели получают in-app уведомление одним bulk_create на порцию.
+
+    Returns:
+        Число отменённых запросов.
+    """
+    from django.conf import settings
+
+    from core.bulk_transitions import bulk_transition
+    from core.services import NotificationService
+
+    if max_age_hours is None:
+        max_age_hours = settings.PURCHASE_REQUEST_PENDING_TTL_HOURS
+    now = now or timezone.now()
+    cutoff = now - timezone.timedelta(hours=max_age_hours)
+
+    def _notify_batch(rows):
+        entries = [
+            {
+                "user_id": row["buyer_id"],
+                "notification_type": "system",
+                "title": f"Запрос истёк: {row['listing__title']}",
+                "message": (
+                    f"Продавец не ответил на ваш запрос за {max_age_hours} ч., "
+                    "запрос отменён автоматически."
+                ),
+                "link": f"/transactions/purchase-request/{row['pk']}/",
+            }
+            for row in rows
+        ]
+        _notify(lambda: NotificationService.bulk_notify(entries))
+
+    return bulk_transition(
+        PurchaseRequest.objects.filter(status="pending", created_at__lt=cutoff),
+        updates={"status": "cancelled", "cancelled_at": now, "updated_at": now},
+        fields=("buyer_id", "listing__title"),
+        batch_size=batch_size,
+        on_batch=_notify_batch,
+    )
@@ -0,0 +1,54 @@
+"""
+Celery задачи для transactions приложения.
+
+Задачи идемпотентны: пакетные переходы повторно проверяют исходный
+статус в UPDATE, поэтому retry не задвоит ни переход, ни уведомления.
+"""
+
+import logging
+
+from django.conf import settings
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    name="transactions.expire_stale_requests",
+    max_retries=3,
+    default_retry_delay=300,
+    acks_late=True,
+)
+def expire_stale_requests(self, batch_size=None):
+    """
+    Истечение зависших сделок и торга.
+
+    - PurchaseRequest ``pending`` старше PURCHASE_REQUEST_PENDING_TTL_HOURS
+      → ``cancelled``;
+    - PriceOffer ``pending``/``countered`` с истёкшим ``expires_at``
+      → ``expired``.
+
+    Запускается Celery Beat'ом раз в час.
+    """
+    from listings.services import price_offers_expire
+    from transactions.services import expire_stale_purchase_requests
+
+    batch_size = batch_size or settings.TRADE_EXPIRY_BATCH_SIZE
+    try:
+        requests_expired = expire_stale_purchase_requests(batch_size=batch_size)
+        offers_expired = price_offers_expire(batch_size=batch_size)
+    except Exception as exc:
+        logger.exception("expire_stale_requests failed")
+        raise self.retry(exc=exc)
+
+    logger.info(
+        "expire_stale_requests: purchase_requests=%s price_offers=%s",
+        requests_expired,
+        offers_expired,
+    )
+    return {
+        "purchase_requests": requests_expired,
+        "price_offers": offers_expired,
+    }
@@ -60,6 +60,20 @@ class TestPurchaseRequestModel:
         active_listing.refresh_from_db()
         assert active_listing.status == "reserved"
 
+    def test_accept_twice_freezes_once(self, active_listing, buyer, purchase_request_factory):
+        """Повторный accept отклоняется, средства замораживаются один раз."""
+        from payments.models import Wallet
+        from transactions.services import PurchaseRequestStateError
+
+        Wallet.objects.update_or_create(user=buyer, defaults={"balance": Decimal("10000.00")})
+        purchase = purchase_request_factory(active_listing, buyer)
+        purchase.accept()
+
+        with pytest.raises(PurchaseRequestStateError):
+            purchase.accept()
+
+        assert Wallet.objects.get(user=buyer).frozen_balance == active_listing.price
+
     def test_reject_method(self, active_listing, buyer, purchase_request_factory):
         """Метод reject()."""
         purchase = purchase_request_factory(active_listing, buyer)
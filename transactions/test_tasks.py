@@ -0,0 +1,108 @@
+"""Тесты пакетного истечения запросов на покупку (services + Celery task)."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+
+from core.models import Notification
+from transactions.models import PurchaseRequest
+from transactions.services import expire_stale_purchase_requests
+from transactions.tasks import expire_stale_requests
+
+
+def _age(pr, hours):
+    PurchaseRequest.objects.filter(pk=pr.pk).update(
+        created_at=timezone.now() - timedelta(hours=hours)
+    )
+
+
+@pytest.mark.django_db
+def test_expire_stale_purchase_requests_cancels_only_old_pending(
+    listing_factory,
+    seller,
+    buyer,
+    user_factory,
+    purchase_request_factory,
+    django_capture_on_commit_callbacks,
+):
+    old = [purchase_request_factory(listing_factory(seller), buyer) for _ in range(3)]
+    for pr in old:
+        _age(pr, 100)
+    fresh = purchase_request_factory(listing_factory(seller), buyer)
+    accepted = purchase_request_factory(listing_factory(seller), user_factory(), status="accepted")
+    _age(accepted, 100)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert expire_stale_purchase_requests(max_age_hours=72, batch_size=2) == 3
+
+    for pr in old:
+        pr.refresh_from_db()
+        assert pr.status == "cancelled"
+        assert pr.cancelled_at is not None
+    fresh.refresh_from_db()
+    accepted.refresh_from_db()
+    assert fresh.status == "pending"
+    assert accepted.status == "accepted"
+    assert Notification.objects.filter(user=buyer, notification_type="system").count() == 3
+
+
+@pytest.mark.django_db
+def test_expire_stale_purchase_requests_uses_one_update_per_batch(
+    listing_factory, seller, buyer, purchase_request_factory, django_assert_max_num_queries
+):
+    for _ in range(5):
+        _age(purchase_request_factory(listing_factory(seller), buyer), 100)
+
+    # Порция: SELECT + UPDATE (+ savepoint'ы); без запроса на каждую строку.
+    with django_assert_max_num_queries(8):
+        assert expire_stale_purchase_requests(max_age_hours=72, batch_size=10) == 5
+
+
+@pytest.mark.django_db
+def test_expire_stale_requests_task(settings, active_listing, buyer, purchase_request_factory):
+    settings.PURCHASE_REQUEST_PENDING_TTL_HOURS = 1
+    _age(purchase_request_factory(active_listing, buyer), 2)
+
+    result = expire_stale_requests.apply().get()
+
+    assert result == {"purchase_requests": 1, "price_offers": 0}
+
+
+@pytest.mark.django_db
+def test_expire_skips_request_accepted_after_select(
+    listing_factory,
+    seller,
+    buyer,
+    user_factory,
+    purchase_request_factory,
+    django_capture_on_commit_callbacks,
+):
+    from django.db import connection
+
+    stale = purchase_request_factory(listing_factory(seller), buyer)
+    raced = purchase_request_factory(listing_factory(seller), user_factory())
+    _age(stale, 100)
+    _age(raced, 100)
+    state = {"selected": False, "done": False}
+
+    def accept_after_select(execute, sql, params, many, context):
+        if state["selected"] and not state["done"]:
+            # Продавец принимает запрос сразу после SELECT порции
+            state["done"] = True
+            PurchaseRequest.objects.filter(pk=raced.pk).update(status="accepted")
+        if sql.startswith("SELECT") and "LIMIT" in sql:
+            state["selected"] = True
+        return execute(sql, params, many, context)
+
+    with (
+        django_capture_on_commit_callbacks(execute=True),
+        connection.execute_wrapper(accept_after_select),
+    ):
+        assert expire_stale_purchase_requests(max_age_hours=72) == 1
+
+    raced.refresh_from_db()
+    assert raced.status == "accepted"
+    assert Notification.objects.filter(user=buyer, notification_type="system").count() == 1
+    assert not Notification.objects.filter(user=raced.buyer).exists()